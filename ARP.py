@@ -0,0 +1,85 @@
+"""
+ARP.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Implements the Address Resolution Protocol (ARP) layer for IPv4 over Ethernet.
+             Supports building requests/replies and parsing from raw bytes. Carried by Ether
+             under EtherType 0x0806.
+"""
+
+import struct
+from Packet import Packet
+from addresses import mac_field, ipv4_field
+
+
+ARP_REQUEST = 1
+ARP_REPLY = 2
+
+
+class ARP(Packet):
+    sender_mac = mac_field()
+    sender_IP = ipv4_field()
+    target_mac = mac_field()
+    target_IP = ipv4_field()
+    show_fields = (("hw_type", "hw_type"), ("proto_type", "proto_type", "0x{:04x}"),
+                   ("hw_len", "hw_len"), ("proto_len", "proto_len"), ("opcode", "opcode"),
+                   ("sender_mac", "sender_mac"), ("sender_IP", "sender_IP"),
+                   ("target_mac", "target_mac"), ("target_IP", "target_IP"))
+
+    def __init__(self, opcode=ARP_REQUEST, sender_mac=None, sender_IP=None,
+                 target_mac="00:00:00:00:00:00", target_IP=None, payload=None, raw=None):
+        """
+        Description: Initializes an ARP packet. Can construct from provided fields (for sending)
+                     or parse from raw bytes (for receiving).
+
+        @param opcode: 1 = request ("who-has"), 2 = reply ("is-at").
+        @param sender_mac: Sender hardware address, e.g. "08:00:27:e2:a4:11".
+        @param sender_IP: Sender IPv4 address.
+        @param target_mac: Target hardware address (all zeros in a request).
+        @param target_IP: Target IPv4 address (the one being resolved in a request).
+        @param payload: Should be None; Ethernet padding ends up here when parsing.
+        @param raw: If provided, parse these bytes.
+        @returns: None
+        """
+        super().__init__(payload)
+        if raw:
+            #2 bytes each for hardware and protocol type, 1 byte each for their lengths, 2 bytes opcode
+            #then sender mac/ip and target mac/ip (6 + 4 bytes each for Ethernet/IPv4)
+            (self.hw_type, self.proto_type, self.hw_len, self.proto_len, self.opcode,
+             sender_mac, sender_IP, target_mac, target_IP) = struct.unpack('!HHBBH6s4s6s4s', raw[:28])
+            ARP.sender_mac.set_packed(self, sender_mac)
+            ARP.sender_IP.set_packed(self, sender_IP)
+            ARP.target_mac.set_packed(self, target_mac)
+            ARP.target_IP.set_packed(self, target_IP)
+            #anything after the 28 bytes is Ethernet padding
+            self.payload = raw[28:] or None
+        else:
+            self.hw_type = 1
+            self.proto_type = 0x0800
+            self.hw_len = 6
+            self.proto_len = 4
+            self.opcode = opcode
+            self.sender_mac = sender_mac
+            self.sender_IP = sender_IP
+            self.target_mac = target_mac
+            self.target_IP = target_IP
+
+    def to_bytes(self):
+        """
+        Description: Byte representation of the ARP packet.
+
+        @returns: (bytes) The 28-byte ARP message.
+        """
+        return struct.pack('!HHBBH6s4s6s4s', self.hw_type, self.proto_type, self.hw_len, self.proto_len,
+                           self.opcode, ARP.sender_mac.packed(self), ARP.sender_IP.packed(self),
+                           ARP.target_mac.packed(self), ARP.target_IP.packed(self))
+
+    def summary_part(self):
+        """
+        Description: One-line description, e.g. "ARP who-has 10.0.2.2 tell 10.0.2.15".
+        """
+        if self.opcode == ARP_REQUEST:
+            return f"ARP who-has {self.target_IP} tell {self.sender_IP}"
+        if self.opcode == ARP_REPLY:
+            return f"ARP {self.sender_IP} is-at {self.sender_mac}"
+        return f"ARP op={self.opcode} {self.sender_IP} > {self.target_IP}"
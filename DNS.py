@@ -3,20 +3,274 @@ DNS.py      COSC 60      Oct 19th, 2025
 
 Author: Ahmed Al Sunbati
 Description: Represents the Domain Name System (DNS) application layer (Layer 7).
-             Supports building DNS queries and parsing responses. Designed to be encapsulated
-             by UDP at Layer 4 and to serve as the final payload (payload=None).
+             Supports building DNS queries and responses (answer and authority records, see
+             ResourceRecord) and parsing both. Designed to be encapsulated by UDP at Layer 4
+             and to serve as the final payload (payload=None).
 """
 
+import socket
 import struct
 from Packet import Packet
 
 
+#common query type names used by summary()
+QTYPE_NAMES = {1: "A", 2: "NS", 5: "CNAME", 6: "SOA", 12: "PTR", 15: "MX", 16: "TXT",
+               28: "AAAA", 33: "SRV", 41: "OPT", 255: "ANY"}
+
+#record types by name
+QTYPE_CODES = {name: code for code, name in QTYPE_NAMES.items()}
+
+#EDNS(0) pseudo-record type (RFC 6891)
+TYPE_OPT = 41
+
+#flag bits and response codes
+FLAG_QR = 0x8000
+FLAG_AA = 0x0400
+FLAG_TC = 0x0200
+FLAG_RD = 0x0100
+FLAG_RA = 0x0080
+RCODE_NOERROR = 0
+RCODE_FORMERR = 1
+RCODE_SERVFAIL = 2
+RCODE_NXDOMAIN = 3
+RCODE_NOTIMP = 4
+RCODE_REFUSED = 5
+#DNSSEC OK bit in the OPT record's flags
+EDNS_DO = 0x8000
+
+#marks a parsed message whose additional section has not been searched for an OPT record yet
+_UNPARSED = object()
+
+
+def skip_name(data, offset):
+    """
+    Description: Offset just past an encoded name, without decoding it (a compression
+                 pointer ends the name).
+
+    @param data: Raw DNS message.
+    @param offset: Start of the name.
+    @returns: (int) Offset of the byte after the name.
+    """
+    while True:
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        if length == 0:
+            return offset + 1
+        offset += length + 1
+
+
+def encode_name(name):
+    """
+    Description: "example.com" (or "example.com.") -> b'\x07example\x03com\x00'; "" and "."
+                 are the root.
+    """
+    name = name.rstrip(".")
+    if not name:
+        return b'\x00'
+    encoded = b''
+    for part in name.split("."):
+        label = part.encode()
+        if not 0 < len(label) < 64:
+            raise ValueError(f"Invalid DNS name: {name!r}")
+        encoded += bytes((len(label),)) + label
+    return encoded + b'\x00'
+
+
+def read_name(data, offset):
+    """
+    Description: Decodes a possibly compressed name.
+
+    @param data: Raw DNS message.
+    @param offset: Start of the name.
+    @returns: (tuple) (name without the trailing dot, offset of the byte after the name).
+    """
+    labels = []
+    end = None
+    #every pointer must go backwards, which also rules out loops
+    limit = offset
+    while True:
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            target = (length & 0x3F) << 8 | data[offset + 1]
+            if target >= limit:
+                raise ValueError("DNS name pointer does not point backwards")
+            if end is None:
+                end = offset + 2
+            offset = limit = target
+            continue
+        if length == 0:
+            return ".".join(labels), offset + 1 if end is None else end
+        labels.append(data[offset + 1:offset + 1 + length].decode("ascii", "replace"))
+        offset += length + 1
+
+
+def encode_rdata(rtype, value):
+    """
+    Description: RDATA of a record from a Python value: A/AAAA -> address text, NS/CNAME/PTR
+                 -> name, MX -> (preference, name), TXT -> str or list of str,
+                 SRV -> (priority, weight, port, target), SOA -> (mname, rname, serial,
+                 refresh, retry, expire, minimum). bytes are used as they are.
+
+    @param rtype: Record type.
+    @param value: The value.
+    @returns: (bytes) The RDATA.
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    if rtype == 1:
+        return socket.inet_aton(value)
+    if rtype == 28:
+        return socket.inet_pton(socket.AF_INET6, value)
+    if rtype in (2, 5, 12):
+        return encode_name(value)
+    if rtype == 15:
+        return struct.pack("!H", value[0]) + encode_name(value[1])
+    if rtype == 16:
+        strings = [value] if isinstance(value, str) else value
+        out = b''
+        for string in strings:
+            data = string.encode()
+            for start in range(0, len(data) or 1, 255):
+                chunk = data[start:start + 255]
+                out += bytes((len(chunk),)) + chunk
+        return out
+    if rtype == 33:
+        return struct.pack("!HHH", *value[:3]) + encode_name(value[3])
+    if rtype == 6:
+        return encode_name(value[0]) + encode_name(value[1]) + struct.pack("!LLLLL", *value[2:])
+    raise ValueError(f"Cannot encode RDATA of type {rtype} from {value!r}")
+
+
+def decode_rdata(data, offset, length, rtype):
+    """
+    Description: Inverse of encode_rdata for the types it knows; other types stay bytes.
+
+    @param data: Raw DNS message (names in RDATA may point into it).
+    @param offset: Start of the RDATA.
+    @param length: RDLENGTH.
+    @param rtype: Record type.
+    @returns: The value.
+    """
+    rdata = data[offset:offset + length]
+    if rtype == 1 and length == 4:
+        return socket.inet_ntoa(rdata)
+    if rtype == 28 and length == 16:
+        return socket.inet_ntop(socket.AF_INET6, rdata)
+    if rtype in (2, 5, 12):
+        return read_name(data, offset)[0]
+    if rtype == 15:
+        return struct.unpack("!H", rdata[:2])[0], read_name(data, offset + 2)[0]
+    if rtype == 16:
+        strings = []
+        position = 0
+        while position < length:
+            strings.append(rdata[position + 1:position + 1 + rdata[position]].decode("utf-8", "replace"))
+            position += rdata[position] + 1
+        return strings
+    if rtype == 33:
+        return struct.unpack("!HHH", rdata[:6]) + (read_name(data, offset + 6)[0],)
+    if rtype == 6:
+        mname, position = read_name(data, offset)
+        rname, position = read_name(data, position)
+        return (mname, rname) + struct.unpack("!LLLLL", data[position:position + 20])
+    return bytes(rdata)
+
+
+class ResourceRecord:
+    def __init__(self, name, rtype, value, ttl=300, rclass=1):
+        """
+        Description: One resource record of a response (answer, authority or additional
+                     section).
+
+        @param name: Owner name.
+        @param rtype: Record type (1 = A, 28 = AAAA, ...) or its name ("A", "MX", ...).
+        @param value: RDATA as a Python value (see encode_rdata) or raw bytes.
+        @param ttl: Time to live in seconds.
+        @param rclass: Class (1 = IN).
+        @returns: None
+        """
+        self.name = name.rstrip(".")
+        self.rtype = QTYPE_CODES[rtype.upper()] if isinstance(rtype, str) else rtype
+        self.value = value
+        self.ttl = ttl
+        self.rclass = rclass
+        self.rdata = encode_rdata(self.rtype, value)
+
+    def to_bytes(self, owner=None):
+        """
+        Description: Wire form of the record.
+
+        @param owner: Encoded owner name to use instead of the record's name (e.g. a
+                      compression pointer to the question).
+        @returns: (bytes)
+        """
+        return (owner or encode_name(self.name)) + struct.pack("!HHLH", self.rtype, self.rclass, self.ttl,
+                                                                 len(self.rdata)) + self.rdata
+
+    def __repr__(self):
+        rtype = QTYPE_NAMES.get(self.rtype, str(self.rtype))
+        return f"ResourceRecord({self.name!r} {self.ttl} {rtype} {self.value!r})"
+
+
+class EDNS:
+    def __init__(self, udp_size=1232, ext_rcode=0, version=0, flags=0, options=None):
+        """
+        Description: EDNS(0) parameters carried in an OPT pseudo-record.
+
+        @param udp_size: Largest UDP response the sender accepts.
+        @param ext_rcode: Upper 8 bits of the extended RCODE.
+        @param version: EDNS version (0).
+        @param flags: Flags (EDNS_DO for DNSSEC OK).
+        @param options: List of (option code, bytes) pairs (cookies, client subnet, ...).
+        @returns: None
+        """
+        self.udp_size = udp_size
+        self.ext_rcode = ext_rcode
+        self.version = version
+        self.flags = flags
+        self.options = list(options or [])
+
+    @classmethod
+    def from_record(cls, rclass, ttl, rdata):
+        """
+        Description: Decodes an OPT record's class, TTL and RDATA fields.
+        """
+        options = []
+        offset = 0
+        while offset + 4 <= len(rdata):
+            code, length = struct.unpack('!HH', rdata[offset:offset + 4])
+            options.append((code, bytes(rdata[offset + 4:offset + 4 + length])))
+            offset += 4 + length
+        return cls(rclass, ttl >> 24, (ttl >> 16) & 0xFF, ttl & 0xFFFF, options)
+
+    def to_bytes(self):
+        """
+        Description: The OPT record (root name, type 41) carrying these parameters.
+        """
+        rdata = b''.join(struct.pack('!HH', code, len(value)) + value for code, value in self.options)
+        return b'\x00' + struct.pack('!HHBBHH', TYPE_OPT, self.udp_size, self.ext_rcode, self.version,
+                                      self.flags, len(rdata)) + rdata
+
+    def __repr__(self):
+        do = " do" if self.flags & EDNS_DO else ""
+        return f"EDNS(version={self.version} udp={self.udp_size}{do} options={self.options})"
+
+
 class DNS(Packet):
+    show_name = "DNS (Layer 7)"
+    show_fields = (("transaction_id", "transaction_id", "0x{:04x}"), ("flags", "flags", "0x{:04x}"),
+                   ("qdcount", "qdcount"), ("ancount", "ancount"), ("nscount", "nscount"),
+                   ("arcount", "arcount"), ("qname", "qname"), ("qtype", "qtype"), ("qclass", "qclass"),
+                   ("edns", "edns"))
+    show_optional = ("edns",)
+
     def __init__(self, transaction_id=None, flags=None,
                  qdcount=1, ancount=0, nscount=0, arcount=0,
-                 qname=None, qtype=1, qclass=1, raw_bytes=None, payload=None):
+                 qname=None, qtype=1, qclass=1, raw_bytes=None, payload=None, edns=None,
+                 answers=None, authority=None, additional=None):
         """
-        Description: Initializes a DNS packet. Can either construct a new DNS query
+        Description: Initializes a DNS packet. Can either construct a new DNS query or response,
                      or parse an existing DNS message from raw bytes.
 
         @param transaction_id: Unique ID for matching DNS requests and responses.
@@ -30,11 +284,21 @@ class DNS(Packet):
         @param qclass:  Class of query (1 = IN).
         @param raw_bytes: Raw DNS message to parse.
         @param payload: Next layer (should be None for DNS).
+        @param edns: (EDNS or None) Adds an OPT record to the additional section (counted in
+                     arcount on top of the arcount given).
+        @param answers: List of ResourceRecord for the answer section (counted in ancount on
+                        top of the ancount given, likewise for authority).
+        @param authority: List of ResourceRecord for the authority section.
+        @param additional: List of ResourceRecord for the additional section other than the
+                           OPT record (counted in arcount on top of the arcount given).
         @returns: None
         """
         super().__init__(payload=payload)
 
         if raw_bytes:
+            if isinstance(raw_bytes, memoryview):
+                #records are decoded later, after a pooled receive buffer may have been reused
+                raw_bytes = raw_bytes.tobytes()
             # Parse header
             (self.transaction_id, self.flags, self.qdcount, self.ancount,
              self.nscount, self.arcount) = struct.unpack("!HHHHHH", raw_bytes[:12])
@@ -43,6 +307,13 @@ class DNS(Packet):
             offset = 12
             self.qname, offset = self._parse_qname(raw_bytes, offset)
             self.qtype, self.qclass = struct.unpack("!HH", raw_bytes[offset:offset + 4])
+            #the OPT record is only looked for when .edns is read
+            self._raw = raw_bytes
+            self._records_offset = offset + 4
+            self._edns = _UNPARSED if self.arcount else None
+            #answer, authority and additional records are only decoded when read
+            self._answers = self._authority = self._additional = \
+                _UNPARSED if self.ancount or self.nscount or self.arcount else None
         else:
             # Build a new query
             self.transaction_id = transaction_id or 0xAAAA
@@ -54,6 +325,124 @@ class DNS(Packet):
             self.qname = qname or "example.com"
             self.qtype = qtype
             self.qclass = qclass
+            self._edns = edns
+            if edns is not None:
+                self.arcount += 1
+            self._answers = list(answers or [])
+            self._authority = list(authority or [])
+            self._additional = list(additional or [])
+            self.ancount += len(self._answers)
+            self.nscount += len(self._authority)
+            self.arcount += len(self._additional)
+
+    @property
+    def edns(self):
+        """
+        Description: EDNS parameters from the OPT record, found on first access by skipping
+                     over the answer and authority records without decoding them.
+
+        @returns: (EDNS or None) The parameters, or None when the message has no OPT record.
+        """
+        if self._edns is _UNPARSED:
+            self._edns = self._find_edns()
+        return self._edns
+
+    @edns.setter
+    def edns(self, edns):
+        had = self.edns is not None
+        self._edns = edns
+        self.arcount += (edns is not None) - had
+
+    @property
+    def answers(self):
+        """
+        Description: Records of the answer section (decoded on first access for parsed
+                     messages).
+
+        @returns: (list) ResourceRecord objects.
+        """
+        if self._answers is _UNPARSED:
+            self._parse_records()
+        return self._answers or []
+
+    @answers.setter
+    def answers(self, records):
+        self.ancount += len(records) - len(self.answers)
+        self._answers = list(records)
+
+    @property
+    def authority(self):
+        """
+        Description: Records of the authority section (decoded on first access for parsed
+                     messages).
+
+        @returns: (list) ResourceRecord objects.
+        """
+        if self._authority is _UNPARSED:
+            self._parse_records()
+        return self._authority or []
+
+    @authority.setter
+    def authority(self, records):
+        self.nscount += len(records) - len(self.authority)
+        self._authority = list(records)
+
+    @property
+    def additional(self):
+        """
+        Description: Records of the additional section other than the OPT record, which is
+                     edns (decoded on first access for parsed messages).
+
+        @returns: (list) ResourceRecord objects.
+        """
+        if self._additional is _UNPARSED:
+            self._parse_records()
+        return self._additional or []
+
+    @additional.setter
+    def additional(self, records):
+        self.arcount += len(records) - len(self.additional)
+        self._additional = list(records)
+
+    def _parse_records(self):
+        data = self._raw
+        offset = self._records_offset
+        sections = ([], [], [])
+        authority = self.ancount
+        additional = authority + self.nscount
+        try:
+            for index in range(additional + self.arcount):
+                name, offset = read_name(data, offset)
+                rtype, rclass, ttl, rdlength = struct.unpack("!HHLH", data[offset:offset + 10])
+                offset += 10
+                if rtype == TYPE_OPT and index >= additional:
+                    #kept as edns
+                    offset += rdlength
+                    continue
+                value = decode_rdata(data, offset, rdlength, rtype)
+                offset += rdlength
+                sections[(index >= authority) + (index >= additional)].append(
+                    ResourceRecord(name, rtype, value, ttl, rclass))
+        except (IndexError, ValueError, struct.error):
+            #truncated or malformed message: the records before the damage are kept
+            pass
+        self._answers, self._authority, self._additional = sections
+
+    def _find_edns(self):
+        data = self._raw
+        offset = self._records_offset
+        try:
+            for index in range(self.ancount + self.nscount + self.arcount):
+                offset = skip_name(data, offset)
+                rtype, rclass, ttl, rdlength = struct.unpack("!HHLH", data[offset:offset + 10])
+                offset += 10
+                if rtype == TYPE_OPT and index >= self.ancount + self.nscount:
+                    return EDNS.from_record(rclass, ttl, data[offset:offset + rdlength])
+                offset += rdlength
+        except (IndexError, struct.error):
+            #truncated message
+            pass
+        return None
 
     def _encode_qname(self, name):
         """
@@ -63,9 +452,7 @@ class DNS(Packet):
         @param name: Domain name to encode.
         @returns: Encoded domain name in DNS label format.
         """
-        parts = name.split(".")
-        encoded = b''.join(struct.pack("B", len(part)) + part.encode() for part in parts)
-        return encoded + b'\x00'
+        return encode_name(name)
 
     def _parse_qname(self, data, offset):
         """
@@ -88,8 +475,9 @@ class DNS(Packet):
 
     def build(self):
         """
-        Description: Constructs the byte representation of the DNS query message.
-                     This includes the header and the question section.
+        Description: Constructs the byte representation of the DNS message: the header, the
+                     question, the answer, authority and additional records and the OPT
+                     record (if any).
 
         @returns: Fully constructed DNS message bytes.
         """
@@ -107,26 +495,29 @@ class DNS(Packet):
         question += struct.pack("!HH", self.qtype, self.qclass)
 
         packet_bytes = header + question
+        edns = self.edns
+        #the additional section is only decoded when it holds more than the OPT record
+        has_additional = self.arcount > (edns is not None)
+        if self.ancount or self.nscount or has_additional:
+            #owner names equal to the question point back to it (offset 12)
+            qname = self.qname.rstrip(".").lower()
+            records = self.answers + self.authority
+            if has_additional:
+                records += self.additional
+            for record in records:
+                packet_bytes += record.to_bytes(b'\xc0\x0c' if record.name.lower() == qname else None)
+        if edns is not None:
+            packet_bytes += edns.to_bytes()
         if self.payload:
             packet_bytes += self.payload.build()
         return packet_bytes
 
-    def show(self, indent=0):
+    def summary_part(self):
         """
-        Description: Prints a readable representation of the DNS header and question section.
-
-        @param indent: Indentation level for nested layers.
-        @returns: None
+        Description: One-line description of the DNS message, e.g. "DNS A? example.com"
+                     for a query or "DNS A example.com an=1" for a response.
         """
-        print(" " * indent + "### DNS (Layer 7) ###")
-        print(" " * (indent + 1) + f"transaction_id: 0x{self.transaction_id:04x}")
-        print(" " * (indent + 1) + f"flags: 0x{self.flags:04x}")
-        print(" " * (indent + 1) + f"qdcount: {self.qdcount}")
-        print(" " * (indent + 1) + f"ancount: {self.ancount}")
-        print(" " * (indent + 1) + f"nscount: {self.nscount}")
-        print(" " * (indent + 1) + f"arcount: {self.arcount}")
-        print(" " * (indent + 1) + f"qname: {self.qname}")
-        print(" " * (indent + 1) + f"qtype: {self.qtype}")
-        print(" " * (indent + 1) + f"qclass: {self.qclass}")
-        if self.payload:
-            self.payload.show(indent + 1)
+        qtype = QTYPE_NAMES.get(self.qtype, str(self.qtype))
+        if self.flags & 0x8000:
+            return f"DNS {qtype} {self.qname} an={self.ancount}"
+        return f"DNS {qtype}? {self.qname}"
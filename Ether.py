@@ -10,9 +10,21 @@ Description: Implements the Ethernet (Layer 2) packet structure. Supports both c
 import struct
 from Packet import Packet
 from IP import IP
+from ARP import ARP
+from IPv6 import IPv6
+from addresses import mac_field
+
+
+#layers dissected from Ether(raw=...) by EtherType; each takes its bytes as raw=
+ETHER_TYPES = {0x0800: IP, 0x0806: ARP, 0x86DD: IPv6}
 
 
 class Ether(Packet):
+    #stored packed when parsed, as text when built; each form is converted on demand
+    dest_mac = mac_field()
+    src_mac = mac_field()
+    show_fields = (("dest_mac", "dest_mac"), ("src_mac", "src_mac"), ("ethr_type", "ethr_type"))
+
     def __init__(self, dest_mac=None, src_mac=None, ethr_type=0x0800, payload=b'', raw=None):
         """
         Description: Initializes an Ethernet frame. Can be built from header fields or parsed from raw bytes.
@@ -27,14 +39,15 @@ class Ether(Packet):
         if raw: 
         #6 bytes each for the dest and srx mac and 2 bytes for ethr_type
         #unpack the dest_mac and src_mac
-            self.dest_mac = ':'.join(f'{b:02x}' for b in raw[0:6])
-            self.src_mac = ':'.join(f'{b:02x}' for b in raw[6:12])
+            Ether.dest_mac.set_packed(self, raw[0:6])
+            Ether.src_mac.set_packed(self, raw[6:12])
             self.ethr_type = struct.unpack('!H', raw[12:14])[0]
 
             payload_data = raw[14:]
-            #ipv4
-            if self.ethr_type == 0x0800:
-                self.payload= IP(raw=payload_data)
+            #ipv4, arp, ipv6 (see ETHER_TYPES)
+            layer = ETHER_TYPES.get(self.ethr_type)
+            if layer is not None and payload_data:
+                self.payload = layer(raw=payload_data)
             else:
                 self.payload = payload_data
         else:
@@ -53,12 +66,17 @@ class Ether(Packet):
       """
         
         #convert destination and source MAC adress into 6 bytes
-        dest_bytes= bytes(int(x,16) for x in self.dest_mac.split(":"))
-        src_bytes =  bytes(int(x,16) for x in self.src_mac.split(":"))
+        dest_bytes = Ether.dest_mac.packed(self)
+        src_bytes = Ether.src_mac.packed(self)
         #pack the ethernet type as 2 bytes
         eth_type_bytes = struct.pack("!H", self.ethr_type)
         #build payload bytes 
-        payload_bytes = self.payload.to_bytes() if hasattr(self.payload, 'to_bytes') else b''
+        payload_bytes = self.payload_bytes()
         #return full ethernet frame
         return dest_bytes + src_bytes + eth_type_bytes + payload_bytes
-   
\ No newline at end of file
+
+    def summary_part(self):
+        """
+        Description: One-line description of the Ethernet header, e.g. "Ether aa:.. > bb:..".
+        """
+        return f"Ether {self.src_mac} > {self.dest_mac}"
@@ -2,13 +2,17 @@
 #Date: 10/20/25
 #Purpose: tester file for the http get request
 #not fully functioning is not recieving the dns reply
-import socket, subprocess, time, random
+import subprocess, random
 from IP import IP
-from TCP import TCP
 from UDP import UDP
 from DNS import DNS
 from network_utils import sr
-from network_utils import send
+from tcp_connection import TCPConnection, RawIPLink
+from http_client import HTTPConnection
+import events
+
+#the library is silent by default, print progress and dump received packets
+events.set_verbosity(2)
 
 INTERFACE = "enp0s3"
 SRC_IP = "10.0.2.15"
@@ -62,35 +66,14 @@ print(f"[+] {DOMAIN} IP: {vibrant_IP}")
 command = ['sudo', 'iptables', '-A', 'OUTPUT', '-p', 'tcp', '-m', 'tcp', '--tcp-flags','RST', 'RST', '-j', 'DROP']
 result = subprocess.run(command, check=True, capture_output=True, text=True)
 
-#3 way handshake
-#syn
-seqN = 1000
-SYN_pkt = TCP(src_port=SRC_PORT, dst_port=DST_PORT, seq=seqN, flags=0X02, ip_src=SRC_IP, ip_dst=vibrant_IP)
-IP_SYN = IP(src_IP=SRC_IP, dest_IP=vibrant_IP, protocol=6, payload=SYN_pkt)
-SYN_ACK_reply = sr(IP_SYN, timeout=3)
-
-#send SYN and wait for SYN-ACK
-if not SYN_ACK_reply:
-    raise Exception(" No SYN-ACK reply received")
-#get server TCP
-server_TCP = SYN_ACK_reply.payload.payload
-server_seq = server_TCP.seq
-
-#ACK
-ACK_pkt = TCP(src_port=SRC_PORT, dst_port=DST_PORT, seq=seqN +1, ack_seq=server_seq+1, FLAGS=0X10, ip_src=SRC_IP, ip_dst=vibrant_IP)
-IP_ACK = IP(src_IP=SRC_IP, dest_IP=vibrant_IP, protocol=6, payload=ACK_pkt)
-sr(IP_ACK)
-
-#http get request
-http_request = f"GET /index.html HTTP/1.0\r\nHost: {DOMAIN}\r\n\r\n".encode()
-TCP_pkt = TCP(src_port=SRC_PORT, dst_port=DST_PORT, seq= seqN + 1, ack_seq=server_seq+1, flags=0x18, ip_src=SRC_IP, ip_dst=vibrant_IP, data=http_request)
-IP_HTTP = IP (src_IP=SRC_IP, dest_IP=vibrant_IP, protocol=6, payload=TCP_pkt)
-HTTP_reply = sr(IP_HTTP, timeout=5)
-
-if HTTP_reply:
-    TCP_reply = HTTP_reply.payload.payload
-    print("[+] HTTP Response:\n")
-    print(TCP_reply.data.decode(errors='ignore'))
+#HTTP/1.1 GET over the library's TCP connection (handshake, ACKs and reassembly of the
+#whole response are handled by tcp_connection; raw IP sockets use SRC_IP)
+conn = TCPConnection(vibrant_IP, DST_PORT, src_port=SRC_PORT, link=RawIPLink(vibrant_IP, SRC_IP))
+conn.connect()
+with HTTPConnection(vibrant_IP, DST_PORT, connect=lambda: conn, host_header=DOMAIN) as http:
+    response, body = http.fetch("GET", "/index.html")
+    print(f"[+] HTTP Response: {response.summary()}\n")
+    print(body.decode(errors='ignore'))
 
 #enable firewall again
 
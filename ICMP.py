@@ -4,14 +4,81 @@ ICMP.py      COSC 60      Oct 19th, 2025
 Author: Dejanae Green
 Description: Implements the Internet Control Message Protocol (ICMP) layer (Layer 3).
              Supports building ICMP headers, computing checksums, and parsing from raw bytes.
+             Error messages expose the datagram they quote, and probe_key() gives a cheap
+             key for matching those errors against outstanding probes.
 """
 
 import struct
-from Packet import Packet
+from Packet import Packet, RAW_TYPES
+from expansion import has_ranges
 import random
 
 
+#ICMP messages that quote the IP header + first 8 bytes of the offending datagram
+#(destination unreachable, source quench, redirect, time exceeded, parameter problem)
+ERROR_TYPES = (3, 4, 5, 11, 12)
+
+
+def probe_key(data, offset=0):
+    """
+    Description: Builds a match key for the IP datagram starting at data[offset] using only the
+                 fields an ICMP error is guaranteed to quote (IP header + 8 transport bytes).
+                 The same function applied to an outgoing probe and to the quote inside the
+                 error it triggered gives the same key, so outstanding probes can be kept in a
+                 dict keyed by probe_key() and errors matched with one lookup.
+
+    @param data: Bytes holding an IPv4 datagram (or a quoted one).
+    @param offset: Offset of the IPv4 header within data.
+    @returns: (tuple or None) (dest address bytes, protocol, field, field[, seq]):
+              TCP -> (dst, 6, src_port, dst_port, seq), UDP -> (dst, 17, src_port, dst_port),
+              ICMP -> (dst, 1, ID, seq), anything else -> (dst, protocol, IP ID).
+              None when data is too short.
+    """
+    if len(data) < offset + 20:
+        return None
+    l4 = offset + (data[offset] & 0x0F) * 4
+    protocol = data[offset + 9]
+    dest = bytes(data[offset + 16:offset + 20])
+    if len(data) < l4 + 8:
+        protocol = None
+    if protocol == 6:
+        src_port, dst_port, seq = struct.unpack_from('!HHL', data, l4)
+        return dest, 6, src_port, dst_port, seq
+    if protocol == 17:
+        src_port, dst_port = struct.unpack_from('!HH', data, l4)
+        return dest, 17, src_port, dst_port
+    if protocol == 1:
+        ID, seq = struct.unpack_from('!HH', data, l4 + 4)
+        return dest, 1, ID, seq
+    return dest, data[offset + 9], struct.unpack_from('!H', data, offset + 4)[0]
+
+
+def error_key(datagram):
+    """
+    Description: Fast path for bulk processing: given a received IP datagram carrying an ICMP
+                 error, returns the probe_key() of the datagram it quotes without building
+                 any objects.
+
+    @param datagram: Received IPv4 datagram bytes (outer IP header + ICMP message).
+    @returns: (tuple or None) The quoted probe's key, or None if this is not an ICMP error.
+    """
+    ihl = (datagram[0] & 0x0F) * 4
+    if len(datagram) < ihl + 8 or datagram[9] != 1 or datagram[ihl] not in ERROR_TYPES:
+        return None
+    return probe_key(datagram, ihl + 8)
+
+
+#names used by summary()
+TYPE_NAMES = {0: "echo-reply", 3: "dest-unreach", 4: "source-quench", 5: "redirect",
+              8: "echo-request", 11: "time-exceeded", 12: "parameter-problem"}
+
+
 class ICMP(Packet):
+    show_fields = (("icmp_type", "icmp_type"), ("code", "code"), ("checksum", "checksum"),
+                   ("ID", "ID"), ("seq", "seq"))
+    expand_fields = {"icmp_type": (0, "B"), "code": (1, "B"), "ID": (4, "H"), "seq": (6, "H")}
+    checksum_offset = 2
+
     def __init__(self, icmp_type= 8, code=0, payload=b'', ID=0, seq=0, raw= None):
         """
         Description: Initializes an ICMP packet. Can construct from parameters (for sending)
@@ -21,8 +88,10 @@ class ICMP(Packet):
         @param code: ICMP code (usually 0).
         @param ID: Identifier field (used for echo requests/replies).
         @param seq: Sequence number (used for echo requests/replies).
+                    Type, code, ID and seq also accept ranges, lists and sets (see Packet.expand()).
         @param raw: If provided, parse these bytes.
         @param payload: Next encapsulated layer (usually None for ICMP).
+                        For error messages this is the quoted datagram (see quoted).
         """
         if raw:
             header = raw[:8]
@@ -39,10 +108,17 @@ class ICMP(Packet):
             super().__init__(payload)
             #place holder will calculae in to_bytes
             self.checksum = 0
-            self.icmp_type = int(icmp_type)
-            self.ID = int(ID) if ID is not None else random.randint(0, 65535)
-            self.seq = int(seq)
-            self.code = int(code)
+            try:
+                self.icmp_type = int(icmp_type)
+                self.ID = int(ID) if ID is not None else random.randint(0, 65535)
+                self.seq = int(seq)
+                self.code = int(code)
+            except TypeError:
+                if not has_ranges(icmp_type, code, ID, seq):
+                    raise
+                #ranges are kept as given for expand()
+                self.icmp_type, self.code, self.seq = icmp_type, code, seq
+                self.ID = ID if ID is not None else random.randint(0, 65535)
 #cite: https://stackoverflow.com/questions/20247551/icmp-echo-checksum
     def checksum_ICMP(self, data):
         """
@@ -62,8 +138,7 @@ class ICMP(Packet):
         """
         Description: Parses ICMP header and data from raw bytes.
         """
-        #make sure is bytes
-        payload_bytes = self.payload if isinstance(self.payload, bytes) else b''
+        payload_bytes = self.payload_bytes()
         #placeholder checksum will calcualte later
         #header with zero checksum placeholder
         header_0CS = struct.pack('!BBHHH', self.icmp_type, self.code, 0, self.ID, self.seq)
@@ -73,6 +148,56 @@ class ICMP(Packet):
         self.checksum = self.checksum_ICMP(data)
         header = struct.pack('!BBHHH', self.icmp_type, self.code, self.checksum, self.ID, self.seq)
         return header + payload_bytes
-   
 
-   
\ No newline at end of file
+    def is_error(self):
+        """
+        Description: True when this message is an error that quotes the offending datagram.
+        """
+        return self.icmp_type in ERROR_TYPES
+
+    @property
+    def quoted(self):
+        """
+        Description: Dissects the quoted datagram of an error message into an IP object whose
+                     payload is the TCP, UDP or ICMP layer of the original probe (only the first
+                     8 bytes of it are quoted, so those objects carry header fields only).
+                     Parsed on every access; use match_key() when only correlation is needed.
+
+        @returns: (IP or None) The quoted datagram, or None for non-error messages.
+        """
+        if not self.is_error() or not isinstance(self.payload, RAW_TYPES) or len(self.payload) < 20:
+            return None
+        from IP import IP
+        return IP(raw=self.payload)
+
+    def match_key(self):
+        """
+        Description: probe_key() of the quoted datagram, for correlating this error with the
+                     outstanding probe that triggered it.
+
+        @returns: (tuple or None) The key, or None for non-error messages.
+        """
+        if not self.is_error() or not isinstance(self.payload, RAW_TYPES):
+            return None
+        return probe_key(self.payload)
+
+    @property
+    def next_hop_mtu(self):
+        """
+        Description: Next-hop MTU advertised by a "fragmentation needed" (type 3, code 4)
+                     message, carried where echo messages keep their sequence number.
+
+        @returns: (int or None) The MTU, or None for any other message.
+        """
+        if self.icmp_type == 3 and self.code == 4:
+            return self.seq
+        return None
+
+    def summary_part(self):
+        """
+        Description: One-line description of the ICMP message, e.g. "ICMP echo-request id=1 seq=1".
+        """
+        name = TYPE_NAMES.get(self.icmp_type, f"type-{self.icmp_type}")
+        if self.icmp_type in (0, 8):
+            return f"ICMP {name} id={self.ID} seq={self.seq}"
+        return f"ICMP {name} code={self.code}"
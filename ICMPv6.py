@@ -0,0 +1,220 @@
+"""
+ICMPv6.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Implements the ICMPv6 layer (RFC 4443) with echo and Neighbor Discovery
+             (RFC 4861) messages. The checksum covers the IPv6 pseudo-header, so the enclosing
+             IPv6 layer hands its addresses to to_bytes() when the message has none of its own
+             (ip_src / ip_dst).
+"""
+
+import struct
+from Packet import Packet
+from addresses import ipv6_to_bytes, ipv6_to_str, mac_to_bytes, mac_to_str, pseudo_header
+
+
+ECHO_REQUEST = 128
+ECHO_REPLY = 129
+ROUTER_SOLICIT = 133
+ROUTER_ADVERT = 134
+NEIGHBOR_SOLICIT = 135
+NEIGHBOR_ADVERT = 136
+REDIRECT = 137
+
+#NA flags (top bits of the first body byte)
+NA_ROUTER = 0x80
+NA_SOLICITED = 0x40
+NA_OVERRIDE = 0x20
+
+#ND option types carrying a link-layer address
+OPT_SOURCE_LL = 1
+OPT_TARGET_LL = 2
+
+#names used by summary()
+TYPE_NAMES = {1: "dest-unreach", 2: "packet-too-big", 3: "time-exceeded", 4: "parameter-problem",
+              ECHO_REQUEST: "echo-request", ECHO_REPLY: "echo-reply", ROUTER_SOLICIT: "router-solicit",
+              ROUTER_ADVERT: "router-advert", NEIGHBOR_SOLICIT: "neighbor-solicit",
+              NEIGHBOR_ADVERT: "neighbor-advert", REDIRECT: "redirect"}
+
+#messages whose body is 4 bytes of flags/reserved followed by a 16-byte target address
+_TARGET_TYPES = (NEIGHBOR_SOLICIT, NEIGHBOR_ADVERT, REDIRECT)
+
+
+def parse_options(data):
+    """
+    Description: Splits Neighbor Discovery options (type, length in 8-byte units, value).
+
+    @param data: Bytes holding the options.
+    @returns: (list) (type, value bytes) pairs; parsing stops at a malformed option.
+    """
+    options = []
+    offset = 0
+    while offset + 2 <= len(data):
+        length = data[offset + 1] * 8
+        if length == 0 or offset + length > len(data):
+            break
+        options.append((data[offset], bytes(data[offset + 2:offset + length])))
+        offset += length
+    return options
+
+
+def encode_options(options):
+    """
+    Description: Encodes (type, value) pairs as ND options, padding each to 8 bytes.
+    """
+    out = b''
+    for opt_type, value in options:
+        length = (len(value) + 2 + 7) // 8
+        out += struct.pack('!BB', opt_type, length) + value.ljust(length * 8 - 2, b'\x00')
+    return out
+
+
+class ICMPv6(Packet):
+    show_fields = (("icmp_type", "icmp_type"), ("code", "code"), ("checksum", "checksum", "0x{:04x}"),
+                   ("ID", "ID"), ("seq", "seq"), ("flags", "flags"), ("target", "target"),
+                   ("options", "options"))
+    show_optional = ("ID", "seq", "flags", "target", "options")
+
+    def __init__(self, icmp_type=ECHO_REQUEST, code=0, ID=0, seq=0, target=None, flags=0,
+                 options=None, payload=b'', ip_src=None, ip_dst=None, raw=None):
+        """
+        Description: Initializes an ICMPv6 message. Can construct from parameters (for sending)
+                     or parse from raw bytes (for received data).
+
+        @param icmp_type: ICMPv6 type (128 = echo request, 135 = neighbor solicitation, ...).
+        @param code: ICMPv6 code (usually 0).
+        @param ID: Identifier (echo messages).
+        @param seq: Sequence number (echo messages).
+        @param target: Target IPv6 address (neighbor solicitation/advertisement, redirect).
+        @param flags: NA_* flags (neighbor advertisement).
+        @param options: List of (type, value bytes) ND options.
+        @param payload: Echo data, or the body of any other message type.
+        @param ip_src: Source IPv6 address for the checksum (taken from IPv6 when None).
+        @param ip_dst: Destination IPv6 address for the checksum (taken from IPv6 when None).
+        @param raw: If provided, parse these bytes.
+        @returns: None
+        """
+        self.ip_src = ip_src
+        self.ip_dst = ip_dst
+        if raw:
+            self.icmp_type, self.code, self.checksum = struct.unpack('!BBH', raw[:4])
+            self.target = None
+            self.flags = 0
+            self.options = ()
+            if self.icmp_type in (ECHO_REQUEST, ECHO_REPLY) and len(raw) >= 8:
+                self.ID, self.seq = struct.unpack('!HH', raw[4:8])
+                self.payload = raw[8:]
+                return
+            self.ID = self.seq = None
+            body = raw[4:]
+            if self.icmp_type in _TARGET_TYPES and len(body) >= 20:
+                self.flags = body[0]
+                self.target = ipv6_to_str(bytes(body[4:20]))
+                #a redirect also carries the destination being redirected
+                start = 36 if self.icmp_type == REDIRECT else 20
+                self.options = parse_options(body[start:])
+                self.payload = body[20:start] or None
+            elif self.icmp_type == ROUTER_SOLICIT:
+                self.options = parse_options(body[4:])
+                self.payload = None
+            elif self.icmp_type == ROUTER_ADVERT and len(body) >= 12:
+                self.options = parse_options(body[12:])
+                self.payload = body[:12]
+            else:
+                self.payload = body
+        else:
+            super().__init__(payload)
+            self.icmp_type = int(icmp_type)
+            self.code = int(code)
+            self.checksum = 0
+            self.ID = self.seq = None
+            if self.icmp_type in (ECHO_REQUEST, ECHO_REPLY):
+                self.ID = int(ID)
+                self.seq = int(seq)
+            self.target = target
+            self.flags = flags
+            self.options = list(options or [])
+
+    def body(self):
+        """
+        Description: Message body (everything after type, code and checksum).
+
+        @returns: (bytes) The encoded body.
+        """
+        payload_bytes = self.payload_bytes()
+        if self.icmp_type in (ECHO_REQUEST, ECHO_REPLY):
+            return struct.pack('!HH', self.ID, self.seq) + payload_bytes
+        if self.icmp_type in _TARGET_TYPES:
+            return (struct.pack('!B3x', self.flags) + ipv6_to_bytes(self.target) + payload_bytes +
+                    encode_options(self.options))
+        if self.icmp_type == ROUTER_SOLICIT:
+            return b'\x00' * 4 + encode_options(self.options)
+        return payload_bytes + encode_options(self.options)
+
+    def to_bytes(self, ip_src=None, ip_dst=None):
+        """
+        Description: Byte representation of the ICMPv6 message, checksummed over the IPv6
+                     pseudo-header when the addresses are known.
+
+        @param ip_src: Source address used when the message has no ip_src of its own.
+        @param ip_dst: Destination address used when the message has no ip_dst of its own.
+        @returns: (bytes) The encoded message.
+        """
+        body = self.body()
+        self.checksum = 0
+        ip_src = self.ip_src or ip_src
+        ip_dst = self.ip_dst or ip_dst
+        if ip_src and ip_dst:
+            data = pseudo_header(ip_src, ip_dst, 58, 4 + len(body)) + \
+                struct.pack('!BBH', self.icmp_type, self.code, 0) + body
+            if len(data) % 2:
+                data += b'\x00'
+            total = sum(struct.unpack('!%dH' % (len(data) // 2), data))
+            total = (total >> 16) + (total & 0xFFFF)
+            total += total >> 16
+            self.checksum = ~total & 0xFFFF
+        return struct.pack('!BBH', self.icmp_type, self.code, self.checksum) + body
+
+    def link_layer_address(self):
+        """
+        Description: MAC address from a source/target link-layer address option, if present.
+
+        @returns: (str or None) The MAC address string.
+        """
+        for opt_type, value in self.options:
+            if opt_type in (OPT_SOURCE_LL, OPT_TARGET_LL) and len(value) >= 6:
+                return mac_to_str(value[:6])
+        return None
+
+    def summary_part(self):
+        """
+        Description: One-line description, e.g. "ICMPv6 neighbor-solicit who-has fe80::1".
+        """
+        name = TYPE_NAMES.get(self.icmp_type, f"type-{self.icmp_type}")
+        if self.icmp_type in (ECHO_REQUEST, ECHO_REPLY):
+            return f"ICMPv6 {name} id={self.ID} seq={self.seq}"
+        if self.icmp_type == NEIGHBOR_SOLICIT:
+            return f"ICMPv6 {name} who-has {self.target}"
+        if self.icmp_type == NEIGHBOR_ADVERT:
+            mac = self.link_layer_address()
+            return f"ICMPv6 {name} {self.target}" + (f" is-at {mac}" if mac else "")
+        return f"ICMPv6 {name} code={self.code}"
+
+
+def neighbor_solicit(target, src_mac):
+    """
+    Description: Builds a neighbor solicitation for target carrying our link-layer address.
+
+    @param target: IPv6 address being resolved.
+    @param src_mac: Our MAC address string.
+    @returns: (ICMPv6) The message (send to solicited_node(target)).
+    """
+    return ICMPv6(NEIGHBOR_SOLICIT, target=target, options=[(OPT_SOURCE_LL, mac_to_bytes(src_mac))])
+
+
+def solicited_node(address):
+    """
+    Description: Solicited-node multicast address (ff02::1:ffXX:XXXX) for an IPv6 address.
+    """
+    low = ipv6_to_bytes(address)[13:]
+    return ipv6_to_str(b'\xff\x02' + bytes(9) + b'\x01\xff' + low)
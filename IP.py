@@ -10,27 +10,100 @@ Description: Implements the IPv4 protocol layer (Layer 3).
 
 
 import struct
-import socket
 from Packet import Packet
 from ICMP import ICMP
+from TCP import TCP
+from UDP import UDP
 import random
+from addresses import ipv4_field
+
+
+#option types (RFC 791, RFC 2113); the top bit marks options copied into fragments
+OPT_EOL = 0
+OPT_NOP = 1
+OPT_RECORD_ROUTE = 7
+OPT_TIMESTAMP = 68
+OPT_LOOSE_SOURCE_ROUTE = 131
+OPT_STRICT_SOURCE_ROUTE = 137
+OPT_ROUTER_ALERT = 148
+
+
+def decode_options(data):
+    """
+    Description: Splits IPv4 options into (type, value bytes) pairs. NOPs are dropped and
+                 decoding stops at end-of-list or a malformed option.
+
+    @param data: The option bytes between the fixed header and the payload.
+    @returns: (list) (type, value bytes) pairs in wire order.
+    """
+    options = []
+    offset = 0
+    end = len(data)
+    while offset < end:
+        opt_type = data[offset]
+        if opt_type == OPT_EOL:
+            break
+        if opt_type == OPT_NOP:
+            offset += 1
+            continue
+        if offset + 1 >= end or data[offset + 1] < 2 or offset + data[offset + 1] > end:
+            break
+        options.append((opt_type, bytes(data[offset + 2:offset + data[offset + 1]])))
+        offset += data[offset + 1]
+    return options
+
+
+def encode_options(options):
+    """
+    Description: Encodes (type, value bytes) pairs and pads with end-of-list to a multiple
+                 of 4 bytes.
+
+    @param options: Iterable of (type, value bytes) pairs.
+    @returns: (bytes) The option bytes.
+    """
+    out = b''
+    for opt_type, value in options:
+        if opt_type in (OPT_EOL, OPT_NOP):
+            out += bytes((opt_type,))
+        else:
+            out += struct.pack('!BB', opt_type, len(value) + 2) + bytes(value)
+    if len(out) > 40:
+        raise ValueError("IP options exceed 40 bytes")
+    return out + b'\x00' * (-len(out) % 4)
 
 
 
 
 class IP(Packet):
-    def __init__(self, src_IP= None, dest_IP= None, payload=None, ttl=128, protocol=1, raw=None):
+    #stored packed when parsed, as text when built; each form is converted on demand
+    src_IP = ipv4_field()
+    dest_IP = ipv4_field()
+    show_fields = (("version", "version"), ("ihl", "ihl"), ("tos", "tos"), ("ID", "ID"),
+                   ("flags_frag", "flags_frag"), ("TTL", "TTL"), ("total_len", "total_len"),
+                   ("protocol", "protocol"), ("checksum", "checksum"), ("src_IP", "src_IP"),
+                   ("dest_IP", "dest_IP"), ("options", "options"))
+    show_optional = ("options",)
+    expand_fields = {"src_IP": (12, "4s"), "dest_IP": (16, "4s"), "tos": (1, "B"), "ID": (4, "H"),
+                     "TTL": (8, "B")}
+    checksum_offset = 10
+    #options are kept as received bytes and only decoded when .options is read
+    _options = None
+    _options_raw = b''
+
+    def __init__(self, src_IP= None, dest_IP= None, payload=None, ttl=128, protocol=1, raw=None, options=None):
         """
         Description: Initializes an IPv4 packet. Can construct from provided
                      fields (for sending) or parse from raw bytes (for receiving).
 
 
         @param src_IP: Source IPv4 address.
-        @param dest_IP: Destination IPv4 address.
+        @param dest_IP: Destination IPv4 address (or a range of them, e.g. "10.0.0.0/24"; see
+                        expand()).
         @param ttl: Time to Live.
         @param payload: the data carried by this layer
         @param protocol: Protocol number (e.g., 6 for TCP, 17 for UDP).
         @param raw: If provided, parse these bytes.
+        @param options: List of (type, value bytes) options, e.g. [(OPT_ROUTER_ALERT, b'\x00\x00')].
         @returns: None
         """
         # ID: Identification field.
@@ -52,18 +125,30 @@ class IP(Packet):
             self.TTL = labels[5]
             self.protocol = labels[6]
             self.checksum = labels[7]
-            self.src_IP = socket.inet_ntoa(labels[8])
-            self.dest_IP = socket.inet_ntoa(labels[9])
+            IP.src_IP.set_packed(self, labels[8])
+            IP.dest_IP.set_packed(self, labels[9])
            
             #split version and ihl into seperate
             self.version = version_ihl >> 4
             self.ihl = version_ihl & 0x0F
 
+            #options fill the header beyond 20 bytes (ihl > 5)
+            header_len = 20
+            if self.ihl > 5:
+                header_len = self.ihl * 4
+                self._options_raw = raw[20:header_len]
 
-            #parse payload
-            payload_data = raw[20:]
+            #parse payload; total length excludes Ethernet padding (0 when offloaded)
+            if len(raw) > self.total_len >= header_len:
+                payload_data = raw[header_len:self.total_len]
+            else:
+                payload_data = raw[header_len:]
             if self.protocol == 1:
                 self.payload=(ICMP(raw=payload_data))
+            elif self.protocol == 6 and payload_data:
+                self.payload = TCP(raw_bytes=payload_data)
+            elif self.protocol == 17 and payload_data:
+                self.payload = UDP(raw_bytes=payload_data)
             else:
                 self.payload= payload_data
        
@@ -83,6 +168,36 @@ class IP(Packet):
             self.checksum = 0
             self.src_IP = src_IP
             self.dest_IP = dest_IP
+            if options:
+                #also sets ihl to cover them
+                self.options = options
+
+    @property
+    def options(self):
+        """
+        Description: Decoded options (see decode_options), decoded on first access. Assign a new
+                     list to change the options of a parsed packet.
+        """
+        if self._options is None:
+            self._options = decode_options(self._options_raw)
+        return self._options
+
+    @options.setter
+    def options(self, options):
+        self._options = list(options)
+        self._options_raw = None
+        self.ihl = 5 + len(self.options_bytes()) // 4
+
+    def options_bytes(self):
+        """
+        Description: Encoded options: the received bytes for parsed packets, otherwise the
+                     current options list encoded.
+
+        @returns: (bytes) Option bytes, a multiple of 4 long.
+        """
+        if self._options_raw is not None:
+            return self._options_raw
+        return encode_options(self._options)
    
 #used these sources to help me: https://medium.com/@tom_84912/the-quaint-but-critical-internet-checksum-05c09eb0af77
 #https://gist.github.com/david-hoze/0c7021434796997a4ca42d7731a7073a?permalink_comment_id=3949455
@@ -117,23 +232,33 @@ class IP(Packet):
         '''
 
 
+        options = self.options_bytes()
+        if self._options_raw is None:
+            self.ihl = 5 + len(options) // 4
         version_ihl = (self.version << 4) + self.ihl
         # if self.payload:
         #     payload_b = self.payload.to_bytes() if hasattr(self.payload, 'to_bytes') else (self.payload if isinstance(self.payload, bytes) else b'')
         # else:
         #     payload_b = b''
-        payload_bytes = self.payload.to_bytes() if hasattr(self.payload, 'to_bytes') else b''
-        self.total_len = 20 + len(payload_bytes)
+        payload_bytes = self.payload_bytes()
+        self.total_len = 20 + len(options) + len(payload_bytes)
    
-        #pass in 0 as a place holder for the checksum and convert ip string to bytes
+        #packed addresses are cached on the layer (see addresses.AddressField)
+        src_bytes = IP.src_IP.packed(self)
+        dest_bytes = IP.dest_IP.packed(self)
+        #pass in 0 as a place holder for the checksum
         IP_header = struct.pack('!BBHHHBBH4s4s', version_ihl, self.tos, self.total_len,
-                                self.ID, self.flags_frag, self.TTL, self.protocol, 0, socket.inet_aton(self.src_IP), socket.inet_aton(self.dest_IP))
+                                self.ID, self.flags_frag, self.TTL, self.protocol, 0, src_bytes, dest_bytes) + options
         #calcuate checksum
         self.checksum = self.checksum_IP(IP_header)
         header = struct.pack('!BBHHHBBH4s4s', version_ihl, self.tos, self.total_len, self.ID, self.flags_frag,
-                                self.TTL, self.protocol, self.checksum, socket.inet_aton(self.src_IP), socket.inet_aton(self.dest_IP))
+                                self.TTL, self.protocol, self.checksum, src_bytes, dest_bytes)
         #add payload to ipheader
    
-        return header + payload_bytes
-
+        return header + options + payload_bytes
 
+    def summary_part(self):
+        """
+        Description: One-line description of the IPv4 header, e.g. "IP 10.0.2.15 > 8.8.8.8".
+        """
+        return f"IP {self.src_IP} > {self.dest_IP}"
@@ -0,0 +1,173 @@
+"""
+IPv6.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Implements the IPv6 protocol layer (Layer 3). Parses the fixed 40-byte header and
+             walks the extension header chain (hop-by-hop, routing, fragment, destination
+             options, AH, ...) to the upper-layer protocol, which is dissected into ICMPv6, TCP
+             or UDP. Carried by Ether under EtherType 0x86DD.
+"""
+
+import struct
+from Packet import Packet
+from ICMPv6 import ICMPv6
+from TCP import TCP
+from UDP import UDP
+from addresses import ipv6_field
+
+
+HOP_BY_HOP = 0
+ROUTING = 43
+FRAGMENT = 44
+ESP = 50
+AH = 51
+NO_NEXT_HEADER = 59
+DEST_OPTIONS = 60
+
+#extension headers that use the generic (next header, length in 8-byte units - 1) layout
+#(hop-by-hop, routing, destination options, mobility, HIP, shim6)
+_GENERIC_EXTENSIONS = frozenset((HOP_BY_HOP, ROUTING, DEST_OPTIONS, 135, 139, 140))
+EXTENSION_HEADERS = _GENERIC_EXTENSIONS | {FRAGMENT, AH}
+
+
+def walk_extensions(data, next_header, offset=40):
+    """
+    Description: Follows the extension header chain starting at data[offset]. Only the next
+                 header and length bytes of each extension are read, and the loop is skipped
+                 entirely for the common case of no extensions.
+
+    @param data: Bytes holding the IPv6 packet.
+    @param next_header: Next Header value of the fixed header.
+    @param offset: Offset of the first extension header.
+    @returns: (tuple) (upper-layer protocol, offset of the upper-layer header,
+              list of (extension type, offset, length)). A truncated chain stops at the
+              extension that does not fit, with that extension's type as the protocol.
+    """
+    extensions = []
+    end = len(data)
+    while next_header in EXTENSION_HEADERS:
+        if offset + 8 > end:
+            break
+        if next_header == FRAGMENT:
+            length = 8
+        elif next_header == AH:
+            length = (data[offset + 1] + 2) * 4
+        else:
+            length = (data[offset + 1] + 1) * 8
+        if offset + length > end:
+            break
+        extensions.append((next_header, offset, length))
+        next_header = data[offset]
+        offset += length
+    return next_header, offset, extensions
+
+
+class IPv6(Packet):
+    #stored packed when parsed, as text when built; each form is converted on demand
+    src_IP = ipv6_field()
+    dest_IP = ipv6_field()
+    show_fields = (("version", "version"), ("traffic_class", "traffic_class"),
+                   ("flow_label", "flow_label", "0x{:05x}"), ("payload_len", "payload_len"),
+                   ("next_header", "next_header"), ("hop_limit", "hop_limit"),
+                   ("src_IP", "src_IP"), ("dest_IP", "dest_IP"), ("extensions", "extensions"))
+    show_optional = ("extensions",)
+
+    def __init__(self, src_IP=None, dest_IP=None, payload=None, hop_limit=64, protocol=58,
+                 traffic_class=0, flow_label=0, extensions=None, raw=None):
+        """
+        Description: Initializes an IPv6 packet. Can construct from provided fields (for
+                     sending) or parse from raw bytes (for receiving).
+
+        @param src_IP: Source IPv6 address.
+        @param dest_IP: Destination IPv6 address.
+        @param payload: The data carried by this layer.
+        @param hop_limit: Hop limit.
+        @param protocol: Upper-layer protocol (58 = ICMPv6, 6 = TCP, 17 = UDP).
+        @param traffic_class: Traffic class byte.
+        @param flow_label: 20-bit flow label.
+        @param extensions: List of (extension type, bytes) headers placed before the payload;
+                           their next header bytes are filled in when building.
+        @param raw: If provided, parse these bytes.
+        @returns: None
+        """
+        if raw:
+            #4 bytes version/traffic class/flow label, 2 bytes payload length, 1 byte each for
+            #next header and hop limit, then 16 bytes each for the source and destination
+            first, self.payload_len, self.next_header, self.hop_limit, src, dest = \
+                struct.unpack('!LHBB16s16s', raw[:40])
+            self.version = first >> 28
+            self.traffic_class = (first >> 20) & 0xFF
+            self.flow_label = first & 0xFFFFF
+            IPv6.src_IP.set_packed(self, src)
+            IPv6.dest_IP.set_packed(self, dest)
+            if self.next_header in EXTENSION_HEADERS:
+                self.protocol, offset, found = walk_extensions(raw, self.next_header)
+                self.extensions = [(ext, raw[start:start + length]) for ext, start, length in found]
+                #a non-first fragment does not start with the upper-layer header
+                if self.fragment_offset():
+                    self.payload = raw[offset:40 + self.payload_len]
+                    return
+            else:
+                self.protocol, offset, self.extensions = self.next_header, 40, []
+            payload_data = raw[offset:40 + self.payload_len] if self.payload_len else raw[offset:]
+            if self.protocol == 58 and payload_data:
+                self.payload = ICMPv6(raw=payload_data)
+            elif self.protocol == 6 and payload_data:
+                self.payload = TCP(raw_bytes=payload_data)
+            elif self.protocol == 17 and payload_data:
+                self.payload = UDP(raw_bytes=payload_data)
+            else:
+                self.payload = payload_data
+        else:
+            super().__init__(payload)
+            self.version = 6
+            self.traffic_class = traffic_class
+            self.flow_label = flow_label
+            self.payload_len = 0
+            self.hop_limit = hop_limit
+            self.protocol = protocol
+            self.extensions = list(extensions or [])
+            self.next_header = self.extensions[0][0] if self.extensions else protocol
+            self.src_IP = src_IP
+            self.dest_IP = dest_IP
+
+    def fragment_offset(self):
+        """
+        Description: Offset (in bytes) of a fragment, from its fragment extension header.
+
+        @returns: (int) The offset, 0 for first fragments and unfragmented packets.
+        """
+        for ext, data in self.extensions:
+            if ext == FRAGMENT:
+                return struct.unpack('!H', data[2:4])[0] & 0xFFF8
+        return 0
+
+    def to_bytes(self):
+        """
+        Description: Byte representation of the IPv6 packet. ICMPv6 payloads get this layer's
+                     addresses for their pseudo-header checksum if they have none.
+
+        @returns: (bytes) The complete IPv6 packet.
+        """
+        #chain the next header bytes of the extensions through to the upper layer
+        ext_bytes = b''
+        for i, (ext, data) in enumerate(self.extensions):
+            following = self.extensions[i + 1][0] if i + 1 < len(self.extensions) else self.protocol
+            ext_bytes += bytes((following,)) + bytes(data[1:])
+        self.next_header = self.extensions[0][0] if self.extensions else self.protocol
+        if isinstance(self.payload, ICMPv6):
+            #passed down rather than stored, the ICMPv6 layer may be shared by other stacks
+            payload_bytes = ext_bytes + self.payload.to_bytes(self.src_IP, self.dest_IP)
+        else:
+            payload_bytes = ext_bytes + self.payload_bytes()
+        self.payload_len = len(payload_bytes)
+        first = (self.version << 28) | (self.traffic_class << 20) | self.flow_label
+        header = struct.pack('!LHBB16s16s', first, self.payload_len, self.next_header, self.hop_limit,
+                             IPv6.src_IP.packed(self), IPv6.dest_IP.packed(self))
+        return header + payload_bytes
+
+    def summary_part(self):
+        """
+        Description: One-line description of the IPv6 header, e.g. "IPv6 fe80::1 > ff02::1".
+        """
+        return f"IPv6 {self.src_IP} > {self.dest_IP}"
@@ -5,8 +5,45 @@ Author: Ahmed Al Sunbati
 Description: Base class for all network protocol layers. Provides common functionality for
              building packet bytes and recursively displaying the structure of encapsulated layers.
              Each subclass should override the build() method to generate its specific header bytes.
+             show() and summary() are driven by per-class field lists (show_fields) compiled
+             once per class, so dumping large captures does no per-packet introspection.
+             Stacks are treated as values: / returns a new stack and replace() a new layer,
+             both sharing every layer they did not change, so many variants can be derived
+             from one base packet without copying or corrupting it.
 """
+import sys
+
+
+#width of the struct formats _adjust_checksum can update incrementally
+_FIELD_BITS = {"H": 16, "L": 32}
+#raw (undissected) data; memoryviews come from packets parsed in place in a receive buffer
+RAW_TYPES = (bytes, bytearray, memoryview)
+
+
 class Packet:
+    #header shown by show(); defaults to the class name
+    show_name = None
+    #(label, attribute) or (label, attribute, format string) entries rendered by show();
+    #None falls back to the instance attributes of the first packet shown
+    show_fields = None
+    #attributes that show() skips when they are empty
+    show_optional = ()
+    #fields that may hold ranges, sets or networks for expand(): attribute -> (offset in the
+    #layer's header, struct format), plus the offset of the checksum covering them and, for
+    #checksums over an IP pseudo-header, the protocol number it carries
+    expand_fields = {}
+    #fields packed into a shared 16-bit header word (e.g. TCP flags and data offset):
+    #attribute -> function giving the word's value for a layer, for incremental checksums
+    checksum_words = {}
+    checksum_offset = None
+    pseudo_header_protocol = None
+    #when a received packet arrived (seconds since the epoch, taken by the kernel when the
+    #transport supports it) and, on a reply returned by sr(), when its probe was sent
+    time = None
+    sent_time = None
+    #the pool slot (buffer_pool.PooledFrame) a received packet was parsed from in place
+    buffer = None
+
     def __init__(self, payload=None):
         """
         Description: Initializes a Packet instance. Each packet can contain another packet
@@ -24,42 +61,261 @@ class Packet:
 
         @returns: (bytes) The full byte sequence of the current layer and all nested payloads.
         """
-        packet_bytes = self.to_bytes() if hasattr(self, 'to_bytes') else b''
-        if self.payload: 
-            packet_bytes += self.payload.to_bytes() if hasattr(self.payload, 'to_bytes') else (self.payload if isinstance(self.payload, bytes) else b'')# Build the bytes of the payload layer recursively
-        return packet_bytes
+        # to_bytes() already encodes the payload chain, so it is not appended a second time here
+        if hasattr(self, 'to_bytes'):
+            return self.to_bytes()
+        return self.payload_bytes()
+
+    def payload_bytes(self):
+        """
+        Description: Encodes whatever this layer carries as its payload. Packet payloads are built
+                     recursively, raw bytes are passed through and anything else encodes to nothing.
+
+        @returns: (bytes) The encoded payload.
+        """
+        if isinstance(self.payload, Packet):
+            return self.payload.build()
+        if isinstance(self.payload, RAW_TYPES):
+            return bytes(self.payload)
+        return b''
     
     def __truediv__(self, other):
         """
         Description: Overloads the division (/) operator to allow stacking of protocol layers.
+                     Neither operand is modified: the layers of this stack are copied (one
+                     shallow copy each, field values shared) and other becomes the payload of
+                     the last one, replacing raw bytes if that layer carried any. other itself
+                     is shared, not copied.
 
-        @param other: The higher-layer packet to encapsulate as this packet’s payload.
-        @returns: The current packet instance (to allow chaining).
+        @param other: The higher-layer packet (or raw bytes) to encapsulate.
+        @returns: (Packet) The new stack.
         """
-        #if paylaod is none or raw bytes replace with nxt layer
-        if self.payload is None or isinstance(self.payload, bytes):
-            self.payload = other
-        else:
-            self.payload / other
-        return self
+        top = layer = self.copy()
+        pairs = [(top, self)]
+        while isinstance(layer.payload, Packet):
+            original = layer.payload
+            layer.payload = original.copy()
+            layer = layer.payload
+            pairs.append((layer, original))
+        layer.payload = other
+        #everything below each copied layer changed; lengths and checksums kept in the
+        #layers are brought up to date from the innermost one out
+        for layer, original in reversed(pairs):
+            layer._refresh(("payload",), original)
+        return top
 
+    def copy(self):
+        """
+        Description: Shallow copy of this layer alone: field values and the payload are shared
+                     with the original, so the cost does not depend on the stack's size.
 
-    def show(self, indent=0):
+        @returns: (Packet) The copy.
         """
-        Description: Prints a hierarchical, human-readable view of the packet’s header fields and payload layers.
-                     Each level of indentation represents a deeper encapsulation.
+        clone = object.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        return clone
 
-        @param indent: (int) The indentation level used for nested printing.
+    @property
+    def rtt(self):
+        """
+        Description: Round-trip time of a reply returned by sr(), in seconds (None otherwise).
+        """
+        if self.time is None or self.sent_time is None:
+            return None
+        return self.time - self.sent_time
+
+    def release(self):
+        """
+        Description: Returns the receive buffer this packet was parsed from to its pool. The
+                     packet's raw fields point into that buffer, so it must not be used after.
+                     Does nothing for packets that do not hold a pooled buffer.
+
+        @returns: None
+        """
+        if self.buffer is not None:
+            self.buffer.release()
+            self.buffer = None
+
+    def replace(self, **fields):
+        """
+        Description: Copy of this layer with some fields changed, e.g. tcp.replace(dst_port=443).
+                     The payload stays shared and values the layer derives from its fields
+                     when it is made (TCP/UDP checksums, UDP length) are updated unless given.
+                     Cached packed addresses are only redone for addresses that changed.
+
+        @param fields: Attribute -> new value; each must be an existing field of the layer.
+        @returns: (Packet) The new layer.
+        """
+        clone = self.copy()
+        for name, value in fields.items():
+            if not hasattr(clone, name):
+                raise AttributeError(f"{self.__class__.__name__} has no field {name!r}")
+            setattr(clone, name, value)
+        clone._refresh(fields, self)
+        return clone
+
+    def _refresh(self, changed, original):
+        """
+        Description: Updates values that the layer stores when it is made and that depend on
+                     other fields or on its payload. Layers that compute them in build() need
+                     nothing, which is the default.
+
+        @param changed: Names of the fields that changed ("payload" after /).
+        @param original: The layer this one was copied from.
+        @returns: None
+        """
+
+    def _adjust_checksum(self, changed, original):
+        """
+        Description: Updates the stored checksum for changed header fields incrementally
+                     (RFC 1624) from the original layer's, without reading the rest of the
+                     layer. Only word-aligned expand_fields and checksum_words can be handled
+                     this way.
+
+        @param changed: Names of the fields that changed.
+        @param original: The layer this one was copied from.
+        @returns: (bool) False when the checksum must be computed in full instead.
+        """
+        checksum = original.checksum
+        if not checksum:
+            return False
+        #HC' = ~(~HC + ~m + m') over every 16-bit word that changed
+        total = ~checksum & 0xFFFF
+        words = set()
+        for name in changed:
+            word = self.checksum_words.get(name)
+            if word is not None:
+                #several fields of one word are adjusted for once
+                if word not in words:
+                    words.add(word)
+                    old, new = word(original), word(self)
+                    if type(old) is not int or type(new) is not int or not 0 <= new <= 0xFFFF:
+                        return False
+                    total += (~old & 0xFFFF) + new
+                continue
+            field = self.expand_fields.get(name)
+            if field is None or field[0] % 2 or field[1] not in _FIELD_BITS:
+                return False
+            bits = _FIELD_BITS[field[1]]
+            old, new = getattr(original, name), getattr(self, name)
+            if type(old) is not int or type(new) is not int or not 0 <= new < 1 << bits:
+                return False
+            for shift in range(bits - 16, -1, -16):
+                total += (~(old >> shift) & 0xFFFF) + (new >> shift & 0xFFFF)
+        while total >> 16:
+            total = (total >> 16) + (total & 0xFFFF)
+        self.checksum = ~total & 0xFFFF
+        if self.checksum == 0 and self.pseudo_header_protocol == 17:
+            #0 means no UDP checksum
+            self.checksum = 0xFFFF
+        return True
+
+
+    @classmethod
+    def _compiled_fields(cls, instance):
+        """
+        Description: Compiles show_fields into (line prefix, attribute, formatter) entries once per
+                     class. Classes without show_fields use the attribute names of the first
+                     instance shown, cached the same way.
+
+        @param instance: A packet of this class (only used for the fallback).
+        @returns: (list) The compiled field list.
+        """
+        compiled = cls.__dict__.get("_field_cache")
+        if compiled is None:
+            fields = cls.show_fields
+            if fields is None:
+                fields = [(key, key) for key in vars(instance) if key != "payload" and not key.startswith("_")]
+            compiled = []
+            for field in fields:
+                label, attr = field[0], field[1]
+                formatter = field[2].format if len(field) > 2 else str
+                compiled.append((label + ": ", attr, formatter, attr in cls.show_optional))
+            cls._field_cache = compiled
+        return compiled
+
+    def _render(self, lines, indent):
+        """
+        Description: Appends the show() lines of this layer and its payload chain to lines.
+
+        @param lines: (list) Output lines.
+        @param indent: (int) Indentation level of this layer.
         @returns: None
         """
-        print(" " * indent + f"### {self.__class__.__name__} ###")
-        for key, value in vars(self).items():
-            if key != "payload":
-                print(" " * (indent + 1) + f"{key}: {value}")
+        pad = " " * indent
+        lines.append(f"{pad}### {self.show_name or self.__class__.__name__} ###")
+        pad += " "
+        for prefix, attr, formatter, optional in self._compiled_fields(self):
+            value = getattr(self, attr, None)
+            if optional and not value:
+                continue
+            if type(value) is memoryview:
+                value = value.tobytes()
+            lines.append(pad + prefix + formatter(value))
         if self.payload:
             if isinstance(self.payload, Packet):
-                self.payload.show(indent + 1)
-            elif isinstance(self.payload, bytes):
-                print(" " * (indent + 1) + f"payload (raw bytes): {self.payload.hex()}")
+                self.payload._render(lines, indent + 1)
+            elif isinstance(self.payload, RAW_TYPES):
+                lines.append(pad + f"payload (raw bytes): {self.payload.hex()}")
             else:
-                print(" " * (indent + 1) + f"payload (unknown type): {self.payload}")
+                lines.append(pad + f"payload (unknown type): {self.payload}")
+
+    def show(self, indent=0, stream=None):
+        """
+        Description: Prints a hierarchical, human-readable view of the packet’s header fields and payload layers.
+                     Each level of indentation represents a deeper encapsulation. The whole dump is
+                     rendered into one buffer and written with a single call.
+
+        @param indent: (int) The indentation level used for nested printing.
+        @param stream: File-like object to write to (defaults to sys.stdout).
+        @returns: None
+        """
+        lines = []
+        self._render(lines, indent)
+        lines.append("")
+        (stream or sys.stdout).write("\n".join(lines))
+
+    def show_str(self, indent=0):
+        """
+        Description: Returns what show() would print, as a string.
+        """
+        lines = []
+        self._render(lines, indent)
+        return "\n".join(lines)
+
+    def expand(self):
+        """
+        Description: Every packet described by the ranges held in this stack's fields, e.g.
+                     IP(dest_IP="10.0.0.0/24") / TCP(dst_port=[22, 80]) describes 512 packets.
+                     The packets are generated lazily from one template (see expansion.py).
+
+        @returns: (Expansion) Sequence of built packets (bytes); supports len(), iteration
+                  and indexing.
+        """
+        from expansion import Expansion
+        return Expansion(self)
+
+    def summary_part(self):
+        """
+        Description: Short description of this layer alone, used by summary(). Subclasses
+                     override it; the default is the class name.
+
+        @returns: (str) e.g. "UDP 40000 > 53".
+        """
+        return self.__class__.__name__
+
+    def summary(self):
+        """
+        Description: Compact one-line description of the whole stack,
+                     e.g. "IP 10.0.2.15 > 8.8.8.8 UDP 40000 > 53 DNS A? example.com".
+
+        @returns: (str) The summary line.
+        """
+        parts = []
+        layer = self
+        while isinstance(layer, Packet):
+            parts.append(layer.summary_part())
+            layer = layer.payload
+        if layer:
+            parts.append(f"Raw {len(layer)}B" if isinstance(layer, RAW_TYPES) else str(layer))
+        return " ".join(parts)
@@ -9,13 +9,129 @@ Description: Represents the Transmission Control Protocol (TCP) layer (Layer 4).
 
 import struct
 import socket
-from Packet import Packet
+from Packet import Packet, RAW_TYPES
+from addresses import pseudo_header
+from expansion import has_ranges
+
+
+#flag bits in the order tcpdump prints them
+_FLAG_LETTERS = ((0x01, "F"), (0x02, "S"), (0x04, "R"), (0x08, "P"),
+                 (0x10, "A"), (0x20, "U"), (0x40, "E"), (0x80, "C"))
+
+#option kinds (RFC 9293, RFC 7323, RFC 2018)
+OPT_EOL = 0
+OPT_NOP = 1
+OPT_MSS = 2
+OPT_WSCALE = 3
+OPT_SACK_PERMITTED = 4
+OPT_SACK = 5
+OPT_TIMESTAMP = 8
+
+
+def decode_options(data):
+    """
+    Description: Decodes TCP options. Known kinds get Python values: MSS and window scale
+                 -> int, SACK-permitted -> True, SACK -> list of (left, right) edges,
+                 timestamps -> (value, echo reply); anything else keeps its raw bytes.
+                 NOPs are dropped and decoding stops at end-of-list or a malformed option.
+
+    @param data: The option bytes between the fixed header and the data.
+    @returns: (list) (kind, value) pairs in wire order.
+    """
+    options = []
+    offset = 0
+    end = len(data)
+    while offset < end:
+        kind = data[offset]
+        if kind == OPT_EOL:
+            break
+        if kind == OPT_NOP:
+            offset += 1
+            continue
+        if offset + 1 >= end or data[offset + 1] < 2 or offset + data[offset + 1] > end:
+            break
+        value = bytes(data[offset + 2:offset + data[offset + 1]])
+        offset += data[offset + 1]
+        if kind == OPT_MSS and len(value) == 2:
+            value = struct.unpack('!H', value)[0]
+        elif kind == OPT_WSCALE and len(value) == 1:
+            value = value[0]
+        elif kind == OPT_SACK_PERMITTED:
+            value = True
+        elif kind == OPT_SACK and len(value) % 8 == 0:
+            edges = struct.unpack('!%dL' % (len(value) // 4), value)
+            value = list(zip(edges[::2], edges[1::2]))
+        elif kind == OPT_TIMESTAMP and len(value) == 8:
+            value = struct.unpack('!LL', value)
+        options.append((kind, value))
+    return options
+
+
+def encode_options(options):
+    """
+    Description: Encodes (kind, value) pairs (as returned by decode_options, or raw bytes
+                 values) and pads them with NOPs / end-of-list to a multiple of 4 bytes.
+                 Timestamps and SACK blocks are NOP-aligned to 4 bytes as stacks send them.
+
+    @param options: Iterable of (kind, value) pairs.
+    @returns: (bytes) The option bytes.
+    """
+    out = b''
+    for kind, value in options:
+        if kind == OPT_NOP:
+            out += b'\x01'
+            continue
+        if kind == OPT_EOL:
+            break
+        if isinstance(value, RAW_TYPES):
+            body = bytes(value)
+        elif kind == OPT_MSS:
+            body = struct.pack('!H', value)
+        elif kind == OPT_WSCALE:
+            body = struct.pack('!B', value)
+        elif kind == OPT_SACK_PERMITTED:
+            body = b''
+        elif kind == OPT_SACK:
+            body = b''.join(struct.pack('!LL', left, right) for left, right in value)
+        elif kind == OPT_TIMESTAMP:
+            body = struct.pack('!LL', *value)
+        else:
+            raise ValueError(f"Cannot encode TCP option {kind} from {value!r}")
+        if kind in (OPT_SACK, OPT_TIMESTAMP):
+            out += b'\x01' * (-(len(out) + 2) % 4)
+        out += struct.pack('!BB', kind, len(body) + 2) + body
+    if len(out) > 40:
+        raise ValueError("TCP options exceed 40 bytes")
+    return out + b'\x00' * (-len(out) % 4)
+
+
+def _offset_flags(tcp):
+    #header word 12: data offset (4 bits), reserved bits and flags
+    return (tcp.data_offset << 12) + tcp.flags
 
 
 class TCP(Packet):
+    show_name = "TCP (Layer 4)"
+    show_fields = (("src_port", "src_port"), ("dst_port", "dst_port"), ("seq", "seq"),
+                   ("ack_seq", "ack_seq"), ("flags", "flags", "0x{:03x}"), ("window", "window"),
+                   ("checksum", "checksum", "0x{:04x}"), ("urg_ptr", "urg_ptr"),
+                   ("options", "options"), ("data", "data"))
+    show_optional = ("options", "data")
+    expand_fields = {"src_port": (0, "H"), "dst_port": (2, "H"), "seq": (4, "L"), "ack_seq": (8, "L"),
+                     "window": (14, "H")}
+    checksum_words = {"flags": _offset_flags, "data_offset": _offset_flags}
+    checksum_offset = 16
+    pseudo_header_protocol = socket.IPPROTO_TCP
+    #options are kept as received bytes and only decoded when .options is read
+    _options = None
+    _options_raw = b''
+    #pseudo-header addresses; parsed segments have none
+    ip_src = None
+    ip_dst = None
+
     def __init__(self, src_port=None, dst_port=None, seq=0, ack_seq=0,
                  data_offset=5, flags=0x02, window=8192, checksum=0, urg_ptr=0,
-                 data=b'', raw_bytes=None, ip_src=None, ip_dst=None, payload=None):
+                 data=b'', raw_bytes=None, ip_src=None, ip_dst=None, payload=None, options=None):
         """
         Description: Initializes a TCP packet. Can either construct from provided parameters
                      (for sending) or parse from raw bytes (for received data).
@@ -24,60 +140,153 @@ class TCP(Packet):
         @param dst_port: Destination TCP port number.
         @param seq: Sequence number.
         @param ack_seq: Acknowledgment number.
-        @param data_offset: Header length in 32-bit words (default 5 → 20 bytes).
+        @param data_offset: Header length in 32-bit words (default 5 → 20 bytes); recomputed
+                            from the options when they are given.
         @param flags: Control flags (SYN=0x02, ACK=0x10, FIN=0x01).
         @param window: Window size.
         @param checksum: Header checksum (computed automatically if not provided).
         @param urg_ptr: Urgent pointer.
         @param data: (bytes) Payload data.
         @param raw_bytes: Raw TCP segment for parsing.
-        @param ip_src: Source IPv4 address (for checksum computation).
-        @param ip_dst: Destination IPv4 address (for checksum computation).
+        @param ip_src: Source IPv4 or IPv6 address (for checksum computation).
+        @param ip_dst: Destination IPv4 or IPv6 address (for checksum computation).
         @param payload: (Packet or None) Next encapsulated layer.
+        @param options: List of (kind, value) options, e.g. [(OPT_MSS, 1460), (OPT_WSCALE, 7)]
+                        (see decode_options for the value types).
+                        Ports, sequence numbers and the window also accept ranges, lists and
+                        sets (see Packet.expand()).
         @returns: None
         """
         super().__init__(payload=payload)
 
         if raw_bytes:
             # Parse from received bytes
+            # segments quoted by ICMP errors may carry only the first 8 bytes; the missing
+            # header fields read as zero
             self.src_port, self.dst_port, self.seq, self.ack_seq, offset_reserved_flags, \
-                self.window, self.checksum, self.urg_ptr = struct.unpack('!HHLLHHHH', raw_bytes[:20])
+                self.window, self.checksum, self.urg_ptr = struct.unpack('!HHLLHHHH', bytes(raw_bytes[:20]).ljust(20, b'\x00'))
             self.data_offset = (offset_reserved_flags >> 12)
             self.flags = offset_reserved_flags & 0xFFF
-            self.data = raw_bytes[self.data_offset * 4:]
+            if self.data_offset > 5:
+                self._options_raw = raw_bytes[20:self.data_offset * 4]
+                self.data = raw_bytes[self.data_offset * 4:]
+            else:
+                self.data = raw_bytes[20:]
         else:
             # Construct a new TCP segment
             self.src_port = src_port or 12345
             self.dst_port = dst_port or 80
             self.seq = seq
             self.ack_seq = ack_seq
-            self.data_offset = data_offset
             self.flags = flags
             self.window = window
             self.checksum = checksum
             self.urg_ptr = urg_ptr
             self.data = data
+            self.data_offset = data_offset
+            if options:
+                #also sets data_offset to cover them
+                self.options = options
             self.ip_src = ip_src
             self.ip_dst = ip_dst
 
-            # Compute checksum if IP info is provided
-            self.checksum = self.compute_checksum() if ip_src and ip_dst else 0
+            self._update_checksum()
+
+    def _update_checksum(self):
+        # Compute checksum if IP info is provided (expand() computes it per packet instead
+        # when fields hold ranges)
+        self.checksum = 0
+        if self.ip_src and self.ip_dst:
+            try:
+                self.checksum = self.compute_checksum()
+            except struct.error:
+                if not has_ranges(self.src_port, self.dst_port, self.seq, self.ack_seq, self.window):
+                    raise
+
+    def _refresh(self, changed, original):
+        #the checksum covers the header and data but not the payload layers
+        if "checksum" in changed or set(changed) <= {"payload"}:
+            return
+        if self._adjust_checksum(changed, original):
+            return
+        if original.checksum and not (self.ip_src and self.ip_dst):
+            #a parsed segment has no pseudo-header addresses to recompute the checksum from
+            raise ValueError(f"Cannot recompute the TCP checksum after changing {sorted(changed)}: "
+                             "pass ip_src and ip_dst (or checksum) to replace()")
+        self._update_checksum()
+
+    @property
+    def options(self):
+        """
+        Description: Decoded options (see decode_options), decoded on first access. Assign a new
+                     list to change the options of a parsed segment.
+        """
+        if self._options is None:
+            self._options = decode_options(self._options_raw)
+        return self._options
+
+    @options.setter
+    def options(self, options):
+        self._options = list(options)
+        self._options_raw = None
+        self.data_offset = 5 + len(self.options_bytes()) // 4
+
+    def options_bytes(self):
+        """
+        Description: Encoded options: the received bytes for parsed segments (so re-building
+                     is byte exact), otherwise the current options list encoded.
+
+        @returns: (bytes) Option bytes, a multiple of 4 long.
+        """
+        if self._options_raw is not None:
+            return self._options_raw
+        return encode_options(self._options)
+
+    def option(self, kind):
+        """
+        Description: Value of the first option of the given kind.
+
+        @param kind: Option kind (OPT_MSS, OPT_WSCALE, ...).
+        @returns: The decoded value, or None when the option is absent.
+        """
+        if not self._options_raw and self._options is None:
+            return None
+        for opt_kind, value in self.options:
+            if opt_kind == kind:
+                return value
+        return None
+
+    @property
+    def mss(self):
+        return self.option(OPT_MSS)
+
+    @property
+    def window_scale(self):
+        return self.option(OPT_WSCALE)
+
+    @property
+    def sack_permitted(self):
+        return self.option(OPT_SACK_PERMITTED) is not None
+
+    @property
+    def sack_blocks(self):
+        return self.option(OPT_SACK) or []
+
+    @property
+    def timestamps(self):
+        return self.option(OPT_TIMESTAMP)
 
     def compute_checksum(self):
         """
         Description: Computes the TCP checksum, including the pseudo-header
-                     (which uses the source and destination IPs from the IP layer).
+                     (which uses the source and destination IPs from the IP or IPv6 layer).
 
         @returns: The computed checksum value.
         """
-        pseudo_header = struct.pack(
-            '!4s4sBBH',
-            socket.inet_aton(self.ip_src),
-            socket.inet_aton(self.ip_dst),
-            0,
-            socket.IPPROTO_TCP,
-            self.data_offset * 4 + len(self.data)
-        )
+        options = self.options_bytes()
+        #IPv4 or IPv6 pseudo-header depending on the address family
+        pseudo = pseudo_header(self.ip_src, self.ip_dst, socket.IPPROTO_TCP,
+                               20 + len(options) + len(self.data))
 
         tcp_header = struct.pack(
             '!HHLLHHHH',
@@ -91,7 +300,7 @@ class TCP(Packet):
             self.urg_ptr
         )
 
-        segment = pseudo_header + tcp_header + self.data
+        segment = pseudo + tcp_header + options + self.data
         if len(segment) % 2 == 1:
             segment += b'\x00'
 
@@ -107,6 +316,9 @@ class TCP(Packet):
 
         @returns: (bytes) Complete TCP segment bytes.
         """
+        options = self.options_bytes()
+        if self._options_raw is None:
+            self.data_offset = 5 + len(options) // 4
         header_bytes = struct.pack(
             '!HHLLHHHH',
             self.src_port,
@@ -119,28 +331,15 @@ class TCP(Packet):
             self.urg_ptr
         )
 
-        packet_bytes = header_bytes + self.data
+        packet_bytes = header_bytes + options + self.data
         if self.payload:
             packet_bytes += self.payload.build()
         return packet_bytes
 
-    def show(self, indent=0):
+    def summary_part(self):
         """
-        Description: Displays a human-readable representation of the TCP header and its payload.
-
-        @param indent: (int) Indentation level for nested layers.
-        @returns: None
+        Description: One-line description of the TCP header, e.g. "TCP 40000 > 80 S".
         """
-        print(" " * indent + f"### TCP (Layer 4) ###")
-        print(" " * (indent + 1) + f"src_port: {self.src_port}")
-        print(" " * (indent + 1) + f"dst_port: {self.dst_port}")
-        print(" " * (indent + 1) + f"seq: {self.seq}")
-        print(" " * (indent + 1) + f"ack_seq: {self.ack_seq}")
-        print(" " * (indent + 1) + f"flags: 0x{self.flags:03x}")
-        print(" " * (indent + 1) + f"window: {self.window}")
-        print(" " * (indent + 1) + f"checksum: 0x{self.checksum:04x}")
-        print(" " * (indent + 1) + f"urg_ptr: {self.urg_ptr}")
-        if self.data:
-            print(" " * (indent + 1) + f"data: {self.data}")
-        if self.payload:
-            self.payload.show(indent + 1)
+        flags = "".join(letter for bit, letter in _FLAG_LETTERS if self.flags & bit)
+        part = f"TCP {self.src_port} > {self.dst_port} {flags or '.'}"
+        return part + f" len={len(self.data)}" if self.data else part
@@ -1,5 +1,7 @@
 import struct
 from Packet import Packet
+from addresses import pseudo_header
+from expansion import has_ranges
 
 class UDP(Packet):
     """
@@ -8,6 +10,14 @@ class UDP(Packet):
     Handles construction and parsing of UDP headers.
     Supports both parameter-based initialization and raw-byte parsing.
     """
+    show_fields = (("Source Port", "src_port"), ("Destination Port", "dst_port"),
+                   ("Length", "length"), ("Checksum", "checksum", "{:#x}"))
+    expand_fields = {"src_port": (0, "H"), "dst_port": (2, "H")}
+    checksum_offset = 6
+    pseudo_header_protocol = 17
+    #pseudo-header addresses; parsed datagrams have none
+    src_ip = None
+    dst_ip = None
 
     def __init__(self, raw_bytes=None, src_port=None, dst_port=None,
                  payload=None, src_ip=None, dst_ip=None):
@@ -15,11 +25,12 @@ class UDP(Packet):
         Description: Initialize a UDP layer.
 
         @param raw_bytes: (bytes) Raw UDP header and data to parse (optional)
-        @param src_port: (int) Source port number (default 12345)
-        @param dst_port: (int) Destination port number (default 53)
-        @param payload: (Packet or None) Encapsulated higher-layer data
-        @param src_ip: (str) Source IP (for checksum computation, optional)
-        @param dst_ip: (str) Destination IP (for checksum computation, optional)
+        @param src_port: (int) Source port number (default 12345); also a range, list or set
+                         (see Packet.expand())
+        @param dst_port: (int) Destination port number (default 53); also a range, list or set
+        @param payload: (Packet, bytes or None) Encapsulated higher-layer data
+        @param src_ip: (str) Source IPv4/IPv6 address (for checksum computation, optional)
+        @param dst_ip: (str) Destination IPv4/IPv6 address (for checksum computation, optional)
         """
         super().__init__(payload)
 
@@ -34,9 +45,28 @@ class UDP(Packet):
             self.src_ip = src_ip
             self.dst_ip = dst_ip
 
-            payload_bytes = self.payload.build() if self.payload else self.data
+            self._update()
+
+    def _update(self, keep=()):
+        #length and checksum (when the addresses are known), except those named in keep
+        payload_bytes = self.payload_bytes() if self.payload else self.data
+        if "length" not in keep:
             self.length = 8 + len(payload_bytes)
-            self.checksum = self._compute_checksum(payload_bytes) if (src_ip and dst_ip) else 0
+        if "checksum" in keep:
+            return
+        # expand() computes the checksum per packet when the ports hold ranges
+        self.checksum = 0
+        if self.src_ip and self.dst_ip:
+            try:
+                self.checksum = self._compute_checksum(payload_bytes)
+            except struct.error:
+                if not has_ranges(self.src_port, self.dst_port):
+                    raise
+
+    def _refresh(self, changed, original):
+        #a port change leaves the length alone and updates the checksum incrementally
+        if "checksum" in changed or not self._adjust_checksum(changed, original):
+            self._update(changed)
 
     def _compute_checksum(self, payload_bytes):
         """
@@ -50,21 +80,14 @@ class UDP(Packet):
             The 16-bit UDP checksum value, computed according to the Internet standard.
             If the computed checksum equals 0, the value transmitted will be 0xFFFF.
         """
-        pseudo_header = b''
-
-        # Convert IP addresses to bytes
-        src_ip_bytes = struct.pack('!4B', *[int(x) for x in self.src_ip.split('.')])
-        dst_ip_bytes = struct.pack('!4B', *[int(x) for x in self.dst_ip.split('.')])
-        protocol = 17  # UDP
-        udp_length = self.length
-
-        # Build pseudo-header: src_ip + dst_ip + zero + protocol + UDP length
-        pseudo_header = src_ip_bytes + dst_ip_bytes + struct.pack('!BBH', 0, protocol, udp_length)
+        # Build pseudo-header: IPv4 (src + dst + zero + protocol + length) or
+        # IPv6 (src + dst + length + zeros + next header), chosen by address family
+        pseudo = pseudo_header(self.src_ip, self.dst_ip, 17, self.length)
 
         # UDP header without checksum (checksum field = 0 for calculation)
         header = struct.pack('!HHHH', self.src_port, self.dst_port, self.length, 0)
 
-        checksum_data = pseudo_header + header + payload_bytes
+        checksum_data = pseudo + header + payload_bytes
 
         # If odd length, pad with zero byte
         if len(checksum_data) % 2 == 1:
@@ -77,24 +100,20 @@ class UDP(Packet):
             checksum = (checksum & 0xFFFF) + (checksum >> 16)  # Carry around
 
         checksum = ~checksum & 0xFFFF
-        return checksum
+        # 0 means "no checksum" (and is not allowed over IPv6), so it is sent as 0xFFFF
+        return checksum or 0xFFFF
 
     def build(self):
         """
         Description: Build the byte representation of the UDP packet.
         """
-        payload_bytes = self.payload.build() if self.payload else self.data
+        payload_bytes = self.payload_bytes() if self.payload else self.data
         header = struct.pack('!HHHH', self.src_port, self.dst_port, self.length, self.checksum)
         return header + payload_bytes
 
-    def show(self, indent=0):
+    def summary_part(self):
         """
-        Description: Display UDP header info (overrides Packet.show for custom formatting).
+        Description: One-line description of the UDP header, e.g. "UDP 40000 > 53".
         """
-        print(" " * indent + f"### UDP ###")
-        print(" " * (indent + 1) + f"Source Port: {self.src_port}")
-        print(" " * (indent + 1) + f"Destination Port: {self.dst_port}")
-        print(" " * (indent + 1) + f"Length: {self.length}")
-        print(" " * (indent + 1) + f"Checksum: {hex(self.checksum)}")
-        if self.payload:
-            self.payload.show(indent + 1)
+        part = f"UDP {self.src_port} > {self.dst_port}"
+        return part + f" len={len(self.data)}" if self.payload is None and self.data else part
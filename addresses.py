@@ -0,0 +1,160 @@
+"""
+addresses.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Cached conversions between textual and packed MAC / IPv4 / IPv6 addresses, and
+             the AddressField descriptor used by Ether, IP and IPv6. An address field keeps whichever
+             form it was given (text when built by hand, packed bytes when parsed) and only
+             converts to the other form when it is first asked for it. Conversions go through
+             bounded LRU caches because a few hundred addresses make up almost all traffic.
+"""
+
+import socket
+import struct
+from functools import lru_cache
+
+
+CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def mac_to_bytes(mac):
+    """
+    Description: "aa:bb:cc:dd:ee:ff" -> b'\xaa\xbb\xcc\xdd\xee\xff'
+    """
+    packed = bytes.fromhex(mac.replace(":", "").replace("-", ""))
+    if len(packed) != 6:
+        raise ValueError(f"Invalid MAC address: {mac}")
+    return packed
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def mac_to_str(packed):
+    """
+    Description: b'\xaa\xbb\xcc\xdd\xee\xff' -> "aa:bb:cc:dd:ee:ff"
+    """
+    return packed.hex(":")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def ip_to_bytes(ip):
+    """
+    Description: "10.0.2.15" -> b'\n\x00\x02\x0f'
+    """
+    return socket.inet_aton(ip)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def ip_to_str(packed):
+    """
+    Description: b'\n\x00\x02\x0f' -> "10.0.2.15"
+    """
+    return socket.inet_ntoa(packed)
+
+
+class AddressField:
+    def __init__(self, pack, unpack):
+        """
+        Description: Descriptor for an address attribute kept in text and/or packed form.
+                     The text form lives in the instance dict under the attribute's own name, so
+                     once it exists reads and assignments are plain attribute accesses. The packed
+                     form is remembered next to the text it was made from; packed(obj) reuses it
+                     while the text is unchanged and converts again after an assignment.
+
+        @param pack: Text -> bytes conversion (e.g. ip_to_bytes).
+        @param unpack: Bytes -> text conversion (e.g. ip_to_str).
+        @returns: None
+        """
+        self.pack = pack
+        self.unpack = unpack
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.packed_key = "_" + name + "_bytes"
+
+    def __get__(self, obj, owner=None):
+        # only reached while the instance has no text form yet (parsed and not read so far)
+        if obj is None:
+            return self
+        state = obj.__dict__
+        cached = state.get(self.packed_key)
+        if cached is None:
+            return None
+        text = state[self.name] = self.unpack(cached[1])
+        state[self.packed_key] = (text, cached[1])
+        return text
+
+    def set_packed(self, obj, packed):
+        """
+        Description: Stores a packed address (e.g. straight from received bytes); the text
+                     form is produced the first time the attribute is read.
+
+        @param obj: Instance owning the field.
+        @param packed: (bytes) The packed address.
+        @returns: None
+        """
+        state = obj.__dict__
+        state.pop(self.name, None)
+        #tobytes() is the cheaper copy of a memoryview (a packet parsed in a pool slot)
+        state[self.packed_key] = (None, packed.tobytes() if type(packed) is memoryview else bytes(packed))
+
+    def packed(self, obj):
+        """
+        Description: Returns the packed form of obj's address, converting and remembering it
+                     when the text form was assigned since the last call.
+
+        @param obj: Instance owning the field.
+        @returns: (bytes) The packed address.
+        """
+        state = obj.__dict__
+        cached = state.get(self.packed_key)
+        if self.name not in state:
+            return cached[1] if cached is not None else self.pack(None)
+        text = state[self.name]
+        if cached is None or cached[0] is not text:
+            cached = state[self.packed_key] = (text, self.pack(text))
+        return cached[1]
+
+
+def mac_field():
+    return AddressField(mac_to_bytes, mac_to_str)
+
+
+def ipv4_field():
+    return AddressField(ip_to_bytes, ip_to_str)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def ipv6_to_bytes(ip):
+    """
+    Description: "fe80::1" -> 16 packed bytes
+    """
+    return socket.inet_pton(socket.AF_INET6, ip)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def ipv6_to_str(packed):
+    """
+    Description: 16 packed bytes -> "fe80::1"
+    """
+    return socket.inet_ntop(socket.AF_INET6, packed)
+
+
+def ipv6_field():
+    return AddressField(ipv6_to_bytes, ipv6_to_str)
+
+
+def pseudo_header(src, dst, protocol, length):
+    """
+    Description: Pseudo-header covered by TCP, UDP and ICMPv6 checksums. IPv6 addresses
+                 (anything containing ":") get the RFC 8200 form, IPv4 addresses the RFC 793 one.
+
+    @param src: Source address string.
+    @param dst: Destination address string.
+    @param protocol: Upper-layer protocol number.
+    @param length: Upper-layer length (header + data).
+    @returns: (bytes) The pseudo-header.
+    """
+    if ":" in src:
+        return ipv6_to_bytes(src) + ipv6_to_bytes(dst) + struct.pack('!LxxxB', length, protocol)
+    return ip_to_bytes(src) + ip_to_bytes(dst) + struct.pack('!xBH', protocol, length)
@@ -0,0 +1,222 @@
+"""
+arp_resolver.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: ARP resolution for Layer 2 sends. ARPResolver keeps a per-interface neighbor cache
+             with a TTL, coalesces concurrent requests for the same address into one ARP
+             exchange, and resolves a whole batch of addresses with a single sweep of requests
+             over one packet socket, so bulk L2 jobs do not block per destination.
+"""
+
+import select
+import socket
+import threading
+import time
+from ARP import ARP, ARP_REQUEST, ARP_REPLY
+from Ether import Ether
+from addresses import ip_to_bytes
+from routing import interface_mac, interface_ipv4
+
+
+ETH_P_ARP = 0x0806
+BROADCAST_MAC = "ff:ff:ff:ff:ff:ff"
+
+
+class ARPResolver:
+    def __init__(self, interface, ttl=60.0, timeout=1.0, retries=2, src_mac=None, src_IP=None):
+        """
+        Description: Creates a resolver for one interface.
+
+        @param interface: Interface to resolve on.
+        @param ttl: Seconds a learned neighbor stays valid.
+        @param timeout: Seconds a resolution may take in total.
+        @param retries: Extra request rounds for addresses that have not answered yet.
+        @param src_mac: Sender MAC for requests (defaults to the interface's address).
+        @param src_IP: Sender IPv4 for requests (defaults to the interface's address).
+        @returns: None
+        """
+        self.interface = interface
+        self.ttl = ttl
+        self.timeout = timeout
+        self.retries = retries
+        self.src_mac = src_mac or interface_mac(interface)
+        self.src_IP = src_IP or interface_ipv4(interface) or "0.0.0.0"
+        # IPv4 string -> (MAC string, expiry time)
+        self.cache = {}
+        # IPv4 string -> threading.Event set when an in-flight resolution finishes
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._sock = None
+        self._sock_lock = threading.Lock()
+        template = Ether(dest_mac=BROADCAST_MAC, src_mac=self.src_mac, ethr_type=ETH_P_ARP) / \
+            ARP(opcode=ARP_REQUEST, sender_mac=self.src_mac, sender_IP=self.src_IP, target_IP="0.0.0.0")
+        # request frame for target 0.0.0.0; never modified, _sweep patches a copy
+        self._template = template.build()
+
+    def _socket(self):
+        with self._sock_lock:
+            if self._sock is None:
+                sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ARP))
+                sock.bind((self.interface, ETH_P_ARP))
+                sock.setblocking(False)
+                self._sock = sock
+            return self._sock
+
+    def close(self):
+        with self._sock_lock:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+
+    def lookup(self, ip):
+        """
+        Description: Cache-only lookup.
+
+        @param ip: IPv4 address string.
+        @returns: (str or None) The MAC if a valid entry exists.
+        """
+        entry = self.cache.get(ip)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def learn(self, ip, mac):
+        """
+        Description: Adds or refreshes a neighbor entry and wakes anyone waiting for it.
+        """
+        self.cache[ip] = (mac, time.monotonic() + self.ttl)
+        event = self._pending.get(ip)
+        if event is not None:
+            event.set()
+
+    def resolve(self, ip, timeout=None):
+        """
+        Description: Resolves one address (cache first, then ARP).
+
+        @param ip: IPv4 address string.
+        @param timeout: Overrides the resolver's timeout.
+        @returns: (str or None) The MAC, or None if the host did not answer.
+        """
+        return self.resolve_many([ip], timeout).get(ip)
+
+    def resolve_many(self, ips, timeout=None):
+        """
+        Description: Resolves a batch of addresses. Cached entries are answered immediately;
+                     addresses already being resolved by another thread are waited on rather
+                     than requested again; the rest get one request each per round.
+
+        @param ips: Iterable of IPv4 address strings.
+        @param timeout: Overrides the resolver's timeout.
+        @returns: (dict) IPv4 string -> MAC string for every address that resolved.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        results = {}
+        mine = []
+        waiting = []
+        with self._lock:
+            for ip in dict.fromkeys(ips):
+                mac = self.lookup(ip)
+                if mac is not None:
+                    results[ip] = mac
+                elif ip in self._pending:
+                    waiting.append(ip)
+                else:
+                    self._pending[ip] = threading.Event()
+                    mine.append(ip)
+        deadline = time.monotonic() + timeout
+        if mine:
+            try:
+                self._sweep(mine, deadline)
+            finally:
+                with self._lock:
+                    for ip in mine:
+                        self._pending.pop(ip).set()
+        for ip in waiting:
+            event = self._pending.get(ip)
+            if event is not None:
+                event.wait(max(0.0, deadline - time.monotonic()))
+        for ip in mine + waiting:
+            mac = self.lookup(ip)
+            if mac is not None:
+                results[ip] = mac
+        return results
+
+    def _sweep(self, ips, deadline):
+        """
+        Description: Sends a request for every unresolved address, then reads replies until all
+                     resolved or the round ends; repeats for up to retries extra rounds.
+
+        @param ips: Addresses this call is responsible for.
+        @param deadline: time.monotonic() value at which to give up.
+        @returns: None
+        """
+        sock = self._socket()
+        # patched per target, so each call works on its own copy of the template
+        request = bytearray(self._template)
+        rounds = self.retries + 1
+        round_time = max(0.0, deadline - time.monotonic()) / rounds
+        for _ in range(rounds):
+            unresolved = [ip for ip in ips if self.lookup(ip) is None]
+            if not unresolved:
+                return
+            for ip in unresolved:
+                # the target IP is the last 4 bytes of the request frame
+                request[38:42] = ip_to_bytes(ip)
+                if not self._send(sock, request, deadline):
+                    return
+            round_end = min(deadline, time.monotonic() + round_time)
+            while any(self.lookup(ip) is None for ip in unresolved):
+                wait = round_end - time.monotonic()
+                if wait <= 0:
+                    break
+                # short waits so replies read by another thread's sweep are noticed promptly
+                readable, _, _ = select.select([sock], [], [], min(wait, 0.05))
+                if readable:
+                    self._drain(sock)
+
+    def _send(self, sock, frame, deadline):
+        """
+        Description: Sends a frame on the non-blocking socket, waiting for room in its send
+                     buffer as often as needed.
+
+        @returns: (bool) False when the deadline passed before the frame could be sent.
+        """
+        while True:
+            try:
+                sock.send(frame)
+                return True
+            except BlockingIOError:
+                wait = deadline - time.monotonic()
+                if wait <= 0:
+                    return False
+                select.select([], [sock], [], min(wait, 0.01))
+
+    def _drain(self, sock):
+        while True:
+            try:
+                frame = sock.recv(65535)
+            except BlockingIOError:
+                return
+            pkt = Ether(raw=frame)
+            arp = pkt.payload
+            # replies answer us; requests from neighbors also reveal their mapping
+            if isinstance(arp, ARP) and arp.opcode in (ARP_REQUEST, ARP_REPLY) and arp.sender_IP != "0.0.0.0":
+                self.learn(arp.sender_IP, arp.sender_mac)
+
+
+_resolvers = {}
+_resolvers_lock = threading.Lock()
+
+
+def get_resolver(interface):
+    """
+    Description: Shared resolver (and neighbor cache) for an interface.
+
+    @param interface: Interface name.
+    @returns: (ARPResolver) The interface's resolver.
+    """
+    with _resolvers_lock:
+        resolver = _resolvers.get(interface)
+        if resolver is None:
+            resolver = _resolvers[interface] = ARPResolver(interface)
+        return resolver
@@ -0,0 +1,837 @@
+"""
+benchmark.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Reproducible benchmark suite for the packet library. Measures build throughput per
+             layer and for common stacks, parse throughput from canned frames, checksum
+             throughput by size, show() rendering cost, loopback send/receive rates and HTTP
+             requests/sec against a local stand-in server. Results can be written as JSON and
+             compared against a stored baseline.
+
+             The HTTP benchmarks over the library's own TCP need an interface where the client
+             can own an address the kernel does not (see tcp_connection.PacketLink), given as
+             BENCH_HTTP_LINK="interface,client address,server address"; the stand-in server is
+             bound to the server address, which must be local and reachable over interface.
+
+Usage:       python benchmark.py [--json out.json] [--baseline base.json] [--threshold 0.10]
+                                 [--filter substring] [--quick] [--no-io]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from Ether import Ether
+from IP import IP
+from IPv6 import IPv6, HOP_BY_HOP
+from ICMP import ICMP
+from ICMPv6 import ICMPv6
+from TCP import TCP
+from UDP import UDP
+from DNS import DNS
+import events
+
+
+SRC_MAC = "08:00:27:e2:a4:11"
+DST_MAC = "52:55:0a:00:02:02"
+SRC_IP = "10.0.2.15"
+DST_IP = "8.8.8.8"
+SRC_IP6 = "2001:db8::15"
+DST_IP6 = "2001:4860:4860::8888"
+
+#local experimental ethertype used to keep benchmark frames apart from real traffic on lo
+BENCH_ETHERTYPE = 0x88B5
+
+CHECKSUM_SIZES = (64, 512, 1500, 9000)
+
+BENCHMARKS = []
+
+
+def benchmark(name, group):
+    """
+    Description: Registers a benchmark factory. The factory does its setup and returns
+                 (op, bytes_per_op) where op() performs exactly one operation, or
+                 (op, bytes_per_op, teardown) when state set up for the timing has to be
+                 restored by teardown() afterwards; it may return None when the benchmark
+                 cannot run in this environment.
+
+    @param name: Unique benchmark name.
+    @param group: Group used by --filter and in reports ("build", "parse", ...).
+    @returns: Decorator.
+    """
+    def register(factory):
+        BENCHMARKS.append((name, group, factory))
+        return factory
+    return register
+
+
+def icmp_stack():
+    return Ether(dest_mac=DST_MAC, src_mac=SRC_MAC) / \
+        IP(src_IP=SRC_IP, dest_IP=DST_IP) / \
+        ICMP(icmp_type=8, code=0, ID=1, seq=1, payload=b'x' * 56)
+
+
+def dns_stack():
+    dns = DNS(qname="example.com")
+    udp = UDP(src_port=40000, dst_port=53, payload=dns, src_ip=SRC_IP, dst_ip=DST_IP)
+    return Ether(dest_mac=DST_MAC, src_mac=SRC_MAC) / IP(src_IP=SRC_IP, dest_IP=DST_IP, protocol=17, payload=udp)
+
+
+def tcp_stack():
+    request = b"GET /index.html HTTP/1.1\r\nHost: example.com\r\n\r\n"
+    tcp = TCP(src_port=40000, dst_port=80, seq=1000, ack_seq=1, flags=0x18,
+              ip_src=SRC_IP, ip_dst=DST_IP, data=request)
+    return Ether(dest_mac=DST_MAC, src_mac=SRC_MAC) / IP(src_IP=SRC_IP, dest_IP=DST_IP, protocol=6, payload=tcp)
+
+
+def icmp6_stack():
+    return Ether(dest_mac=DST_MAC, src_mac=SRC_MAC, ethr_type=0x86DD) / \
+        IPv6(src_IP=SRC_IP6, dest_IP=DST_IP6) / ICMPv6(ID=1, seq=1, payload=b'x' * 56)
+
+
+def tcp6_stack():
+    request = b"GET /index.html HTTP/1.1\r\nHost: example.com\r\n\r\n"
+    tcp = TCP(src_port=40000, dst_port=80, seq=1000, ack_seq=1, flags=0x18,
+              ip_src=SRC_IP6, ip_dst=DST_IP6, data=request)
+    return Ether(dest_mac=DST_MAC, src_mac=SRC_MAC, ethr_type=0x86DD) / \
+        IPv6(src_IP=SRC_IP6, dest_IP=DST_IP6, protocol=6, payload=tcp)
+
+
+STACKS = {"icmp": icmp_stack, "dns": dns_stack, "tcp": tcp_stack, "icmp6": icmp6_stack, "tcp6": tcp6_stack}
+
+
+# ---------------------------------------------------------------- build
+
+@benchmark("build.Ether", "build")
+def bench_build_ether():
+    pkt = Ether(dest_mac=DST_MAC, src_mac=SRC_MAC, payload=b'')
+    return pkt.build, 14
+
+
+@benchmark("build.IP", "build")
+def bench_build_ip():
+    pkt = IP(src_IP=SRC_IP, dest_IP=DST_IP)
+    return pkt.build, 20
+
+
+@benchmark("build.ICMP", "build")
+def bench_build_icmp():
+    pkt = ICMP(icmp_type=8, ID=1, seq=1, payload=b'x' * 56)
+    return pkt.build, 64
+
+
+@benchmark("build.TCP", "build")
+def bench_build_tcp():
+    pkt = TCP(src_port=40000, dst_port=80, ip_src=SRC_IP, ip_dst=DST_IP)
+    return pkt.build, 20
+
+
+@benchmark("build.UDP", "build")
+def bench_build_udp():
+    pkt = UDP(src_port=40000, dst_port=53, src_ip=SRC_IP, dst_ip=DST_IP)
+    return pkt.build, 8
+
+
+@benchmark("build.DNS", "build")
+def bench_build_dns():
+    pkt = DNS(qname="example.com")
+    return pkt.build, len(pkt.build())
+
+
+def _stack_build(make):
+    pkt = make()
+    return pkt.build, len(pkt.build())
+
+
+def _stack_construct(make):
+    size = len(make().build())
+    return (lambda: make().build()), size
+
+
+for _name, _make in STACKS.items():
+    benchmark(f"build.stack.{_name}", "build")(lambda make=_make: _stack_build(make))
+    benchmark(f"build.stack.{_name}.construct", "build")(lambda make=_make: _stack_construct(make))
+
+
+@benchmark("build.expand.tcp", "build")
+def bench_build_expand_tcp():
+    #one packet of a /16 x 4 port SYN probe set generated from its template
+    probes = (Ether(dest_mac=DST_MAC, src_mac=SRC_MAC) /
+              IP(src_IP=SRC_IP, dest_IP="10.0.0.0/16", protocol=6) /
+              TCP(src_port=40000, dst_port=[22, 80, 443, 8080], flags=0x02)).expand()
+
+    def cycle():
+        while True:
+            yield from probes
+    return cycle().__next__, len(probes[0])
+
+
+@benchmark("build.derive.tcp", "build")
+def bench_build_derive_tcp():
+    #one variant of a base stack: the TCP layer with a new port under the shared Ether / IP
+    base = Ether(dest_mac=DST_MAC, src_mac=SRC_MAC) / IP(src_IP=SRC_IP, dest_IP=DST_IP, protocol=6)
+    tcp = tcp_stack().payload.payload
+    ports = iter(range(1 << 62))
+
+    def derive():
+        return (base / tcp.replace(dst_port=next(ports) & 0xFFFF)).build()
+    return derive, len(derive())
+
+
+# ---------------------------------------------------------------- parse
+
+for _name, _make in STACKS.items():
+    def _parse(make=_make):
+        frame = make().build()
+        return (lambda: Ether(raw=frame)), len(frame)
+    benchmark(f"parse.stack.{_name}", "parse")(_parse)
+
+
+@benchmark("parse.IP", "parse")
+def bench_parse_ip():
+    datagram = icmp_stack().payload.build()
+    return (lambda: IP(raw=datagram)), len(datagram)
+
+
+@benchmark("parse.IPv6", "parse")
+def bench_parse_ipv6():
+    datagram = icmp6_stack().payload.build()
+    return (lambda: IPv6(raw=datagram)), len(datagram)
+
+
+@benchmark("parse.IPv6.extensions", "parse")
+def bench_parse_ipv6_extensions():
+    #hop-by-hop header with a PadN option ahead of the ICMPv6 message
+    pkt = IPv6(src_IP=SRC_IP6, dest_IP=DST_IP6, extensions=[(HOP_BY_HOP, b'\x00\x00\x01\x04\x00\x00\x00\x00')],
+               payload=ICMPv6(ID=1, seq=1, payload=b'x' * 56))
+    datagram = pkt.build()
+    return (lambda: IPv6(raw=datagram)), len(datagram)
+
+
+@benchmark("parse.TCP", "parse")
+def bench_parse_tcp():
+    segment = tcp_stack().payload.payload.build()
+    return (lambda: TCP(raw_bytes=segment)), len(segment)
+
+
+@benchmark("parse.DNS", "parse")
+def bench_parse_dns():
+    message = DNS(qname="example.com").build()
+    return (lambda: DNS(raw_bytes=message)), len(message)
+
+
+@benchmark("parse.http.dissect", "parse")
+def bench_parse_http_dissect():
+    #one keep-alive connection with 16 request/response exchanges, reassembled and dissected
+    from http_dissector import HTTPDissector
+    request = b"GET /index.html HTTP/1.1\r\nHost: example.com\r\n\r\n"
+    response = b"HTTP/1.1 200 OK\r\nContent-Length: 512\r\n\r\n" + b'x' * 512
+    frames = []
+    client_seq, server_seq = 1000, 5000
+    for _ in range(16):
+        for src, dst, sport, dport, seq, data in ((SRC_IP, DST_IP, 40000, 80, client_seq, request),
+                                                  (DST_IP, SRC_IP, 80, 40000, server_seq, response)):
+            tcp = TCP(src_port=sport, dst_port=dport, seq=seq, flags=0x18, data=data)
+            frames.append(Ether(dest_mac=DST_MAC, src_mac=SRC_MAC) /
+                          IP(src_IP=src, dest_IP=dst, protocol=6, payload=tcp))
+        client_seq += len(request)
+        server_seq += len(response)
+    frames = [frame.build() for frame in frames]
+
+    def op():
+        dissector = HTTPDissector()
+        for frame in frames:
+            dissector.feed_frame(0.0, frame)
+        dissector.flush()
+    return op, sum(map(len, frames))
+
+
+def _filter_frames():
+    #the tcp, dns and icmp stacks, a mix a display filter has to tell apart
+    return [make().build() for make in (tcp_stack, dns_stack, icmp_stack)]
+
+
+@benchmark("parse.filter", "parse")
+def bench_parse_filter():
+    #one compiled display filter applied to three frames
+    from display_filter import DisplayFilter
+    frames = _filter_frames()
+    matches = DisplayFilter(f"ip.src == {SRC_IP} and tcp.dstport == 80 and tcp.flags.push").matcher()
+
+    def op():
+        for frame in frames:
+            matches(frame)
+    return op, sum(map(len, frames))
+
+
+@benchmark("parse.filter.dissect", "parse")
+def bench_parse_filter_dissect():
+    #the same test as parse.filter, by dissecting each frame and checking its layers
+    frames = _filter_frames()
+
+    def matches(frame):
+        ip = Ether(raw=frame).payload
+        if not isinstance(ip, IP) or ip.src_IP != SRC_IP:
+            return False
+        tcp = ip.payload
+        return isinstance(tcp, TCP) and tcp.dst_port == 80 and bool(tcp.flags & 0x08)
+
+    def op():
+        for frame in frames:
+            matches(frame)
+    return op, sum(map(len, frames))
+
+
+@benchmark("parse.dedup.classify", "parse")
+def bench_parse_dedup_classify():
+    #4096 tcp segments, each seen on two taps (the second copy one router hop later, TTL - 1);
+    #every frame is new or a duplicate, and the index expires a cycle before it repeats
+    from dedup import DedupIndex
+    base = bytearray(tcp_stack().build())
+    pairs = []
+    for seq in range(4096):
+        base[38:42] = seq.to_bytes(4, 'big')
+        first = bytes(base)
+        base[22] -= 1
+        pairs.append((first, bytes(base)))
+        base[22] += 1
+    index = DedupIndex(window=0.1)
+    state = [0]
+
+    def op():
+        step = state[0] = state[0] + 1
+        first, copy = pairs[step & 4095]
+        ts = step * 1e-4
+        index.classify(ts, first)
+        index.classify(ts + 1e-5, copy)
+    return op, len(base) * 2
+
+
+def _dns_responder(max_cache):
+    from dns_server import DNSResponder, Zone
+    zone = Zone("example.com")
+    zone.add("@", "SOA", ("ns1.example.com", "admin.example.com", 1, 7200, 3600, 1209600, 300))
+    zone.add("www", "A", "93.184.216.34")
+    return DNSResponder(zone, max_cache=max_cache)
+
+
+@benchmark("parse.dns.respond", "parse")
+def bench_parse_dns_respond():
+    #a repeated query: answered from the response cache with a new transaction ID
+    responder = _dns_responder(1024)
+    query = DNS(qname="www.example.com").build()
+    responder.respond(query)
+    return (lambda: responder.respond(query)), len(query)
+
+
+@benchmark("parse.dns.respond.uncached", "parse")
+def bench_parse_dns_respond_uncached():
+    #the same query parsed, looked up and encoded every time
+    responder = _dns_responder(0)
+    query = DNS(qname="www.example.com").build()
+    return (lambda: responder.respond(query)), len(query)
+
+
+# ---------------------------------------------------------------- checksum
+
+for _size in CHECKSUM_SIZES:
+    def _ip_checksum(size=_size):
+        data = random.Random(size).randbytes(size)
+        ip = IP(src_IP=SRC_IP, dest_IP=DST_IP)
+        return (lambda: ip.checksum_IP(data)), size
+
+    def _icmp_checksum(size=_size):
+        icmp = ICMP(payload=random.Random(size).randbytes(size - 8))
+        return icmp.to_bytes, size
+
+    def _tcp_checksum(size=_size):
+        tcp = TCP(src_port=1, dst_port=2, ip_src=SRC_IP, ip_dst=DST_IP,
+                  data=random.Random(size).randbytes(size - 20))
+        return tcp.compute_checksum, size
+
+    def _udp_checksum(size=_size):
+        udp = UDP(src_port=1, dst_port=2, src_ip=SRC_IP, dst_ip=DST_IP)
+        data = random.Random(size).randbytes(size - 8)
+        udp.length = size
+        return (lambda: udp._compute_checksum(data)), size
+
+    benchmark(f"checksum.IP.{_size}", "checksum")(_ip_checksum)
+    benchmark(f"checksum.ICMP.{_size}", "checksum")(_icmp_checksum)
+    benchmark(f"checksum.TCP.{_size}", "checksum")(_tcp_checksum)
+    benchmark(f"checksum.UDP.{_size}", "checksum")(_udp_checksum)
+
+
+# ---------------------------------------------------------------- show
+
+for _name, _make in STACKS.items():
+    def _show(make=_make):
+        pkt = Ether(raw=make().build())
+        sink = io.StringIO()
+
+        def op():
+            sink.seek(0)
+            sink.truncate()
+            with contextlib.redirect_stdout(sink):
+                pkt.show()
+        return op, 0
+    benchmark(f"show.stack.{_name}", "show")(_show)
+
+    def _show_stream(make=_make):
+        pkt = Ether(raw=make().build())
+        sink = io.StringIO()
+
+        def op():
+            sink.seek(0)
+            sink.truncate()
+            pkt.show(stream=sink)
+        return op, 0
+    benchmark(f"show.stack.{_name}.stream", "show")(_show_stream)
+
+    def _summary(make=_make):
+        pkt = Ether(raw=make().build())
+        return pkt.summary, 0
+    benchmark(f"summary.stack.{_name}", "show")(_summary)
+
+
+# ---------------------------------------------------------------- events
+
+class _Discard:
+    #stdout stand-in that drops what is written, without growing or being reset per op
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _receive_path(verbosity):
+    """
+    Description: Per-packet receive work done by sr()/sniff() after recvfrom: dissect the frame
+                 and report it. Comparing verbosity 0 against 2 (the old always-print behaviour)
+                 gives the per-packet cost of the progress output.
+    """
+    frame = icmp_stack().build()
+
+    def op():
+        pkt_recv = Ether(raw=frame)
+        if events.ACTIVE:
+            events.emit(events.RECEIVED, "sr", pkt_recv, length=len(frame))
+    if not verbosity:
+        return op, len(frame)
+    #verbosity and the redirect are set once, so only formatting the output is timed
+    redirect = contextlib.redirect_stdout(_Discard())
+    redirect.__enter__()
+    events.set_verbosity(verbosity)
+
+    def teardown():
+        events.set_verbosity(0)
+        redirect.__exit__(None, None, None)
+    return op, len(frame), teardown
+
+
+benchmark("events.receive.silent", "events")(lambda: _receive_path(0))
+benchmark("events.receive.progress", "events")(lambda: _receive_path(1))
+benchmark("events.receive.show", "events")(lambda: _receive_path(2))
+
+
+# ---------------------------------------------------------------- I/O
+
+def _packet_socket(protocol):
+    try:
+        sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(protocol))
+        sock.bind(("lo", protocol))
+    except (OSError, AttributeError):
+        return None
+    return sock
+
+
+@benchmark("io.pcap.write", "io")
+def bench_io_pcap_write():
+    #what the capture loop pays per frame to persist it; the writer thread drains to /dev/null
+    import pcap
+    writer = pcap.RotatingPcapWriter(os.devnull, queue_size=1 << 20)
+    frame = tcp_stack().build()
+    return (lambda: writer.write(0.0, frame)), len(frame), writer.close
+
+
+@benchmark("io.memory.sendp_sniff", "io")
+def bench_io_memory():
+    #sendp() on one end of an in-memory link and sniff() on the other; no root needed
+    import transports
+    from network_utils import sendp, sniff
+    left, right = transports.memory_pair()
+    pkt = Ether(dest_mac=DST_MAC, src_mac=SRC_MAC, ethr_type=BENCH_ETHERTYPE, payload=b'x' * 50)
+
+    def op():
+        sendp(pkt, transport=left)
+        sniff(0, transport=right)
+    return op, len(pkt.build())
+
+
+@benchmark("io.send.lo", "io")
+def bench_io_send():
+    sock = _packet_socket(BENCH_ETHERTYPE)
+    if sock is None:
+        return None
+    frame = Ether(dest_mac="00:00:00:00:00:00", src_mac="00:00:00:00:00:00",
+                  ethr_type=BENCH_ETHERTYPE, payload=b'x' * 50).build()
+    return (lambda: sock.send(frame)), len(frame), sock.close
+
+
+@benchmark("io.send_recv.lo", "io")
+def bench_io_send_recv():
+    tx = _packet_socket(BENCH_ETHERTYPE)
+    if tx is None:
+        return None
+    rx = _packet_socket(BENCH_ETHERTYPE)
+    rx.settimeout(1.0)
+    frame = Ether(dest_mac="00:00:00:00:00:00", src_mac="00:00:00:00:00:00",
+                  ethr_type=BENCH_ETHERTYPE, payload=b'x' * 50).build()
+
+    def op():
+        tx.send(frame)
+        Ether(raw=rx.recv(65535))
+
+    def teardown():
+        tx.close()
+        rx.close()
+    return op, len(frame), teardown
+
+
+def _recv_path(pooled):
+    #one MTU-sized frame sent on lo and received through RawTransport, as sniff() does: a
+    #new bytes object per frame, or read into a pool slot and dissected in place
+    import transports
+    from buffer_pool import BufferPool
+    tx = _packet_socket(BENCH_ETHERTYPE)
+    if tx is None:
+        return None
+    transport = transports.RawTransport("lo", protocol=BENCH_ETHERTYPE)
+    #opened before the first frame is sent, or that frame is never seen
+    transport.receiver()
+    frame = Ether(dest_mac="00:00:00:00:00:00", src_mac="00:00:00:00:00:00",
+                  ethr_type=BENCH_ETHERTYPE, payload=b'x' * 1486).build()
+    pool = BufferPool(16, 1518)
+
+    def op():
+        tx.send(frame)
+        transport.decode(transport.recv_stamped(1.0)[1])
+
+    def op_pooled():
+        tx.send(frame)
+        received = pool.recv(transport, 1.0)
+        transport.decode(received.data)
+        received.release()
+
+    def teardown():
+        tx.close()
+        transport.close()
+    return (op_pooled if pooled else op), len(frame), teardown
+
+
+benchmark("io.recv.lo", "io")(lambda: _recv_path(False))
+benchmark("io.recv.lo.pool", "io")(lambda: _recv_path(True))
+
+
+CAPTURE_BATCH = 32
+
+
+def _capture_path(pooled):
+    #CAPTURE_BATCH MTU-sized frames sent on lo and read back by capture(), which keeps one in
+    #ten: as new bytes objects, or read into pool slots that only kept frames are copied from
+    import transports
+    from buffer_pool import BufferPool
+    from network_utils import capture
+    from sampling import CountSampler
+    tx = _packet_socket(BENCH_ETHERTYPE)
+    if tx is None:
+        return None
+    transport = transports.RawTransport("lo", protocol=BENCH_ETHERTYPE)
+    transport.receiver()
+    frame = Ether(dest_mac="00:00:00:00:00:00", src_mac="00:00:00:00:00:00",
+                  ethr_type=BENCH_ETHERTYPE, payload=b'x' * 1486).build()
+    pool = BufferPool(CAPTURE_BATCH, 1518) if pooled else None
+
+    def sink(stamp, data):
+        #a sink that keeps frames copies them (bytes() returns bytes objects as they are)
+        return bytes(data)
+
+    def op():
+        for _ in range(CAPTURE_BATCH):
+            tx.send(frame)
+        capture(sink, transport=transport, count=CAPTURE_BATCH, batch=CAPTURE_BATCH,
+                sampler=CountSampler(10), pool=pool)
+
+    def teardown():
+        tx.close()
+        transport.close()
+    return op, len(frame) * CAPTURE_BATCH, teardown
+
+
+#one op is CAPTURE_BATCH frames
+benchmark("io.capture.lo", "io")(lambda: _capture_path(False))
+benchmark("io.capture.lo.pool", "io")(lambda: _capture_path(True))
+
+
+@benchmark("io.network_utils.sendp.lo", "io")
+def bench_io_sendp():
+    probe = _packet_socket(BENCH_ETHERTYPE)
+    if probe is None:
+        return None
+    #only opened to see whether packet sockets are available
+    probe.close()
+    from network_utils import sendp
+    pkt = Ether(dest_mac="00:00:00:00:00:00", src_mac="00:00:00:00:00:00",
+                ethr_type=BENCH_ETHERTYPE, payload=b'x' * 50)
+    return (lambda: sendp(pkt, "lo")), len(pkt.build())
+
+
+# ---------------------------------------------------------------- HTTP
+
+HTTP_BODY = b'x' * 512
+PIPELINE_DEPTH = 16
+
+
+def _http_server(address):
+    """
+    Description: Starts a keep-alive HTTP/1.1 stand-in server in a daemon thread.
+
+    @param address: Address to bind (port chosen by the system).
+    @returns: (ThreadingHTTPServer or None) The server, or None if it could not bind.
+    """
+    import threading
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        #headers and body are written separately; Nagle would hold the body for an ACK
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(HTTP_BODY)))
+            self.end_headers()
+            self.wfile.write(HTTP_BODY)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((address, 0), Handler)
+    except OSError:
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _http_benchmark(which, connection, server):
+    #(op, bytes per op, teardown) for one request, or PIPELINE_DEPTH pipelined requests
+    def keepalive():
+        connection.fetch("GET", "/")
+
+    def pipelined():
+        for _ in connection.pipeline(["/"] * PIPELINE_DEPTH):
+            pass
+
+    def teardown():
+        connection.close()
+        server.shutdown()
+        server.server_close()
+    if which == "keepalive":
+        return keepalive, len(HTTP_BODY), teardown
+    return pipelined, len(HTTP_BODY) * PIPELINE_DEPTH, teardown
+
+
+def _kernel_http(which):
+    from http_client import HTTPConnection
+    server = _http_server("127.0.0.1")
+    if server is None:
+        return None
+    port = server.server_address[1]
+    connection = HTTPConnection("127.0.0.1", port,
+                                connect=lambda: socket.create_connection(("127.0.0.1", port)))
+    return _http_benchmark(which, connection, server)
+
+
+def _stack_http(which):
+    link_spec = os.environ.get("BENCH_HTTP_LINK")
+    if not link_spec:
+        return None
+    from http_client import HTTPConnection
+    from tcp_connection import TCPConnection, PacketLink
+    interface, client_IP, server_IP = link_spec.split(",")
+    server = _http_server(server_IP)
+    if server is None:
+        return None
+    port = server.server_address[1]
+
+    def connect():
+        conn = TCPConnection(server_IP, port, link=PacketLink(interface, client_IP))
+        conn.connect()
+        return conn
+    connection = HTTPConnection(server_IP, port, connect=connect)
+    return _http_benchmark(which, connection, server)
+
+
+#one op is one request (keepalive) or PIPELINE_DEPTH requests (pipelined)
+benchmark("io.http.kernel.keepalive", "io")(lambda: _kernel_http("keepalive"))
+benchmark("io.http.kernel.pipelined", "io")(lambda: _kernel_http("pipelined"))
+benchmark("io.http.stack.keepalive", "io")(lambda: _stack_http("keepalive"))
+benchmark("io.http.stack.pipelined", "io")(lambda: _stack_http("pipelined"))
+
+
+# ---------------------------------------------------------------- runner
+
+def measure(op, min_time, repeat):
+    """
+    Description: Times op() in batches sized to last at least min_time seconds and keeps the
+                 fastest of `repeat` batches (the least disturbed by the rest of the system).
+
+    @param op: Callable performing one operation.
+    @param min_time: Minimum seconds per timed batch.
+    @param repeat: Number of timed batches.
+    @returns: (float) Best seconds per operation.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 4:
+            break
+        number *= 4
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(filter_text=None, min_time=0.2, repeat=5, include_io=True):
+    """
+    Description: Runs every registered benchmark (optionally filtered by name substring).
+
+    @param filter_text: Only run benchmarks whose name contains this text.
+    @param min_time: Minimum seconds per timed batch.
+    @param repeat: Timed batches per benchmark.
+    @param include_io: Run the loopback I/O benchmarks (needs CAP_NET_RAW).
+    @returns: (dict) {"meta": {...}, "results": {name: {"group", "ns_per_op", "ops_per_sec",
+              "bytes_per_op", "mb_per_sec"}}} ; skipped benchmarks map to {"skipped": True}.
+    """
+    results = {}
+    for name, group, factory in BENCHMARKS:
+        if filter_text and filter_text not in name:
+            continue
+        if group == "io" and not include_io:
+            continue
+        # fixed seeds keep random IDs and payloads identical between runs
+        random.seed(0)
+        prepared = factory()
+        if prepared is None:
+            results[name] = {"group": group, "skipped": True}
+            continue
+        op, nbytes = prepared[:2]
+        try:
+            seconds = measure(op, min_time, repeat)
+        finally:
+            if len(prepared) > 2:
+                prepared[2]()
+        entry = {"group": group, "ns_per_op": seconds * 1e9, "ops_per_sec": 1.0 / seconds,
+                 "bytes_per_op": nbytes}
+        if nbytes:
+            entry["mb_per_sec"] = nbytes / seconds / 1e6
+        results[name] = entry
+    meta = {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "revision": _git_revision(),
+        "min_time": min_time,
+        "repeat": repeat,
+    }
+    return {"meta": meta, "results": results}
+
+
+def compare(current, baseline, threshold=0.10):
+    """
+    Description: Compares ops/sec of every benchmark present in both runs.
+
+    @param current: Result dict from run().
+    @param baseline: Result dict loaded from a previous run.
+    @param threshold: Relative slowdown treated as a regression (0.10 = 10% fewer ops/sec).
+    @returns: (list) (name, baseline ops/sec, current ops/sec, ratio, regressed) tuples.
+    """
+    rows = []
+    for name, entry in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or entry.get("skipped") or base.get("skipped"):
+            continue
+        ratio = entry["ops_per_sec"] / base["ops_per_sec"]
+        rows.append((name, base["ops_per_sec"], entry["ops_per_sec"], ratio, ratio < 1.0 - threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Packet library benchmarks")
+    parser.add_argument("--json", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="regression threshold (fraction)")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--quick", action="store_true", help="shorter batches, fewer repeats")
+    parser.add_argument("--no-io", action="store_true", help="skip loopback socket benchmarks")
+    args = parser.parse_args(argv)
+
+    min_time, repeat = (0.05, 3) if args.quick else (0.2, 5)
+    report = run(args.filter, min_time=min_time, repeat=repeat, include_io=not args.no_io)
+
+    for name, entry in report["results"].items():
+        if entry.get("skipped"):
+            print(f"{name:40s} skipped")
+            continue
+        line = f"{name:40s} {entry['ns_per_op']:12.0f} ns/op {entry['ops_per_sec']:14.0f} ops/s"
+        if "mb_per_sec" in entry:
+            line += f" {entry['mb_per_sec']:10.1f} MB/s"
+        print(line)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        regressions = [row for row in rows if row[4]]
+        print(f"\n[*] compared with {args.baseline} (revision {baseline.get('meta', {}).get('revision')})")
+        for name, base, cur, ratio, regressed in rows:
+            flag = "REGRESSION" if regressed else ""
+            print(f"{name:40s} {base:14.0f} -> {cur:14.0f} ops/s  x{ratio:5.2f} {flag}")
+        if regressions:
+            print(f"[-] {len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+buffer_pool.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: A pool of preallocated receive buffers, so receiving does not allocate a new bytes
+             object per frame. Frames are read straight into a free slot (Transport.recv_into,
+             recvmsg_into on raw sockets) and dissected in place: the parsed layers hold
+             memoryviews into the slot instead of copies. Releasing the frame (or the packet
+             parsed from it, see Packet.release) hands the slot back for the next receive.
+
+             Slots are sized to the interface MTU plus the link header. A frame larger than a
+             slot (e.g. one the kernel coalesced with GRO) is truncated to it; its original
+             length is still known. Once released, a slot is overwritten by a later receive,
+             so nothing parsed from it may be used after that; copy with bytes() what has to
+             be kept.
+
+             Python has no recvmmsg(), so a batch is one wait followed by non-blocking
+             reads of whatever is already queued, into slots taken from the pool together
+             (Transport.recv_into_many).
+"""
+
+import routing
+
+
+#Ethernet header with one VLAN tag
+LINK_HEADER = 18
+#MTU assumed when the interfaces cannot be read
+DEFAULT_MTU = 1500
+
+
+def slot_size(interface=None):
+    """
+    Description: Buffer size that holds any frame of an interface: its MTU plus the link
+                 header. Without an interface, the largest MTU of all interfaces (frames are
+                 then received from every one of them).
+
+    @param interface: Interface name, or None.
+    @returns: (int) Size in bytes.
+    """
+    try:
+        interfaces = routing.read_interfaces()
+    except OSError:
+        interfaces = {}
+    if interface is not None:
+        found = interfaces.get(interface)
+        mtus = [found.mtu] if found is not None and found.mtu else []
+    else:
+        mtus = [entry.mtu for entry in interfaces.values() if entry.mtu]
+    return (max(mtus) if mtus else DEFAULT_MTU) + LINK_HEADER
+
+
+class PooledFrame:
+    __slots__ = ("pool", "buffer", "data", "length", "original", "time", "_view", "_held")
+
+    def __init__(self, pool, buffer):
+        """
+        Description: A pool slot and the frame last received into it. Slots are made once with
+                     the pool and handed out again after each release().
+
+        @param pool: (BufferPool) The pool the slot returns to; None for a buffer allocated
+                     because the pool was empty.
+        @param buffer: (bytearray) The slot's buffer.
+        @returns: None
+        """
+        self.pool = pool
+        self.buffer = buffer
+        self._view = memoryview(buffer)
+        #memoryview of the received bytes, set when a frame is received into the slot
+        self.data = None
+        self.length = 0
+        self.original = 0
+        self.time = None
+        self._held = False
+
+    @property
+    def truncated(self):
+        """
+        Description: True when the frame was longer than the slot.
+        """
+        return self.original > self.length
+
+    def release(self):
+        """
+        Description: Returns the slot to its pool. Safe to call more than once.
+        """
+        if not self._held:
+            return
+        self._held = False
+        self.data = None
+        if self.pool is not None:
+            self.pool._free.append(self)
+
+    def __bytes__(self):
+        return self.data.tobytes()
+
+    def __len__(self):
+        return self.length
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class BufferPool:
+    def __init__(self, count=256, size=None, interface=None):
+        """
+        Description: count receive buffers of size bytes each, allocated once.
+
+        @param count: Number of slots (frames that can be held unreleased at once).
+        @param size: Slot size in bytes (default: slot_size(interface)).
+        @param interface: Interface the pool receives from, to size the slots.
+        @returns: None
+        """
+        self.size = size or slot_size(interface)
+        self.count = count
+        self._free = [PooledFrame(self, bytearray(self.size)) for _ in range(count)]
+        #slots handed out, receives that found the pool empty (and used a buffer allocated
+        #for them instead) and the fewest slots free at once
+        self.acquired = 0
+        self.exhausted = 0
+        self._low = count
+
+    @property
+    def in_use(self):
+        return self.count - len(self._free)
+
+    @property
+    def high_water(self):
+        """
+        Description: Most slots in use at once.
+        """
+        return self.count - self._low
+
+    def acquire(self):
+        """
+        Description: Takes a free slot. When every slot is in use (frames not released), a
+                     buffer outside the pool is allocated so receiving goes on, and counted in
+                     exhausted.
+
+        @returns: (PooledFrame) The slot.
+        """
+        free = self._free
+        if free:
+            frame = free.pop()
+            if len(free) < self._low:
+                self._low = len(free)
+            self.acquired += 1
+        else:
+            self.exhausted += 1
+            frame = PooledFrame(None, bytearray(self.size))
+        frame._held = True
+        return frame
+
+    def recv(self, transport, timeout=None, snaplen=None):
+        """
+        Description: Receives one frame from transport into a slot.
+
+        @param transport: Transport to receive on (see transports.py).
+        @param timeout: Seconds to wait (None waits forever, 0 does not wait).
+        @param snaplen: Keep only the first snaplen bytes of the frame (None keeps all the
+                        slot holds); on raw sockets the kernel then copies no more.
+        @returns: (PooledFrame or None) The frame, or None on timeout.
+        """
+        frame = self.acquire()
+        buffer = frame.buffer if snaplen is None or snaplen >= self.size else frame._view[:snaplen]
+        received = transport.recv_into(buffer, timeout)
+        if received is None:
+            frame.release()
+            return None
+        frame.length, frame.original, frame.time = received
+        frame.data = frame._view[:frame.length]
+        return frame
+
+    def recv_many(self, transport, max_count=64, timeout=None, snaplen=None):
+        """
+        Description: Waits for one frame like recv(), then also reads up to max_count - 1
+                     frames that are already queued, without waiting.
+
+        @param transport: Transport to receive on.
+        @param max_count: Most frames returned.
+        @param timeout: Seconds to wait for the first frame.
+        @param snaplen: Bytes kept per frame (see recv).
+        @returns: (list) PooledFrames (empty on timeout).
+        """
+        #the free slots are taken for the whole batch and the ones left unfilled go back
+        free = self._free
+        taken = min(max_count, len(free))
+        slots = free[len(free) - taken:]
+        del free[len(free) - taken:]
+        if snaplen is None or snaplen >= self.size:
+            buffers = [slot.buffer for slot in slots]
+        else:
+            buffers = [slot._view[:snaplen] for slot in slots]
+        received = transport.recv_into_many(buffers, timeout) if taken else []
+        frames = slots[:len(received)]
+        free.extend(slots[len(received):])
+        if len(free) < self._low:
+            self._low = len(free)
+        self.acquired += len(frames)
+        for frame, (length, original, stamp) in zip(frames, received):
+            frame._held = True
+            frame.length, frame.original, frame.time = length, original, stamp
+            frame.data = frame._view[:length]
+        if not taken:
+            frame = self.recv(transport, timeout, snaplen)
+            if frame is None:
+                return frames
+            frames.append(frame)
+        elif len(frames) < taken:
+            return frames
+        #the pool ran out with frames still queued: go on with buffers allocated for them
+        while len(frames) < max_count:
+            frame = self.recv(transport, 0, snaplen)
+            if frame is None:
+                break
+            frames.append(frame)
+        return frames
+
+    def stats(self):
+        return {"size": self.size, "count": self.count, "in_use": self.in_use,
+                "acquired": self.acquired, "exhausted": self.exhausted,
+                "high_water": self.high_water}
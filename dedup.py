@@ -0,0 +1,235 @@
+"""
+dedup.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Packet digests and a time-windowed index that tags the frames of a capture as new,
+             duplicates or TCP retransmissions (see network_utils.capture(dedup=...)).
+
+             packet_digest() is a stable 8-byte BLAKE2b digest of a frame's IP packet without
+             the fields routers change on the way: the Ethernet header and VLAN tags, TTL /
+             hop limit and the IPv4 header checksum (and Ethernet padding after the packet).
+             The same packet seen by two taps, on either side of a router, has one digest;
+             digests are the same in every process and run. Only the IP header and the first
+             DIGEST_PAYLOAD bytes of its payload are hashed: the TCP/UDP/ICMP header in
+             there carries a checksum over the rest, so hashing it all would cost more
+             without telling more packets apart.
+
+             DedupIndex remembers the digests (and TCP segments) seen in the last window
+             seconds in two generations: new entries go to the current one, lookups
+             check both, and when a window has passed the older one is dropped whole. Every
+             operation is O(1) and an entry is kept between window and 2 * window seconds;
+             memory is bounded by max_entries, reached early only when more packets than that
+             arrive in a window (counted in overflows).
+"""
+
+import hashlib
+import struct
+
+
+#tags given by DedupIndex.classify
+NEW = "new"
+DUPLICATE = "duplicate"
+RETRANSMIT = "retransmit"
+
+#bytes of the IP payload hashed into a digest (covers TCP headers with options)
+DIGEST_PAYLOAD = 64
+#802.1Q and 802.1ad tags
+_VLAN_TYPES = (b'\x81\x00', b'\x88\xa8')
+_TCP_SYN_FIN = 0x03
+_LENGTH_FLAGS = struct.Struct("!HB")
+
+
+def _network_offset(frame):
+    """
+    Description: Offset and EtherType of the network layer of an Ethernet frame, past any
+                 VLAN tags.
+    """
+    ethr_type = frame[12:14]
+    if ethr_type not in _VLAN_TYPES:
+        return 14, ethr_type
+    offset = 14
+    while ethr_type in _VLAN_TYPES and len(frame) >= offset + 4:
+        ethr_type = frame[offset + 2:offset + 4]
+        offset += 4
+    return offset, ethr_type
+
+
+def packet_digest(frame):
+    """
+    Description: Digest of an Ethernet frame that is the same for every copy of its IP packet
+                 (see the module description). Frames that are not IPv4/IPv6 are hashed whole.
+
+    @param frame: Ethernet frame bytes (or a memoryview of them).
+    @returns: (bytes) 8-byte digest.
+    """
+    return _digest_at(frame, *_network_offset(frame))
+
+
+def _digest_at(frame, offset, ethr_type):
+    #the pieces are hashed in turn rather than joined, which also works on memoryviews
+    digest = hashlib.blake2b(digest_size=8)
+    if ethr_type == b'\x08\x00' and len(frame) >= offset + 20:
+        end = offset + ((frame[offset + 2] << 8) | frame[offset + 3])
+        if end <= offset:
+            #total length 0 (segmentation offload): the packet runs to the end of the frame
+            end = len(frame)
+        end = min(end, offset + (frame[offset] & 0x0F) * 4 + DIGEST_PAYLOAD)
+        #skip TTL (byte 8) and the header checksum (bytes 10-11)
+        digest.update(frame[offset:offset + 8])
+        digest.update(frame[offset + 9:offset + 10])
+        digest.update(frame[offset + 12:end])
+    elif ethr_type == b'\x86\xdd' and len(frame) >= offset + 40:
+        end = offset + 40 + ((frame[offset + 4] << 8) | frame[offset + 5])
+        if end <= offset + 40:
+            end = len(frame)
+        end = min(end, offset + 40 + DIGEST_PAYLOAD)
+        #skip the hop limit (byte 7)
+        digest.update(frame[offset:offset + 7])
+        digest.update(frame[offset + 8:end])
+    else:
+        digest.update(frame)
+    return digest.digest()
+
+
+def segment_key(frame):
+    """
+    Description: Key of the TCP segment an Ethernet frame carries: connection and direction,
+                 sequence number and the sequence space it covers. A retransmission has the
+                 same key as the original even when its IP ID, TCP timestamps or checksum
+                 differ. Pure ACKs, which occupy no sequence space, have none.
+
+    @param frame: Ethernet frame bytes.
+    @returns: (bytes or None) The key, or None for frames that are not TCP segments with
+              data, SYN or FIN.
+    """
+    return _segment_at(frame, *_network_offset(frame))
+
+
+def _segment_at(frame, offset, ethr_type):
+    if ethr_type == b'\x08\x00' and len(frame) >= offset + 20:
+        if frame[offset + 9] != 6:
+            return None
+        tcp = offset + (frame[offset] & 0x0F) * 4
+        end = offset + ((frame[offset + 2] << 8) | frame[offset + 3])
+        addresses = frame[offset + 12:offset + 20]
+    elif ethr_type == b'\x86\xdd' and len(frame) >= offset + 40:
+        #segments behind IPv6 extension headers are not keyed
+        if frame[offset + 6] != 6:
+            return None
+        tcp = offset + 40
+        end = tcp + ((frame[offset + 4] << 8) | frame[offset + 5])
+        addresses = frame[offset + 8:offset + 40]
+    else:
+        return None
+    if len(frame) < tcp + 20:
+        return None
+    if end <= tcp:
+        end = len(frame)
+    length = end - tcp - (frame[tcp + 12] >> 4) * 4
+    flags = frame[tcp + 13] & _TCP_SYN_FIN
+    if length <= 0:
+        if not flags:
+            return None
+        length = 0
+    #ports and sequence number, then the segment's length and SYN/FIN
+    return b''.join((addresses, frame[tcp:tcp + 8], _LENGTH_FLAGS.pack(length, flags)))
+
+
+class DedupIndex:
+    def __init__(self, window=1.0, max_entries=1 << 20, max_skew=0.01, on_tag=None):
+        """
+        Description: Index of the packets seen in the last window seconds. classify() tags a
+                     frame:
+                       DUPLICATE  - its digest was seen, at most max_skew seconds earlier:
+                                    another tap's copy of the same packet.
+                       RETRANSMIT - a TCP segment that covers sequence space already seen
+                                    (with different bytes, e.g. a new IP ID, or the same
+                                    bytes more than max_skew seconds earlier).
+                       NEW        - anything else, including a repeat of other packets (pure
+                                    ACKs, UDP, ICMP) more than max_skew seconds later: it was
+                                    sent again, and copies of it are measured from then.
+
+        @param window: Seconds a packet is remembered (at least).
+        @param max_entries: Most digests, and most TCP segments, held at once.
+        @param max_skew: Longest delay between copies of one packet seen on different taps.
+        @param on_tag: Callable on_tag(timestamp, frame, tag) for every frame tagged
+                       DUPLICATE or RETRANSMIT (default: none). The frame is the one given
+                       to classify(), a memoryview into a reused buffer when capture()
+                       receives into a BufferPool: copy it with bytes() to keep it.
+        @returns: None
+        """
+        self.window = window
+        self.max_entries = max_entries
+        self.max_skew = max_skew
+        self.on_tag = on_tag
+        self.seen = 0
+        self.duplicates = 0
+        self.retransmits = 0
+        #generations dropped because the current one filled up before its window ended
+        self.overflows = 0
+        #digest -> when the packet was last sent (copies within max_skew are not sendings),
+        #and segment keys; newer and older generation
+        self._digests, self._old_digests = {}, {}
+        self._segments, self._old_segments = set(), set()
+        self._rotate_at = None
+
+    def __len__(self):
+        return (len(self._digests) + len(self._old_digests) +
+                len(self._segments) + len(self._old_segments))
+
+    def _rotate(self, ts):
+        if ts >= self._rotate_at + self.window:
+            #nothing seen in the last window either: both generations have expired
+            self._old_digests, self._old_segments = {}, set()
+        else:
+            self._old_digests, self._old_segments = self._digests, self._segments
+        self._digests, self._segments = {}, set()
+        self._rotate_at = ts + self.window
+
+    def classify(self, ts, frame):
+        """
+        Description: Tags a frame and remembers it. Frames are expected in (roughly)
+                     timestamp order.
+
+        @param ts: When the frame was captured (seconds).
+        @param frame: Ethernet frame bytes (or a memoryview of them).
+        @returns: (str) NEW, DUPLICATE or RETRANSMIT.
+        """
+        self.seen += 1
+        if self._rotate_at is None:
+            self._rotate_at = ts + self.window
+        elif ts >= self._rotate_at:
+            self._rotate(ts)
+        half = self.max_entries // 2
+        if len(self._digests) >= half or len(self._segments) >= half:
+            self.overflows += 1
+            self._old_digests, self._old_segments = self._digests, self._segments
+            self._digests, self._segments = {}, set()
+            self._rotate_at = ts + self.window
+
+        offset, ethr_type = _network_offset(frame)
+        digest = _digest_at(frame, offset, ethr_type)
+        sent = self._digests.get(digest)
+        if sent is None:
+            sent = self._old_digests.get(digest)
+        if sent is not None and ts - sent <= self.max_skew:
+            self.duplicates += 1
+            if self.on_tag is not None:
+                self.on_tag(ts, frame, DUPLICATE)
+            return DUPLICATE
+        #a repeat later than max_skew was sent again: later copies are measured from it
+        self._digests[digest] = ts
+        segment = _segment_at(frame, offset, ethr_type)
+        if segment is None:
+            return NEW
+        if sent is not None or segment in self._segments or segment in self._old_segments:
+            self.retransmits += 1
+            if self.on_tag is not None:
+                self.on_tag(ts, frame, RETRANSMIT)
+            return RETRANSMIT
+        self._segments.add(segment)
+        return NEW
+
+    def stats(self):
+        return {"seen": self.seen, "duplicates": self.duplicates, "retransmits": self.retransmits,
+                "overflows": self.overflows, "entries": len(self)}
@@ -0,0 +1,746 @@
+"""
+display_filter.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Display filters for captured packets, e.g.
+                 ip.src == 10.0.2.15 and tcp.flags.syn and not tcp.flags.ack
+                 udp.port in {53 5353} || dns.qname ~ "example"
+                 ip.addr == 10.0.0.0/8 && tcp.payload contains "GET"
+             An expression is parsed once into a tree of small closures. Each packet is only
+             decoded as deep as the filter needs (the offsets of its headers, no layer objects),
+             and each test reads its field straight from the raw bytes, so a packet that fails
+             an early test is never looked at further.
+
+             Grammar: tests combine with and/&&, or/||, not/! and parentheses. A test is a
+             field alone (the protocol is present / the flag is set) or
+             field op value, with op one of == != < <= > >= (or eq ne lt le gt ge),
+             contains, ~ (matches: regular expression search) or in {value value ...}.
+             Values are numbers, IPv4/IPv6 addresses or networks (10.0.0.0/8), MAC addresses
+             and "quoted strings". ip.addr, tcp.port and the like match either direction.
+
+             Usage: python display_filter.py capture.pcap "expression" [--count]
+"""
+
+import ipaddress
+import operator
+import re
+import sys
+import pcap
+from Ether import Ether
+from IP import IP
+from IPv6 import IPv6, EXTENSION_HEADERS, FRAGMENT, walk_extensions
+from addresses import mac_to_bytes
+
+
+class FilterError(Exception):
+    pass
+
+
+#how deep a packet must be decoded for each protocol
+_DEPTH = {"frame": 0, "eth": 0, "vlan": 0, "arp": 1, "ip": 1, "ipv6": 1,
+          "tcp": 2, "udp": 2, "icmp": 2, "icmpv6": 2, "dns": 3, "http": 3}
+_VLAN_TYPES = (0x8100, 0x88A8)
+_DNS_PORTS = (53, 5353)
+_HTTP_START = re.compile(rb"HTTP/1\.\d |(?:GET|POST|HEAD|PUT|DELETE|OPTIONS|PATCH|CONNECT|TRACE) ")
+
+
+def _dissect(data, link_type, depth):
+    """
+    Description: Offsets of the headers of one packet, decoded no deeper than depth.
+                 Private keys hold what the field readers need besides the offsets:
+                 _type (ethertype), _proto (upper-layer protocol), _payload and _end
+                 (transport payload and end of the IP payload).
+
+    @param data: Packet bytes as captured.
+    @param link_type: pcap LINKTYPE_* value of the capture.
+    @param depth: 0 link layer, 1 network, 2 transport, 3 application.
+    @returns: (dict) protocol name -> offset of its header.
+    """
+    layers = {"frame": 0}
+    size = len(data)
+    if link_type == pcap.LINKTYPE_ETHERNET:
+        if size < 14:
+            return layers
+        layers["eth"] = 0
+        offset = 12
+        ethr_type = data[12] << 8 | data[13]
+        #a tag is dissected only when it and the type after it fit in the frame, so the
+        #vlan readers stay inside it
+        if ethr_type in _VLAN_TYPES and size >= 18:
+            layers["vlan"] = 12
+            while ethr_type in _VLAN_TYPES and size >= offset + 6:
+                offset += 4
+                ethr_type = data[offset] << 8 | data[offset + 1]
+        offset += 2
+    elif link_type == pcap.LINKTYPE_RAW:
+        if not size:
+            return layers
+        offset = 0
+        ethr_type = {4: 0x0800, 6: 0x86DD}.get(data[0] >> 4, 0)
+    else:
+        #Linux cooked capture: 16-byte header ending in the protocol type
+        if size < 16:
+            return layers
+        offset = 16
+        ethr_type = data[14] << 8 | data[15]
+    layers["_type"] = ethr_type
+    if depth < 1:
+        return layers
+
+    if ethr_type == 0x0800:
+        if size < offset + 20 or data[offset] >> 4 != 4:
+            return layers
+        layers["ip"] = offset
+        total = data[offset + 2] << 8 | data[offset + 3]
+        end = offset + total if 20 <= total <= size - offset else size
+        proto = layers["_proto"] = data[offset + 9]
+        if (data[offset + 6] << 8 | data[offset + 7]) & 0x1FFF:
+            #later fragments carry no transport header
+            return layers
+        start = offset + (data[offset] & 0x0F) * 4
+    elif ethr_type == 0x86DD:
+        if size < offset + 40:
+            return layers
+        layers["ipv6"] = offset
+        length = data[offset + 4] << 8 | data[offset + 5]
+        end = offset + 40 + length if length and length <= size - offset - 40 else size
+        proto, start = data[offset + 6], offset + 40
+        if proto in EXTENSION_HEADERS:
+            proto, start, extensions = walk_extensions(data, proto, start)
+            for kind, at, _ in extensions:
+                if kind == FRAGMENT and (data[at + 2] << 8 | data[at + 3]) & 0xFFF8:
+                    layers["_proto"] = proto
+                    return layers
+        layers["_proto"] = proto
+    elif ethr_type == 0x0806:
+        if size >= offset + 28:
+            layers["arp"] = offset
+        return layers
+    else:
+        return layers
+    if depth < 2:
+        return layers
+
+    if proto == 6:
+        if end < start + 20:
+            return layers
+        layers["tcp"] = start
+        payload = min(start + (data[start + 12] >> 4) * 4, end)
+    elif proto == 17:
+        if end < start + 8:
+            return layers
+        layers["udp"] = start
+        payload = start + 8
+    elif proto == 1:
+        if end >= start + 8:
+            layers["icmp"] = start
+        return layers
+    elif proto == 58:
+        if end >= start + 4:
+            layers["icmpv6"] = start
+        return layers
+    else:
+        return layers
+    layers["_payload"] = payload
+    layers["_end"] = end
+    if depth < 3:
+        return layers
+
+    src_port = data[start] << 8 | data[start + 1]
+    dst_port = data[start + 2] << 8 | data[start + 3]
+    dns = src_port in _DNS_PORTS or dst_port in _DNS_PORTS
+    if proto == 17:
+        if dns and end - payload >= 12:
+            layers["dns"] = payload
+    elif payload < end:
+        if dns:
+            #DNS over TCP: each message follows a 2-byte length
+            if end - payload >= 14:
+                layers["dns"] = payload + 2
+        elif _HTTP_START.match(data, payload):
+            layers["http"] = payload
+    return layers
+
+
+# ---------------------------------------------------------------- field readers
+#each reader takes (packet bytes, offset of its protocol's header, layers) and returns the
+#field's value, or None when the packet has no such field
+
+def _u8(at, shift=0, mask=0xFF):
+    return lambda data, offset, layers: data[offset + at] >> shift & mask
+
+
+def _u16(at, mask=0xFFFF):
+    return lambda data, offset, layers: (data[offset + at] << 8 | data[offset + at + 1]) & mask
+
+
+def _u32(at, mask=0xFFFFFFFF):
+    return lambda data, offset, layers: int.from_bytes(data[offset + at:offset + at + 4], 'big') & mask
+
+
+def _flag(at, bit):
+    return lambda data, offset, layers: bool(data[offset + at] & bit)
+
+
+def _raw(at, size):
+    return lambda data, offset, layers: data[offset + at:offset + at + size]
+
+
+def _either(first, second):
+    #fields matching in both directions (ip.addr, tcp.port, ...)
+    return lambda data, offset, layers: (first(data, offset, layers), second(data, offset, layers))
+
+
+def _payload(data, offset, layers):
+    return data[layers["_payload"]:layers["_end"]]
+
+
+def _payload_len(data, offset, layers):
+    return layers["_end"] - layers["_payload"]
+
+
+def _dns_question(data, offset, layers):
+    #(name, offset after it) of the first question
+    if not data[offset + 4] << 8 | data[offset + 5]:
+        return None, None
+    end = layers["_end"]
+    labels = []
+    position = offset + 12
+    while position < end:
+        length = data[position]
+        if length == 0:
+            return ".".join(labels), position + 1
+        if length & 0xC0 or position + 1 + length > end:
+            break
+        labels.append(data[position + 1:position + 1 + length].decode("ascii", "replace"))
+        position += length + 1
+    return None, None
+
+
+def _dns_qname(data, offset, layers):
+    return _dns_question(data, offset, layers)[0]
+
+
+def _dns_qtype(data, offset, layers):
+    position = _dns_question(data, offset, layers)[1]
+    if position is None or position + 2 > layers["_end"]:
+        return None
+    return data[position] << 8 | data[position + 1]
+
+
+def _http_head(data, offset, layers):
+    end = data.find(b"\r\n\r\n", offset, layers["_end"])
+    return data[offset:end if end >= 0 else layers["_end"]]
+
+
+def _http_line(data, offset, layers):
+    end = data.find(b"\r\n", offset, layers["_end"])
+    return data[offset:end if end >= 0 else layers["_end"]].split(b" ", 2)
+
+
+def _http_request(index):
+    def read(data, offset, layers):
+        if data.startswith(b"HTTP/", offset):
+            return None
+        parts = _http_line(data, offset, layers)
+        return parts[index].decode("latin-1") if len(parts) > index else None
+    return read
+
+
+def _http_code(data, offset, layers):
+    if not data.startswith(b"HTTP/", offset):
+        return None
+    parts = _http_line(data, offset, layers)
+    return int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+
+
+_HOST = re.compile(rb"\r\nhost:[ \t]*([^\r\n]*)", re.IGNORECASE)
+
+
+def _http_host(data, offset, layers):
+    found = _HOST.search(_http_head(data, offset, layers))
+    return found.group(1).decode("latin-1").strip() if found else None
+
+
+#field name -> (protocol, kind, reader); kinds: int, bool, ipv4, ipv6, mac, str, bytes
+#(pairs, for fields matching either direction, end in "2")
+FIELDS = {
+    "frame.len": ("frame", "int", lambda data, offset, layers: len(data)),
+    "eth.dst": ("eth", "mac", _raw(0, 6)),
+    "eth.src": ("eth", "mac", _raw(6, 6)),
+    "eth.addr": ("eth", "mac2", _either(_raw(0, 6), _raw(6, 6))),
+    "eth.type": ("eth", "int", lambda data, offset, layers: layers["_type"]),
+    "vlan.id": ("vlan", "int", _u16(2, 0x0FFF)),
+    "vlan.priority": ("vlan", "int", _u8(2, 5, 0x07)),
+    "arp.opcode": ("arp", "int", _u16(6)),
+    "arp.src.mac": ("arp", "mac", _raw(8, 6)),
+    "arp.src.ip": ("arp", "ipv4", _raw(14, 4)),
+    "arp.dst.mac": ("arp", "mac", _raw(18, 6)),
+    "arp.dst.ip": ("arp", "ipv4", _raw(24, 4)),
+    "ip.version": ("ip", "int", _u8(0, 4, 0x0F)),
+    "ip.hdr_len": ("ip", "int", lambda data, offset, layers: (data[offset] & 0x0F) * 4),
+    "ip.tos": ("ip", "int", _u8(1)),
+    "ip.dscp": ("ip", "int", _u8(1, 2, 0x3F)),
+    "ip.len": ("ip", "int", _u16(2)),
+    "ip.id": ("ip", "int", _u16(4)),
+    "ip.flags.df": ("ip", "bool", _flag(6, 0x40)),
+    "ip.flags.mf": ("ip", "bool", _flag(6, 0x20)),
+    "ip.frag_offset": ("ip", "int", _u16(6, 0x1FFF)),
+    "ip.ttl": ("ip", "int", _u8(8)),
+    "ip.proto": ("ip", "int", _u8(9)),
+    "ip.checksum": ("ip", "int", _u16(10)),
+    "ip.src": ("ip", "ipv4", _raw(12, 4)),
+    "ip.dst": ("ip", "ipv4", _raw(16, 4)),
+    "ip.addr": ("ip", "ipv42", _either(_raw(12, 4), _raw(16, 4))),
+    "ipv6.tclass": ("ipv6", "int", lambda data, offset, layers: (data[offset] << 4 | data[offset + 1] >> 4) & 0xFF),
+    "ipv6.flow": ("ipv6", "int", _u32(0, 0xFFFFF)),
+    "ipv6.plen": ("ipv6", "int", _u16(4)),
+    "ipv6.nxt": ("ipv6", "int", lambda data, offset, layers: layers["_proto"]),
+    "ipv6.hlim": ("ipv6", "int", _u8(7)),
+    "ipv6.src": ("ipv6", "ipv6", _raw(8, 16)),
+    "ipv6.dst": ("ipv6", "ipv6", _raw(24, 16)),
+    "ipv6.addr": ("ipv6", "ipv62", _either(_raw(8, 16), _raw(24, 16))),
+    "tcp.srcport": ("tcp", "int", _u16(0)),
+    "tcp.dstport": ("tcp", "int", _u16(2)),
+    "tcp.port": ("tcp", "int2", _either(_u16(0), _u16(2))),
+    "tcp.seq": ("tcp", "int", _u32(4)),
+    "tcp.ack": ("tcp", "int", _u32(8)),
+    "tcp.hdr_len": ("tcp", "int", _u8(12, 2, 0x3C)),
+    "tcp.flags": ("tcp", "int", _u16(12, 0x0FFF)),
+    "tcp.flags.fin": ("tcp", "bool", _flag(13, 0x01)),
+    "tcp.flags.syn": ("tcp", "bool", _flag(13, 0x02)),
+    "tcp.flags.rst": ("tcp", "bool", _flag(13, 0x04)),
+    "tcp.flags.push": ("tcp", "bool", _flag(13, 0x08)),
+    "tcp.flags.ack": ("tcp", "bool", _flag(13, 0x10)),
+    "tcp.flags.urg": ("tcp", "bool", _flag(13, 0x20)),
+    "tcp.flags.ece": ("tcp", "bool", _flag(13, 0x40)),
+    "tcp.flags.cwr": ("tcp", "bool", _flag(13, 0x80)),
+    "tcp.window_size": ("tcp", "int", _u16(14)),
+    "tcp.checksum": ("tcp", "int", _u16(16)),
+    "tcp.urgent_pointer": ("tcp", "int", _u16(18)),
+    "tcp.len": ("tcp", "int", _payload_len),
+    "tcp.payload": ("tcp", "bytes", _payload),
+    "udp.srcport": ("udp", "int", _u16(0)),
+    "udp.dstport": ("udp", "int", _u16(2)),
+    "udp.port": ("udp", "int2", _either(_u16(0), _u16(2))),
+    "udp.length": ("udp", "int", _u16(4)),
+    "udp.checksum": ("udp", "int", _u16(6)),
+    "udp.payload": ("udp", "bytes", _payload),
+    "icmp.type": ("icmp", "int", _u8(0)),
+    "icmp.code": ("icmp", "int", _u8(1)),
+    "icmp.id": ("icmp", "int", _u16(4)),
+    "icmp.seq": ("icmp", "int", _u16(6)),
+    "icmpv6.type": ("icmpv6", "int", _u8(0)),
+    "icmpv6.code": ("icmpv6", "int", _u8(1)),
+    "dns.id": ("dns", "int", _u16(0)),
+    "dns.flags": ("dns", "int", _u16(2)),
+    "dns.flags.response": ("dns", "bool", _flag(2, 0x80)),
+    "dns.opcode": ("dns", "int", _u8(2, 3, 0x0F)),
+    "dns.rcode": ("dns", "int", _u8(3, 0, 0x0F)),
+    "dns.qdcount": ("dns", "int", _u16(4)),
+    "dns.ancount": ("dns", "int", _u16(6)),
+    "dns.qname": ("dns", "str", _dns_qname),
+    "dns.qtype": ("dns", "int", _dns_qtype),
+    "http.request": ("http", "bool", lambda data, offset, layers: not data.startswith(b"HTTP/", offset)),
+    "http.response": ("http", "bool", lambda data, offset, layers: data.startswith(b"HTTP/", offset)),
+    "http.request.method": ("http", "str", _http_request(0)),
+    "http.request.uri": ("http", "str", _http_request(1)),
+    "http.response.code": ("http", "int", _http_code),
+    "http.host": ("http", "str", _http_host),
+}
+
+
+# ---------------------------------------------------------------- parsing
+
+_TOKEN = re.compile(r'''\s*(?:
+    (?P<string>"(?:[^"\\]|\\.)*")
+  | (?P<symbol>==|!=|<=|>=|&&|\|\||[<>~!(){},])
+  | (?P<word>[A-Za-z0-9_.:/\-]+)
+)''', re.VERBOSE)
+
+_COMPARISONS = {"==": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le,
+                ">": operator.gt, ">=": operator.ge}
+_OPERATOR_WORDS = {"eq": "==", "ne": "!=", "lt": "<", "le": "<=", "gt": ">", "ge": ">=",
+                   "matches": "~", "contains": "contains", "in": "in"}
+_ESCAPE = re.compile(r"\\(x[0-9a-fA-F]{2}|.)")
+
+
+def _tokenize(expression):
+    """
+    Description: Splits an expression into (kind, text, position) tokens.
+    """
+    tokens = []
+    position = 0
+    while True:
+        found = _TOKEN.match(expression, position)
+        if not found or found.end() == position:
+            rest = expression[position:].lstrip()
+            if rest:
+                position = len(expression) - len(rest)
+                raise FilterError(f"unexpected {rest.rstrip()[:20]!r} at {position}")
+            break
+        kind = found.lastgroup
+        tokens.append((kind, found.group(kind), found.start(kind)))
+        position = found.end()
+    tokens.append(("end", "", len(expression)))
+    return tokens
+
+
+def _unquote(text):
+    #"..." with \" \\ \n \t \r and \xNN escapes -> str (\xNN as a code point below 256)
+    def escape(found):
+        code = found.group(1)
+        if code[0] == "x" and len(code) == 3:
+            return chr(int(code[1:], 16))
+        return {"n": "\n", "t": "\t", "r": "\r"}.get(code, code)
+    return _ESCAPE.sub(escape, text[1:-1])
+
+
+class _Parser:
+    def __init__(self, expression):
+        self.tokens = _tokenize(expression)
+        self.index = 0
+        self.depth = 0
+        self.fields = []
+
+    def peek(self):
+        return self.tokens[self.index]
+
+    def take(self):
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def error(self, message, token=None):
+        kind, text, position = token or self.peek()
+        found = "end of expression" if kind == "end" else repr(text)
+        return FilterError(f"{message} at {position} (found {found})")
+
+    def at(self, *texts):
+        kind, text, _ = self.peek()
+        return kind != "string" and text in texts
+
+    def parse(self):
+        test = self.parse_or()
+        if self.peek()[0] != "end":
+            raise self.error("expected and/or")
+        return test
+
+    def parse_or(self):
+        test = self.parse_and()
+        while self.at("or", "||"):
+            self.take()
+            test = _any(test, self.parse_and())
+        return test
+
+    def parse_and(self):
+        test = self.parse_not()
+        while self.at("and", "&&"):
+            self.take()
+            test = _all(test, self.parse_not())
+        return test
+
+    def parse_not(self):
+        if self.at("not", "!"):
+            self.take()
+            inner = self.parse_not()
+            return lambda data, layers: not inner(data, layers)
+        if self.at("("):
+            self.take()
+            test = self.parse_or()
+            if not self.at(")"):
+                raise self.error("expected ')'")
+            self.take()
+            return test
+        return self.parse_test()
+
+    def parse_test(self):
+        token = self.take()
+        kind, name, _ = token
+        if kind != "word":
+            raise self.error("expected a field", token)
+        if name in _DEPTH:
+            self.depth = max(self.depth, _DEPTH[name])
+            if self.operator() is not None:
+                raise self.error(f"{name} is a protocol and has no value")
+            return lambda data, layers: name in layers
+        if name not in FIELDS:
+            raise FilterError(f"unknown field {name!r} at {token[2]}")
+        protocol, field_kind, read = FIELDS[name]
+        self.depth = max(self.depth, _DEPTH[protocol])
+        self.fields.append(name)
+        op = self.operator()
+        if op is None:
+            check = None
+        else:
+            self.take()
+            if op == "in":
+                check = self.parse_set(name, field_kind)
+            else:
+                check = _check(name, field_kind, op, self.literal(), self)
+            if field_kind.endswith("2"):
+                check = _either_matches(check, op)
+        return _field_test(protocol, read, check)
+
+    def operator(self):
+        kind, text, _ = self.peek()
+        if kind == "symbol" and (text in _COMPARISONS or text == "~"):
+            return text
+        if kind == "word" and text in _OPERATOR_WORDS:
+            return _OPERATOR_WORDS[text]
+        return None
+
+    def literal(self):
+        kind, text, position = self.take()
+        if kind not in ("word", "string"):
+            raise self.error("expected a value", (kind, text, position))
+        return kind, text, position
+
+    def parse_set(self, name, field_kind):
+        if not self.at("{"):
+            raise self.error("expected '{'")
+        self.take()
+        if self.at("}"):
+            raise self.error("empty set")
+        checks = []
+        while not self.at("}"):
+            if self.peek()[0] == "end":
+                raise self.error("expected '}'")
+            checks.append(_check(name, field_kind, "==", self.literal(), self))
+            if self.at(","):
+                self.take()
+        self.take()
+        constants = [check.constant for check in checks if hasattr(check, "constant")]
+        if len(constants) == len(checks):
+            members = frozenset(constants)
+            return lambda value: value in members
+        return lambda value: any(check(value) for check in checks)
+
+
+def _all(first, second):
+    return lambda data, layers: first(data, layers) and second(data, layers)
+
+
+def _any(first, second):
+    return lambda data, layers: first(data, layers) or second(data, layers)
+
+
+def _either_matches(check, op):
+    #a pair field matches when either side does; != means neither side is equal
+    if op == "!=":
+        return lambda pair: check(pair[0]) and check(pair[1])
+    return lambda pair: check(pair[0]) or check(pair[1])
+
+
+def _field_test(protocol, read, check):
+    if check is None:
+        #a field alone: present, and set for flags
+        def test(data, layers):
+            offset = layers.get(protocol)
+            if offset is None:
+                return False
+            value = read(data, offset, layers)
+            return value is not None and value is not False
+        return test
+
+    def test(data, layers):
+        offset = layers.get(protocol)
+        if offset is None:
+            return False
+        value = read(data, offset, layers)
+        return value is not None and check(value)
+    return test
+
+
+def _check(name, field_kind, op, literal, parser):
+    """
+    Description: Compiles one comparison of a field against a literal into a function of the
+                 field's value. Literals are converted once, here, to the form the reader
+                 returns (packed addresses, ints, str or bytes). Equality checks against a
+                 single value carry it as .constant so sets of them become one lookup.
+
+    @returns: (callable) value -> bool.
+    """
+    kind, text, position = literal
+    base_kind = field_kind.rstrip("2")
+
+    def fail(message):
+        return FilterError(f"{name}: {message} at {position}")
+
+    if op in ("~", "contains"):
+        if base_kind not in ("str", "bytes"):
+            raise fail(f"{op} needs a text field")
+        pattern = _unquote(text) if kind == "string" else text
+        if base_kind == "bytes":
+            pattern = pattern.encode("latin-1")
+        if op == "contains":
+            return lambda value: pattern in value
+        try:
+            search = re.compile(pattern).search
+        except re.error as error:
+            raise fail(f"bad regular expression ({error})")
+        return lambda value: search(value) is not None
+
+    if base_kind in ("ipv4", "ipv6"):
+        if kind == "string":
+            raise fail("expected an address")
+        network_type = ipaddress.IPv4Network if base_kind == "ipv4" else ipaddress.IPv6Network
+        try:
+            network = network_type(text, strict=False)
+        except ValueError:
+            raise fail(f"bad {base_kind} address {text!r}")
+        if network.prefixlen < network.max_prefixlen:
+            if op not in ("==", "!="):
+                raise fail("networks only compare with == and !=")
+            first = int(network.network_address)
+            mask = int(network.netmask)
+            inside = lambda value: int.from_bytes(value, 'big') & mask == first
+            return inside if op == "==" else (lambda value: not inside(value))
+        constant = network.network_address.packed
+    elif base_kind == "mac":
+        try:
+            constant = mac_to_bytes(_unquote(text) if kind == "string" else text)
+        except ValueError:
+            raise fail(f"bad MAC address {text!r}")
+    elif base_kind in ("int", "bool"):
+        if kind == "string":
+            raise fail("expected a number")
+        if base_kind == "bool" and text in ("true", "false"):
+            constant = text == "true"
+        else:
+            try:
+                constant = int(text, 0)
+            except ValueError:
+                raise fail(f"bad number {text!r}")
+    else:
+        constant = _unquote(text) if kind == "string" else text
+        if base_kind == "bytes":
+            constant = constant.encode("latin-1")
+
+    if op != "==" and op != "!=" and base_kind not in ("int", "bool"):
+        raise fail(f"{op} needs a numeric field")
+    compare = _COMPARISONS[op]
+    if op == "==":
+        check = lambda value: value == constant
+        check.constant = constant
+        return check
+    return lambda value: compare(value, constant)
+
+
+# ---------------------------------------------------------------- filters
+
+class DisplayFilter:
+    def __init__(self, expression):
+        """
+        Description: Parses and compiles a display filter (see the module description).
+
+        @param expression: Filter text.
+        @returns: None
+        @raises FilterError: For syntax errors, unknown fields and values that do not fit
+                             their field, with the position in the expression.
+        """
+        parser = _Parser(expression)
+        self.expression = expression
+        self._test = parser.parse()
+        #deepest layer the filter reads: 0 link, 1 network, 2 transport, 3 application
+        self.depth = parser.depth
+        self.fields = tuple(parser.fields)
+
+    def matcher(self, link_type=pcap.LINKTYPE_ETHERNET):
+        """
+        Description: The filter as a function of the raw bytes of one packet.
+
+        @param link_type: pcap LINKTYPE_* value of the packets (Ethernet, raw IP or Linux SLL).
+        @returns: (callable) f(packet bytes) -> bool.
+        """
+        if link_type not in (pcap.LINKTYPE_ETHERNET, pcap.LINKTYPE_RAW, pcap.LINKTYPE_LINUX_SLL):
+            raise pcap.PcapError(f"unsupported link type {link_type}")
+        test, depth = self._test, self.depth
+        return lambda data: test(data, _dissect(data, link_type, depth))
+
+    def match(self, data, link_type=pcap.LINKTYPE_ETHERNET):
+        """
+        Description: Whether one packet matches (use matcher() for many packets).
+
+        @param data: Packet bytes, or a Packet (which is built first).
+        @param link_type: pcap LINKTYPE_* value of the packet.
+        @returns: (bool)
+        """
+        if not isinstance(data, (bytes, bytearray)):
+            data = data.build()
+        return self.matcher(link_type)(data)
+
+    def filter_pcap(self, path):
+        """
+        Description: Matching records of a capture file.
+
+        @param path: Path of the pcap file.
+        @returns: Generator of (timestamp, packet bytes) pairs.
+        """
+        with pcap.PcapReader(path) as reader:
+            matches = self.matcher(reader.link_type)
+            for ts, data, _ in reader:
+                if matches(data):
+                    yield ts, data
+
+    def __repr__(self):
+        return f"DisplayFilter({self.expression!r})"
+
+
+def filter_pcap(path, expression):
+    """
+    Description: Records of a capture file matching a filter expression.
+
+    @param path: Path of the pcap file.
+    @param expression: Filter text, or a DisplayFilter.
+    @returns: Generator of (timestamp, packet bytes) pairs.
+    """
+    if not isinstance(expression, DisplayFilter):
+        expression = DisplayFilter(expression)
+    return expression.filter_pcap(path)
+
+
+def describe(data, link_type=pcap.LINKTYPE_ETHERNET):
+    """
+    Description: One-line summary of a captured packet, e.g. for printing matches.
+
+    @param data: Packet bytes.
+    @param link_type: pcap LINKTYPE_* value of the capture.
+    @returns: (str)
+    """
+    if link_type == pcap.LINKTYPE_ETHERNET:
+        return Ether(raw=data).summary()
+    if link_type == pcap.LINKTYPE_LINUX_SLL:
+        data = data[16:]
+    if data and data[0] >> 4 == 6:
+        return IPv6(raw=data).summary()
+    return IP(raw=data).summary()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    args = [arg for arg in argv if not arg.startswith("--")]
+    if len(args) != 2:
+        print(__doc__.strip().splitlines()[-1].strip())
+        return 2
+    path, expression = args
+    try:
+        display_filter = DisplayFilter(expression)
+    except FilterError as error:
+        print(f"filter error: {error}")
+        return 2
+    count = 0
+    with pcap.PcapReader(path) as reader:
+        matches = display_filter.matcher(reader.link_type)
+        for ts, data, _ in reader:
+            if matches(data):
+                count += 1
+                if "--count" not in argv:
+                    print(f"{ts:.6f} {describe(data, reader.link_type)}")
+    if "--count" in argv:
+        print(count)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,538 @@
+"""
+dns_server.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Lightweight authoritative DNS responder over UDP, for testing resolvers and for
+             lab deployments. Records live in an in-memory Zone (loaded from a master file or
+             added in code) indexed by (name, type). Queries are parsed with the DNS layer and
+             answered with DNS responses; every encoded response is cached under the bytes of
+             the query after its transaction ID (flags, counts and question), so a repeated
+             query is answered by a dict lookup and by putting the new ID in front of the
+             cached bytes. Each wakeup of the receive loop drains up to a batch of queued
+             queries before waiting again.
+
+             Usage: python dns_server.py zone.txt [--address 127.0.0.1] [--port 5353]
+                    python dns_server.py [zone.txt] --bench [seconds]
+"""
+
+import multiprocessing
+import select
+import shlex
+import socket
+import struct
+import sys
+import time
+from DNS import (DNS, EDNS, ResourceRecord, QTYPE_CODES, FLAG_QR, FLAG_AA, FLAG_TC, FLAG_RD,
+                 RCODE_FORMERR, RCODE_NXDOMAIN, RCODE_NOTIMP, RCODE_REFUSED)
+
+
+TYPE_CNAME = 5
+TYPE_SOA = 6
+TYPE_ANY = 255
+#longest CNAME chain followed inside the zone
+MAX_CHAIN = 8
+#largest UDP response without / with EDNS (RFC 1035, DNS flag day 2020)
+UDP_LIMIT = 512
+EDNS_LIMIT = 1232
+#opcode bits of the flags
+_OPCODE = 0x7800
+
+
+class ZoneError(Exception):
+    pass
+
+
+class Zone:
+    def __init__(self, origin=None, default_ttl=3600):
+        """
+        Description: In-memory records indexed by (lowercase name, type).
+
+        @param origin: Origin for relative names in load() and add() (e.g. "example.com").
+        @param default_ttl: TTL of records added without one.
+        @returns: None
+        """
+        self.origin = (origin or "").rstrip(".").lower()
+        self.default_ttl = default_ttl
+        self.records = {}
+        #names that exist (own records, or are empty non-terminals below an apex)
+        self.names = set()
+        #apex name -> SOA record used in negative answers
+        self.apexes = {}
+
+    def _absolute(self, name, origin):
+        if name == "@":
+            return origin
+        if name.endswith("."):
+            return name.rstrip(".")
+        return f"{name}.{origin}" if origin else name
+
+    def add(self, name, rtype, value, ttl=None):
+        """
+        Description: Adds one record. An SOA record makes its owner an apex the zone is
+                     authoritative for.
+
+        @param name: Owner name (relative names are completed with the origin; "@" is the origin).
+        @param rtype: Record type, e.g. "A" or 1.
+        @param value: RDATA value (see DNS.encode_rdata).
+        @param ttl: TTL (defaults to default_ttl).
+        @returns: (ResourceRecord) The record.
+        """
+        name = self._absolute(name, self.origin)
+        record = ResourceRecord(name, rtype, value, self.default_ttl if ttl is None else ttl)
+        key = name.lower()
+        self.records.setdefault((key, record.rtype), []).append(record)
+        if record.rtype == TYPE_SOA:
+            #negative answers are cached for min(SOA TTL, SOA minimum) (RFC 2308)
+            self.apexes[key] = ResourceRecord(name, TYPE_SOA, value, min(record.ttl, value[6]))
+        labels = key.split(".")
+        for start in range(len(labels)):
+            self.names.add(".".join(labels[start:]))
+        return record
+
+    def load(self, text, origin=None):
+        """
+        Description: Loads records in master file format (RFC 1035): one record per line as
+                     name [ttl] [class] type rdata, $ORIGIN and $TTL directives, "@", relative
+                     names, owner names carried over from the previous line, ";" comments,
+                     "quoted strings" and ( ) continuations.
+
+        @param text: Zone file contents.
+        @param origin: Initial origin (defaults to the zone's).
+        @returns: (int) Number of records loaded.
+        """
+        origin = (origin or self.origin).rstrip(".").lower()
+        owner = None
+        count = 0
+        pending = []
+        depth = 0
+        for number, line in enumerate(text.splitlines(), 1):
+            lexer = shlex.shlex(line, posix=True)
+            lexer.whitespace_split = True
+            lexer.commenters = ";"
+            try:
+                tokens = list(lexer)
+            except ValueError as error:
+                raise ZoneError(f"line {number}: {error}")
+            if not pending:
+                if not tokens:
+                    continue
+                starts_blank = line[:1] in (" ", "\t")
+                first = number
+            for token in tokens:
+                depth += token.count("(") - token.count(")")
+                token = token.replace("(", "").replace(")", "")
+                if token:
+                    pending.append(token)
+            if depth > 0:
+                continue
+            tokens, pending = pending, []
+            if not tokens:
+                continue
+            if tokens[0] == "$ORIGIN":
+                origin = tokens[1].rstrip(".").lower()
+                continue
+            if tokens[0] == "$TTL":
+                self.default_ttl = int(tokens[1])
+                continue
+            if not starts_blank:
+                owner = self._absolute(tokens.pop(0), origin)
+            if owner is None:
+                raise ZoneError(f"line {first}: record without an owner name")
+            ttl = None
+            while tokens and (tokens[0].isdigit() or tokens[0].upper() in ("IN", "CH", "HS")):
+                token = tokens.pop(0)
+                if token.isdigit():
+                    ttl = int(token)
+            if not tokens or tokens[0].upper() not in QTYPE_CODES:
+                raise ZoneError(f"line {first}: unknown record type in {line.strip()!r}")
+            rtype = QTYPE_CODES[tokens.pop(0).upper()]
+            try:
+                value = self._rdata(rtype, tokens, origin)
+                self.add(owner + ".", rtype, value, ttl)
+            except (ValueError, IndexError, OSError) as error:
+                raise ZoneError(f"line {first}: bad {rtype} record ({error})")
+            count += 1
+        if pending:
+            raise ZoneError("unbalanced parentheses at end of zone")
+        return count
+
+    def _rdata(self, rtype, tokens, origin):
+        absolute = lambda name: self._absolute(name, origin)
+        if rtype in (1, 28):
+            return tokens[0]
+        if rtype in (2, 5, 12):
+            return absolute(tokens[0])
+        if rtype == 15:
+            return int(tokens[0]), absolute(tokens[1])
+        if rtype == 16:
+            return tokens
+        if rtype == 33:
+            return int(tokens[0]), int(tokens[1]), int(tokens[2]), absolute(tokens[3])
+        if rtype == TYPE_SOA:
+            return (absolute(tokens[0]), absolute(tokens[1])) + tuple(int(token) for token in tokens[2:7])
+        raise ValueError("record type not supported in zone files")
+
+    @classmethod
+    def from_file(cls, path, origin=None):
+        """
+        Description: Zone loaded from a master file.
+        """
+        zone = cls(origin)
+        with open(path) as file:
+            zone.load(file.read())
+        return zone
+
+    def apex_of(self, name):
+        """
+        Description: The closest enclosing apex of a lowercase name, or None when the zone is
+                     not authoritative for it.
+        """
+        while True:
+            if name in self.apexes:
+                return name
+            if "." not in name:
+                return "" if "" in self.apexes else None
+            name = name.split(".", 1)[1]
+
+    def lookup(self, qname, qtype):
+        """
+        Description: Answers one question from the zone, following CNAMEs inside it.
+
+        @param qname: Queried name.
+        @param qtype: Queried type.
+        @returns: (tuple) (rcode, answer records, authority records, authoritative).
+        """
+        name = qname.rstrip(".").lower()
+        apex = self.apex_of(name)
+        if apex is None:
+            return RCODE_REFUSED, [], [], False
+        answers = []
+        for _ in range(MAX_CHAIN):
+            if qtype == TYPE_ANY:
+                found = [record for (owner, _), records in self.records.items() if owner == name
+                         for record in records]
+            else:
+                found = self.records.get((name, qtype))
+            if found:
+                return 0, answers + found, [], True
+            cname = self.records.get((name, TYPE_CNAME))
+            if not cname:
+                break
+            answers += cname
+            name = cname[0].value.rstrip(".").lower()
+            if self.apex_of(name) is None:
+                #the rest of the chain is someone else's
+                return 0, answers, [], True
+        soa = self.apexes.get(self.apex_of(name))
+        rcode = 0 if name in self.names else RCODE_NXDOMAIN
+        return rcode, answers, [soa] if soa else [], True
+
+
+class DNSResponder:
+    def __init__(self, zone, address="127.0.0.1", port=5353, max_cache=100000, batch=64,
+                 reuse_port=False):
+        """
+        Description: UDP responder answering from a zone.
+
+        @param zone: The Zone to serve.
+        @param address: Address to listen on.
+        @param port: UDP port (0 picks a free one; see .port after bind()).
+        @param max_cache: Responses kept; the cache is emptied when it is full
+                          (0 turns caching off).
+        @param batch: Queries handled per wakeup of the receive loop.
+        @param reuse_port: Set SO_REUSEPORT so several processes can share the port and the
+                           kernel spreads queries over them.
+        @returns: None
+        """
+        self.zone = zone
+        self.address = address
+        self.port = port
+        self.max_cache = max_cache
+        self.batch = batch
+        self.reuse_port = reuse_port
+        #(bytes after the ID up to the end of the question) -> response bytes after the ID
+        self.cache = {}
+        self.sock = None
+        self._stop = False
+        self.queries = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.send_errors = 0
+        self.wakeups = 0
+
+    def respond(self, query):
+        """
+        Description: Response to one query. A query seen before is answered from the cache
+                     without being parsed.
+
+        @param query: Query bytes.
+        @returns: (bytes or None) The response, or None when nothing should be sent back.
+        """
+        #end of the (single) question: the name's labels, then type and class
+        try:
+            end = 12
+            length = query[12]
+            while length:
+                end += length + 1
+                length = query[end]
+            end += 5
+        except IndexError:
+            return self._error(query, RCODE_FORMERR)
+        key = query[2:end]
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            return query[:2] + cached
+        return self._answer(query, key, end)
+
+    def _answer(self, query, key, end):
+        try:
+            message = DNS(raw_bytes=query)
+            edns = message.edns
+        except (struct.error, IndexError, ValueError):
+            return self._error(query, RCODE_FORMERR)
+        if message.flags & FLAG_QR:
+            #a response sent to us; answering it could start a loop
+            self.errors += 1
+            return None
+        self.misses += 1
+        flags = FLAG_QR | message.flags & (_OPCODE | FLAG_RD)
+        if message.flags & _OPCODE:
+            return self._error(query, RCODE_NOTIMP, end)
+        if message.qdcount != 1 or len(query) < end:
+            return self._error(query, RCODE_FORMERR)
+        if message.qclass not in (1, TYPE_ANY) or not message.qname:
+            rcode, answers, authority, authoritative = RCODE_REFUSED, [], [], False
+        else:
+            rcode, answers, authority, authoritative = self.zone.lookup(message.qname, message.qtype)
+        flags |= rcode | (FLAG_AA if authoritative else 0)
+        edns = EDNS() if edns is not None else None
+        response = DNS(transaction_id=message.transaction_id, flags=flags, qname=message.qname,
+                       qtype=message.qtype, qclass=message.qclass, answers=answers,
+                       authority=authority, edns=edns)
+        wire = response.build()
+        if len(wire) > (EDNS_LIMIT if edns else UDP_LIMIT):
+            #too large for UDP: the client retries over TCP
+            wire = DNS(transaction_id=message.transaction_id, flags=flags | FLAG_TC, qname=message.qname,
+                       qtype=message.qtype, qclass=message.qclass, edns=edns).build()
+        if self.max_cache:
+            if len(self.cache) >= self.max_cache:
+                self.cache.clear()
+            self.cache[key] = wire[2:]
+        return query[:2] + wire[2:]
+
+    def _error(self, query, rcode, end=None):
+        """
+        Description: Header-only error response echoing the question when it could be read.
+
+        @param end: End of the question, or None to send no question back.
+        """
+        self.errors += 1
+        if len(query) < 12:
+            return None
+        flags = FLAG_QR | (query[2] << 8 | query[3]) & (_OPCODE | FLAG_RD) | rcode
+        question = query[12:end] if end is not None else b''
+        return query[:2] + struct.pack("!HHHHH", flags, 1 if question else 0, 0, 0, 0) + question
+
+    def bind(self):
+        """
+        Description: Opens the non-blocking listening socket.
+
+        @returns: (int) The bound port.
+        """
+        sock = socket.socket(socket.AF_INET6 if ":" in self.address else socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        #room for bursts while a batch is being answered
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 << 20)
+        sock.bind((self.address, self.port))
+        sock.setblocking(False)
+        self.sock = sock
+        self.port = sock.getsockname()[1]
+        return self.port
+
+    def serve(self, duration=None):
+        """
+        Description: Answers queries until stop() is called or duration runs out. Every
+                     wakeup drains up to batch queued datagrams before polling again.
+
+        @param duration: Seconds to serve (default: until stop()).
+        @returns: (int) Number of queries received.
+        """
+        if self.sock is None:
+            self.bind()
+        poller = select.poll()
+        poller.register(self.sock, select.POLLIN)
+        recvfrom, sendto, respond = self.sock.recvfrom, self.sock.sendto, self.respond
+        deadline = time.monotonic() + duration if duration is not None else None
+        batch = self.batch
+        received = 0
+        self._stop = False
+        while not self._stop:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            if not poller.poll(100):
+                continue
+            self.wakeups += 1
+            for _ in range(batch):
+                try:
+                    query, client = recvfrom(4096)
+                except BlockingIOError:
+                    break
+                received += 1
+                reply = respond(query)
+                if reply is not None:
+                    try:
+                        sendto(reply, client)
+                    except OSError:
+                        #socket buffer full: the client retries
+                        self.send_errors += 1
+        self.queries += received
+        return received
+
+    def stop(self):
+        self._stop = True
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def stats(self):
+        """
+        Description: Counters of the responder.
+
+        @returns: (dict) queries, hits, misses, errors, send_errors, wakeups, cached and
+                  queries_per_wakeup.
+        """
+        return {"queries": self.queries, "hits": self.hits, "misses": self.misses,
+                "errors": self.errors, "send_errors": self.send_errors, "wakeups": self.wakeups,
+                "cached": len(self.cache),
+                "queries_per_wakeup": self.queries / self.wakeups if self.wakeups else 0.0}
+
+
+def measure_qps(address, port, queries, duration=3.0, window=64):
+    """
+    Description: Load generator: keeps window queries in flight against a responder and
+                 counts the answers.
+
+    @param address: Responder address.
+    @param port: Responder port.
+    @param queries: List of query bytes, sent in turn (each with a fresh ID).
+    @param duration: Seconds to measure.
+    @param window: Queries in flight.
+    @returns: (tuple) (answers per second, number of answers).
+    """
+    sock = socket.socket(socket.AF_INET6 if ":" in address else socket.AF_INET, socket.SOCK_DGRAM)
+    sock.connect((address, port))
+    sock.setblocking(False)
+    poller = select.poll()
+    poller.register(sock, select.POLLIN)
+    sent = answered = 0
+
+    def send():
+        nonlocal sent
+        query = queries[sent % len(queries)]
+        try:
+            sock.send(struct.pack("!H", sent & 0xFFFF) + query[2:])
+        except BlockingIOError:
+            pass
+        sent += 1
+
+    for _ in range(window):
+        send()
+    start = time.monotonic()
+    deadline = start + duration
+    while time.monotonic() < deadline:
+        if not poller.poll(200):
+            #lost queries: refill the window
+            for _ in range(window):
+                send()
+            continue
+        while True:
+            try:
+                sock.recv(4096)
+            except BlockingIOError:
+                break
+            answered += 1
+            send()
+    elapsed = time.monotonic() - start
+    sock.close()
+    return answered / elapsed, answered
+
+
+def _demo_zone():
+    zone = Zone("example.com")
+    zone.add("@", "SOA", ("ns1.example.com", "admin.example.com", 1, 7200, 3600, 1209600, 300))
+    zone.add("@", "NS", "ns1.example.com")
+    zone.add("ns1", "A", "127.0.0.1")
+    zone.add("www", "A", "93.184.216.34")
+    zone.add("www", "AAAA", "2606:2800:220:1:248:1893:25c8:1946")
+    zone.add("mail", "CNAME", "www.example.com")
+    zone.add("@", "MX", (10, "mail.example.com"))
+    return zone
+
+
+def _serve_process(zone, port, duration, ready):
+    responder = DNSResponder(zone, port=port)
+    ready.put(responder.bind())
+    responder.serve(duration)
+    ready.put(responder.stats())
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    options = {}
+    args = []
+    index = 0
+    while index < len(argv):
+        arg = argv[index]
+        if arg in ("--address", "--port"):
+            options[arg] = argv[index + 1]
+            index += 2
+            continue
+        if arg == "--bench":
+            following = argv[index + 1] if index + 1 < len(argv) else ""
+            options[arg] = float(following) if following.replace(".", "", 1).isdigit() else 3.0
+            index += 2 if following.replace(".", "", 1).isdigit() else 1
+            continue
+        args.append(arg)
+        index += 1
+    if not args and "--bench" not in options:
+        print(__doc__.strip().splitlines()[-2].strip())
+        return 2
+    zone = Zone.from_file(args[0]) if args else _demo_zone()
+
+    if "--bench" in options:
+        #the responder runs in its own process so the load generator does not share its GIL
+        duration = options["--bench"]
+        ready = multiprocessing.Queue()
+        server = multiprocessing.Process(target=_serve_process, args=(zone, 0, duration + 1.0, ready))
+        server.start()
+        port = ready.get()
+        names = sorted({owner for owner, _ in zone.records})
+        queries = [DNS(transaction_id=1, qname=name, qtype=1).build() for name in names]
+        qps, answered = measure_qps("127.0.0.1", port, queries, duration)
+        stats = ready.get()
+        server.join()
+        print(f"{qps:,.0f} queries/s over loopback ({answered} answers in {duration:g}s)")
+        print(f"responder: {stats['hits']} cache hits, {stats['misses']} misses, "
+              f"{stats['queries_per_wakeup']:.1f} queries per wakeup")
+        return 0
+
+    responder = DNSResponder(zone, options.get("--address", "127.0.0.1"), int(options.get("--port", 5353)))
+    print(f"serving {len(zone.records)} record sets on {responder.address}:{responder.bind()}")
+    try:
+        responder.serve()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        responder.close()
+    print(responder.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+events.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Structured event reporting for the I/O functions in network_utils. The library is
+             silent by default: call sites check events.ACTIVE before building an event, so
+             without a sink no formatting work is done at all. Sinks receive Event objects whose
+             packet summary and dump are rendered lazily, only if the sink asks for them.
+"""
+
+import sys
+import time
+
+
+SENT = "sent"
+RECEIVED = "received"
+TIMEOUT = "timeout"
+
+#True while at least one sink is registered; checked by callers before emit()
+ACTIVE = False
+
+_sinks = []
+_print_sink = None
+
+
+class Event:
+    def __init__(self, name, source, packet=None, **fields):
+        """
+        Description: One I/O event.
+
+        @param name: SENT, RECEIVED or TIMEOUT.
+        @param source: Function that produced it ("send", "sendp", "sr", "sniff").
+        @param packet: (Packet or None) Packet sent or received.
+        @param fields: Extra structured fields (dest_IP, interface, layer, timeout, ...).
+        @returns: None
+        """
+        self.name = name
+        self.source = source
+        self.time = time.time()
+        self.packet = packet
+        self.fields = fields
+        self._summary = None
+
+    @property
+    def summary(self):
+        """
+        Description: One-line description of the packet, rendered on first access.
+        """
+        if self._summary is None and self.packet is not None:
+            if hasattr(self.packet, "summary"):
+                self._summary = self.packet.summary()
+            else:
+                layers = []
+                layer = self.packet
+                while layer is not None and not isinstance(layer, (bytes, bytearray)):
+                    layers.append(layer.__class__.__name__)
+                    layer = getattr(layer, "payload", None)
+                self._summary = " / ".join(layers)
+        return self._summary
+
+    def as_dict(self):
+        """
+        Description: Structured form of the event (renders the summary).
+
+        @returns: (dict) name, source, time, summary and every extra field.
+        """
+        record = {"event": self.name, "source": self.source, "time": self.time, "summary": self.summary}
+        record.update(self.fields)
+        return record
+
+
+def add_sink(sink):
+    """
+    Description: Registers a callable that receives every Event.
+
+    @param sink: Callable taking one Event.
+    @returns: The sink (so it can be passed to remove_sink later).
+    """
+    global ACTIVE
+    _sinks.append(sink)
+    ACTIVE = True
+    return sink
+
+
+def remove_sink(sink):
+    """
+    Description: Unregisters a sink added with add_sink().
+    """
+    global ACTIVE
+    if sink in _sinks:
+        _sinks.remove(sink)
+    ACTIVE = bool(_sinks)
+
+
+def emit(name, source, packet=None, **fields):
+    """
+    Description: Delivers an event to every sink. Callers guard with `if events.ACTIVE`.
+
+    @param name: SENT, RECEIVED or TIMEOUT.
+    @param source: Function producing the event.
+    @param packet: (Packet or None) Packet involved.
+    @param fields: Extra structured fields.
+    @returns: None
+    """
+    event = Event(name, source, packet, **fields)
+    for sink in list(_sinks):
+        sink(event)
+
+
+def print_sink(show_packets=False, stream=None):
+    """
+    Description: Builds a sink that prints the classic "[+] sent packet ..." progress lines.
+
+    @param show_packets: Also dump received packets with show().
+    @param stream: Output stream (defaults to sys.stdout at print time).
+    @returns: The sink callable.
+    """
+    def sink(event):
+        out = stream or sys.stdout
+        fields = event.fields
+        if event.name == SENT:
+            if event.source == "sendp":
+                print(f"[+] sent packet on {fields.get('interface')} (layer 2)", file=out)
+            elif event.source == "sr":
+                print(f"[+] sent packet to {fields.get('dest_IP')}, waiting for reply...", file=out)
+            else:
+                print(f"[+] sent packet to {fields.get('dest_IP')} (layer 3)", file=out)
+        elif event.name == RECEIVED:
+            print("[+] Received reply" if event.source == "sr" else "[+] Sniffed a packet", file=out)
+            if show_packets and event.packet is not None:
+                event.packet.show(stream=out)
+        elif event.name == TIMEOUT:
+            what = "reply" if event.source == "sr" else "packet"
+            print(f"[-] Timeout: No {what} received", file=out)
+    return sink
+
+
+def logging_sink(logger):
+    """
+    Description: Builds a sink that forwards events to a standard library logger. The event's
+                 structured form is attached as the record's "event" attribute; the message
+                 (and therefore the packet summary) is only formatted if the logger emits it.
+
+    @param logger: logging.Logger instance.
+    @returns: The sink callable.
+    """
+    import logging
+
+    class _Message:
+        def __init__(self, event):
+            self.event = event
+
+        def __str__(self):
+            summary = self.event.summary
+            return f"{self.event.source} {self.event.name}" + (f": {summary}" if summary else "")
+
+    def sink(event):
+        level = logging.WARNING if event.name == TIMEOUT else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(level, _Message(event), extra={"event": event})
+    return sink
+
+
+def set_verbosity(level):
+    """
+    Description: Convenience switch for interactive scripts.
+                 0 = silent (default), 1 = progress lines, 2 = progress lines and show() dumps.
+
+    @param level: Verbosity level.
+    @returns: None
+    """
+    global _print_sink
+    if _print_sink is not None:
+        remove_sink(_print_sink)
+        _print_sink = None
+    if level > 0:
+        _print_sink = add_sink(print_sink(show_packets=level > 1))
@@ -0,0 +1,306 @@
+"""
+expansion.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Lazy expansion of packets whose fields hold several values. Layers list the fields
+             that may hold ranges in expand_fields; such a field can be given a range, list,
+             tuple, set or Net (an IPv4 address field also takes "a.b.c.d/len" text), e.g.
+             IP(dest_IP="10.0.0.0/16") / TCP(dst_port=[22, 80, 443]). Expansion(packet), or
+             packet.expand(), is then the sequence of every combination as built bytes.
+
+             The stack is built once with the first value of every field. Each next packet is
+             made by patching only the fields that changed into that template and updating the
+             checksums covering them incrementally (RFC 1624), the way syn_scan and ping_sweep
+             patch their probes. Values are produced by index, so memory stays constant however
+             many packets the fields describe.
+"""
+
+import copy
+import ipaddress
+import struct
+from Packet import Packet
+from addresses import ip_to_bytes, pseudo_header
+
+
+class Net:
+    def __init__(self, network):
+        """
+        Description: Every IPv4 address of a network, as a lazy sequence of address strings
+                     (network and broadcast addresses included).
+
+        @param network: Network in CIDR notation, e.g. "10.0.0.0/16" (host bits are ignored).
+        @returns: None
+        """
+        net = ipaddress.IPv4Network(network, strict=False)
+        self.network = str(net)
+        self.first = int(net.network_address)
+        self.size = net.num_addresses
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("Net index out of range")
+        return str(ipaddress.IPv4Address(self.first + index))
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield self[index]
+
+    def packed(self, index):
+        """
+        Description: Packed form of the address at index, without going through text.
+        """
+        return (self.first + index).to_bytes(4, 'big')
+
+    def __repr__(self):
+        return f"Net({self.network!r})"
+
+
+#checked by exact type
+_MULTI_TYPES = frozenset((range, list, tuple, set, frozenset, Net))
+
+
+def is_multi(value):
+    """
+    Description: True when a field value describes several values (a range, list, tuple, set,
+                 Net or CIDR text).
+    """
+    kind = type(value)
+    return kind in _MULTI_TYPES or (kind is str and "/" in value)
+
+
+def has_ranges(*values):
+    """
+    Description: True when any of the given numeric field values holds several values. Layer
+                 constructors only call it once converting or packing a field has failed,
+                 so ordinary construction pays nothing for range support.
+    """
+    return not _MULTI_TYPES.isdisjoint(map(type, values))
+
+
+def values_of(value):
+    """
+    Description: Indexable sequence of the values a field holds; CIDR text becomes a Net and
+                 sets are sorted. A single value gives a one-element sequence.
+    """
+    if isinstance(value, str) and "/" in value:
+        return Net(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, (range, list, tuple, Net)):
+        return value
+    return (value,)
+
+
+def _own_addresses(layer):
+    #TCP keeps its pseudo-header addresses in ip_src/ip_dst, UDP in src_ip/dst_ip
+    src = getattr(layer, "ip_src", None) or getattr(layer, "src_ip", None)
+    dst = getattr(layer, "ip_dst", None) or getattr(layer, "dst_ip", None)
+    return (src, dst) if src and dst else (None, None)
+
+
+def _fold(total):
+    while total >> 16:
+        total = (total >> 16) + (total & 0xFFFF)
+    return total
+
+
+class _Field:
+    def __init__(self, values, offset, fmt):
+        """
+        Description: One varying field: where it sits in the template and the checksums
+                     covering it.
+
+        @param values: Indexable sequence of its values.
+        @param offset: Offset of the field in the template.
+        @param fmt: struct format of the field ("B", "H", "L" or "4s" for IPv4 addresses).
+        @returns: None
+        """
+        self.values = values
+        self.offset = offset
+        self.size = struct.calcsize("!" + fmt)
+        if fmt == "4s":
+            if isinstance(values, Net):
+                self.encode = values.packed
+            else:
+                self.encode = lambda index: ip_to_bytes(values[index])
+        else:
+            pack = struct.Struct("!" + fmt).pack
+            self.encode = lambda index: pack(values[index])
+        #(checksum offset, aligned start, word reader, 0xFFFF per word, zero means no checksum)
+        #per checksum covering the field
+        self.checksums = []
+
+    def covered_by(self, checksum_offset, layer_start, no_zero):
+        #16-bit words of the checksummed data that the field overlaps
+        start = self.offset - ((self.offset - layer_start) & 1)
+        end = self.offset + self.size
+        end += (end - layer_start) & 1
+        count = (end - start) // 2
+        self.checksums.append((checksum_offset, start, struct.Struct('!%dH' % count).unpack_from,
+                               0xFFFF * count, no_zero))
+
+
+def _word_sum(buf, start, end):
+    return sum(struct.unpack_from('!%dH' % ((end - start) // 2), buf, start))
+
+
+class Expansion:
+    def __init__(self, packet):
+        """
+        Description: Sequence of the built bytes of every combination of the multi-valued
+                     fields of a packet. Fields vary in stack order (within a layer, in
+                     expand_fields order), the last one fastest.
+
+        @param packet: Packet stack, any of whose layers' expand_fields may hold ranges.
+        @returns: None
+        """
+        self.packet = packet
+        layers = []
+        layer = packet
+        while isinstance(layer, Packet):
+            layers.append(layer)
+            layer = layer.payload
+        #(layer index, attribute, values, offset in the layer, struct format)
+        varying = []
+        for index, layer in enumerate(layers):
+            for attr, (offset, fmt) in layer.expand_fields.items():
+                value = getattr(layer, attr, None)
+                if is_multi(value):
+                    values = values_of(value)
+                    if not len(values):
+                        raise ValueError(f"{type(layer).__name__}.{attr} has no values")
+                    varying.append((index, attr, values, offset, fmt))
+        self._template, starts, copies = self._build_template(layers, varying)
+        self.fields = []
+        for index, attr, values, offset, fmt in varying:
+            field = _Field(values, starts[index] + offset, fmt)
+            layer = copies[index]
+            if layer.checksum_offset is not None:
+                field.covered_by(starts[index] + layer.checksum_offset, starts[index],
+                                 layer.pseudo_header_protocol == 17)
+            #addresses of an IP layer are also in the pseudo-header of the TCP/UDP it carries
+            if attr in ("src_IP", "dest_IP") and index + 1 in self._pseudo_from_ip:
+                inner = copies[index + 1]
+                field.covered_by(starts[index + 1] + inner.checksum_offset, starts[index],
+                                 inner.pseudo_header_protocol == 17)
+            self.fields.append(field)
+        self.sizes = [len(field.values) for field in self.fields]
+
+    def _build_template(self, layers, varying):
+        """
+        Description: Builds the stack with the first value of every varying field.
+
+        @returns: (tuple) (template bytearray, offset of each layer, layer copies).
+        """
+        copies = [copy.copy(layer) for layer in layers]
+        for upper, lower in zip(copies, copies[1:]):
+            upper.payload = lower
+        for index, attr, values, _, _ in varying:
+            setattr(copies[index], attr, values[0])
+        template = bytearray(copies[0].build())
+        starts = [len(template) - len(layer.build()) for layer in copies]
+        #TCP/UDP checksums were computed when the layers were made (or not at all), so they
+        #are recomputed over the template; the pseudo-header comes from the layer's own
+        #addresses, or else from the IP layer carrying it. When that IP layer's addresses
+        #vary, the layer's own (single) addresses would be wrong for all but one packet, so
+        #the IP layer's are used
+        varying_addresses = {index for index, attr, _, _, _ in varying if attr in ("src_IP", "dest_IP")}
+        self._pseudo_from_ip = set()
+        for index, layer in enumerate(copies):
+            protocol = layer.pseudo_header_protocol
+            if protocol is None:
+                continue
+            src, dst = _own_addresses(layer)
+            carried = index and getattr(copies[index - 1], "version", None) == 4
+            if carried and (src is None or index - 1 in varying_addresses):
+                src, dst = copies[index - 1].src_IP, copies[index - 1].dest_IP
+                self._pseudo_from_ip.add(index)
+            if not (src and dst):
+                #no checksum to keep up to date (e.g. TCP without addresses)
+                layer.checksum_offset = None
+                continue
+            start = starts[index]
+            segment = template[start:]
+            struct.pack_into('!H', segment, layer.checksum_offset, 0)
+            data = pseudo_header(src, dst, protocol, len(segment)) + segment
+            if len(data) % 2:
+                data += b'\x00'
+            checksum = ~_fold(_word_sum(data, 0, len(data))) & 0xFFFF
+            if protocol == 17 and checksum == 0:
+                checksum = 0xFFFF
+            struct.pack_into('!H', template, start + layer.checksum_offset, checksum)
+        return template, starts, copies
+
+    def __len__(self):
+        total = 1
+        for size in self.sizes:
+            total *= size
+        return total
+
+    def _patch(self, buf, field, index):
+        new = field.encode(index)
+        if not field.checksums:
+            buf[field.offset:field.offset + field.size] = new
+            return
+        old_sums = [sum(words(buf, start)) for _, start, words, _, _ in field.checksums]
+        buf[field.offset:field.offset + field.size] = new
+        for (offset, start, words, ones, no_zero), old in zip(field.checksums, old_sums):
+            checksum = buf[offset] << 8 | buf[offset + 1]
+            if no_zero and checksum == 0:
+                #UDP sent without a checksum
+                continue
+            #HC' = ~(~HC + ~m + m'); ~m is the sum of the complemented old words
+            total = _fold((~checksum & 0xFFFF) + (ones - old) + sum(words(buf, start)))
+            checksum = ~total & 0xFFFF
+            if no_zero and checksum == 0:
+                checksum = 0xFFFF
+            buf[offset] = checksum >> 8
+            buf[offset + 1] = checksum & 0xFF
+
+    def __iter__(self):
+        """
+        Description: Generates every packet, patching only the fields whose value changed.
+
+        @returns: Generator of bytes.
+        """
+        buf = bytearray(self._template)
+        fields, sizes = self.fields, self.sizes
+        digits = [0] * len(fields)
+        total = len(self)
+        yield bytes(buf)
+        for _ in range(total - 1):
+            position = len(fields) - 1
+            while True:
+                digits[position] += 1
+                if digits[position] < sizes[position]:
+                    self._patch(buf, fields[position], digits[position])
+                    break
+                digits[position] = 0
+                self._patch(buf, fields[position], 0)
+                position -= 1
+            yield bytes(buf)
+
+    def __getitem__(self, index):
+        """
+        Description: Packet at one index of the sequence (random access, e.g. for permuted
+                     probing).
+
+        @param index: Index in [0, len).
+        @returns: (bytes) The packet.
+        """
+        total = len(self)
+        if index < 0:
+            index += total
+        if not 0 <= index < total:
+            raise IndexError("Expansion index out of range")
+        buf = bytearray(self._template)
+        for field, size in zip(reversed(self.fields), reversed(self.sizes)):
+            index, digit = divmod(index, size)
+            if digit:
+                self._patch(buf, field, digit)
+        return bytes(buf)
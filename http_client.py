@@ -0,0 +1,355 @@
+"""
+http_client.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: HTTP/1.1 client over the library's TCP connections (tcp_connection.py), or any
+             socket-like object with sendall/recv/close. Connections are persistent
+             (keep-alive) and requests can be pipelined: request() only sends, and responses
+             are read back in order with get_response(). Bodies are framed by Content-Length,
+             chunked transfer coding or connection close, and can be streamed incrementally.
+"""
+
+from tcp_connection import TCPConnection
+
+
+READ_SIZE = 65536
+
+#responses that never carry a body (RFC 9112 section 6.3)
+_NO_BODY_STATUS = (204, 304)
+
+
+class HTTPError(Exception):
+    pass
+
+
+class _Reader:
+    def __init__(self, conn):
+        """
+        Description: Buffered reader over a socket-like connection.
+        """
+        self.conn = conn
+        self.buffer = bytearray()
+        self.eof = False
+
+    def _fill(self):
+        data = self.conn.recv(READ_SIZE)
+        if not data:
+            self.eof = True
+            return False
+        self.buffer += data
+        return True
+
+    def readline(self, limit=65536):
+        start = 0
+        while True:
+            end = self.buffer.find(b"\n", start)
+            if end >= 0:
+                line = bytes(self.buffer[:end + 1])
+                del self.buffer[:end + 1]
+                return line
+            if len(self.buffer) > limit:
+                raise HTTPError("Header line too long")
+            start = len(self.buffer)
+            if not self._fill():
+                line = bytes(self.buffer)
+                self.buffer.clear()
+                return line
+
+    def read_some(self, limit):
+        """
+        Description: Up to limit buffered bytes, reading from the connection only when the
+                     buffer is empty.
+
+        @returns: (bytes) Data, b'' at end of stream.
+        """
+        if not self.buffer and not self._fill():
+            return b''
+        data = bytes(self.buffer[:limit])
+        del self.buffer[:limit]
+        return data
+
+    def read_exact(self, size):
+        while len(self.buffer) < size:
+            if not self._fill():
+                raise HTTPError("Connection closed mid-message")
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+
+class HTTPResponse:
+    def __init__(self, reader, method):
+        """
+        Description: Reads a response's status line and headers; the body is left on the
+                     connection until read()/iter_body() consume it.
+
+        @param reader: _Reader of the connection.
+        @param method: Method of the request this answers (HEAD responses have no body).
+        @returns: None
+        """
+        self._reader = reader
+        while True:
+            line = reader.readline()
+            if not line:
+                raise HTTPError("Connection closed before a response")
+            version, _, rest = line.decode("latin-1").rstrip("\r\n").partition(" ")
+            status, _, reason = rest.partition(" ")
+            self.version = version
+            self.status = int(status)
+            self.reason = reason
+            self.headers = self._read_headers()
+            #skip interim 1xx responses (101 hands the connection over and is returned)
+            if self.status >= 200 or self.status == 101:
+                break
+        self.keep_alive = self._keep_alive()
+        te = self.header("transfer-encoding", "").lower()
+        self._chunked = "chunked" in te
+        self._remaining = None
+        self._chunk_left = 0
+        self.complete = False
+        if method == "HEAD" or self.status in _NO_BODY_STATUS or self.status < 200:
+            self.complete = True
+        elif not self._chunked:
+            length = self.header("content-length")
+            if length is not None:
+                self._remaining = int(length)
+                self.complete = self._remaining == 0
+            else:
+                #body runs until the server closes
+                self.keep_alive = False
+
+    def _read_headers(self):
+        headers = []
+        while True:
+            line = self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers.append((name.strip(), value.strip()))
+
+    def header(self, name, default=None):
+        """
+        Description: Value of a header (case-insensitive; the last one wins).
+        """
+        name = name.lower()
+        for key, value in reversed(self.headers):
+            if key.lower() == name:
+                return value
+        return default
+
+    def _keep_alive(self):
+        tokens = self.header("connection", "").lower()
+        if "close" in tokens:
+            return False
+        if self.version == "HTTP/1.0":
+            return "keep-alive" in tokens
+        return True
+
+    def iter_body(self, chunk_size=READ_SIZE):
+        """
+        Description: Yields the body incrementally as it arrives, decoding chunked transfer
+                     coding on the fly.
+
+        @param chunk_size: Largest piece yielded at once.
+        @returns: Generator of bytes.
+        """
+        reader = self._reader
+        while not self.complete:
+            if self._chunked:
+                if self._chunk_left == 0:
+                    size_line = reader.readline()
+                    if not size_line:
+                        raise HTTPError("Connection closed mid-message")
+                    #chunk extensions after ';' are ignored
+                    self._chunk_left = int(size_line.split(b";")[0].strip() or b"0", 16)
+                    if self._chunk_left == 0:
+                        #trailer fields end with an empty line
+                        self.headers.extend(self._read_headers())
+                        self.complete = True
+                        return
+                data = reader.read_some(min(chunk_size, self._chunk_left))
+                if not data:
+                    raise HTTPError("Connection closed mid-message")
+                self._chunk_left -= len(data)
+                if self._chunk_left == 0:
+                    reader.read_exact(2)
+                yield data
+            elif self._remaining is not None:
+                data = reader.read_some(min(chunk_size, self._remaining))
+                if not data:
+                    raise HTTPError("Connection closed mid-message")
+                self._remaining -= len(data)
+                self.complete = self._remaining == 0
+                yield data
+            else:
+                data = reader.read_some(chunk_size)
+                if not data:
+                    self.complete = True
+                    return
+                yield data
+
+    def read(self):
+        """
+        Description: The rest of the body.
+
+        @returns: (bytes) Body bytes.
+        """
+        return b"".join(self.iter_body())
+
+    def summary(self):
+        return f"{self.version} {self.status} {self.reason}"
+
+
+class HTTPConnection:
+    def __init__(self, host, port=80, connect=None, timeout=5.0, host_header=None):
+        """
+        Description: Persistent HTTP/1.1 connection to one server.
+
+        @param host: Server IPv4 address.
+        @param port: Server port.
+        @param connect: Callable returning a connected socket-like object (sendall, recv,
+                        close); defaults to a library TCPConnection.
+        @param timeout: Seconds a TCP operation may wait without progress.
+        @param host_header: Host header value (defaults to host[:port]).
+        @returns: None
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.host_header = host_header or (host if port == 80 else f"{host}:{port}")
+        self._connect = connect or self._tcp_connect
+        self.conn = None
+        self._reader = None
+        #methods of requests sent whose responses have not been read yet
+        self._pending = []
+        self._current = None
+        self.requests_sent = 0
+        self.connections_opened = 0
+
+    def _tcp_connect(self):
+        conn = TCPConnection(self.host, self.port, timeout=self.timeout)
+        conn.connect()
+        return conn
+
+    def _ensure_connected(self):
+        if self.conn is None:
+            self.conn = self._connect()
+            self._reader = _Reader(self.conn)
+            self.connections_opened += 1
+
+    def encode_request(self, method, path, headers=None, body=None):
+        """
+        Description: Serializes one request.
+
+        @returns: (bytes) The request bytes.
+        """
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host_header}"]
+        names = set()
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+            names.add(name.lower())
+        if body is not None and "content-length" not in names:
+            lines.append(f"Content-Length: {len(body)}")
+        head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+        return head + body if body else head
+
+    def request(self, method, path, headers=None, body=None):
+        """
+        Description: Sends a request without waiting for earlier responses (pipelining).
+                     Read responses back in order with get_response().
+
+        @param method: HTTP method.
+        @param path: Request target.
+        @param headers: Extra headers (dict).
+        @param body: (bytes or None) Request body.
+        @returns: None
+        """
+        self._ensure_connected()
+        self.conn.sendall(self.encode_request(method, path, headers, body))
+        self._pending.append(method)
+        self.requests_sent += 1
+
+    def get_response(self):
+        """
+        Description: Reads the next response. An unread body of the previous response is
+                     drained first; a response that ends the connection closes it.
+
+        @returns: (HTTPResponse) The response (its body may still be on the wire).
+        """
+        if not self._pending:
+            raise HTTPError("No request awaiting a response")
+        if self._current is not None:
+            self._finish(self._current)
+        response = HTTPResponse(self._reader, self._pending.pop(0))
+        self._current = response
+        if response.complete:
+            self._finish(response)
+        return response
+
+    def _finish(self, response):
+        for _ in response.iter_body():
+            pass
+        self._current = None
+        if not response.keep_alive:
+            if self._pending:
+                #pipelined requests after a close are lost; the caller must resend them
+                lost = len(self._pending)
+                self._pending.clear()
+                self.close()
+                raise HTTPError(f"Server closed the connection with {lost} pipelined requests unanswered")
+            self.close()
+
+    def fetch(self, method, path, headers=None, body=None):
+        """
+        Description: One request/response exchange with the body read.
+
+        @returns: (tuple) (HTTPResponse, body bytes).
+        """
+        self.request(method, path, headers, body)
+        response = self.get_response()
+        data = response.read()
+        if not response.keep_alive:
+            self._finish(response)
+        return response, data
+
+    def pipeline(self, paths, method="GET", headers=None):
+        """
+        Description: Sends every request first, then yields (response, body) in order.
+
+        @param paths: Request targets.
+        @param method: Method for all requests.
+        @param headers: Extra headers for all requests.
+        @returns: Generator of (HTTPResponse, body bytes).
+        """
+        paths = list(paths)
+        for path in paths:
+            self.request(method, path, headers)
+        for _ in paths:
+            response = self.get_response()
+            data = response.read()
+            if not response.keep_alive:
+                self._finish(response)
+            yield response, data
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+            self._reader = None
+        self._current = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def get(host, path="/", port=80, connect=None, timeout=5.0):
+    """
+    Description: Single GET over a new connection.
+
+    @returns: (tuple) (HTTPResponse, body bytes).
+    """
+    with HTTPConnection(host, port, connect=connect, timeout=timeout) as conn:
+        return conn.fetch("GET", path)
@@ -0,0 +1,608 @@
+"""
+http_dissector.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: HTTP/1.x dissector for reassembled TCP streams (tcp_stream.py). Each direction of a
+             connection is parsed incrementally as its bytes arrive: request and status lines
+             and headers are decoded, and message bodies are delimited (Content-Length, chunked
+             transfer coding, or connection close) by counting bytes instead of buffering them,
+             so memory stays bounded by the header size however large the capture or body.
+
+             Requests and responses are paired in order (pipelining included) into
+             HTTPTransaction records carrying capture timestamps for every message boundary,
+             from which request, time-to-first-byte, transfer and total latencies are derived.
+             Bytes lost from the capture inside a counted body are skipped without losing sync;
+             anywhere else the direction resynchronizes at the next segment that starts a
+             message.
+
+Usage:       python http_dissector.py capture.pcap [--quiet]
+"""
+
+import collections
+import re
+import sys
+from tcp_stream import TCPReassembler
+
+
+#largest header section accepted before the direction is treated as not HTTP
+MAX_HEAD = 65536
+
+#responses that never carry a body (RFC 9112 section 6.3)
+_NO_BODY_STATUS = (204, 304)
+
+#parser states
+_START, _HEAD, _BODY, _CHUNK_SIZE, _CHUNK_DATA, _CHUNK_END, _TRAILER, _UNTIL_CLOSE, _OPAQUE, _DESYNC = range(10)
+
+#a request line starts with a method token and a space; a status line with the version
+_REQUEST_START = re.compile(rb"[A-Z][A-Z_-]{0,23} ")
+#stricter form used to pick a stream back up after lost data
+_RESYNC = re.compile(rb"HTTP/1\.\d \d{3}|[A-Z][A-Z_-]{0,23} \S+ HTTP/1\.\d\r?\n")
+
+
+def _starts_message(data, pos=0):
+    return data.startswith(b"HTTP/", pos) or _REQUEST_START.match(data, pos) is not None
+
+
+class HTTPMessage:
+    def __init__(self, is_request, start):
+        """
+        Description: One request or response seen on the wire.
+
+        @param is_request: True for requests, False for responses.
+        @param start: Capture time of its first byte.
+        @returns: None
+        """
+        self.is_request = is_request
+        self.start = start
+        self.head_end = None
+        self.end = None
+        self.method = self.target = None
+        self.status = None
+        self.reason = None
+        self.version = None
+        self.headers = []
+        self.head_bytes = 0
+        #body length after removing chunked framing, and bytes of it missing from the capture
+        self.body_bytes = 0
+        self.missing_bytes = 0
+        self.chunked = False
+        self.complete = False
+
+    def header(self, name, default=None):
+        """
+        Description: Value of a header (case-insensitive; the last one wins).
+        """
+        name = name.lower()
+        for key, value in reversed(self.headers):
+            if key.lower() == name:
+                return value
+        return default
+
+    def first_line(self):
+        if self.is_request:
+            return f"{self.method} {self.target} {self.version}"
+        return f"{self.version} {self.status} {self.reason}"
+
+    def __repr__(self):
+        state = "" if self.complete else " incomplete"
+        return f"<HTTPMessage {self.first_line()} body={self.body_bytes}{state}>"
+
+
+class HTTPTransaction:
+    def __init__(self, client, server, request=None):
+        """
+        Description: A request and the response that answered it. Either side may be missing
+                     when the capture did not contain it.
+
+        @param client: (address, port) of the client.
+        @param server: (address, port) of the server.
+        @param request: (HTTPMessage or None) The request.
+        @returns: None
+        """
+        self.client = client
+        self.server = server
+        self.request = request
+        self.response = None
+        #interim (1xx) responses received before the final one
+        self.interim = 0
+
+    def _span(self, start, end):
+        if start is None or end is None:
+            return None
+        return end - start
+
+    @property
+    def request_time(self):
+        """
+        Description: Seconds from the first to the last byte of the request.
+        """
+        return self._span(self.request and self.request.start, self.request and self.request.end)
+
+    @property
+    def time_to_first_byte(self):
+        """
+        Description: Seconds from the end of the request to the first byte of the response.
+        """
+        return self._span(self.request and self.request.end, self.response and self.response.start)
+
+    @property
+    def transfer_time(self):
+        """
+        Description: Seconds from the first to the last byte of the response.
+        """
+        return self._span(self.response and self.response.start, self.response and self.response.end)
+
+    @property
+    def total_time(self):
+        """
+        Description: Seconds from the first byte of the request to the last of the response.
+        """
+        return self._span(self.request and self.request.start, self.response and self.response.end)
+
+    @property
+    def complete(self):
+        return bool(self.request and self.request.complete and self.response and self.response.complete)
+
+    def summary(self):
+        """
+        Description: One-line description, e.g.
+                     "10.0.0.2:51000 > 10.0.0.1:80 GET /index.html -> 200 (1024 B) ttfb=1.20ms total=1.51ms".
+        """
+        request = f"{self.request.method} {self.request.target}" if self.request else "<no request>"
+        response = f"{self.response.status} ({self.response.body_bytes} B)" if self.response else "<no response>"
+        line = f"{self.client[0]}:{self.client[1]} > {self.server[0]}:{self.server[1]} {request} -> {response}"
+        for name, value in (("ttfb", self.time_to_first_byte), ("total", self.total_time)):
+            if value is not None:
+                line += f" {name}={value * 1000:.2f}ms"
+        return line if self.complete else line + " [incomplete]"
+
+    def as_dict(self):
+        """
+        Description: JSON-friendly record of the transaction.
+        """
+        request, response = self.request, self.response
+        return {"client": f"{self.client[0]}:{self.client[1]}", "server": f"{self.server[0]}:{self.server[1]}",
+                "method": request and request.method, "target": request and request.target,
+                "host": request and request.header("host"),
+                "status": response and response.status,
+                "request_start": request and request.start, "request_end": request and request.end,
+                "response_start": response and response.start, "response_end": response and response.end,
+                "request_body_bytes": request and request.body_bytes,
+                "response_body_bytes": response and response.body_bytes,
+                "request_time": self.request_time, "time_to_first_byte": self.time_to_first_byte,
+                "transfer_time": self.transfer_time, "total_time": self.total_time,
+                "complete": self.complete}
+
+
+class _MessageParser:
+    def __init__(self, session, from_client):
+        """
+        Description: Incremental parser for the messages of one direction of a connection.
+
+        @param session: The connection's _HTTPSession (told about message boundaries).
+        @param from_client: True for the client-to-server direction.
+        @returns: None
+        """
+        self.session = session
+        self.from_client = from_client
+        self.state = _START
+        self.message = None
+        self._buffer = bytearray()
+        self._remaining = 0
+        self.desyncs = 0
+
+    def feed(self, ts, data):
+        """
+        Description: Parses the next contiguous bytes of the direction.
+
+        @param ts: Capture time of the data.
+        @param data: Bytes.
+        @returns: None
+        """
+        pos, end = 0, len(data)
+        while pos < end:
+            state = self.state
+            if state == _START:
+                #tolerate line breaks between messages
+                while pos < end and data[pos] in (13, 10):
+                    pos += 1
+                if pos == end:
+                    return
+                if not _starts_message(data, pos):
+                    self._desync(ts)
+                    return
+                self.message = HTTPMessage(not data.startswith(b"HTTP/", pos), ts)
+                self.state = _HEAD
+            elif state == _HEAD:
+                pos = self._feed_head(ts, data, pos)
+            elif state == _BODY or state == _CHUNK_DATA:
+                take = min(self._remaining, end - pos)
+                self._body(data, pos, take)
+                pos += take
+                self._remaining -= take
+                if self._remaining == 0:
+                    if state == _BODY:
+                        self._finish(ts)
+                    else:
+                        self.state = _CHUNK_END
+            elif state == _CHUNK_END:
+                #CRLF after chunk data
+                if data[pos] == 13:
+                    pos += 1
+                elif data[pos] == 10:
+                    pos += 1
+                    self.state = _CHUNK_SIZE
+                else:
+                    self.state = _CHUNK_SIZE
+            elif state == _CHUNK_SIZE or state == _TRAILER:
+                newline = data.find(b"\n", pos)
+                if newline < 0:
+                    self._buffer += data[pos:]
+                    if len(self._buffer) > MAX_HEAD:
+                        self._desync(ts)
+                    return
+                line = bytes(self._buffer + data[pos:newline]) if self._buffer else data[pos:newline]
+                self._buffer.clear()
+                pos = newline + 1
+                if state == _CHUNK_SIZE:
+                    self._chunk_size(ts, line)
+                else:
+                    self._trailer(ts, line)
+            elif state == _UNTIL_CLOSE:
+                self._body(data, pos, end - pos)
+                return
+            else:
+                #_OPAQUE (upgraded / tunnelled) directions are not parsed; a _DESYNC one resumes
+                #at the next segment that starts a message
+                if state == _DESYNC and pos == 0 and _RESYNC.match(data) is not None:
+                    self.state = _START
+                    continue
+                return
+
+    def _feed_head(self, ts, data, pos):
+        buffer = self._buffer
+        searched = max(0, len(buffer) - 3)
+        buffer += data[pos:]
+        #header section ends with an empty line (CRLF CRLF, or bare LF LF)
+        found = [i for i in (buffer.find(b"\r\n\r\n", searched), buffer.find(b"\n\n", searched)) if i >= 0]
+        if not found:
+            if len(buffer) > MAX_HEAD:
+                self._desync(ts)
+            return len(data)
+        head_end = min(found)
+        head_end += 4 if buffer[head_end] == 13 else 2
+        #bytes past the head belong to the body and are parsed from data itself
+        consumed = len(data) - (len(buffer) - head_end)
+        head = bytes(buffer[:head_end])
+        buffer.clear()
+        self._head(ts, head)
+        return consumed
+
+    def _head(self, ts, head):
+        message = self.message
+        message.head_end = ts
+        message.head_bytes = len(head)
+        lines = head.decode("latin-1").split("\n")
+        first = lines[0].rstrip("\r").split(" ", 2)
+        try:
+            if message.is_request:
+                message.method, message.target, message.version = first
+            else:
+                message.version = first[0]
+                message.status = int(first[1])
+                message.reason = first[2] if len(first) > 2 else ""
+        except ValueError:
+            self._desync(ts)
+            return
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                message.headers.append((name.strip(), value.strip()))
+        self._frame(ts, message)
+
+    def _frame(self, ts, message):
+        """
+        Description: Chooses how the body of a message whose head was just parsed is delimited.
+        """
+        if message.is_request:
+            method = message.method
+            self.session.request_head(message)
+        else:
+            method = self.session.response_head(message)
+        if not message.is_request:
+            status = message.status
+            if status == 101 or (method == "CONNECT" and 200 <= status < 300):
+                #the rest of both directions is another protocol
+                self._finish(ts)
+                self.state = _OPAQUE
+                self.session.upgrade()
+                return
+            if status < 200 or status in _NO_BODY_STATUS or method == "HEAD":
+                self._finish(ts)
+                return
+        if "chunked" in message.header("transfer-encoding", "").lower():
+            message.chunked = True
+            self.state = _CHUNK_SIZE
+            return
+        length = message.header("content-length")
+        if length is not None:
+            try:
+                self._remaining = int(length)
+            except ValueError:
+                self._desync(ts)
+                return
+            if self._remaining > 0:
+                self.state = _BODY
+                return
+        elif not message.is_request:
+            #body runs until the server closes
+            self.state = _UNTIL_CLOSE
+            return
+        self._finish(ts)
+
+    def _chunk_size(self, ts, line):
+        try:
+            #chunk extensions after ';' are ignored
+            size = int(line.split(b";")[0].strip() or b"0", 16)
+        except ValueError:
+            self._desync(ts)
+            return
+        if size:
+            self._remaining = size
+            self.state = _CHUNK_DATA
+        else:
+            self.state = _TRAILER
+
+    def _trailer(self, ts, line):
+        line = line.rstrip(b"\r")
+        if not line:
+            self._finish(ts)
+            return
+        name, sep, value = line.decode("latin-1").partition(":")
+        if sep:
+            self.message.headers.append((name.strip(), value.strip()))
+
+    def _body(self, data, pos, size):
+        self.message.body_bytes += size
+        handler = self.session.dissector.on_body
+        if handler is not None and size:
+            handler(self.message, data[pos:pos + size])
+
+    def _finish(self, ts):
+        message = self.message
+        message.end = ts
+        message.complete = True
+        self.message = None
+        self.state = _START
+        self.session.message_done(message, self.from_client)
+
+    def _desync(self, ts):
+        """
+        Description: Gives up on the current message, which is reported incomplete if its head
+                     was parsed; parsing resumes at the next segment that starts a message.
+        """
+        self._buffer.clear()
+        self.desyncs += 1
+        message, self.message = self.message, None
+        self.state = _DESYNC
+        if message is not None and message.head_end is not None:
+            message.end = ts
+            self.session.message_done(message, self.from_client)
+
+    def gap(self, ts, size):
+        """
+        Description: size bytes of the direction are missing from the capture.
+        """
+        if self.state in (_BODY, _CHUNK_DATA) and size < self._remaining:
+            self.message.body_bytes += size
+            self.message.missing_bytes += size
+            self._remaining -= size
+        elif self.state == _UNTIL_CLOSE:
+            self.message.body_bytes += size
+            self.message.missing_bytes += size
+        elif self.state not in (_OPAQUE, _DESYNC):
+            if self.state == _START:
+                self.state = _DESYNC
+            else:
+                self._desync(ts)
+
+    def end(self, ts):
+        """
+        Description: The direction was closed; a close-delimited body ends here.
+        """
+        if self.state == _UNTIL_CLOSE:
+            self._finish(ts)
+        elif self.message is not None:
+            #cut short: reported as an incomplete message
+            self._desync(ts)
+
+
+class _HTTPSession:
+    def __init__(self, dissector, stream):
+        """
+        Description: tcp_stream consumer pairing the requests and responses of one connection.
+
+        @param dissector: The HTTPDissector collecting transactions.
+        @param stream: The TCPStream.
+        @returns: None
+        """
+        self.dissector = dissector
+        self.stream = stream
+        self.parsers = (_MessageParser(self, True), _MessageParser(self, False))
+        #transactions in request order that are not finished yet
+        self.open = collections.deque()
+
+    #tcp_stream consumer interface
+
+    def data(self, from_client, ts, data):
+        self.parsers[0 if from_client else 1].feed(ts, data)
+
+    def gap(self, from_client, ts, size):
+        self.parsers[0 if from_client else 1].gap(ts, size)
+
+    def end(self, from_client, ts):
+        self.parsers[0 if from_client else 1].end(ts)
+
+    def close(self, ts):
+        for parser in self.parsers:
+            parser.end(ts)
+        while self.open:
+            self.dissector._emit(self.open.popleft())
+
+    #called by the parsers
+
+    def request_head(self, message):
+        self.open.append(HTTPTransaction(self.stream.client, self.stream.server, message))
+
+    def response_head(self, message):
+        """
+        Description: Attaches a response whose head was parsed to the oldest unanswered request.
+
+        @returns: (str or None) Method of that request.
+        """
+        for transaction in self.open:
+            if transaction.response is None and transaction.request is not None:
+                if message.status is not None and message.status < 200 and message.status != 101:
+                    transaction.interim += 1
+                else:
+                    transaction.response = message
+                return transaction.request.method
+        #the request was not captured
+        if message.status is None or message.status >= 200 or message.status == 101:
+            transaction = HTTPTransaction(self.stream.client, self.stream.server)
+            transaction.response = message
+            self.open.append(transaction)
+        return None
+
+    def message_done(self, message, from_client):
+        #transactions are handed out in request order once both messages are finished
+        open_ = self.open
+        while open_:
+            first = open_[0]
+            if first.response is None or first.response.end is None or \
+                    (first.request is not None and first.request.end is None):
+                return
+            self.dissector._emit(open_.popleft())
+
+    def upgrade(self):
+        for parser in self.parsers:
+            parser.state = _OPAQUE
+
+
+class HTTPDissector:
+    def __init__(self, on_transaction=None, on_body=None, ports=None, **reassembler_args):
+        """
+        Description: HTTP dissector over a TCP reassembler.
+
+        @param on_transaction: Called with each finished HTTPTransaction; without it they are
+                               queued on self.transactions.
+        @param on_body: Optional callback (message, bytes) for body data (chunked framing
+                        removed); bodies are otherwise only counted.
+        @param ports: Server ports to dissect (None = every connection).
+        @param reassembler_args: Extra TCPReassembler arguments (max_out_of_order, idle_timeout).
+        @returns: None
+        """
+        self.on_transaction = on_transaction
+        self.on_body = on_body
+        self.ports = set(ports) if ports else None
+        self.transactions = collections.deque()
+        self.count = 0
+        self.reassembler = TCPReassembler(self._new_session, **reassembler_args)
+
+    def _new_session(self, stream):
+        if self.ports is not None and stream.server[1] not in self.ports and stream.client[1] not in self.ports:
+            return None
+        return _HTTPSession(self, stream)
+
+    def _emit(self, transaction):
+        self.count += 1
+        if self.on_transaction is not None:
+            self.on_transaction(transaction)
+        else:
+            self.transactions.append(transaction)
+
+    def feed_frame(self, ts, frame):
+        self.reassembler.feed_frame(ts, frame)
+
+    def feed_ip(self, ts, datagram):
+        self.reassembler.feed_ip(ts, datagram)
+
+    def flush(self):
+        self.reassembler.flush()
+
+    def dissect_pcap(self, path):
+        """
+        Description: Dissects a capture file, yielding transactions as they finish.
+
+        @param path: Path of the pcap file.
+        @returns: Generator of HTTPTransaction.
+        """
+        queue = self.transactions
+        for _ in self.reassembler.iter_pcap(path):
+            while queue:
+                yield queue.popleft()
+        while queue:
+            yield queue.popleft()
+
+
+def dissect_pcap(path, ports=None, **kwargs):
+    """
+    Description: HTTP transactions of a capture file, streamed as they finish.
+
+    @param path: Path of the pcap file.
+    @param ports: Server ports to dissect (None = every connection).
+    @returns: Generator of HTTPTransaction.
+    """
+    return HTTPDissector(ports=ports, **kwargs).dissect_pcap(path)
+
+
+def latency_stats(transactions, percentiles=(50, 90, 99)):
+    """
+    Description: Percentiles of the latencies of complete transactions.
+
+    @param transactions: Iterable of HTTPTransaction (consumed once).
+    @param percentiles: Percentiles to report.
+    @returns: (dict) {"count": n, "incomplete": m, latency name: {"p50": s, ..., "max": s}}.
+    """
+    names = ("request_time", "time_to_first_byte", "transfer_time", "total_time")
+    values = {name: [] for name in names}
+    count = incomplete = 0
+    for transaction in transactions:
+        if not transaction.complete:
+            incomplete += 1
+            continue
+        count += 1
+        for name in names:
+            values[name].append(getattr(transaction, name))
+    stats = {"count": count, "incomplete": incomplete}
+    for name in names:
+        series = sorted(values[name])
+        if not series:
+            continue
+        stats[name] = {f"p{p}": series[min(len(series) - 1, len(series) * p // 100)] for p in percentiles}
+        stats[name]["max"] = series[-1]
+    return stats
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__.strip().splitlines()[-1].strip())
+        return 2
+    quiet = "--quiet" in argv
+    path = [arg for arg in argv if not arg.startswith("--")][0]
+    finished = []
+    for transaction in dissect_pcap(path):
+        finished.append(transaction)
+        if not quiet:
+            print(transaction.summary())
+    stats = latency_stats(finished)
+    print(f"{stats['count']} complete transactions, {stats['incomplete']} incomplete")
+    for name in ("time_to_first_byte", "total_time"):
+        if name in stats:
+            print(f"{name}: " + " ".join(f"{k}={v * 1000:.2f}ms" for k, v in stats[name].items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+instrumentation.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Opt-in hot-path instrumentation. While enabled, every Packet layer's build and
+             parse is counted and timed (cumulative time plus a log2 latency histogram) along
+             with the bytes it produced or consumed; network_utils reports socket syscalls and
+             timeouts here too. enable() wraps the layer methods and disable() restores the
+             originals, so a disabled process pays nothing in the layers and one module
+             attribute check per socket call in network_utils.
+"""
+
+import json
+import sys
+import threading
+import time
+from Packet import Packet
+
+
+ENABLED = False
+
+_lock = threading.Lock()
+_layers = {}
+_syscalls = {}
+_timeouts = {}
+_patched = {}
+_started = None
+
+
+class _OpStats:
+    def __init__(self):
+        """
+        Description: Counters for one (layer, operation) pair.
+        """
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.bytes = 0
+        # bucket i counts calls that took [2**(i-1), 2**i) nanoseconds
+        self.histogram = {}
+
+    def add(self, elapsed_ns, nbytes):
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.bytes += nbytes
+        bucket = elapsed_ns.bit_length()
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_ns": self.total_ns,
+            "avg_ns": self.total_ns // self.count if self.count else 0,
+            "max_ns": self.max_ns,
+            "bytes": self.bytes,
+            "histogram_ns": {str(1 << bucket): n for bucket, n in sorted(self.histogram.items())},
+        }
+
+
+def record(layer, op, elapsed_ns, nbytes=0):
+    """
+    Description: Adds one timed operation to the (layer, op) counters.
+
+    @param layer: Layer name, e.g. "IP".
+    @param op: Operation name, "build" or "parse".
+    @param elapsed_ns: Duration in nanoseconds.
+    @param nbytes: Bytes produced or consumed.
+    @returns: None
+    """
+    with _lock:
+        stats = _layers.get((layer, op))
+        if stats is None:
+            stats = _layers[(layer, op)] = _OpStats()
+        stats.add(elapsed_ns, nbytes)
+
+
+def syscall(name, nbytes=0):
+    """
+    Description: Counts one socket call. Callers guard with `if instrumentation.ENABLED`.
+
+    @param name: Call name, e.g. "sendto" or "recvfrom".
+    @param nbytes: Bytes moved by the call.
+    @returns: None
+    """
+    with _lock:
+        entry = _syscalls.get(name)
+        if entry is None:
+            entry = _syscalls[name] = [0, 0]
+        entry[0] += 1
+        entry[1] += nbytes
+
+
+def timeout(name):
+    """
+    Description: Counts one receive timeout. Callers guard with `if instrumentation.ENABLED`.
+
+    @param name: Function that timed out, e.g. "sr".
+    @returns: None
+    """
+    with _lock:
+        _timeouts[name] = _timeouts.get(name, 0) + 1
+
+
+def _layer_classes(cls=Packet):
+    for sub in cls.__subclasses__():
+        yield sub
+        yield from _layer_classes(sub)
+
+
+def _wrap_build(cls, original):
+    name = cls.__name__
+
+    def timed_build(self, *args, **kwargs):
+        start = time.perf_counter_ns()
+        data = original(self, *args, **kwargs)
+        record(name, "build", time.perf_counter_ns() - start, len(data))
+        return data
+    timed_build.__wrapped__ = original
+    return timed_build
+
+
+def _wrap_init(cls, original):
+    name = cls.__name__
+
+    def timed_init(self, *args, **kwargs):
+        raw = kwargs.get("raw") or kwargs.get("raw_bytes")
+        if not raw:
+            return original(self, *args, **kwargs)
+        start = time.perf_counter_ns()
+        original(self, *args, **kwargs)
+        record(name, "parse", time.perf_counter_ns() - start, len(raw))
+    timed_init.__wrapped__ = original
+    return timed_init
+
+
+def enable():
+    """
+    Description: Starts recording. Wraps the encoding method (to_bytes, or build when the layer
+                 has no to_bytes) and the parsing constructor of every Packet subclass currently
+                 defined. Times are inclusive of nested layers.
+
+    @returns: None
+    """
+    global ENABLED, _started
+    if ENABLED:
+        return
+    for cls in set(_layer_classes()):
+        attr = "to_bytes" if "to_bytes" in cls.__dict__ else ("build" if "build" in cls.__dict__ else None)
+        if attr:
+            original = cls.__dict__[attr]
+            _patched[(cls, attr)] = original
+            setattr(cls, attr, _wrap_build(cls, original))
+        if "__init__" in cls.__dict__:
+            original = cls.__dict__["__init__"]
+            _patched[(cls, "__init__")] = original
+            cls.__init__ = _wrap_init(cls, original)
+    _started = time.time()
+    ENABLED = True
+
+
+def disable():
+    """
+    Description: Stops recording and restores the original layer methods. Counters are kept
+                 until reset().
+
+    @returns: None
+    """
+    global ENABLED
+    if not ENABLED:
+        return
+    ENABLED = False
+    for (cls, attr), original in _patched.items():
+        setattr(cls, attr, original)
+    _patched.clear()
+
+
+def reset():
+    """
+    Description: Clears every counter.
+
+    @returns: None
+    """
+    global _started
+    with _lock:
+        _layers.clear()
+        _syscalls.clear()
+        _timeouts.clear()
+    _started = time.time() if ENABLED else None
+
+
+def snapshot(clear=False):
+    """
+    Description: Returns a JSON-serialisable copy of every counter.
+
+    @param clear: Reset the counters after taking the snapshot (for interval exports).
+    @returns: (dict) {"enabled", "since", "time", "layers": {layer: {op: stats}},
+              "syscalls": {name: {"count", "bytes"}}, "timeouts": {name: count}}
+    """
+    global _started
+    with _lock:
+        layers = {}
+        for (layer, op), stats in _layers.items():
+            layers.setdefault(layer, {})[op] = stats.as_dict()
+        result = {
+            "enabled": ENABLED,
+            "since": _started,
+            "time": time.time(),
+            "layers": layers,
+            "syscalls": {name: {"count": c, "bytes": b} for name, (c, b) in _syscalls.items()},
+            "timeouts": dict(_timeouts),
+        }
+        if clear:
+            _layers.clear()
+            _syscalls.clear()
+            _timeouts.clear()
+            _started = result["time"]
+    return result
+
+
+class Exporter:
+    def __init__(self, interval=10.0, sink=None, clear=False):
+        """
+        Description: Background thread that hands a snapshot to a sink every interval seconds.
+
+        @param interval: Seconds between exports.
+        @param sink: Callable taking the snapshot dict; defaults to one JSON line on stderr.
+        @param clear: Reset counters after each export so every snapshot covers one interval.
+        @returns: None
+        """
+        self.interval = interval
+        self.sink = sink or (lambda snap: print(json.dumps(snap), file=sys.stderr, flush=True))
+        self.clear = clear
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Description: Stops the thread after one final export.
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sink(snapshot(clear=self.clear))
+        self.sink(snapshot(clear=self.clear))
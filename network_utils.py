@@ -1,70 +1,313 @@
 import socket
 import socket
+import time
+import events
+import instrumentation
+from Packet import Packet
 from Ether import Ether
+from ICMP import ICMP, probe_key
+from arp_resolver import get_resolver
+import routing
+import transports
+import dedup as dedup_tags
 
 
-def send(pkt):
+def _transport(transport, interface=None, **options):
+    """
+    Description: Transport for one call: the one given, else the default set with
+                 transports.set_default(), else raw sockets opened for this call only
+                 (created with options).
+
+    @returns: (tuple) (transport, True when the caller must close it).
+    """
+    if transport is None:
+        transport = transports.get_default()
+    if transport is None:
+        return transports.RawTransport(interface, **options), True
+    return transport, False
+
+
+def send(pkt, transport=None):
     """
     Description: Transmit a packet at Layer 3 (IP). Uses a raw socket with AF_INET.
                  The socket automatically adds Ethernet headers and FCS.
 
 
     @param pkt: The stacked packet object starting at IP or Ether layer.
+    @param transport: Transport to send on (see transports.py; raw sockets by default).
     @returns: None
     """
     if isinstance(pkt, Ether):
         pkt = pkt.payload # move to layer 3
-   
+
     # Build bytes (Ether is skipped, starts from IP layer)
     packet_bytes = pkt.build()
 
+    transport, owned = _transport(transport)
+    try:
+        # Send using destination IP from IP layer
+        transport.send_datagram(packet_bytes, pkt.dest_IP)
+    finally:
+        if owned:
+            transport.close()
+    if events.ACTIVE:
+        events.emit(events.SENT, "send", pkt, dest_IP=pkt.dest_IP, layer=3)
+
+def send_many(packets, transport=None):
+    """
+    Description: Transmit many IP datagrams through one raw socket. A packet whose fields hold
+                 ranges is expanded lazily (see Packet.expand()), so probe sets of any size
+                 are sent without being materialized.
+
+    @param packets: A packet with ranges in its fields, or an iterable of IP packets or
+                    datagram bytes (e.g. an Expansion).
+    @param transport: Transport to send on (raw sockets by default).
+    @returns: (int) Number of datagrams sent.
+    """
+    if isinstance(packets, Packet):
+        if isinstance(packets, Ether):
+            packets = packets.payload
+        packets = packets.expand()
+    transport, owned = _transport(transport)
+    count = 0
+    try:
+        for packet in packets:
+            packet_bytes = packet if isinstance(packet, (bytes, bytearray)) else packet.build()
+            #destination straight from the IPv4 header
+            dest_IP = socket.inet_ntoa(packet_bytes[16:20])
+            transport.send_datagram(packet_bytes, dest_IP)
+            count += 1
+            if events.ACTIVE:
+                events.emit(events.SENT, "send", packet if isinstance(packet, Packet) else None,
+                            dest_IP=dest_IP, layer=3)
+    finally:
+        if owned:
+            transport.close()
+    return count
+
+
+def _fill_l2(packets, interface, next_hop=None):
+    """
+    Description: Fills in missing Ethernet addresses: the source from the interface and the
+                 destination by resolving the next hop with ARP. Without an explicit next_hop,
+                 each packet's next hop comes from the routing table (its gateway, or the IP
+                 destination itself when on-link). All next hops are resolved in one batch.
+                 Missing IP source addresses are filled from the interface. The packets are
+                 updated in place.
+
+    @param packets: Ether packets to complete.
+    @param interface: Interface the packets will leave from.
+    @param next_hop: IPv4 address to resolve instead of each packet's next hop (a gateway).
+    @returns: None
+    """
+    missing = [pkt for pkt in packets if pkt.dest_mac is None or pkt.src_mac is None
+               or getattr(pkt.payload, "src_IP", True) is None]
+    if not missing:
+        return
+    resolver = get_resolver(interface)
+    table = routing.get_table()
+    targets = {}
+    for pkt in missing:
+        ip = pkt.payload
+        if pkt.src_mac is None:
+            pkt.src_mac = resolver.src_mac
+        if getattr(ip, "src_IP", True) is None:
+            ip.src_IP = resolver.src_IP
+        if pkt.dest_mac is None:
+            target = next_hop
+            if target is None:
+                dest = getattr(ip, "dest_IP", None)
+                if dest is None:
+                    raise ValueError("No destination MAC and no IP destination to resolve it from")
+                route = table.route(dest)
+                #a gateway is only meaningful on the interface its route leaves from
+                target = route.gateway if route is not None and route.gateway and route.interface == interface else dest
+            targets.setdefault(target, []).append(pkt)
+    resolved = resolver.resolve_many(targets)
+    for target, pkts in targets.items():
+        mac = resolved.get(target)
+        if mac is None:
+            raise ValueError(f"Could not resolve MAC address for {target} on {interface}")
+        for pkt in pkts:
+            pkt.dest_mac = mac
+
 
-    # Create new raw socket for layer 3 transmission
-    sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_RAW)
+def _route_interface(packet):
+    """
+    Description: Outgoing interface for an Ether packet, chosen by longest-prefix match on the
+                 IP layer's destination.
+
+    @param packet: Ether packet carrying an IP layer.
+    @returns: (str) Interface name.
+    """
+    dest = getattr(packet.payload, "dest_IP", None)
+    if dest is None:
+        raise ValueError("No interface given and no IP destination to route")
+    found = routing.get_table().route(dest)
+    if found is None:
+        raise ValueError(f"No route to {dest}")
+    return found.interface
 
 
-    # Send using destination IP from IP layer
-    sock.sendto(packet_bytes, (pkt.dest_IP, 0))
-    sock.close()
-    print(f"[+] sent packet to {pkt.dest_IP} (layer 3)")
-    sock.close()
-   
-def sendp(packet, interface):
+def sendp(packet, interface=None, next_hop=None, transport=None):
     """
     Description: Transmit a packet at Layer 2 (Ethernet). Uses a raw socket with AF_PACKET.
-                 You must include the full Ethernet frame (Ether + higher layers).
+                 You must include the full Ethernet frame (Ether + higher layers). A missing
+                 dest_mac is resolved with ARP (through the interface's neighbor cache) and a
+                 missing src_mac is taken from the interface. On a transport other than raw
+                 sockets, missing addresses come from the transport (see Transport.frame).
 
 
     @param pkt: The stacked packet object starting at Ether layer.
-    @param interface: The name of the network interface to send from (e.g., 'eth0', 'ens33').
+    @param interface: The name of the network interface to send from (e.g., 'eth0', 'ens33');
+                      chosen from the routing table when omitted.
+    @param next_hop: IPv4 address whose MAC to use when dest_mac is missing (e.g. a gateway);
+                     defaults to the routed next hop for the IP layer's destination.
+    @param transport: Transport to send on (raw sockets by default).
     @returns: None
     """
     #packet must start with ether to send
     if not isinstance(packet, Ether):
         raise ValueError("Packet msut start with Ether to send")
-    sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW)
-    sock.bind((interface, 0))
-    packet_bytes = packet.build()
-    sock.send(packet_bytes)
-    print(f"[+] sent packet on {interface} (layer 2)")
-    #close the socket
-    sock.close()
+    if transport is None:
+        transport = transports.get_default()
+    if transport is None or isinstance(transport, transports.RawTransport):
+        if interface is None:
+            interface = getattr(transport, "interface", None) or _route_interface(packet)
+        _fill_l2([packet], interface, next_hop)
+    transport, owned = _transport(transport, interface)
+    try:
+        packet_bytes = transport.frame(packet)
+        if isinstance(transport, transports.RawTransport):
+            transport.send_frame_on(packet_bytes, interface)
+        else:
+            transport.send_frame(packet_bytes)
+    finally:
+        #close the socket
+        if owned:
+            transport.close()
+    if events.ACTIVE:
+        events.emit(events.SENT, "sendp", packet, interface=interface, layer=2)
+
+
+def sendp_many(packets, interface=None, next_hop=None, transport=None):
+    """
+    Description: Transmit many Ethernet frames with one socket per interface. Missing
+                 destination MACs are resolved with a single ARP sweep per interface before
+                 anything is sent.
+
+    @param packets: Iterable of Ether packets.
+    @param interface: The name of the network interface to send from; when omitted each
+                      packet is routed by its IP destination.
+    @param next_hop: IPv4 address whose MAC to use when dest_mac is missing.
+    @param transport: Transport to send on (raw sockets by default).
+    @returns: (int) Number of frames sent.
+    """
+    if transport is None:
+        transport = transports.get_default()
+    if transport is not None and not isinstance(transport, transports.RawTransport):
+        packets = list(packets)
+        for packet in packets:
+            if not isinstance(packet, Ether):
+                raise ValueError("Packet msut start with Ether to send")
+        count = transport.send_frames([transport.frame(packet) for packet in packets])
+        if events.ACTIVE:
+            for packet in packets:
+                events.emit(events.SENT, "sendp", packet, interface=None, layer=2)
+        return count
+    by_interface = {}
+    count = 0
+    for packet in packets:
+        if not isinstance(packet, Ether):
+            raise ValueError("Packet msut start with Ether to send")
+        by_interface.setdefault(interface or getattr(transport, "interface", None)
+                                or _route_interface(packet), []).append(packet)
+    for iface, group in by_interface.items():
+        _fill_l2(group, iface, next_hop)
+    transport, owned = _transport(transport, interface)
+    try:
+        for iface, group in by_interface.items():
+            for packet in group:
+                transport.send_frame_on(packet.build(), iface)
+                if events.ACTIVE:
+                    events.emit(events.SENT, "sendp", packet, interface=iface, layer=2)
+            count += len(group)
+    finally:
+        if owned:
+            transport.close()
+    return count
+
 
 
 
 
 
+def _receive(transport, timeout, pool):
+    """
+    Description: Receives one frame for sr()/sniff(): as a new bytes object, or into a slot of
+                 pool (see buffer_pool.py) when one is given.
+
+    @returns: (tuple or None) (timestamp, frame, pooled frame or None), or None on timeout.
+    """
+    if pool is None:
+        received = transport.recv_stamped(timeout)
+        return None if received is None else (received[0], received[1], None)
+    frame = pool.recv(transport, timeout)
+    return None if frame is None else (frame.time, frame.data, frame)
+
 
-def sr(packet, timeout=2):
+def _answers(probe, probe_bytes, reply):
+    """
+    Description: Whether a received packet answers a probe sent by sr(): an ICMP error quoting
+                 it, or a packet from the probe's destination back to its source that replies
+                 to it (echo reply with the probe's ID and seq, or TCP/UDP with the ports
+                 swapped). Other traffic, including copies of the probe itself, does not.
+
+    @param probe: The network layer sent (IP or IPv6).
+    @param probe_bytes: Its bytes as sent.
+    @param reply: The received packet, decoded by the transport.
+    @returns: (bool)
+    """
+    layer = reply.payload if isinstance(reply, Ether) else reply
+    if not hasattr(layer, "src_IP") or not hasattr(layer, "dest_IP"):
+        return False
+    inner, answer = probe.payload, layer.payload
+    if isinstance(answer, ICMP) and answer.is_error():
+        return answer.match_key() == probe_key(probe_bytes)
+    if type(layer) is not type(probe):
+        return False
+    #compared packed, so differently written IPv6 addresses are still equal
+    addresses = type(probe)
+    if addresses.src_IP.packed(layer) != addresses.dest_IP.packed(probe):
+        return False
+    if probe.src_IP is not None and addresses.dest_IP.packed(layer) != addresses.src_IP.packed(probe):
+        return False
+    if hasattr(inner, "icmp_type"):
+        return (type(answer) is type(inner) and answer.icmp_type != inner.icmp_type and
+                answer.ID == inner.ID and answer.seq == inner.seq)
+    if hasattr(inner, "src_port"):
+        return (type(answer) is type(inner) and answer.src_port == inner.dst_port and
+                answer.dst_port == inner.src_port)
+    return layer.build() != probe_bytes
+
+
+def sr(packet, timeout=2, transport=None, pool=None):
     """
     Description: Sends a packet at Layer 3 and receives a reply.
                  Uses a raw socket (AF_INET, SOCK_RAW) for sending
                  and a Layer 2 raw socket (AF_PACKET) for receiving.
+                 Frames that do not answer the probe (see _answers) are skipped until the
+                 reply arrives or the timeout passes.
 
 
     @param pkt: The stacked packet object starting at IP or Ether layer.
     @param timeout: Timeout in seconds to wait for a reply.
-    @returns: The received packet object built from reply bytes.
+    @param transport: Transport to send and receive on (raw sockets by default).
+    @param pool: BufferPool to receive the reply into; the reply is then parsed in place and
+                 must be release()d when done with.
+    @returns: The received packet object built from reply bytes. Its time is when it arrived
+              and its sent_time when the probe left (kernel timestamps on raw sockets), so
+              its rtt excludes the time spent building, dissecting and reporting.
     """
     if isinstance(packet, Ether):
             l3_pkt= packet.payload
@@ -72,62 +315,280 @@ def sr(packet, timeout=2):
         l3_pkt = packet
     if l3_pkt is None:
         raise ValueError(" No IP layer found to send")
-   
-    #send socket
-    send_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_RAW)
-    dest_ip = l3_pkt.dest_IP
-    send_sock.sendto(l3_pkt.build(), (dest_ip, 0))
-    print( f"[+] sent packet to {dest_ip}, waiting for reply...")
-
-
-    #recieve socket
-    recv_sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(0x0003))
-    recv_sock.settimeout(timeout)
-
 
+    transport, owned = _transport(transport)
     try:
-        raw_bytes, addr = recv_sock.recvfrom(65535)
-        pkt_recv = Ether(raw=raw_bytes)
-        print("[+] Received reply")
-        pkt_recv.show()
+        dest_ip = l3_pkt.dest_IP
+        packet_bytes = l3_pkt.build()
+        sent_time = transport.send_datagram_stamped(packet_bytes, dest_ip)
+        if events.ACTIVE:
+            events.emit(events.SENT, "sr", l3_pkt, dest_IP=dest_ip, layer=3)
+
+        deadline = time.monotonic() + timeout
+        while True:
+            received = _receive(transport, max(0.0, deadline - time.monotonic()), pool)
+            #if no reply recieved by timeout send message and return none
+            if received is None:
+                if instrumentation.ENABLED:
+                    instrumentation.timeout("sr")
+                if events.ACTIVE:
+                    events.emit(events.TIMEOUT, "sr", timeout=timeout)
+                return None
+            received_time, raw_bytes, pooled = received
+            pkt_recv = transport.decode(raw_bytes)
+            if _answers(l3_pkt, packet_bytes, pkt_recv):
+                break
+            if pooled is not None:
+                pooled.release()
+        pkt_recv.buffer = pooled
+        pkt_recv.time = received_time
+        pkt_recv.sent_time = sent_time
+        if events.ACTIVE:
+            events.emit(events.RECEIVED, "sr", pkt_recv, length=len(raw_bytes), rtt=pkt_recv.rtt)
         return pkt_recv
-    #if no reply recieved by timeout send message and return none
-    except socket.timeout:
-        print("[-] Timeout: No reply received")
-        return None
     finally:
         #close both sockets
-        send_sock.close()
-        recv_sock.close()
+        if owned:
+            transport.close()
 
 
 
 
-def sniff(timeout=5):
+def sniff(timeout=5, transport=None, pool=None):
     """
     Description: Captures one packet at Layer 2 on any interface.
                  Builds a Packet hierarchy (starting from Ether) from received bytes
-                 and displays it using the show() method.
-
+                 and reports it as an events.RECEIVED event (silent unless a sink is set).
 
 
-
-    @returns: The captured packet object built from received bytes.
+    @param timeout: Timeout in seconds to wait for a packet.
+    @param transport: Transport to receive on (raw sockets by default).
+    @param pool: BufferPool to receive into; the packet is then parsed in place and must be
+                 release()d when done with.
+    @returns: The captured packet object built from received bytes (its time is when it
+              arrived).
     """
     #open socket to recieve packet
-    recv_sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(0x0003))
-    recv_sock.settimeout(5)
+    transport, owned = _transport(transport)
     try:
-        raw_bytes,addr = recv_sock.recvfrom(65535)
-        pkt_recv = Ether(raw=raw_bytes)
-        print("[+] Sniffed a packet")
-        #print what was recieved
-        pkt_recv.show()
+        received = _receive(transport, timeout, pool)
+        if received is None:
+            #timeout and no packet was recieved on socket
+            if instrumentation.ENABLED:
+                instrumentation.timeout("sniff")
+            if events.ACTIVE:
+                events.emit(events.TIMEOUT, "sniff", timeout=timeout)
+            return None
+        received_time, raw_bytes, pooled = received
+        pkt_recv = transport.decode(raw_bytes)
+        pkt_recv.buffer = pooled
+        pkt_recv.time = received_time
+        #report what was recieved (only rendered if a sink is listening)
+        if events.ACTIVE:
+            events.emit(events.RECEIVED, "sniff", pkt_recv, length=len(raw_bytes))
         return pkt_recv
-    except socket.timeout:
-        #timeout and no packet was recieved on socket
-        print("[-] Timeout: No packet recieved")
-        return None
     finally:
         #close sock
-        recv_sock.close()
+        if owned:
+            transport.close()
+
+
+#consecutive full batches (or batches with the sink over PRESSURE_LOAD) that turn on the
+#header-only fast path, and calm batches that turn it off again
+PRESSURE_BATCHES = 4
+PRESSURE_LOAD = 0.5
+#seconds between readings of the link's drop counters
+LINK_STATS_INTERVAL = 0.1
+#receive buffer of the raw socket capture() opens, to ride out bursts
+CAPTURE_RCVBUF = 4 << 20
+
+
+class CaptureStats:
+    def __init__(self):
+        """
+        Description: Counters of a capture() run, updated while it runs.
+
+        received      - frames read from the transport
+        delivered     - frames handed to the sink
+        sampled_out   - frames a sampler did not keep
+        duplicates    - copies of an earlier frame dropped by dedup
+        retransmits   - TCP retransmissions dedup found (still delivered)
+        truncated     - frames cut to their headers under pressure
+        pressure      - True while the header-only fast path is on
+        pressure_runs - times it was turned on
+        link_received / link_dropped - the link's own counters over the capture (kernel
+                        drops for raw sockets), None when the transport has none
+        sink_dropped  - frames the sink reports it dropped (sinks with stats(), e.g. a
+                        RotatingPcapWriter), None otherwise
+        """
+        self.received = 0
+        self.delivered = 0
+        self.duplicates = 0
+        self.retransmits = 0
+        self.truncated = 0
+        self.pressure = False
+        self.pressure_runs = 0
+        self.link_received = None
+        self.link_dropped = None
+        self.sink_dropped = None
+
+    @property
+    def sampled_out(self):
+        #frames a FlowReservoir still holds count here until it emits them
+        return self.received - self.delivered - self.duplicates
+
+    @property
+    def missed(self):
+        """
+        Description: Frames lost before they reached the sink's storage: dropped by the link
+                     plus dropped by the sink (sampled-out frames are not counted).
+        """
+        return (self.link_dropped or 0) + (self.sink_dropped or 0)
+
+    def as_dict(self):
+        return {"received": self.received, "delivered": self.delivered, "sampled_out": self.sampled_out,
+                "duplicates": self.duplicates, "retransmits": self.retransmits, "truncated": self.truncated,
+                "pressure": self.pressure, "pressure_runs": self.pressure_runs,
+                "link_received": self.link_received, "link_dropped": self.link_dropped,
+                "sink_dropped": self.sink_dropped, "missed": self.missed}
+
+    def __repr__(self):
+        return f"<CaptureStats {self.as_dict()}>"
+
+
+def _read_link_stats(stats, transport, sink, base):
+    """
+    Description: Refreshes the link and sink counters of stats.
+
+    @param base: The link's counters when the capture started.
+    @returns: (bool) True when the link dropped frames since the last reading.
+    """
+    link = transport.link_stats()
+    dropped = False
+    if link is not None:
+        received, drops = link["received"] - base["received"], link["dropped"] - base["dropped"]
+        dropped = stats.link_dropped is not None and drops > stats.link_dropped
+        stats.link_received, stats.link_dropped = received, drops
+    sink_stats = getattr(sink, "stats", None)
+    if callable(sink_stats):
+        stats.sink_dropped = sink_stats().get("dropped")
+    return dropped
+
+
+def capture(sink, interface=None, count=None, timeout=None, transport=None, batch=64,
+            sampler=None, header_snaplen=None, stats=None, dedup=None, pool=None):
+    """
+    Description: Captures frames at Layer 2 and hands each one, undecoded, to sink. Meant for
+                 long captures: with a pcap.RotatingPcapWriter as the sink, frames are queued
+                 for its writer thread and the loop never waits on the disk.
+
+                 Under overload the capture degrades instead of silently falling behind: a
+                 sampler (see sampling.py) can thin the stream, and with header_snaplen set,
+                 frames are cut to their first header_snaplen bytes while the capture is
+                 under pressure (the link dropped frames, the transport keeps returning full
+                 batches, or the sink's load is over PRESSURE_LOAD). On raw sockets the kernel
+                 then copies only the headers. What was missed is counted in stats.
+
+                 With dedup, copies of one packet seen more than once (e.g. by several taps
+                 feeding the interface) are dropped before the sampler and sink, and TCP
+                 retransmissions are counted; dedup.on_tag sees both as they are found.
+
+                 With a pool (buffer_pool.BufferPool), frames are received into its slots
+                 instead of new bytes objects, and the slots are reused once the batch has
+                 been through dedup, the sampler and the sink: frames that are dropped or
+                 sampled out are never copied. The sink (and dedup.on_tag) then gets
+                 memoryviews that are only valid during the call; RotatingPcapWriter and the
+                 samplers copy what they keep, other sinks have to do the same.
+
+    @param sink: Callable sink(timestamp, frame bytes), e.g. a RotatingPcapWriter; the
+                 timestamp is the kernel's receive time where the transport has one. A frame
+                 cut to its headers is passed as sink(timestamp, frame, original length).
+    @param interface: Interface to capture on (default: all).
+    @param count: Stop after this many frames (default: no limit).
+    @param timeout: Stop after this many seconds (default: no limit).
+    @param transport: Transport to receive on (raw sockets by default).
+    @param batch: Most frames taken from the transport per wakeup.
+    @param sampler: Sampler deciding which frames reach the sink (default: all do).
+    @param header_snaplen: Bytes kept per frame under pressure (default: frames are never cut).
+    @param stats: CaptureStats to update (e.g. to watch from another thread).
+    @param dedup: dedup.DedupIndex to tag duplicates and retransmissions with (default: none).
+    @param pool: BufferPool to receive into, with at least batch slots (default: none).
+    @returns: (int) Number of frames captured (read from the transport).
+    """
+    stats = stats if stats is not None else CaptureStats()
+    transport, owned = _transport(transport, interface, rcvbuf=CAPTURE_RCVBUF)
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    has_load = hasattr(type(sink), "load")
+    busy = calm = 0
+    base = transport.link_stats() or {"received": 0, "dropped": 0}
+    _read_link_stats(stats, transport, sink, base)
+    next_stats = time.monotonic() + LINK_STATS_INTERVAL
+
+    def deliver(stamp, frame, original):
+        if original != len(frame):
+            sink(stamp, frame, original)
+        else:
+            sink(stamp, frame)
+        stats.delivered += 1
+        if events.ACTIVE:
+            events.emit(events.RECEIVED, "capture", None, length=original)
+
+    try:
+        while count is None or stats.received < count:
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+            wanted = batch if count is None else min(batch, count - stats.received)
+            snaplen = header_snaplen if stats.pressure else None
+            if pool is None:
+                slots = ()
+                frames = transport.recv_stamped_frames(wanted, remaining, snaplen)
+            else:
+                slots = pool.recv_many(transport, wanted, remaining, snaplen)
+                frames = [(slot.time, slot.data, slot.original) for slot in slots]
+            if not frames:
+                break
+            stats.received += len(frames)
+            try:
+                for stamp, frame, original in frames:
+                    if original != len(frame):
+                        stats.truncated += 1
+                    if dedup is not None:
+                        tag = dedup.classify(stamp, frame)
+                        if tag is not dedup_tags.NEW:
+                            if tag is dedup_tags.DUPLICATE:
+                                stats.duplicates += 1
+                                continue
+                            stats.retransmits += 1
+                    if sampler is None:
+                        deliver(stamp, frame, original)
+                    else:
+                        sampler.feed(stamp, frame, original, deliver)
+            finally:
+                for slot in slots:
+                    slot.release()
+            dropping = False
+            if time.monotonic() >= next_stats:
+                dropping = _read_link_stats(stats, transport, sink, base)
+                next_stats = time.monotonic() + LINK_STATS_INTERVAL
+            if header_snaplen is not None:
+                #a full batch means more frames were already queued behind it
+                if len(frames) == batch or (has_load and sink.load > PRESSURE_LOAD):
+                    busy, calm = busy + 1, 0
+                else:
+                    busy, calm = 0, calm + 1
+                if not stats.pressure and (dropping or busy >= PRESSURE_BATCHES):
+                    stats.pressure = True
+                    stats.pressure_runs += 1
+                    calm = 0
+                elif stats.pressure and calm >= PRESSURE_BATCHES:
+                    stats.pressure = False
+        if sampler is not None:
+            sampler.flush(deliver)
+        _read_link_stats(stats, transport, sink, base)
+    finally:
+        if owned:
+            transport.close()
+    return stats.received
@@ -0,0 +1,433 @@
+"""
+pcap.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Streaming reader and writers for classic pcap capture files (microsecond and
+             nanosecond timestamp variants, either byte order). Records are read one at a time,
+             so captures of any size are processed in constant memory; gzip, bzip2 and xz
+             compressed captures are read transparently.
+
+             RotatingPcapWriter persists long captures: the capture loop only appends frames
+             to a bounded queue, and a writer thread turns them into large buffered writes
+             to size- or time-rotated (optionally compressed) files. Frames that arrive while
+             the queue is full are dropped and counted, so capture never waits on the disk.
+"""
+
+import bz2
+import collections
+import gzip
+import lzma
+import os
+import struct
+import threading
+
+
+MAGIC_USEC = 0xA1B2C3D4
+MAGIC_NSEC = 0xA1B23C4D
+
+#link types (the network field of the global header)
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LINUX_SLL = 113
+
+
+#compressors by name, and the leading bytes of the files they write
+_COMPRESSORS = {"gzip": (gzip.open, ".gz"), "bz2": (bz2.open, ".bz2"), "xz": (lzma.open, ".xz")}
+_COMPRESSED_MAGIC = ((b"\x1f\x8b", gzip.open), (b"BZh", bz2.open), (b"\xfd7zXZ", lzma.open))
+
+_RECORD = struct.Struct("<LLLL")
+
+
+class PcapError(Exception):
+    pass
+
+
+def _open_capture(path):
+    #plain or compressed capture, opened for reading
+    file = open(path, "rb")
+    start = file.read(6)
+    for magic, opener in _COMPRESSED_MAGIC:
+        if start.startswith(magic):
+            file.close()
+            return opener(path, "rb")
+    file.seek(0)
+    return file
+
+
+def file_header(link_type=LINKTYPE_ETHERNET, snaplen=65535, nanosecond=False):
+    """
+    Description: Global header of a capture file (little-endian, version 2.4).
+
+    @param link_type: LINKTYPE_* value of the frames.
+    @param snaplen: Largest number of bytes stored per frame.
+    @param nanosecond: Nanosecond rather than microsecond timestamps.
+    @returns: (bytes) The 24-byte header.
+    """
+    return struct.pack("<LHHlLLL", MAGIC_NSEC if nanosecond else MAGIC_USEC, 2, 4, 0, 0,
+                       snaplen, link_type)
+
+
+def record_header(ts, captured, original, nanosecond=False):
+    """
+    Description: Header of one record.
+
+    @param ts: Timestamp in seconds.
+    @param captured: Number of bytes stored.
+    @param original: Length of the frame on the wire.
+    @param nanosecond: Whether the file has nanosecond timestamps.
+    @returns: (bytes) The 16-byte record header.
+    """
+    seconds = int(ts)
+    fraction = int((ts - seconds) * (1e9 if nanosecond else 1e6))
+    return _RECORD.pack(seconds, fraction, captured, original)
+
+
+class PcapReader:
+    def __init__(self, path):
+        """
+        Description: Opens a capture and reads its global header.
+
+        @param path: Path of the pcap file.
+        @returns: None
+        """
+        self._file = _open_capture(path)
+        header = self._file.read(24)
+        if len(header) < 24:
+            self._file.close()
+            raise PcapError(f"{path}: truncated pcap header")
+        for order in ("<", ">"):
+            magic = struct.unpack(order + "L", header[:4])[0]
+            if magic in (MAGIC_USEC, MAGIC_NSEC):
+                break
+        else:
+            self._file.close()
+            raise PcapError(f"{path}: not a pcap file")
+        self._divisor = 1e9 if magic == MAGIC_NSEC else 1e6
+        self.nanosecond = magic == MAGIC_NSEC
+        self.version_major, self.version_minor, _, _, self.snaplen, self.link_type = \
+            struct.unpack(order + "HHlLLL", header[4:])
+        self._record = struct.Struct(order + "LLLL")
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        """
+        Description: Next record of the capture.
+
+        @returns: (tuple) (timestamp in seconds, frame bytes, original length).
+        """
+        header = self._file.read(16)
+        if len(header) < 16:
+            raise StopIteration
+        seconds, fraction, captured, original = self._record.unpack(header)
+        data = self._file.read(captured)
+        if len(data) < captured:
+            raise StopIteration
+        return seconds + fraction / self._divisor, data, original
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_pcap(path):
+    """
+    Description: Iterates over the records of a capture file.
+
+    @param path: Path of the pcap file.
+    @returns: Generator of (timestamp, frame bytes) pairs.
+    """
+    with PcapReader(path) as reader:
+        for ts, data, _ in reader:
+            yield ts, data
+
+
+class PcapWriter:
+    def __init__(self, file, link_type=LINKTYPE_ETHERNET, snaplen=65535, nanosecond=False):
+        """
+        Description: Writes a capture file record by record, on the calling thread.
+
+        @param file: Path of the file, or a binary file object.
+        @param link_type: LINKTYPE_* value of the frames.
+        @param snaplen: Frames are cut to this many bytes.
+        @param nanosecond: Store nanosecond rather than microsecond timestamps.
+        @returns: None
+        """
+        self._owned = isinstance(file, (str, bytes, os.PathLike))
+        self._file = open(file, "wb") if self._owned else file
+        self.snaplen = snaplen
+        self.nanosecond = nanosecond
+        self._file.write(file_header(link_type, snaplen, nanosecond))
+
+    def write(self, ts, data, original=None):
+        """
+        Description: Appends one frame.
+
+        @param ts: Capture time in seconds.
+        @param data: Frame bytes.
+        @param original: Length on the wire (defaults to len(data)).
+        @returns: None
+        """
+        stored = data[:self.snaplen]
+        self._file.write(record_header(ts, len(stored), len(data) if original is None else original,
+                                       self.nanosecond) + stored)
+
+    def close(self):
+        if self._owned:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_pcap(path, records, link_type=LINKTYPE_ETHERNET):
+    """
+    Description: Writes (timestamp, frame bytes) pairs to a capture file.
+
+    @param path: Path of the pcap file.
+    @param records: Iterable of (timestamp, frame bytes).
+    @param link_type: LINKTYPE_* value of the frames.
+    @returns: (int) Number of records written.
+    """
+    count = 0
+    with PcapWriter(path, link_type) as writer:
+        for ts, data in records:
+            writer.write(ts, data)
+            count += 1
+    return count
+
+
+class RotatingPcapWriter:
+    def __init__(self, path, link_type=LINKTYPE_ETHERNET, rotate_bytes=None, rotate_seconds=None,
+                 max_files=None, compress=None, queue_size=65536, buffer_size=1 << 20,
+                 flush_interval=0.5, snaplen=65535, nanosecond=False):
+        """
+        Description: Capture sink that writes frames to disk from a background thread.
+                     write() is called from the capture loop and only appends to a bounded
+                     queue (a deque: appends and pops need no lock); the writer thread drains
+                     it, encodes the records and writes them buffer_size bytes at a time. With
+                     rotation, files are named after path with a sequence number
+                     (capture.pcap -> capture_00001.pcap, capture_00002.pcap, ...).
+
+        @param path: File name, e.g. "capture.pcap" (a compression suffix is added).
+        @param link_type: LINKTYPE_* value of the frames.
+        @param rotate_bytes: Start a new file once this many pcap bytes (before compression)
+                             were written to the current one.
+        @param rotate_seconds: Start a new file once the capture time of a frame is this far
+                               past the first frame of the current file.
+        @param max_files: Keep only the newest max_files files (a ring of files).
+        @param compress: None, "gzip", "bz2" or "xz".
+        @param queue_size: Frames the queue holds before new ones are dropped.
+        @param buffer_size: Size of the writes issued to the file.
+        @param flush_interval: Longest time (seconds) buffered frames wait while the
+                               capture is quiet.
+        @param snaplen: Frames are cut to this many bytes.
+        @param nanosecond: Store nanosecond rather than microsecond timestamps.
+        @returns: None
+        """
+        if compress is not None and compress not in _COMPRESSORS:
+            raise ValueError(f"unknown compression {compress!r}")
+        self.path = path
+        self.link_type = link_type
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.max_files = max_files
+        self.compress = compress
+        self.queue_size = queue_size
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.snaplen = snaplen
+        self.nanosecond = nanosecond
+        #counted by the capturing thread
+        self.received = 0
+        self.dropped = 0
+        #counted by the writer thread
+        self.written = 0
+        self.bytes_written = 0
+        self.failed = 0
+        self.error = None
+        self.files = []
+        self._sequence = 0
+        self._queue = collections.deque()
+        #the writer is woken early once the queue is a quarter full
+        self._wake_at = max(1, queue_size // 4)
+        self._wakeup = threading.Event()
+        self._closing = False
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name="pcap-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, ts, data, original=None):
+        """
+        Description: Queues one frame. Never blocks: when the queue is full (or the writer
+                     has stopped) the frame is dropped and counted.
+
+        @param ts: Capture time in seconds.
+        @param data: Frame bytes (kept as they are, not copied), or a memoryview into a
+                     receive buffer that is reused (copied, see capture(pool=...)).
+        @param original: Length on the wire (defaults to len(data)).
+        @returns: (bool) False when the frame was dropped.
+        """
+        self.received += 1
+        queue = self._queue
+        if len(queue) >= self.queue_size or self._closing:
+            self.dropped += 1
+            return False
+        if type(data) is memoryview:
+            data = data.tobytes()
+        queue.append((ts, data, original))
+        if len(queue) == self._wake_at:
+            self._wakeup.set()
+        return True
+
+    __call__ = write
+
+    @property
+    def load(self):
+        """
+        Description: How full the queue is (0.0 - 1.0); capture() trims frames to their
+                     headers when the writer falls behind.
+        """
+        return len(self._queue) / self.queue_size
+
+    def _file_name(self):
+        if self.rotate_bytes is None and self.rotate_seconds is None:
+            name = self.path
+        else:
+            root, ext = os.path.splitext(self.path)
+            name = f"{root}_{self._sequence:05d}{ext or '.pcap'}"
+        if self.compress:
+            name += _COMPRESSORS[self.compress][1]
+        return name
+
+    def _open(self, ts):
+        self._sequence += 1
+        name = self._file_name()
+        if self.compress:
+            #compresslevel 1: compression has to keep up with the capture
+            opener = _COMPRESSORS[self.compress][0]
+            self._file = opener(name, "wb", **({"preset": 1} if self.compress == "xz" else {"compresslevel": 1}))
+        else:
+            self._file = open(name, "wb", buffering=0)
+        self.files.append(name)
+        self._file_start = ts
+        self._file.write(file_header(self.link_type, self.snaplen, self.nanosecond))
+        self._file_bytes = 24
+        self.bytes_written += 24
+        if self.max_files and len(self.files) > self.max_files:
+            old = self.files.pop(0)
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _run(self):
+        queue, popleft = self._queue, self._queue.popleft
+        pack, snaplen = _RECORD.pack, self.snaplen
+        scale = 1e9 if self.nanosecond else 1e6
+        chunks = []
+        pending = 0
+        while True:
+            if not queue:
+                if chunks:
+                    self._flush(chunks, pending)
+                    chunks, pending = [], 0
+                if self._closing:
+                    break
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                continue
+            ts, data, original = popleft()
+            if self.error is not None:
+                self.failed += 1
+                continue
+            rotate = self._file is None or (
+                self.rotate_bytes is not None and self._file_bytes + pending >= self.rotate_bytes) or (
+                self.rotate_seconds is not None and ts - self._file_start >= self.rotate_seconds)
+            if rotate:
+                if chunks:
+                    self._flush(chunks, pending)
+                    chunks, pending = [], 0
+                try:
+                    self._close_file()
+                    self._open(ts)
+                except OSError as error:
+                    self.error = error
+                    self.failed += 1
+                    continue
+            stored = data[:snaplen] if len(data) > snaplen else data
+            seconds = int(ts)
+            chunks.append(pack(seconds, int((ts - seconds) * scale), len(stored),
+                               len(data) if original is None else original))
+            chunks.append(stored)
+            pending += 16 + len(stored)
+            if pending >= self.buffer_size:
+                self._flush(chunks, pending)
+                chunks, pending = [], 0
+        try:
+            self._close_file()
+        except OSError as error:
+            self.error = self.error or error
+
+    def _flush(self, chunks, size):
+        if self.error is not None:
+            return
+        try:
+            self._file.write(b"".join(chunks))
+        except OSError as error:
+            #the records of this write are lost; later frames are dropped
+            self.error = error
+            self.failed += len(chunks) // 2
+            return
+        self.written += len(chunks) // 2
+        self._file_bytes += size
+        self.bytes_written += size
+
+    def stats(self):
+        """
+        Description: Counters of the sink.
+
+        @returns: (dict) received, written, dropped (queue full or writer stopped), failed
+                  (lost to a disk error), queued, bytes_written (pcap bytes, before
+                  compression), files, error.
+        """
+        return {"received": self.received, "written": self.written, "dropped": self.dropped,
+                "failed": self.failed, "queued": len(self._queue), "bytes_written": self.bytes_written,
+                "files": list(self.files), "error": None if self.error is None else str(self.error)}
+
+    def close(self, timeout=None):
+        """
+        Description: Stops accepting frames, writes out everything queued and closes the file.
+
+        @param timeout: Longest time to wait for the writer thread (None waits until done).
+        @returns: None
+        """
+        self._closing = True
+        self._wakeup.set()
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            #a frame queued while the writer was finishing
+            self.dropped += len(self._queue)
+            self._queue.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
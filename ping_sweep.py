@@ -0,0 +1,335 @@
+"""
+ping_sweep.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Concurrent ICMP echo sweeper built on the ICMP layer. Pings a whole CIDR range
+             (or a list of targets) through one shared raw socket: a sender thread streams
+             templated echo requests at a limited rate while the receive loop matches replies
+             back to their probe in O(1) and collects per-host RTT and loss statistics.
+             Replies are timed with the kernel's receive timestamp, so RTTs do not grow while
+             replies wait for the receive loop under load. Given a transport (see
+             transports.py), the sweep runs over it instead of a raw ICMP socket, e.g. against
+             an in-memory responder.
+"""
+
+import ipaddress
+import os
+import select
+import socket
+import struct
+import threading
+import time
+from array import array
+from ICMP import ICMP
+from IP import IP
+from pcap import LINKTYPE_RAW
+import timestamps
+
+
+def expand_targets(targets):
+    """
+    Description: Expands a target specification into a list of IPv4 address strings.
+                 Networks contribute their usable hosts (the address itself for /31 and /32).
+
+    @param targets: A CIDR string ("10.0.0.0/16"), a single address, or an iterable of those.
+    @returns: (list) IPv4 address strings in the order given.
+    """
+    if isinstance(targets, str):
+        targets = [targets]
+    hosts = []
+    for target in targets:
+        network = ipaddress.ip_network(str(target), strict=False)
+        if network.num_addresses <= 2:
+            hosts.extend(str(addr) for addr in network)
+        else:
+            hosts.extend(str(addr) for addr in network.hosts())
+    return hosts
+
+
+class PingResult:
+    def __init__(self, host):
+        """
+        Description: Holds the echo statistics collected for one host during a sweep.
+
+        @param host: IPv4 address string of the host.
+        @returns: None
+        """
+        self.host = host
+        self.sent = 0
+        self.received = 0
+        self.rtts = []
+
+    @property
+    def loss(self):
+        """
+        Description: Fraction of echo requests that went unanswered (0.0 - 1.0).
+        """
+        if not self.sent:
+            return 0.0
+        return 1.0 - self.received / self.sent
+
+    @property
+    def alive(self):
+        """
+        Description: True when the host answered at least one echo request.
+        """
+        return self.received > 0
+
+    @property
+    def rtt_min(self):
+        return min(self.rtts) if self.rtts else None
+
+    @property
+    def rtt_avg(self):
+        return sum(self.rtts) / len(self.rtts) if self.rtts else None
+
+    @property
+    def rtt_max(self):
+        return max(self.rtts) if self.rtts else None
+
+    def __repr__(self):
+        rtt = f"{self.rtt_avg * 1000:.3f}ms" if self.rtts else "-"
+        return f"<PingResult {self.host} {self.received}/{self.sent} avg={rtt}>"
+
+
+class PingSweeper:
+    def __init__(self, targets, count=1, rate=10000, timeout=1.0, payload=b'', ID=None,
+                 transport=None, source=None):
+        """
+        Description: Prepares a sweep over every target. Each probe gets a unique (ID, seq) pair:
+                     seq carries the low 16 bits of the probe index and ID the high bits offset
+                     from a per-sweep base, so a reply maps straight back to its probe index.
+
+        @param targets: CIDR string, address, or iterable of those (see expand_targets).
+        @param count: Number of echo requests sent to each host.
+        @param rate: Maximum probes per second (None or 0 disables rate limiting).
+        @param timeout: Seconds to keep listening after the last probe has been sent.
+        @param payload: (bytes) Echo data carried by every request.
+        @param ID: Base ICMP identifier (defaults to one derived from the process id).
+        @param transport: Transport to sweep over instead of a raw ICMP socket.
+        @param source: Our IPv4 address on transport (needed with one, as the kernel does not
+                       fill it in there).
+        @returns: None
+        """
+        if transport is not None and source is None:
+            raise ValueError("A sweep over a transport needs a source address")
+        self.hosts = expand_targets(targets)
+        self.count = int(count)
+        self.rate = rate
+        self.timeout = timeout
+        self.payload = payload
+        self.base_id = (os.getpid() if ID is None else ID) & 0xFFFF
+        self.total = len(self.hosts) * self.count
+        if self.total > 1 << 32:
+            raise ValueError("Too many probes for the 32 bit ID/seq space")
+
+        # packed addresses let the matcher validate the reply source without formatting it
+        self._packed = [socket.inet_aton(host) for host in self.hosts]
+        self._sent_at = array('d', bytes(8 * self.total))
+        self.results = {host: PingResult(host) for host in self.hosts}
+
+        # the template is built once with ID=seq=0; its checksum is then patched per probe
+        template = ICMP(icmp_type=8, code=0, ID=0, seq=0, payload=payload).to_bytes()
+        self._template = bytearray(template)
+        self._base_sum = ~struct.unpack_from('!H', template, 2)[0] & 0xFFFF
+        self.sock = None
+        self.transport = transport
+        self.source = source
+
+    def _probe(self, index):
+        """
+        Description: Fills the shared template with the ID, seq and checksum for one probe index.
+
+        @param index: Probe index in [0, total).
+        @returns: (bytearray) The ready-to-send ICMP echo request.
+        """
+        ident = (self.base_id + (index >> 16)) & 0xFFFF
+        seq = index & 0xFFFF
+        # incremental one's complement update of the zero-ID/seq checksum
+        csum = self._base_sum + ident + seq
+        csum = (csum >> 16) + (csum & 0xFFFF)
+        csum += csum >> 16
+        struct.pack_into('!HHH', self._template, 2, ~csum & 0xFFFF, ident, seq)
+        return self._template
+
+    def _match(self, raw):
+        """
+        Description: Maps a received IPv4 datagram back to the probe index it answers.
+
+        @param raw: Bytes returned by the raw ICMP socket (IP header + ICMP message).
+        @returns: (int or None) Probe index, or None when the datagram is not one of our replies.
+        """
+        ihl = (raw[0] & 0x0F) * 4
+        if len(raw) < ihl + 8 or raw[ihl] != 0:
+            return None
+        ident, seq = struct.unpack_from('!HH', raw, ihl + 4)
+        index = ((ident - self.base_id) & 0xFFFF) << 16 | seq
+        if index >= self.total or raw[12:16] != self._packed[index % len(self.hosts)]:
+            return None
+        return index
+
+    def _send_loop(self, done):
+        """
+        Description: Streams every probe through the shared socket, round by round,
+                     sleeping whenever it runs ahead of the configured rate.
+
+        @param done: (threading.Event) Set once the last probe has been handed to the kernel.
+        @returns: None
+        """
+        sock = self.sock
+        hosts = self.hosts
+        sent_at = self._sent_at
+        n_hosts = len(hosts)
+        start = time.perf_counter()
+        try:
+            for index in range(self.total):
+                if self.rate:
+                    ahead = index / self.rate - (time.perf_counter() - start)
+                    if ahead > 0.001:
+                        time.sleep(ahead)
+                host = hosts[index % n_hosts]
+                packet = self._probe(index)
+                #wall clock, the kernel's receive timestamps use it too
+                sent_at[index] = time.time()
+                if sock is None:
+                    # transports take whole datagrams; the kernel adds the IP header otherwise
+                    self.transport.send_datagram(IP(src_IP=self.source, dest_IP=host, protocol=1,
+                                                    payload=bytes(packet)).build(), host)
+                    self.results[host].sent += 1
+                    continue
+                try:
+                    sock.sendto(packet, (host, 0))
+                except BlockingIOError:
+                    # socket buffer is full, give the kernel a moment and retry once
+                    select.select([], [sock], [], 0.01)
+                    try:
+                        sock.sendto(packet, (host, 0))
+                    except OSError:
+                        sent_at[index] = 0.0
+                except OSError:
+                    # unreachable or unroutable targets simply count as lost
+                    sent_at[index] = 0.0
+                self.results[host].sent += 1
+        finally:
+            done.set()
+
+    def run(self):
+        """
+        Description: Runs the sweep to completion and returns the per-host statistics.
+
+        @returns: (dict) Mapping of host address string to PingResult.
+        """
+        if self.transport is not None:
+            done = threading.Event()
+            sender = threading.Thread(target=self._send_loop, args=(done,), daemon=True)
+            sender.start()
+            self._recv_loop(done)
+            sender.join()
+            return self.results
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 22)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 22)
+            self.sock.setblocking(False)
+            timestamps.enable_rx(self.sock)
+
+            done = threading.Event()
+            sender = threading.Thread(target=self._send_loop, args=(done,), daemon=True)
+            sender.start()
+            self._recv_loop(done)
+            sender.join()
+        finally:
+            self.sock.close()
+            self.sock = None
+        return self.results
+
+    def _recv_loop(self, done):
+        """
+        Description: Drains replies until the sender has finished and the timeout has elapsed
+                     since the last probe was sent.
+
+        @param done: (threading.Event) Set by the sender when it has sent everything.
+        @returns: None
+        """
+        sock = self.sock
+        deadline = None
+        while True:
+            if deadline is None and done.is_set():
+                deadline = time.perf_counter() + self.timeout
+            wait = 0.05 if deadline is None else deadline - time.perf_counter()
+            if wait <= 0:
+                break
+            if sock is None:
+                received = self.transport.recv_stamped(min(wait, 0.05))
+                if received is not None:
+                    now, frame = received
+                    raw = self._datagram(frame)
+                    if raw is not None:
+                        self._record(raw, now)
+                continue
+            readable, _, _ = select.select([sock], [], [], wait)
+            if not readable:
+                continue
+            while True:
+                try:
+                    raw, now, _ = timestamps.recv(sock)
+                except BlockingIOError:
+                    break
+                self._record(raw, now)
+
+    def _datagram(self, frame):
+        """
+        Description: The IPv4 datagram carried by a frame received on the transport.
+
+        @returns: (bytes or None) The datagram, or None for other frames.
+        """
+        if self.transport.link_type == LINKTYPE_RAW:
+            return frame if frame and frame[0] >> 4 == 4 else None
+        return frame[14:] if frame[12:14] == b'\x08\x00' else None
+
+    def _record(self, raw, now):
+        """
+        Description: Counts a received datagram if it is the first reply to one of our probes.
+
+        @param raw: IPv4 datagram (IP header + ICMP message).
+        @param now: When it arrived.
+        @returns: None
+        """
+        index = self._match(raw)
+        if index is None or not self._sent_at[index]:
+            return
+        result = self.results[self.hosts[index % len(self.hosts)]]
+        result.received += 1
+        result.rtts.append(now - self._sent_at[index])
+        # clearing the send time drops duplicate replies to the same probe
+        self._sent_at[index] = 0.0
+
+
+def ping_sweep(targets, count=1, rate=10000, timeout=1.0, payload=b'', transport=None, source=None):
+    """
+    Description: Convenience wrapper that pings every target concurrently.
+
+    @param targets: CIDR string, address, or iterable of those.
+    @param count: Number of echo requests per host.
+    @param rate: Maximum probes per second.
+    @param timeout: Seconds to wait for stragglers after the last probe.
+    @param payload: (bytes) Echo data carried by every request.
+    @param transport: Transport to sweep over instead of a raw ICMP socket.
+    @param source: Our IPv4 address on transport.
+    @returns: (dict) Mapping of host address string to PingResult.
+    """
+    return PingSweeper(targets, count=count, rate=rate, timeout=timeout, payload=payload,
+                       transport=transport, source=source).run()
+
+
+if __name__ == "__main__":
+    import sys
+
+    target = sys.argv[1] if len(sys.argv) > 1 else "127.0.0.0/24"
+    start = time.perf_counter()
+    results = ping_sweep(target, count=1, rate=20000, timeout=1.0)
+    elapsed = time.perf_counter() - start
+    alive = [r for r in results.values() if r.alive]
+    for result in alive:
+        print(f"[+] {result.host} rtt={result.rtt_avg * 1000:.3f}ms loss={result.loss:.0%}")
+    print(f"[*] {len(alive)}/{len(results)} hosts up in {elapsed:.2f}s")
@@ -0,0 +1,349 @@
+"""
+routing.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Local routing and interface tables. The IPv4 routing table is read once from
+             /proc/net/route (plus connected routes for every interface address) and indexed in
+             a longest-prefix-match trie, so "which interface, source IP and next hop for X"
+             is answered in a few list lookups without touching the kernel. Tables are cached
+             and refreshed on an interval or on demand.
+"""
+
+import fcntl
+import os
+import socket
+import struct
+import threading
+import time
+
+
+#ioctls from linux/sockios.h
+SIOCGIFADDR = 0x8915
+SIOCGIFNETMASK = 0x891B
+SIOCGIFMTU = 0x8921
+
+RTF_UP = 0x0001
+RTF_GATEWAY = 0x0002
+
+
+def _ifreq(sock, request, interface):
+    return fcntl.ioctl(sock.fileno(), request, struct.pack('256s', interface.encode()[:15]))
+
+
+def interface_mac(interface):
+    """
+    Description: Hardware address of a local interface, read from sysfs.
+
+    @param interface: Interface name, e.g. "enp0s3".
+    @returns: (str) MAC address string.
+    """
+    with open(f"/sys/class/net/{interface}/address") as f:
+        return f.read().strip()
+
+
+def interface_ipv4(interface):
+    """
+    Description: Primary IPv4 address of a local interface (SIOCGIFADDR ioctl).
+
+    @param interface: Interface name.
+    @returns: (str or None) IPv4 address string, or None when the interface has none.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        return socket.inet_ntoa(_ifreq(sock, SIOCGIFADDR, interface)[20:24])
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+
+class Interface:
+    def __init__(self, name, index, mac, ipv4, netmask, mtu):
+        """
+        Description: Snapshot of one local interface.
+
+        @param name: Interface name.
+        @param index: Interface index.
+        @param mac: MAC address string (None if unavailable).
+        @param ipv4: Primary IPv4 address string (None if unconfigured).
+        @param netmask: IPv4 netmask string (None if unconfigured).
+        @param mtu: MTU in bytes.
+        @returns: None
+        """
+        self.name = name
+        self.index = index
+        self.mac = mac
+        self.ipv4 = ipv4
+        self.netmask = netmask
+        self.mtu = mtu
+
+    def __repr__(self):
+        return f"<Interface {self.name} {self.ipv4}/{self.netmask} {self.mac} mtu={self.mtu}>"
+
+
+def read_interfaces():
+    """
+    Description: Reads every local interface's addresses and MTU (one set of ioctls each).
+
+    @returns: (dict) Interface name -> Interface.
+    """
+    interfaces = {}
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        for index, name in socket.if_nameindex():
+            try:
+                mac = interface_mac(name)
+            except OSError:
+                mac = None
+            try:
+                ipv4 = socket.inet_ntoa(_ifreq(sock, SIOCGIFADDR, name)[20:24])
+                netmask = socket.inet_ntoa(_ifreq(sock, SIOCGIFNETMASK, name)[20:24])
+            except OSError:
+                ipv4 = netmask = None
+            try:
+                mtu = struct.unpack_from('i', _ifreq(sock, SIOCGIFMTU, name), 16)[0]
+            except OSError:
+                mtu = None
+            interfaces[name] = Interface(name, index, mac, ipv4, netmask, mtu)
+    finally:
+        sock.close()
+    return interfaces
+
+
+class Route:
+    def __init__(self, destination, prefix_len, gateway, interface, metric=0, flags=RTF_UP):
+        """
+        Description: One IPv4 route.
+
+        @param destination: Network address as a 32-bit int.
+        @param prefix_len: Prefix length (0-32).
+        @param gateway: Gateway address string, or None for an on-link route.
+        @param interface: Outgoing interface name.
+        @param metric: Route metric (lower wins between routes for the same prefix).
+        @param flags: RTF_* flags from the kernel table.
+        @returns: None
+        """
+        self.destination = destination
+        self.prefix_len = prefix_len
+        self.gateway = gateway
+        self.interface = interface
+        self.metric = metric
+        self.flags = flags
+
+    def __repr__(self):
+        dest = socket.inet_ntoa(self.destination.to_bytes(4, 'big'))
+        via = f" via {self.gateway}" if self.gateway else ""
+        return f"<Route {dest}/{self.prefix_len}{via} dev {self.interface} metric {self.metric}>"
+
+
+def read_routes(path="/proc/net/route"):
+    """
+    Description: Parses the kernel's IPv4 routing table. Addresses in the file are hex in host
+                 (little-endian) byte order.
+
+    @param path: Table to read.
+    @returns: (list) Route objects for every route that is up.
+    """
+    routes = []
+    with open(path) as f:
+        next(f)
+        for line in f:
+            fields = line.split()
+            if len(fields) < 8:
+                continue
+            flags = int(fields[3], 16)
+            if not flags & RTF_UP:
+                continue
+            #network-order words printed as host (little-endian) ints: reverse the bytes
+            destination = int.from_bytes(bytes.fromhex(fields[1]), 'little')
+            gateway = bytes.fromhex(fields[2])[::-1]
+            mask = int.from_bytes(bytes.fromhex(fields[7]), 'little')
+            routes.append(Route(
+                destination,
+                bin(mask).count("1"),
+                socket.inet_ntoa(gateway) if flags & RTF_GATEWAY else None,
+                fields[0],
+                int(fields[6]),
+                flags,
+            ))
+    return routes
+
+
+class LPMTrie:
+    def __init__(self):
+        """
+        Description: Longest-prefix-match index over IPv4 prefixes: a multibit trie with an
+                     8-bit stride (controlled prefix expansion). Each node has 256 slots holding
+                     the best value for that slot at this level, its prefix length and a child
+                     node, so a lookup visits at most 4 nodes.
+        """
+        self.root = self._node()
+        self.size = 0
+
+    @staticmethod
+    def _node():
+        return [[None] * 256, [-1] * 256, [None] * 256]
+
+    def insert(self, prefix, length, value):
+        """
+        Description: Adds prefix/length -> value (replacing a value for the same prefix).
+
+        @param prefix: Network address as a 32-bit int.
+        @param length: Prefix length (0-32).
+        @param value: Value returned by lookups that match this prefix most specifically.
+        @returns: None
+        """
+        node = self.root
+        level = 0
+        while length - 8 * level > 8:
+            byte = (prefix >> (24 - 8 * level)) & 0xFF
+            child = node[2][byte]
+            if child is None:
+                child = node[2][byte] = self._node()
+            node = child
+            level += 1
+        remaining = length - 8 * level
+        span = 1 << (8 - remaining)
+        start = ((prefix >> (24 - 8 * level)) & 0xFF) & ~(span - 1)
+        values, lengths = node[0], node[1]
+        for slot in range(start, start + span):
+            # a longer prefix already expanded into this slot keeps it
+            if lengths[slot] <= length:
+                values[slot] = value
+                lengths[slot] = length
+        self.size += 1
+
+    def lookup(self, addr):
+        """
+        Description: Value of the longest prefix containing addr.
+
+        @param addr: IPv4 address as a 32-bit int.
+        @returns: The value, or None when no prefix matches.
+        """
+        node = self.root
+        best = None
+        shift = 24
+        while node is not None:
+            byte = (addr >> shift) & 0xFF
+            value = node[0][byte]
+            if value is not None:
+                best = value
+            node = node[2][byte]
+            shift -= 8
+        return best
+
+
+class RoutingTable:
+    def __init__(self, refresh_interval=30.0, route_path="/proc/net/route"):
+        """
+        Description: Cached view of the local routing and interface tables.
+
+        @param refresh_interval: Seconds before lookups reload the tables (None = never).
+        @param route_path: Kernel routing table file.
+        @returns: None
+        """
+        self.refresh_interval = refresh_interval
+        self.route_path = route_path
+        self.interfaces = {}
+        self.routes = []
+        self._trie = LPMTrie()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        """
+        Description: Re-reads routes and interfaces and rebuilds the trie. Connected routes are
+                     added for interface addresses the kernel table does not list (e.g. lo).
+                     Lookups keep using the old trie until the new one is complete.
+
+        @returns: None
+        """
+        interfaces = read_interfaces()
+        routes = read_routes(self.route_path) if os.path.exists(self.route_path) else []
+        present = {(route.destination, route.prefix_len) for route in routes}
+        for iface in interfaces.values():
+            if iface.ipv4 and iface.netmask:
+                mask = int.from_bytes(socket.inet_aton(iface.netmask), 'big')
+                network = int.from_bytes(socket.inet_aton(iface.ipv4), 'big') & mask
+                length = bin(mask).count("1")
+                if (network, length) not in present:
+                    routes.append(Route(network, length, None, iface.name, metric=1 << 16))
+        best = {}
+        for route in routes:
+            key = (route.destination, route.prefix_len)
+            if key not in best or route.metric < best[key].metric:
+                best[key] = route
+        trie = LPMTrie()
+        # shortest prefixes first so expansion never has to revisit slots
+        for route in sorted(best.values(), key=lambda r: r.prefix_len):
+            trie.insert(route.destination, route.prefix_len, route)
+        with self._lock:
+            self.interfaces = interfaces
+            self.routes = sorted(best.values(), key=lambda r: (-r.prefix_len, r.metric))
+            self._trie = trie
+            self._loaded_at = time.monotonic()
+
+    def _maybe_refresh(self):
+        if self.refresh_interval is not None and time.monotonic() - self._loaded_at > self.refresh_interval:
+            self.refresh()
+
+    def route(self, dest_IP):
+        """
+        Description: Longest-prefix-match route for a destination.
+
+        @param dest_IP: IPv4 address string, packed 4 bytes, or 32-bit int.
+        @returns: (Route or None) The matching route.
+        """
+        self._maybe_refresh()
+        if isinstance(dest_IP, str):
+            dest_IP = socket.inet_aton(dest_IP)
+        if isinstance(dest_IP, (bytes, bytearray)):
+            dest_IP = int.from_bytes(dest_IP, 'big')
+        return self._trie.lookup(dest_IP)
+
+    def lookup(self, dest_IP):
+        """
+        Description: Answers "how do I reach dest_IP".
+
+        @param dest_IP: IPv4 address string.
+        @returns: (tuple or None) (interface name, source IPv4 string, next hop IPv4 string),
+                  where the next hop is the gateway or dest_IP itself for on-link routes.
+                  None when no route matches.
+        """
+        route = self.route(dest_IP)
+        if route is None:
+            return None
+        iface = self.interfaces.get(route.interface)
+        src_IP = iface.ipv4 if iface is not None else None
+        return route.interface, src_IP, route.gateway or dest_IP
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_table():
+    """
+    Description: Process-wide RoutingTable, created on first use.
+    """
+    global _table
+    with _table_lock:
+        if _table is None:
+            _table = RoutingTable()
+        return _table
+
+
+def lookup(dest_IP):
+    """
+    Description: Shortcut for get_table().lookup(dest_IP).
+    """
+    return get_table().lookup(dest_IP)
+
+
+if __name__ == "__main__":
+    table = get_table()
+    for iface in table.interfaces.values():
+        print(iface)
+    for route in table.routes:
+        print(route)
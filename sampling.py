@@ -0,0 +1,152 @@
+"""
+sampling.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Capture samplers for network_utils.capture(), to keep a capture within what the
+             host can store or analyse when traffic is heavier than that:
+               CountSampler  - 1 frame in every n.
+               TimeSampler   - every frame during the first `window` seconds of every
+                               `period` seconds.
+               FlowReservoir - up to k frames per flow (and direction) in every interval,
+                               chosen uniformly at random among that flow's frames, so small
+                               flows stay visible next to large ones.
+             A sampler is fed (timestamp, frame, original length) and passes the frames it
+             keeps to an emit callable with the same arguments; flush() emits whatever it
+             still holds when the capture ends. Flows are keyed straight from the frame
+             bytes, without dissecting it. Frames may be memoryviews into a receive buffer
+             that is reused after feed() returns (capture() with a BufferPool); a sampler
+             copies what it holds on to.
+"""
+
+import random
+
+
+def flow_key(frame):
+    """
+    Description: Key of the flow (protocol, addresses and ports, one direction) an Ethernet
+                 frame belongs to. Frames that are not IPv4/IPv6 are keyed by their Ethernet
+                 addresses and type.
+
+    @param frame: Ethernet frame bytes (or a memoryview of them).
+    @returns: (bytes) The key.
+    """
+    ethr_type = frame[12:14]
+    #joined rather than added, so memoryview slices give a (hashable) bytes key too
+    if ethr_type == b'\x08\x00' and len(frame) >= 34:
+        protocol = frame[23]
+        if protocol in (6, 17):
+            ports = 14 + (frame[14] & 0x0F) * 4
+            return b''.join((frame[23:24], frame[26:34], frame[ports:ports + 4]))
+        return b''.join((frame[23:24], frame[26:34]))
+    if ethr_type == b'\x86\xdd' and len(frame) >= 54:
+        if frame[20] in (6, 17):
+            return b''.join((frame[20:21], frame[22:58]))
+        return b''.join((frame[20:21], frame[22:54]))
+    return bytes(frame[:14])
+
+
+class CountSampler:
+    def __init__(self, n):
+        """
+        Description: Keeps 1 frame in every n (the n-th, 2n-th, ...).
+
+        @param n: Sampling ratio (1 keeps everything).
+        @returns: None
+        """
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        self.n = n
+        self._count = 0
+
+    def feed(self, ts, frame, original, emit):
+        self._count += 1
+        if self._count >= self.n:
+            self._count = 0
+            emit(ts, frame, original)
+
+    def flush(self, emit):
+        pass
+
+
+class TimeSampler:
+    def __init__(self, window, period):
+        """
+        Description: Keeps every frame during the first `window` seconds of every `period`
+                     seconds, counted from the first frame.
+
+        @param window: Seconds kept per period.
+        @param period: Length of a period in seconds.
+        @returns: None
+        """
+        if not 0 < window <= period:
+            raise ValueError("window must be in (0, period]")
+        self.window = window
+        self.period = period
+        self._start = None
+
+    def feed(self, ts, frame, original, emit):
+        if self._start is None:
+            self._start = ts
+        if (ts - self._start) % self.period < self.window:
+            emit(ts, frame, original)
+
+    def flush(self, emit):
+        pass
+
+
+class FlowReservoir:
+    def __init__(self, per_flow=4, interval=1.0, max_flows=65536, seed=None):
+        """
+        Description: Per-flow reservoir sampling: in every interval, keeps up to per_flow frames
+                     of each flow, chosen uniformly at random among the flow's frames (Vitter's
+                     algorithm R), and emits them in time order when the interval ends. Memory is
+                     bounded by max_flows * per_flow frames; frames of flows beyond max_flows in
+                     an interval are not sampled (counted in overflow).
+
+        @param per_flow: Frames kept per flow per interval.
+        @param interval: Interval length in seconds (by frame timestamps).
+        @param max_flows: Flows tracked per interval.
+        @param seed: Random seed (for reproducible samples).
+        @returns: None
+        """
+        self.per_flow = per_flow
+        self.interval = interval
+        self.max_flows = max_flows
+        self.overflow = 0
+        self._random = random.Random(seed)
+        #flow key -> [frames seen, reservoir of (ts, frame, original)]
+        self._flows = {}
+        self._end = None
+
+    def feed(self, ts, frame, original, emit):
+        if self._end is None:
+            self._end = ts + self.interval
+        elif ts >= self._end:
+            self.flush(emit)
+            self._end = ts + self.interval
+        key = flow_key(frame)
+        entry = self._flows.get(key)
+        if entry is None:
+            if len(self._flows) >= self.max_flows:
+                self.overflow += 1
+                return
+            entry = self._flows[key] = [0, []]
+        entry[0] += 1
+        reservoir = entry[1]
+        #held past this call: bytes() copies a memoryview (and returns bytes as they are)
+        if len(reservoir) < self.per_flow:
+            reservoir.append((ts, bytes(frame), original))
+        else:
+            slot = self._random.randrange(entry[0])
+            if slot < self.per_flow:
+                reservoir[slot] = (ts, bytes(frame), original)
+
+    def flush(self, emit):
+        """
+        Description: Emits the frames held for the current interval, oldest first.
+        """
+        kept = [item for _, reservoir in self._flows.values() for item in reservoir]
+        self._flows = {}
+        kept.sort(key=lambda item: item[0])
+        for ts, frame, original in kept:
+            emit(ts, frame, original)
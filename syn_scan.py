@@ -0,0 +1,330 @@
+"""
+syn_scan.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Stateless TCP SYN scanner built on the IP and TCP layers. Host x port combinations
+             are visited in a keyed pseudo-random order computed on the fly, each SYN carries a
+             keyed cookie in its sequence number, and a separate receive loop validates SYN-ACK,
+             RST and ICMP unreachable replies against the cookie alone, so memory stays constant
+             no matter how many probes are sent.
+"""
+
+import hashlib
+import ipaddress
+import math
+import os
+import random
+import select
+import socket
+import struct
+import threading
+import time
+from bisect import bisect_right
+from IP import IP
+from TCP import TCP
+from traceroute import source_address
+
+
+OPEN = "open"
+CLOSED = "closed"
+FILTERED = "filtered"
+
+#ICMP destination unreachable codes that mean "administratively filtered"
+_FILTER_CODES = (1, 2, 3, 9, 10, 13)
+
+
+class TargetSpace:
+    def __init__(self, targets, ports):
+        """
+        Description: Index space over host x port combinations. Networks are kept as
+                     (first address, size) ranges so a /8 costs no more memory than a /32.
+
+        @param targets: CIDR string, address, or iterable of those.
+        @param ports: Iterable of destination ports.
+        @returns: None
+        """
+        if isinstance(targets, str):
+            targets = [targets]
+        self.ports = list(ports)
+        self._starts = []
+        self._bases = []
+        self.n_hosts = 0
+        for target in targets:
+            network = ipaddress.ip_network(str(target), strict=False)
+            self._starts.append(self.n_hosts)
+            self._bases.append(int(network.network_address))
+            self.n_hosts += network.num_addresses
+        self.size = self.n_hosts * len(self.ports)
+
+    def host(self, host_index):
+        """
+        Description: Returns the 32-bit address of the host at host_index.
+        """
+        slot = bisect_right(self._starts, host_index) - 1
+        return self._bases[slot] + host_index - self._starts[slot]
+
+    def __getitem__(self, index):
+        """
+        Description: Maps an index in [0, size) to its (address as int, port) pair.
+        """
+        host_index, port_index = divmod(index, len(self.ports))
+        return self.host(host_index), self.ports[port_index]
+
+    def __len__(self):
+        return self.size
+
+
+def permutation(size, seed):
+    """
+    Description: Generates every index in [0, size) exactly once in a scrambled order using
+                 an affine map i -> (a*i + c) mod size with a coprime to size.
+
+    @param size: Number of indices.
+    @param seed: Seed for choosing the multiplier and offset.
+    @returns: (generator) Indices in permuted order.
+    """
+    if size <= 0:
+        return
+    rng = random.Random(seed)
+    a = rng.randrange(1, size) | 1 if size > 2 else 1
+    while math.gcd(a, size) != 1:
+        a += 2
+    c = rng.randrange(size)
+    for i in range(size):
+        yield (a * i + c) % size
+
+
+class SynScanner:
+    def __init__(self, targets, ports, rate=20000, timeout=2.0, src_port=None, retries=0, key=None):
+        """
+        Description: Prepares a SYN scan over targets x ports.
+
+        @param targets: CIDR string, address, or iterable of those.
+        @param ports: Iterable of destination ports (or a single int).
+        @param rate: Maximum probes per second (None or 0 disables rate limiting).
+        @param timeout: Seconds to wait for replies after the last probe.
+        @param src_port: Source port for every probe (random unprivileged port by default).
+        @param retries: Extra passes over the whole space for lossy paths.
+        @param key: (bytes) Cookie secret; a random one is generated when omitted.
+        @returns: None
+        """
+        if isinstance(ports, int):
+            ports = [ports]
+        self.space = TargetSpace(targets, ports)
+        self.rate = rate
+        self.timeout = timeout
+        self.src_port = src_port or random.randint(40000, 60000)
+        self.retries = int(retries)
+        self.key = key or os.urandom(16)
+        self.results = {}
+        self.sent = 0
+        self.invalid = 0
+
+    def cookie(self, src, dst, dst_port):
+        """
+        Description: Keyed 32-bit cookie for one probe, used as its TCP sequence number.
+
+        @param src: Packed 4-byte local address.
+        @param dst: Packed 4-byte target address.
+        @param dst_port: Target port.
+        @returns: (int) The cookie.
+        """
+        digest = hashlib.blake2b(src + dst + dst_port.to_bytes(2, 'big'),
+                                 key=self.key, digest_size=4).digest()
+        return int.from_bytes(digest, 'big')
+
+    def _template(self, src_IP):
+        """
+        Description: Builds the SYN once with the library's layers and precomputes the
+                     one's complement sum of every TCP checksum input that never changes.
+
+        @param src_IP: Local source address string.
+        @returns: (tuple) (IP header bytes, TCP header bytearray, constant checksum sum).
+        """
+        syn = TCP(src_port=self.src_port, dst_port=0, seq=0, flags=0x02, window=1024)
+        # the kernel fills in the IP checksum, ID and total length for IP_HDRINCL sockets
+        ip_header = bytearray(IP(src_IP=src_IP, dest_IP="0.0.0.0", protocol=socket.IPPROTO_TCP,
+                                 ttl=64, payload=syn).build()[:20])
+        tcp_header = bytearray(syn.build())
+        # clear the fields patched per probe so they drop out of the constant sum
+        struct.pack_into('!H', tcp_header, 2, 0)
+        struct.pack_into('!L', tcp_header, 4, 0)
+        struct.pack_into('!H', tcp_header, 16, 0)
+        src = socket.inet_aton(src_IP)
+        base = sum(struct.unpack('!HH', src)) + socket.IPPROTO_TCP + len(tcp_header)
+        base += sum(struct.unpack('!%dH' % (len(tcp_header) // 2), tcp_header))
+        return ip_header, tcp_header, base
+
+    def _send_loop(self, sock, src_IP, done):
+        """
+        Description: Emits a SYN for every index of the permuted target space, patching only
+                     the destination, port, cookie and checksum into the prebuilt headers.
+
+        @param sock: Raw IPPROTO_RAW socket.
+        @param src_IP: Local source address string.
+        @param done: (threading.Event) Set once every probe has been sent.
+        @returns: None
+        """
+        ip_header, tcp_header, base = self._template(src_IP)
+        src = socket.inet_aton(src_IP)
+        space = self.space
+        start = time.perf_counter()
+        try:
+            for attempt in range(self.retries + 1):
+                for index in permutation(space.size, self.key + bytes([attempt])):
+                    if self.rate:
+                        ahead = self.sent / self.rate - (time.perf_counter() - start)
+                        if ahead > 0.001:
+                            time.sleep(ahead)
+                    addr, port = space[index]
+                    dst = addr.to_bytes(4, 'big')
+                    if self.results.get((addr, port)) is not None:
+                        continue
+                    seq = self.cookie(src, dst, port)
+                    csum = base + (addr >> 16) + (addr & 0xFFFF) + port + (seq >> 16) + (seq & 0xFFFF)
+                    while csum >> 16:
+                        csum = (csum >> 16) + (csum & 0xFFFF)
+                    ip_header[16:20] = dst
+                    struct.pack_into('!H', tcp_header, 2, port)
+                    struct.pack_into('!L', tcp_header, 4, seq)
+                    struct.pack_into('!H', tcp_header, 16, ~csum & 0xFFFF)
+                    try:
+                        sock.sendto(ip_header + tcp_header, (socket.inet_ntoa(dst), 0))
+                    except BlockingIOError:
+                        select.select([], [sock], [], 0.01)
+                    except OSError:
+                        pass
+                    self.sent += 1
+        finally:
+            done.set()
+
+    def _handle_tcp(self, raw, src):
+        """
+        Description: Classifies a SYN-ACK (open) or RST (closed) reply after checking that its
+                     acknowledgment number is our cookie plus one.
+
+        @param raw: IP datagram from the raw TCP socket.
+        @param src: Packed local address the probes were sent from.
+        @returns: None
+        """
+        ihl = (raw[0] & 0x0F) * 4
+        if len(raw) < ihl + 20:
+            return
+        sport, dport, _, ack, offset_flags = struct.unpack_from('!HHLLH', raw, ihl)
+        flags = offset_flags & 0x3F
+        if dport != self.src_port or not flags & 0x14:
+            return
+        peer = raw[12:16]
+        if (ack - 1) & 0xFFFFFFFF != self.cookie(src, peer, sport):
+            self.invalid += 1
+            return
+        state = OPEN if flags & 0x12 == 0x12 else CLOSED
+        self.results[(int.from_bytes(peer, 'big'), sport)] = state
+
+    def _handle_icmp(self, raw, src):
+        """
+        Description: Marks a probe filtered when an ICMP unreachable quotes it. The quoted TCP
+                     sequence number must still be our cookie.
+
+        @param raw: IP datagram from the raw ICMP socket.
+        @param src: Packed local address the probes were sent from.
+        @returns: None
+        """
+        ihl = (raw[0] & 0x0F) * 4
+        if len(raw) < ihl + 28 or raw[ihl] != 3 or raw[ihl + 1] not in _FILTER_CODES:
+            return
+        inner = ihl + 8
+        if raw[inner + 9] != socket.IPPROTO_TCP:
+            return
+        l4 = inner + (raw[inner] & 0x0F) * 4
+        if len(raw) < l4 + 8:
+            return
+        sport, dport, seq = struct.unpack_from('!HHL', raw, l4)
+        peer = raw[inner + 16:inner + 20]
+        if sport != self.src_port or seq != self.cookie(src, peer, dport):
+            return
+        self.results.setdefault((int.from_bytes(peer, 'big'), dport), FILTERED)
+
+    def run(self):
+        """
+        Description: Runs the scan and returns every answered probe.
+
+        @returns: (dict) Mapping of (address string, port) to OPEN, CLOSED or FILTERED.
+                  Probes that got no answer at all are also filtered; see unanswered().
+        """
+        src_IP = source_address(str(ipaddress.ip_address(self.space.host(0))))
+        src = socket.inet_aton(src_IP)
+        send_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_RAW)
+        tcp_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+        icmp_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        handlers = {tcp_sock: self._handle_tcp, icmp_sock: self._handle_icmp}
+        try:
+            send_sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 22)
+            for sock in handlers:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 24)
+                sock.setblocking(False)
+            done = threading.Event()
+            sender = threading.Thread(target=self._send_loop, args=(send_sock, src_IP, done), daemon=True)
+            sender.start()
+            deadline = None
+            while True:
+                if deadline is None and done.is_set():
+                    deadline = time.perf_counter() + self.timeout
+                wait = 0.05 if deadline is None else deadline - time.perf_counter()
+                if wait <= 0:
+                    break
+                readable, _, _ = select.select(list(handlers), [], [], wait)
+                for sock in readable:
+                    handler = handlers[sock]
+                    while True:
+                        try:
+                            raw = sock.recv(65535)
+                        except BlockingIOError:
+                            break
+                        handler(raw, src)
+            sender.join()
+        finally:
+            send_sock.close()
+            for sock in handlers:
+                sock.close()
+        return {(socket.inet_ntoa(addr.to_bytes(4, 'big')), port): state
+                for (addr, port), state in self.results.items()}
+
+    def unanswered(self):
+        """
+        Description: Lazily yields the (address string, port) pairs that never answered.
+
+        @returns: (generator) Silently filtered probes.
+        """
+        for index in range(self.space.size):
+            addr, port = self.space[index]
+            if (addr, port) not in self.results:
+                yield socket.inet_ntoa(addr.to_bytes(4, 'big')), port
+
+
+def syn_scan(targets, ports, rate=20000, timeout=2.0, retries=0):
+    """
+    Description: Convenience wrapper that SYN-scans targets x ports.
+
+    @param targets: CIDR string, address, or iterable of those.
+    @param ports: Iterable of destination ports (or a single int).
+    @param rate: Maximum probes per second.
+    @param timeout: Seconds to wait for replies after the last probe.
+    @param retries: Extra passes for probes that have not been answered yet.
+    @returns: (dict) Mapping of (address string, port) to OPEN, CLOSED or FILTERED.
+    """
+    return SynScanner(targets, ports, rate=rate, timeout=timeout, retries=retries).run()
+
+
+if __name__ == "__main__":
+    import sys
+
+    target = sys.argv[1] if len(sys.argv) > 1 else "127.0.0.1"
+    ports = range(1, 1025)
+    start = time.perf_counter()
+    results = syn_scan(target, ports, timeout=1.0)
+    elapsed = time.perf_counter() - start
+    for (host, port), state in sorted(results.items()):
+        if state == OPEN:
+            print(f"[+] {host}:{port} open")
+    print(f"[*] {len(results)} answers in {elapsed:.2f}s")
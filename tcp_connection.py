@@ -0,0 +1,469 @@
+"""
+tcp_connection.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Client-side TCP connections built on the library's IP and TCP layers, with a
+             socket-like interface (connect, sendall, recv, close). Handles the handshake with
+             MSS / window scale options, windowed sending with retransmission, in-order
+             reassembly of received data with one coalesced ACK per batch of segments, and
+             connection teardown.
+
+             Segments travel over a link:
+               RawIPLink  - raw IP sockets using the host's own address. The kernel does not
+                            know the connection and answers the server with RSTs, so those
+                            must be suppressed (e.g. with iptables, as in Http_get.py).
+               PacketLink - an AF_PACKET socket on an interface using an address the kernel
+                            does not own; the link answers ARP for it itself, so the kernel
+                            never sees the connection and no RST suppression is needed.
+"""
+
+import random
+import select
+import socket
+import struct
+import time
+from Ether import Ether
+from IP import IP
+from TCP import TCP, OPT_MSS, OPT_WSCALE
+from ARP import ARP, ARP_REQUEST, ARP_REPLY
+from arp_resolver import ARPResolver
+from addresses import ip_to_bytes
+import routing
+
+
+FIN = 0x01
+SYN = 0x02
+RST = 0x04
+PSH = 0x08
+ACK = 0x10
+
+ETH_P_ALL = 0x0003
+PACKET_OUTGOING = 4
+
+#receive buffer size and the window scale advertised to cover it
+RECV_BUFFER = 1 << 20
+WINDOW_SCALE = 5
+
+MIN_RTO = 0.2
+MAX_RTO = 8.0
+
+
+class RawIPLink:
+    def __init__(self, dest_IP, src_IP=None):
+        """
+        Description: Link that sends IP datagrams through an IPPROTO_RAW socket and receives
+                     every inbound TCP datagram through an IPPROTO_TCP raw socket.
+
+        @param dest_IP: Peer address (used to pick the source address).
+        @param src_IP: Source address (defaults to the routed interface's address).
+        @returns: None
+        """
+        self.src_IP = src_IP or routing.lookup(dest_IP)[1]
+        self._send = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_RAW)
+        self._recv = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+        self._recv.setblocking(False)
+
+    def fileno(self):
+        return self._recv.fileno()
+
+    def send(self, datagram, dest_IP):
+        self._send.sendto(datagram, (dest_IP, 0))
+
+    def recv(self):
+        """
+        Description: One received IP datagram, or None when nothing is queued.
+        """
+        try:
+            return self._recv.recv(65535)
+        except BlockingIOError:
+            return None
+
+    def close(self):
+        self._send.close()
+        self._recv.close()
+
+
+class PacketLink:
+    def __init__(self, interface, src_IP, src_mac=None, next_hop=None):
+        """
+        Description: Link that acts as its own host on an interface: frames are sent and
+                     received on an AF_PACKET socket, ARP requests for src_IP are answered
+                     and the next hop's MAC is resolved with a private ARP resolver.
+
+        @param interface: Interface to use.
+        @param src_IP: Address to own; must not be configured on the local host.
+        @param src_mac: MAC to use (defaults to the interface's).
+        @param next_hop: Gateway or peer whose MAC frames are sent to (defaults to the routed
+                         next hop for each destination).
+        @returns: None
+        """
+        self.interface = interface
+        self.src_IP = src_IP
+        self.src_mac = src_mac or routing.interface_mac(interface)
+        self.next_hop = next_hop
+        self._src_bytes = ip_to_bytes(src_IP)
+        self._resolver = ARPResolver(interface, src_mac=self.src_mac, src_IP=src_IP)
+        self._headers = {}
+        self._sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+        self._sock.bind((interface, ETH_P_ALL))
+        self._sock.setblocking(False)
+
+    def fileno(self):
+        return self._sock.fileno()
+
+    def _ether_header(self, dest_IP):
+        header = self._headers.get(dest_IP)
+        if header is None:
+            hop = self.next_hop
+            if hop is None:
+                found = routing.get_table().route(dest_IP)
+                hop = found.gateway if found is not None and found.gateway else dest_IP
+            mac = self._resolver.resolve(hop)
+            if mac is None:
+                raise OSError(f"Could not resolve MAC address for {hop} on {self.interface}")
+            header = self._headers[dest_IP] = Ether(dest_mac=mac, src_mac=self.src_mac, payload=b'').build()
+        return header
+
+    def send(self, datagram, dest_IP):
+        self._sock.send(self._ether_header(dest_IP) + datagram)
+
+    def recv(self):
+        """
+        Description: One received IP datagram addressed to src_IP, or None when nothing is
+                     queued. ARP requests for src_IP are answered on the way.
+        """
+        while True:
+            try:
+                frame, addr = self._sock.recvfrom(65535)
+            except BlockingIOError:
+                return None
+            if addr[2] == PACKET_OUTGOING or len(frame) < 34:
+                continue
+            ethr_type = frame[12] << 8 | frame[13]
+            if ethr_type == 0x0800 and frame[30:34] == self._src_bytes:
+                return frame[14:]
+            if ethr_type == 0x0806:
+                self._answer_arp(frame)
+
+    def _answer_arp(self, frame):
+        arp = ARP(raw=frame[14:])
+        if arp.opcode == ARP_REQUEST and arp.target_IP == self.src_IP:
+            self._resolver.learn(arp.sender_IP, arp.sender_mac)
+            reply = Ether(dest_mac=arp.sender_mac, src_mac=self.src_mac, ethr_type=0x0806) / \
+                ARP(opcode=ARP_REPLY, sender_mac=self.src_mac, sender_IP=self.src_IP,
+                    target_mac=arp.sender_mac, target_IP=arp.sender_IP)
+            self._sock.send(reply.build())
+
+    def close(self):
+        self._sock.close()
+        self._resolver.close()
+
+
+class TCPConnection:
+    def __init__(self, dest_IP, dest_port, src_port=None, link=None, timeout=5.0, mss=1460):
+        """
+        Description: Creates an unconnected client connection.
+
+        @param dest_IP: Server IPv4 address.
+        @param dest_port: Server port.
+        @param src_port: Local port (random ephemeral port by default).
+        @param link: RawIPLink or PacketLink (a RawIPLink by default).
+        @param timeout: Seconds a blocking call may wait without progress (None = forever).
+        @param mss: Largest segment we accept / send.
+        @returns: None
+        """
+        self.dest_IP = dest_IP
+        self.dest_port = dest_port
+        self.src_port = src_port or random.randint(49152, 65535)
+        self.link = link or RawIPLink(dest_IP)
+        self.src_IP = self.link.src_IP
+        self.timeout = timeout
+        self.mss = mss
+        self.state = "CLOSED"
+        self._dest_bytes = ip_to_bytes(dest_IP)
+        self._iss = random.getrandbits(32)
+        self.snd_una = self.snd_nxt = self._iss
+        self.rcv_nxt = 0
+        self.peer_window = 0
+        self.peer_mss = 536
+        self._peer_wscale = 0
+        self._wscale = 0
+        #segments sent and not yet acknowledged: [seq, flags, data, sent at]
+        self._unacked = []
+        self._rto = 1.0
+        self._buffer = bytearray()
+        self._out_of_order = {}
+        self._advertised = 0
+        self.peer_closed = False
+
+    # ------------------------------------------------------------ socket-like interface
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def connect(self):
+        """
+        Description: Three-way handshake. Offers our MSS and window scale and honours the
+                     peer's.
+
+        @returns: None
+        """
+        self.state = "SYN_SENT"
+        self._transmit(SYN, b'', self._iss, options=[(OPT_MSS, self.mss), (OPT_WSCALE, WINDOW_SCALE)])
+        self.snd_nxt = (self._iss + 1) & 0xFFFFFFFF
+        self._unacked.append([self._iss, SYN, b'', time.monotonic()])
+        self._wait(lambda: self.state == "ESTABLISHED", "connect")
+
+    def send(self, data):
+        """
+        Description: Sends as much of data as the peer's window allows right now (at least
+                     one segment, waiting for window space if necessary).
+
+        @param data: Bytes to send.
+        @returns: (int) Number of bytes queued.
+        """
+        self._check_open()
+        self._wait(lambda: self._window_space() > 0, "send")
+        sent = 0
+        view = memoryview(data)
+        while sent < len(data):
+            size = min(self.peer_mss, self._window_space(), len(data) - sent)
+            if size <= 0:
+                break
+            chunk = bytes(view[sent:sent + size])
+            flags = ACK | PSH if sent + size == len(data) else ACK
+            self._transmit(flags, chunk, self.snd_nxt)
+            self._unacked.append([self.snd_nxt, flags, chunk, time.monotonic()])
+            self.snd_nxt = (self.snd_nxt + size) & 0xFFFFFFFF
+            sent += size
+        self._poll()
+        return sent
+
+    def sendall(self, data):
+        """
+        Description: Sends all of data, waiting for window space as needed. Returns once the
+                     data is sent (acknowledgements are processed by later calls).
+
+        @param data: Bytes to send.
+        @returns: None
+        """
+        view = memoryview(data)
+        while len(view):
+            view = view[self.send(view):]
+
+    def recv(self, bufsize):
+        """
+        Description: Receives up to bufsize bytes of in-order data.
+
+        @param bufsize: Maximum number of bytes to return.
+        @returns: (bytes) Data, or b'' once the peer has closed and everything was read.
+        """
+        if not self._buffer and not self.peer_closed:
+            self._wait(lambda: self._buffer or self.peer_closed, "recv")
+        data = bytes(self._buffer[:bufsize])
+        del self._buffer[:bufsize]
+        #reopen a window we had (nearly) closed
+        if self._advertised < 2 * self.mss and self._receive_window() >= 2 * self.mss:
+            self._send_ack()
+        return data
+
+    def close(self):
+        """
+        Description: Sends FIN once everything sent is acknowledged and waits (up to the
+                     timeout) for the peer to acknowledge it. Closes the link.
+
+        @returns: None
+        """
+        try:
+            if self.state == "ESTABLISHED":
+                self._wait(lambda: not self._unacked, "close")
+                self.state = "FIN_WAIT"
+                self._transmit(FIN | ACK, b'', self.snd_nxt)
+                self._unacked.append([self.snd_nxt, FIN | ACK, b'', time.monotonic()])
+                self.snd_nxt = (self.snd_nxt + 1) & 0xFFFFFFFF
+                self._wait(lambda: not self._unacked, "close")
+        except (socket.timeout, ConnectionError):
+            pass
+        finally:
+            self.state = "CLOSED"
+            self.link.close()
+
+    def __enter__(self):
+        if self.state == "CLOSED":
+            self.connect()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------ internals
+
+    def _check_open(self):
+        if self.state != "ESTABLISHED":
+            raise ConnectionError(f"Connection is {self.state}")
+
+    def _window_space(self):
+        #bytes in flight are counted modulo 2^32, so the window stays right across a wrap
+        return self.peer_window - ((self.snd_nxt - self.snd_una) & 0xFFFFFFFF)
+
+    def _receive_window(self):
+        return max(0, RECV_BUFFER - len(self._buffer))
+
+    def _transmit(self, flags, data, seq, options=None):
+        window = min(self._receive_window() >> self._wscale, 0xFFFF) if not flags & SYN else 0xFFFF
+        self._advertised = window << self._wscale
+        segment = TCP(src_port=self.src_port, dst_port=self.dest_port, seq=seq,
+                      ack_seq=self.rcv_nxt if flags & ACK else 0, flags=flags, window=window,
+                      data=data, options=options, ip_src=self.src_IP, ip_dst=self.dest_IP)
+        datagram = IP(src_IP=self.src_IP, dest_IP=self.dest_IP, protocol=6, ttl=64, payload=segment)
+        self.link.send(datagram.build(), self.dest_IP)
+
+    def _send_ack(self):
+        self._transmit(ACK, b'', self.snd_nxt)
+
+    def _wait(self, done, what):
+        """
+        Description: Processes incoming segments and retransmissions until done() is true.
+
+        @param done: Condition to wait for.
+        @param what: Operation name for the timeout error.
+        @returns: None
+        """
+        last_progress = time.monotonic()
+        progress = (self.snd_una, self.rcv_nxt)
+        while not done():
+            if self.state == "CLOSED":
+                raise ConnectionError(f"Connection closed during {what}")
+            now = time.monotonic()
+            if (self.snd_una, self.rcv_nxt) != progress:
+                progress = (self.snd_una, self.rcv_nxt)
+                last_progress = now
+            elif self.timeout is not None and now - last_progress > self.timeout:
+                raise socket.timeout(f"TCP {what} timed out")
+            wait = self._rto
+            if self._unacked:
+                wait = max(0.0, self._unacked[0][3] + self._rto - now)
+            readable, _, _ = select.select([self.link], [], [], min(wait, 0.05))
+            if readable:
+                self._poll()
+            self._retransmit()
+
+    def _retransmit(self):
+        """
+        Description: Go-back-N: when the oldest unacknowledged segment has waited a full RTO,
+                     everything unacknowledged is sent again and the RTO doubles.
+        """
+        if not self._unacked or time.monotonic() - self._unacked[0][3] < self._rto:
+            return
+        now = time.monotonic()
+        for entry in self._unacked:
+            seq, flags, data, _ = entry
+            options = [(OPT_MSS, self.mss), (OPT_WSCALE, WINDOW_SCALE)] if flags & SYN else None
+            self._transmit(flags, data, seq, options)
+            entry[3] = now
+        self._rto = min(self._rto * 2, MAX_RTO)
+
+    def _poll(self):
+        """
+        Description: Processes every queued segment of this connection, then sends one ACK if
+                     any of them carried data or a FIN.
+        """
+        need_ack = False
+        while True:
+            datagram = self.link.recv()
+            if datagram is None:
+                break
+            ihl = (datagram[0] & 0x0F) * 4
+            #cheap filter before building any objects: TCP from the peer, to our port
+            if datagram[9] != 6 or datagram[12:16] != self._dest_bytes or len(datagram) < ihl + 20:
+                continue
+            if struct.unpack_from('!HH', datagram, ihl) != (self.dest_port, self.src_port):
+                continue
+            total_len = struct.unpack_from('!H', datagram, 2)[0]
+            need_ack |= self._segment(TCP(raw_bytes=datagram[ihl:total_len or None]))
+        if need_ack:
+            self._send_ack()
+
+    def _segment(self, tcp):
+        """
+        Description: Handles one segment from the peer.
+
+        @param tcp: The parsed segment.
+        @returns: (bool) True when the segment must be acknowledged.
+        """
+        flags = tcp.flags
+        if flags & RST:
+            self.state = "CLOSED"
+            raise ConnectionResetError("Connection reset by peer")
+        if self.state == "SYN_SENT":
+            if flags & SYN and flags & ACK and tcp.ack_seq == (self._iss + 1) & 0xFFFFFFFF:
+                self.rcv_nxt = (tcp.seq + 1) & 0xFFFFFFFF
+                self.peer_mss = min(tcp.mss or 536, self.mss)
+                if tcp.window_scale is not None:
+                    self._peer_wscale = min(tcp.window_scale, 14)
+                    self._wscale = WINDOW_SCALE
+                self.peer_window = tcp.window
+                self.snd_una = tcp.ack_seq
+                self._unacked.clear()
+                self.state = "ESTABLISHED"
+                return True
+            return False
+        if flags & ACK:
+            self._ack(tcp)
+        need_ack = False
+        data = tcp.data
+        if data:
+            need_ack = True
+            offset = (self.rcv_nxt - tcp.seq) & 0xFFFFFFFF
+            if offset < len(data):
+                #new data at (or overlapping) the next expected byte
+                self._accept(data[offset:])
+            elif offset > 0x7FFFFFFF and len(self._out_of_order) < 256:
+                #a segment past a gap: keep it until the gap is filled
+                self._out_of_order[tcp.seq] = data
+        if flags & FIN and (tcp.seq + len(data)) & 0xFFFFFFFF == self.rcv_nxt:
+            self.rcv_nxt = (self.rcv_nxt + 1) & 0xFFFFFFFF
+            self.peer_closed = True
+            need_ack = True
+        return need_ack
+
+    def _accept(self, data):
+        self._buffer += data
+        self.rcv_nxt = (self.rcv_nxt + len(data)) & 0xFFFFFFFF
+        while self.rcv_nxt in self._out_of_order:
+            data = self._out_of_order.pop(self.rcv_nxt)
+            self._buffer += data
+            self.rcv_nxt = (self.rcv_nxt + len(data)) & 0xFFFFFFFF
+        #drop queued segments the data just delivered has overtaken
+        for seq in [seq for seq in self._out_of_order if (seq - self.rcv_nxt) & 0xFFFFFFFF > 0x7FFFFFFF]:
+            del self._out_of_order[seq]
+
+    def _ack(self, tcp):
+        acked = (tcp.ack_seq - self.snd_una) & 0xFFFFFFFF
+        in_flight = (self.snd_nxt - self.snd_una) & 0xFFFFFFFF
+        if 0 < acked <= in_flight:
+            self.snd_una = tcp.ack_seq
+            while self._unacked:
+                seq, flags, data, _ = self._unacked[0]
+                end = (seq + len(data) + (1 if flags & (SYN | FIN) else 0)) & 0xFFFFFFFF
+                if (self.snd_una - end) & 0xFFFFFFFF > 0x7FFFFFFF:
+                    break
+                self._unacked.pop(0)
+            self._rto = max(MIN_RTO, self._rto / 2)
+        if acked <= in_flight:
+            self.peer_window = tcp.window << self._peer_wscale
+
+
+def connect(dest_IP, dest_port, link=None, timeout=5.0):
+    """
+    Description: Opens a connected TCPConnection.
+
+    @param dest_IP: Server IPv4 address.
+    @param dest_port: Server port.
+    @param link: RawIPLink or PacketLink (a RawIPLink by default).
+    @param timeout: Seconds a blocking call may wait without progress.
+    @returns: (TCPConnection) The established connection.
+    """
+    conn = TCPConnection(dest_IP, dest_port, link=link, timeout=timeout)
+    conn.connect()
+    return conn
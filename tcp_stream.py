@@ -0,0 +1,377 @@
+"""
+tcp_stream.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: TCP stream reassembly for captured traffic. Segments are fed in capture order
+             (Ethernet frames, IPv4/IPv6 datagrams or whole captures); each direction of every
+             connection is put back in sequence order and handed to a per-connection consumer
+             as it becomes contiguous, so nothing is buffered beyond out-of-order data.
+             Retransmitted and overlapping bytes are trimmed, and data that never arrives
+             (capture loss) is reported as a gap instead of stalling the stream.
+
+             Headers are read straight from the frame bytes rather than by building layer
+             objects, since reassembly runs over every segment of large captures.
+
+             A consumer is created for each new connection by the factory given to
+             TCPReassembler and gets these calls:
+               data(from_client, ts, data)  - next contiguous bytes of one direction
+               gap(from_client, ts, size)   - size bytes of that direction were never seen
+               end(from_client, ts)         - that direction was closed by FIN
+               close(ts)                    - the connection ended (RST, both FINs, idle)
+"""
+
+import struct
+from IPv6 import EXTENSION_HEADERS, walk_extensions
+from addresses import ipv6_to_str
+import pcap
+
+
+FIN = 0x01
+SYN = 0x02
+RST = 0x04
+ACK = 0x10
+
+#out-of-order data kept per direction before the hole in front of it is declared lost
+MAX_OUT_OF_ORDER = 1 << 20
+#seconds without a segment after which a connection is closed by expire()
+IDLE_TIMEOUT = 300.0
+
+_MOD = 1 << 32
+_HALF = 1 << 31
+
+
+def _seq_diff(a, b):
+    """
+    Description: a - b in sequence space (signed, wrapping at 2^32).
+    """
+    diff = (a - b) % _MOD
+    return diff - _MOD if diff >= _HALF else diff
+
+
+class _HalfStream:
+    def __init__(self):
+        """
+        Description: Reassembly state of one direction of a connection.
+        """
+        self.next_seq = None
+        #out-of-order segments by sequence number
+        self.pending = {}
+        self.pending_bytes = 0
+        self.fin_seq = None
+        self.ended = False
+        self.bytes = 0
+        self.gaps = 0
+
+
+class TCPStream:
+    def __init__(self, client, server, ts):
+        """
+        Description: One reassembled connection.
+
+        @param client: (address, port) of the side believed to have opened the connection.
+        @param server: (address, port) of the other side.
+        @param ts: Capture time of the first segment.
+        @returns: None
+        """
+        self.client = client
+        self.server = server
+        self.start = ts
+        self.last_seen = ts
+        self.halves = (_HalfStream(), _HalfStream())
+        self.consumer = None
+        self.closed = False
+        self.keys = ()
+
+    def __repr__(self):
+        return f"TCPStream({self.client[0]}:{self.client[1]} > {self.server[0]}:{self.server[1]})"
+
+
+def _ip_address(packed):
+    if len(packed) == 4:
+        return ".".join(map(str, packed))
+    return ipv6_to_str(packed)
+
+
+class TCPReassembler:
+    def __init__(self, consumer_factory, max_out_of_order=MAX_OUT_OF_ORDER, idle_timeout=IDLE_TIMEOUT):
+        """
+        Description: Creates a reassembler.
+
+        @param consumer_factory: Called with each new TCPStream; returns its consumer (see the
+                                 module description) or None to ignore the connection.
+        @param max_out_of_order: Bytes of out-of-order data kept per direction.
+        @param idle_timeout: Seconds of silence after which expire() closes a connection.
+        @returns: None
+        """
+        self.consumer_factory = consumer_factory
+        self.max_out_of_order = max_out_of_order
+        self.idle_timeout = idle_timeout
+        #both directed 4-tuples of a connection map to it
+        self.streams = {}
+        self.segments = 0
+
+    def feed_frame(self, ts, frame):
+        """
+        Description: Feeds one Ethernet frame (802.1Q tags are skipped).
+
+        @param ts: Capture time in seconds.
+        @param frame: Frame bytes.
+        @returns: None
+        """
+        offset = 12
+        ethr_type = frame[12] << 8 | frame[13] if len(frame) >= 14 else 0
+        while ethr_type in (0x8100, 0x88A8) and len(frame) >= offset + 6:
+            offset += 4
+            ethr_type = frame[offset] << 8 | frame[offset + 1]
+        if ethr_type in (0x0800, 0x86DD):
+            self.feed_ip(ts, frame[offset + 2:])
+
+    def feed_ip(self, ts, datagram):
+        """
+        Description: Feeds one IPv4 or IPv6 datagram; anything but unfragmented TCP is ignored.
+
+        @param ts: Capture time in seconds.
+        @param datagram: Datagram bytes.
+        @returns: None
+        """
+        if not datagram:
+            return
+        version = datagram[0] >> 4
+        if version == 4:
+            if len(datagram) < 20 or datagram[9] != 6:
+                return
+            #fragments cannot be reassembled here (more fragments flag or an offset)
+            if struct.unpack('!H', datagram[6:8])[0] & 0x3FFF:
+                return
+            header_len = (datagram[0] & 0x0F) * 4
+            total = datagram[2] << 8 | datagram[3]
+            src, dst = datagram[12:16], datagram[16:20]
+            segment = datagram[header_len:total] if header_len <= total <= len(datagram) else datagram[header_len:]
+        elif version == 6:
+            if len(datagram) < 40:
+                return
+            protocol, offset = datagram[6], 40
+            if protocol in EXTENSION_HEADERS:
+                protocol, offset, _ = walk_extensions(datagram, protocol)
+            if protocol != 6:
+                return
+            length = datagram[4] << 8 | datagram[5]
+            src, dst = datagram[8:24], datagram[24:40]
+            segment = datagram[offset:40 + length] if length else datagram[offset:]
+        else:
+            return
+        self.feed_segment(ts, src, dst, segment)
+
+    def _feed_sll(self, ts, frame):
+        #Linux cooked capture: 16-byte header ending in the protocol type
+        if frame[14:16] in (b'\x08\x00', b'\x86\xdd'):
+            self.feed_ip(ts, frame[16:])
+
+    def feed_segment(self, ts, src, dst, segment):
+        """
+        Description: Feeds one TCP segment.
+
+        @param ts: Capture time in seconds.
+        @param src: Packed source address.
+        @param dst: Packed destination address.
+        @param segment: TCP header and data.
+        @returns: None
+        """
+        if len(segment) < 20:
+            return
+        self.segments += 1
+        sport, dport, seq = struct.unpack('!HHL', segment[:8])
+        flags = segment[13]
+        data = segment[(segment[12] >> 4) * 4:]
+        key = (src, sport, dst, dport)
+        entry = self.streams.get(key)
+        if entry is None:
+            #stray ACKs, FINs and RSTs (e.g. after a close) do not open a connection
+            if flags & RST or not (flags & SYN or data):
+                return
+            entry = self._new_stream(ts, key, flags)
+        stream, from_client = entry
+        stream.last_seen = ts
+        if flags & RST:
+            self._close(stream, ts)
+            return
+        if stream.consumer is None:
+            return
+        half = stream.halves[0 if from_client else 1]
+        if half.ended:
+            return
+        if flags & SYN:
+            half.next_seq = (seq + 1) % _MOD
+            seq = half.next_seq
+            if not data:
+                return
+        elif half.next_seq is None:
+            #connection picked up mid-stream: start at the first segment seen
+            half.next_seq = seq
+        if flags & FIN:
+            half.fin_seq = (seq + len(data)) % _MOD
+        if data:
+            self._add(stream, half, from_client, ts, seq, data)
+        if half.fin_seq is not None and half.next_seq == half.fin_seq:
+            self._end(stream, half, from_client, ts)
+
+    def _new_stream(self, ts, key, flags):
+        src, sport, dst, dport = key
+        a, b = (_ip_address(src), sport), (_ip_address(dst), dport)
+        #the SYN sender opened the connection; without a handshake the lower port is the server
+        if flags & SYN:
+            client_first = not flags & ACK
+        else:
+            client_first = sport >= dport
+        stream = TCPStream(a, b, ts) if client_first else TCPStream(b, a, ts)
+        #connections without a consumer stay registered (and ignored) until they expire
+        stream.consumer = self.consumer_factory(stream)
+        stream.keys = (key, (dst, dport, src, sport))
+        self.streams[key] = (stream, client_first)
+        self.streams[stream.keys[1]] = (stream, not client_first)
+        return self.streams[key]
+
+    def _add(self, stream, half, from_client, ts, seq, data):
+        offset = _seq_diff(half.next_seq, seq)
+        if offset > 0:
+            #retransmitted or overlapping bytes
+            if offset >= len(data):
+                return
+            data = data[offset:]
+            seq = half.next_seq
+        elif offset < 0:
+            if seq not in half.pending or len(half.pending[seq]) < len(data):
+                half.pending_bytes += len(data) - len(half.pending.get(seq, b''))
+                half.pending[seq] = data
+            if half.pending_bytes > self.max_out_of_order:
+                self._skip_hole(stream, half, from_client, ts)
+            return
+        self._deliver(stream, half, from_client, ts, data)
+        if half.pending:
+            self._drain(stream, half, from_client, ts)
+
+    def _deliver(self, stream, half, from_client, ts, data):
+        half.next_seq = (half.next_seq + len(data)) % _MOD
+        half.bytes += len(data)
+        stream.consumer.data(from_client, ts, data)
+
+    def _drain(self, stream, half, from_client, ts):
+        pending = half.pending
+        while pending:
+            progressed = False
+            for seq in list(pending):
+                offset = _seq_diff(half.next_seq, seq)
+                if offset < 0:
+                    continue
+                data = pending.pop(seq)
+                half.pending_bytes -= len(data)
+                progressed = True
+                if offset < len(data):
+                    self._deliver(stream, half, from_client, ts, data[offset:])
+            if not progressed:
+                return
+
+    def _skip_hole(self, stream, half, from_client, ts):
+        """
+        Description: Declares the bytes before the earliest out-of-order segment lost and
+                     continues from it.
+        """
+        first = min(half.pending, key=lambda seq: _seq_diff(seq, half.next_seq))
+        size = _seq_diff(first, half.next_seq)
+        half.gaps += 1
+        stream.consumer.gap(from_client, ts, size)
+        half.next_seq = first
+        self._drain(stream, half, from_client, ts)
+
+    def _end(self, stream, half, from_client, ts):
+        half.ended = True
+        stream.consumer.end(from_client, ts)
+        if all(h.ended for h in stream.halves):
+            self._close(stream, ts)
+
+    def _close(self, stream, ts):
+        if stream.closed:
+            return
+        stream.closed = True
+        for key in stream.keys:
+            self.streams.pop(key, None)
+        if stream.consumer is None:
+            return
+        for half, from_client in zip(stream.halves, (True, False)):
+            if half.pending and not half.ended:
+                #flush what is left behind the holes
+                while half.pending:
+                    self._skip_hole(stream, half, from_client, ts)
+        stream.consumer.close(ts)
+
+    def expire(self, now):
+        """
+        Description: Closes connections idle for longer than idle_timeout.
+
+        @param now: Current (capture) time in seconds.
+        @returns: (int) Number of connections closed.
+        """
+        idle = {s for s, _ in self.streams.values() if now - s.last_seen > self.idle_timeout}
+        for stream in idle:
+            self._close(stream, now)
+        return len(idle)
+
+    def flush(self, ts=None):
+        """
+        Description: Closes every open connection (end of capture).
+
+        @param ts: Time given to the consumers (defaults to each connection's last segment).
+        @returns: None
+        """
+        for stream in {s for s, _ in self.streams.values()}:
+            self._close(stream, stream.last_seen if ts is None else ts)
+
+    def feeder(self, link_type):
+        """
+        Description: Feed function for records of a capture with the given link type.
+
+        @param link_type: pcap LINKTYPE_* value.
+        @returns: (callable) f(ts, data).
+        """
+        if link_type == pcap.LINKTYPE_ETHERNET:
+            return self.feed_frame
+        if link_type == pcap.LINKTYPE_RAW:
+            return self.feed_ip
+        if link_type == pcap.LINKTYPE_LINUX_SLL:
+            return self._feed_sll
+        raise pcap.PcapError(f"unsupported link type {link_type}")
+
+    def iter_pcap(self, path, expire_interval=60.0):
+        """
+        Description: Feeds a capture file one record at a time, expiring idle connections as
+                     capture time advances and flushing the rest at the end. Yields after every
+                     record so consumers can hand out results while the capture is read.
+
+        @param path: Path of the pcap file.
+        @param expire_interval: Capture seconds between idle checks.
+        @returns: Generator of record timestamps.
+        """
+        with pcap.PcapReader(path) as reader:
+            feed = self.feeder(reader.link_type)
+            next_expire = None
+            for ts, data, _ in reader:
+                feed(ts, data)
+                if next_expire is None:
+                    next_expire = ts + expire_interval
+                elif ts >= next_expire:
+                    self.expire(ts)
+                    next_expire = ts + expire_interval
+                yield ts
+        self.flush()
+        yield None
+
+    def feed_pcap(self, path, expire_interval=60.0):
+        """
+        Description: Feeds a whole capture file (see iter_pcap).
+
+        @param path: Path of the pcap file.
+        @param expire_interval: Capture seconds between idle checks.
+        @returns: None
+        """
+        for _ in self.iter_pcap(path, expire_interval):
+            pass
@@ -9,11 +9,14 @@ from network_utils import send
 from network_utils import sendp
 from network_utils import sniff
 from network_utils import sr
+import events
 
 # =========================
 # ICMP Test Function
 # =========================
 if __name__ == "__main__":
+    #the library is silent by default, print progress and dump received packets
+    events.set_verbosity(2)
     INTERFACE = "enp0s3"
     MY_IP = "10.0.2.15"
     MY_MAC = "08:00:27:e2:a4:11"
@@ -0,0 +1,135 @@
+"""
+test_dedup.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Checks that packet digests ignore what routers change, and how DedupIndex tags
+             copies, retransmissions and repeats over time, including generation rotation
+             and overflow.
+"""
+
+import struct
+from Ether import Ether
+from IP import IP
+from IPv6 import IPv6
+from TCP import TCP
+from UDP import UDP
+from dedup import DUPLICATE, NEW, RETRANSMIT, DedupIndex, packet_digest, segment_key
+
+
+MACS = {"dest_mac": "02:00:00:00:00:02", "src_mac": "02:00:00:00:00:01"}
+
+
+def _tcp(seq=1000, data=b'hello', ID=1, ttl=64, flags=0x18):
+    ip = IP(src_IP="10.0.0.1", dest_IP="10.0.0.2", protocol=6, ttl=ttl).replace(ID=ID)
+    tcp = TCP(src_port=40000, dst_port=80, seq=seq, flags=flags, data=data,
+              ip_src="10.0.0.1", ip_dst="10.0.0.2")
+    return Ether(payload=(ip / tcp).build(), **MACS).build()
+
+
+def _udp(port=53, ID=1, ttl=64):
+    ip = IP(src_IP="10.0.0.1", dest_IP="10.0.0.2", protocol=17, ttl=ttl).replace(ID=ID)
+    udp = UDP(src_port=40000, dst_port=port, payload=b'query', src_ip="10.0.0.1", dst_ip="10.0.0.2")
+    return Ether(payload=(ip / udp).build(), **MACS).build()
+
+
+def _tagged(frame):
+    return frame[:12] + struct.pack("!HH", 0x8100, 10) + frame[12:]
+
+
+def test_digest_ignores_what_routers_change():
+    frame = _tcp()
+    digest = packet_digest(frame)
+    assert len(digest) == 8
+    #another TTL changes the IPv4 header checksum too
+    routed = _tcp(ttl=63)
+    assert routed != frame
+    assert packet_digest(routed) == digest
+    #other MAC addresses, a VLAN tag, Ethernet padding and a memoryview of the frame
+    assert packet_digest(b'\xaa' * 12 + frame[12:]) == digest
+    assert packet_digest(_tagged(routed)) == digest
+    assert packet_digest(frame + bytes(10)) == digest
+    assert packet_digest(memoryview(bytearray(frame))) == digest
+    #what the sender chose is part of it
+    assert packet_digest(_tcp(ID=2)) != digest
+    assert packet_digest(_tcp(data=b'hellp')) != digest
+
+
+def test_digest_ipv6_ignores_hop_limit():
+    def frame(hop_limit):
+        ip = IPv6(src_IP="2001:db8::1", dest_IP="2001:db8::2", protocol=17, hop_limit=hop_limit)
+        udp = UDP(src_port=40000, dst_port=53, payload=b'query', src_ip="2001:db8::1", dst_ip="2001:db8::2")
+        return Ether(ethr_type=0x86DD, payload=(ip / udp).build(), **MACS).build()
+    assert packet_digest(frame(64)) == packet_digest(frame(1))
+
+
+def test_segment_key():
+    assert segment_key(_tcp()) == segment_key(_tcp(ID=9, ttl=10))
+    assert segment_key(_tcp()) != segment_key(_tcp(seq=1005))
+    #pure ACKs occupy no sequence space; a SYN does
+    assert segment_key(_tcp(data=b'', flags=0x10)) is None
+    assert segment_key(_tcp(data=b'', flags=0x02)) is not None
+    assert segment_key(_udp()) is None
+
+
+def test_duplicate_within_max_skew():
+    tags = []
+    index = DedupIndex(window=1.0, max_skew=0.01, on_tag=lambda ts, frame, tag: tags.append((ts, tag)))
+    assert index.classify(0.0, _udp()) == NEW
+    #another tap's copy, after a router
+    assert index.classify(0.005, _tagged(_udp(ttl=63))) == DUPLICATE
+    #sent again later: a new packet, and copies of it are measured from now
+    assert index.classify(0.5, _udp()) == NEW
+    assert index.classify(0.508, _udp()) == DUPLICATE
+    assert index.classify(0.6, _udp()) == NEW
+    assert tags == [(0.005, DUPLICATE), (0.508, DUPLICATE)]
+    assert (index.duplicates, index.retransmits, index.seen) == (2, 0, 5)
+
+
+def test_retransmit():
+    index = DedupIndex(window=1.0, max_skew=0.01)
+    assert index.classify(0.0, _tcp()) == NEW
+    #a copy seen on another tap is a duplicate, not a retransmission
+    assert index.classify(0.002, _tcp(ttl=60)) == DUPLICATE
+    #the same segment resent with a new IP ID
+    assert index.classify(0.2, _tcp(ID=2)) == RETRANSMIT
+    #the same bytes resent after max_skew
+    assert index.classify(0.4, _tcp()) == RETRANSMIT
+    assert index.classify(0.5, _tcp(seq=1005, ID=3)) == NEW
+    #pure ACKs repeat without being retransmissions
+    ack = _tcp(data=b'', flags=0x10, ID=4)
+    assert index.classify(0.6, ack) == NEW
+    assert index.classify(0.7, ack) == NEW
+    assert index.stats()["retransmits"] == 2
+
+
+def test_generations_expire():
+    index = DedupIndex(window=1.0, max_skew=0.01)
+    index.classify(0.0, _tcp())
+    #remembered for at least a window, across one rotation
+    assert index.classify(1.5, _tcp(ID=2)) == RETRANSMIT
+    assert len(index) > 0
+    #forgotten after two rotations
+    index.classify(2.5, _udp())
+    assert index.classify(3.6, _tcp(ID=3)) == NEW
+    #a gap of more than a window drops both generations at once
+    index.classify(10.0, _udp(port=1))
+    assert len(index) == 1
+    assert index.classify(10.1, _tcp(ID=4)) == NEW
+
+
+def test_overflow():
+    index = DedupIndex(window=10.0, max_entries=8, max_skew=0.01)
+    #each generation holds 4 digests: the fifth packet starts a new generation early
+    for port in range(5):
+        assert index.classify(0.0, _udp(port=port)) == NEW
+    assert index.overflows == 1
+    assert len(index) == 5
+    #the older generation is still looked up
+    assert index.classify(0.001, _udp(port=0)) == DUPLICATE
+    for port in range(5, 9):
+        index.classify(0.002, _udp(port=port))
+    assert index.overflows == 2
+    assert len(index) == 5
+    #the one before it is gone
+    assert index.classify(0.003, _udp(port=1)) == NEW
+    assert index.stats()["overflows"] == 2
@@ -0,0 +1,140 @@
+"""
+test_display_filter.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Compiles display filters and matches them against built frames: operator
+             precedence, sets and networks, VLAN-tagged and truncated frames, and the
+             positions FilterError reports for bad expressions.
+"""
+
+import struct
+import pytest
+import pcap
+from Ether import Ether
+from IP import IP
+from TCP import TCP
+from UDP import UDP
+from display_filter import DisplayFilter, FilterError, filter_pcap
+
+
+MACS = {"dest_mac": "02:00:00:00:00:02", "src_mac": "02:00:00:00:00:01"}
+
+
+def _tcp(src="10.0.0.1", dst="192.168.1.20", dport=80, flags=2, data=b''):
+    return (IP(src_IP=src, dest_IP=dst, protocol=6) /
+            TCP(src_port=40000, dst_port=dport, flags=flags, data=data, ip_src=src, ip_dst=dst)).build()
+
+
+def _udp(src="10.0.0.1", dst="192.168.1.20", dport=53):
+    return (IP(src_IP=src, dest_IP=dst, protocol=17) /
+            UDP(src_port=40000, dst_port=dport, payload=b'x', src_ip=src, dst_ip=dst)).build()
+
+
+def _ether(ip_bytes):
+    return Ether(payload=ip_bytes, **MACS).build()
+
+
+def _tagged(ip_bytes, vlan_id, priority=0):
+    #an 802.1Q tag between the MAC addresses and the IPv4 EtherType
+    plain = _ether(ip_bytes)
+    return plain[:12] + struct.pack("!HH", 0x8100, priority << 13 | vlan_id) + plain[12:]
+
+
+def _matches(expression, data, link_type=pcap.LINKTYPE_ETHERNET):
+    return DisplayFilter(expression).match(data, link_type)
+
+
+@pytest.mark.parametrize("expression, expected", [
+    #and binds tighter than or
+    ("tcp or udp and udp.port == 53", True),
+    ("(tcp or udp) and udp.port == 53", False),
+    ("udp and udp.port == 53 or tcp.port == 80", True),
+    #not binds tighter than and
+    ("not tcp and udp", False),
+    ("not (tcp and udp)", True),
+    ("! udp && tcp.flags.syn && !tcp.flags.ack", True),
+    ("not not tcp", True),
+    ("tcp.port eq 80 || tcp.port ge 1024", True),
+    ("tcp.port < 80 or tcp.dstport > 80", False),
+])
+def test_operator_precedence(expression, expected):
+    assert _matches(expression, _ether(_tcp())) is expected
+
+
+def test_sets():
+    frame = _ether(_tcp(dport=443))
+    assert _matches("tcp.port in {80 443 8080}", frame)
+    assert _matches("tcp.dstport in {80, 443}", frame)
+    assert not _matches("tcp.dstport in {80 8080}", frame)
+    #tcp.port matches either direction: 40000 is the source port
+    assert _matches("tcp.port in {22 40000}", frame)
+    assert _matches('ip.dst in {10.0.0.0/8 192.168.1.0/24}', frame)
+    assert not _matches('ip.dst in {10.0.0.0/8 172.16.0.0/12}', frame)
+
+
+def test_networks():
+    frame = _ether(_tcp(src="10.1.2.3", dst="192.168.1.20"))
+    assert _matches("ip.src == 10.0.0.0/8", frame)
+    assert _matches("ip.src == 10.1.2.0/24 and ip.dst == 192.168.1.20/32", frame)
+    assert not _matches("ip.src == 10.1.3.0/24", frame)
+    assert _matches("ip.src != 10.1.3.0/24", frame)
+    #ip.addr == matches either address; != means neither is equal
+    assert _matches("ip.addr == 192.168.0.0/16", frame)
+    assert not _matches("ip.addr != 192.168.0.0/16", frame)
+    assert _matches("ip.addr != 172.16.0.0/12", frame)
+
+
+def test_payload_and_raw_ip():
+    packet = _tcp(flags=0x18, data=b"GET /index.html HTTP/1.1\r\nHost: example.com\r\n\r\n")
+    for data, link_type in [(_ether(packet), pcap.LINKTYPE_ETHERNET), (packet, pcap.LINKTYPE_RAW)]:
+        assert _matches('tcp.payload contains "GET /"', data, link_type)
+        assert _matches('http.request.method == "GET" and http.host ~ "example\\\\.com$"', data, link_type)
+        assert not _matches("http.response", data, link_type)
+
+
+def test_vlan_frames():
+    frame = _tagged(_udp(dport=53), 100, priority=5)
+    assert _matches("vlan", frame)
+    assert _matches("vlan.id == 100 and vlan.priority == 5", frame)
+    #the fields after the tag are read from the inner IPv4 packet
+    assert _matches("vlan.id == 100 and ip.dst == 192.168.1.20 and udp.dstport == 53", frame)
+    assert _matches("eth.type == 0x0800", frame)
+    assert not _matches("vlan", _ether(_udp()))
+
+
+@pytest.mark.parametrize("size", range(12, 19))
+def test_truncated_vlan_frames(size):
+    #runt tagged frames must not make the readers run past the end of the frame
+    frame = _tagged(_udp(), 100)[:size]
+    matches = DisplayFilter("vlan.id == 100 or vlan.priority == 1 or ip or udp").matcher()
+    assert matches(frame) is (size == 18)
+    assert DisplayFilter("vlan").match(frame) is (size == 18)
+
+
+def test_filter_pcap_skips_runts(tmp_path):
+    path = str(tmp_path / "vlan.pcap")
+    frames = [_tagged(_udp(), 100)[:16], _tagged(_udp(), 100), _tagged(_udp(), 200)]
+    with pcap.PcapWriter(path) as writer:
+        for frame in frames:
+            writer.write(0.0, frame)
+    assert [data for _, data in filter_pcap(path, "vlan.id == 100")] == [frames[1]]
+
+
+@pytest.mark.parametrize("expression, message", [
+    ("tcp.port == 80 and", "expected a field at 18 (found end of expression)"),
+    ("tcp and bogus.field", "unknown field 'bogus.field' at 8"),
+    ("(tcp or udp", "expected ')' at 11 (found end of expression)"),
+    ("tcp.port in {}", "empty set at 13 (found '}')"),
+    ("tcp.port in {80 443", "expected '}' at 19 (found end of expression)"),
+    ("ip.src  @ 1", "unexpected '@ 1' at 8"),
+    ("tcp == 1", "tcp is a protocol and has no value at 4 (found '==')"),
+    ("ip.src == 10.0.0.300", "ip.src: bad ipv4 address '10.0.0.300' at 10"),
+    ("ip.src > 10.0.0.0/8", "ip.src: networks only compare with == and != at 9"),
+    ('tcp.payload < "x"', "tcp.payload: < needs a numeric field at 14"),
+    ("tcp.port == abc", "tcp.port: bad number 'abc' at 12"),
+    ("udp udp", "expected and/or at 4 (found 'udp')"),
+])
+def test_error_positions(expression, message):
+    with pytest.raises(FilterError) as error:
+        DisplayFilter(expression)
+    assert str(error.value) == message
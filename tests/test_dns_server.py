@@ -0,0 +1,177 @@
+"""
+test_dns_server.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Answers queries with DNSResponder.respond(), no socket involved: zone file
+             loading, CNAME chains, negative answers with the SOA, refused queries, truncation
+             and the response cache.
+"""
+
+import pytest
+from DNS import (DNS, EDNS, FLAG_AA, FLAG_QR, FLAG_RD, FLAG_TC, RCODE_FORMERR, RCODE_NXDOMAIN,
+                 RCODE_REFUSED)
+from dns_server import DNSResponder, Zone, ZoneError
+
+
+ZONE = """
+$ORIGIN example.com.
+$TTL 600
+@       IN  SOA  ns1 admin ( 2026101901 ; serial
+                             7200 3600 1209600
+                             300 )      ; negative TTL
+        IN  NS   ns1
+        IN  MX   10 mail
+ns1         A    192.0.2.1
+www     60  A    192.0.2.10
+            AAAA 2001:db8::10
+mail        CNAME www
+alias       CNAME mail.example.com.
+away        CNAME www.example.org.
+a.b.c       TXT  "hello world" "second string"
+loop1       CNAME loop2
+loop2       CNAME loop1
+"""
+
+
+@pytest.fixture
+def responder():
+    zone = Zone()
+    zone.load(ZONE)
+    return DNSResponder(zone)
+
+
+def _ask(responder, qname, qtype=1, transaction_id=0x1234, **query_args):
+    wire = responder.respond(DNS(transaction_id=transaction_id, qname=qname, qtype=qtype, **query_args).build())
+    return DNS(raw_bytes=wire)
+
+
+def _rcode(message):
+    return message.flags & 0x0F
+
+
+def _values(records):
+    return [(record.name, record.rtype, record.value) for record in records]
+
+
+def test_zone_load():
+    zone = Zone()
+    assert zone.load(ZONE) == 12
+    soa, = zone.records[("example.com", 6)]
+    assert soa.value == ("ns1.example.com", "admin.example.com", 2026101901, 7200, 3600, 1209600, 300)
+    assert soa.ttl == 600
+    #the negative TTL is the smaller of the SOA's TTL and its minimum
+    assert zone.apexes["example.com"].ttl == 300
+    #owner names carry over to lines starting with a blank
+    assert [record.value for record in zone.records[("example.com", 15)]] == [(10, "mail.example.com")]
+    www, = zone.records[("www.example.com", 1)]
+    assert (www.value, www.ttl) == ("192.0.2.10", 60)
+    assert zone.records[("www.example.com", 28)][0].value == "2001:db8::10"
+    assert zone.records[("alias.example.com", 5)][0].value == "mail.example.com"
+    assert zone.records[("a.b.c.example.com", 16)][0].value == ["hello world", "second string"]
+    #empty non-terminals exist
+    assert {"b.c.example.com", "c.example.com"} <= zone.names
+
+
+@pytest.mark.parametrize("text, message", [
+    ("  A 192.0.2.1", "line 1: record without an owner name"),
+    ("www BOGUS 1", "line 1: unknown record type"),
+    ("www A not-an-address", "line 1: bad 1 record"),
+    ("@ SOA ns1 admin ( 1 2 3", "unbalanced parentheses"),
+])
+def test_zone_load_errors(text, message):
+    with pytest.raises(ZoneError, match=message):
+        Zone("example.com").load(text)
+
+
+def test_answer(responder):
+    response = _ask(responder, "WWW.Example.com")
+    assert response.transaction_id == 0x1234
+    assert response.flags == FLAG_QR | FLAG_AA | FLAG_RD
+    #names match whatever their case; the answer keeps the question's spelling
+    assert _values(response.answers) == [("WWW.Example.com", 1, "192.0.2.10")]
+    assert response.authority == []
+
+
+def test_cname_chain(responder):
+    response = _ask(responder, "alias.example.com")
+    assert _rcode(response) == 0
+    assert _values(response.answers) == [("alias.example.com", 5, "mail.example.com"),
+                                         ("mail.example.com", 5, "www.example.com"),
+                                         ("www.example.com", 1, "192.0.2.10")]
+    #a chain leaving the zone ends at the CNAME pointing out of it
+    response = _ask(responder, "away.example.com")
+    assert _rcode(response) == 0
+    assert _values(response.answers) == [("away.example.com", 5, "www.example.org")]
+    #a CNAME is the answer to a CNAME query, not followed
+    assert _values(_ask(responder, "mail.example.com", 5).answers) == [("mail.example.com", 5, "www.example.com")]
+
+
+def test_cname_loop_ends(responder):
+    response = _ask(responder, "loop1.example.com")
+    assert len(response.answers) == 8
+    assert _rcode(response) == 0
+
+
+def test_nxdomain_and_nodata(responder):
+    soa = ("example.com", 6, ("ns1.example.com", "admin.example.com", 2026101901, 7200, 3600, 1209600, 300))
+    nxdomain = _ask(responder, "missing.example.com")
+    assert nxdomain.flags & FLAG_AA and _rcode(nxdomain) == RCODE_NXDOMAIN
+    assert nxdomain.answers == [] and _values(nxdomain.authority) == [soa]
+    assert nxdomain.authority[0].ttl == 300
+    #the name exists (with another type, or as an empty non-terminal): NODATA
+    for qname, qtype in [("www.example.com", 15), ("b.c.example.com", 1)]:
+        nodata = _ask(responder, qname, qtype)
+        assert nodata.flags & FLAG_AA and _rcode(nodata) == 0
+        assert nodata.answers == [] and _values(nodata.authority) == [soa]
+    #the end of a chain inside the zone is missing: the CNAMEs and NXDOMAIN
+    responder.zone.add("dangling.example.com.", "CNAME", "gone.example.com")
+    dangling = _ask(responder, "dangling.example.com")
+    assert _rcode(dangling) == RCODE_NXDOMAIN
+    assert _values(dangling.answers) == [("dangling.example.com", 5, "gone.example.com")]
+    assert _values(dangling.authority) == [soa]
+
+
+def test_refused(responder):
+    for response in [_ask(responder, "www.example.org"), _ask(responder, "www.example.com", qclass=3)]:
+        assert _rcode(response) == RCODE_REFUSED
+        assert not response.flags & FLAG_AA
+        assert response.answers == [] and response.authority == []
+
+
+def test_truncation(responder):
+    for index in range(40):
+        responder.zone.add("big.example.com.", "A", f"192.0.2.{index}")
+    #40 A records take 640 bytes: over the 512 of plain UDP, within the 1232 of EDNS
+    truncated = _ask(responder, "big.example.com")
+    assert truncated.flags & FLAG_TC
+    assert truncated.answers == [] and truncated.qname == "big.example.com"
+    full = _ask(responder, "big.example.com", edns=EDNS())
+    assert not full.flags & FLAG_TC
+    assert len(full.answers) == 40
+    assert full.edns is not None
+
+
+def test_cache_hit_swaps_only_the_id(responder):
+    query = DNS(transaction_id=0x1111, qname="mail.example.com", qtype=1).build()
+    first = responder.respond(query)
+    assert (responder.hits, responder.misses) == (0, 1)
+
+    def fail(*args):
+        raise AssertionError("a cached query was looked up again")
+    responder.zone.lookup = fail
+    second = responder.respond(b"\x22\x22" + query[2:])
+    assert second == b"\x22\x22" + first[2:]
+    assert (responder.hits, responder.misses) == (1, 1)
+    #another question is not a hit
+    with pytest.raises(AssertionError):
+        responder.respond(DNS(transaction_id=0x1111, qname="mail.example.com", qtype=28).build())
+
+
+def test_malformed_queries(responder):
+    assert responder.respond(b"\x00\x01\x01") is None
+    #the question runs past the end of the message
+    response = responder.respond(DNS(transaction_id=7, qname="www.example.com").build()[:20])
+    #a bare header: the ID, QR and FORMERR, and no question
+    assert response == b"\x00\x07" + bytes((0x81, RCODE_FORMERR)) + bytes(8)
+    #responses are not answered
+    assert responder.respond(DNS(transaction_id=7, flags=FLAG_QR, qname="www.example.com").build()) is None
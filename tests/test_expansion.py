@@ -0,0 +1,89 @@
+"""
+test_expansion.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Checks Net indexing and that every packet an Expansion produces, by iteration or
+             by index, is byte for byte the packet built from the same field values, checksums
+             included.
+"""
+
+import itertools
+import pytest
+from ICMP import ICMP
+from IP import IP
+from TCP import TCP
+from UDP import UDP
+from expansion import Expansion, Net
+
+
+SOURCE = "10.0.0.1"
+
+
+def _ip(dest, protocol):
+    #a fixed ID, so separately built packets can be compared with the expanded ones
+    return IP(src_IP=SOURCE, dest_IP=dest, protocol=protocol).replace(ID=7)
+
+
+def _tcp(dest, port):
+    return _ip(dest, 6) / TCP(src_port=1000, dst_port=port, flags=2, data=b'probe',
+                              ip_src=SOURCE, ip_dst=dest)
+
+
+def _udp(dest, port):
+    return _ip(dest, 17) / UDP(src_port=1000, dst_port=port, payload=b'probe',
+                               src_ip=SOURCE, dst_ip=dest)
+
+
+def _icmp(dest, seq):
+    return _ip(dest, 1) / ICMP(ID=0x4242, seq=seq, payload=b'probe')
+
+
+def _expanded(make, dests, values):
+    #the stack for the first combination, with its fields then given every value
+    packet = make("10.0.0.0", values[0])
+    packet.dest_IP = dests
+    setattr(packet.payload, {_tcp: "dst_port", _udp: "dst_port", _icmp: "seq"}[make], values)
+    return packet.expand()
+
+
+def test_net_indexing():
+    net = Net("192.168.1.77/30")
+    assert net.network == "192.168.1.76/30"
+    assert len(net) == 4
+    assert list(net) == ["192.168.1.76", "192.168.1.77", "192.168.1.78", "192.168.1.79"]
+    assert net[-1] == "192.168.1.79"
+    assert net.packed(2) == bytes((192, 168, 1, 78))
+    with pytest.raises(IndexError):
+        net[4]
+    with pytest.raises(IndexError):
+        net[-5]
+
+
+def test_getitem_matches_iteration():
+    packets = _expanded(_tcp, "10.0.0.0/29", [22, 80, 443])
+    assert len(packets) == 24
+    listed = list(packets)
+    assert listed == [packets[index] for index in range(len(packets))]
+    assert packets[-1] == listed[-1]
+    with pytest.raises(IndexError):
+        packets[len(packets)]
+
+
+@pytest.mark.parametrize("make, values", [(_tcp, [22, 80]), (_udp, [53, 123]), (_icmp, [1, 2, 3])])
+def test_matches_built_packets(make, values):
+    #the TCP/UDP layers carry their own pseudo-header addresses (for the first destination):
+    #the expanded packets must still have the checksum of their own destination
+    dests = ["10.0.0.%d" % host for host in range(4)]
+    packets = _expanded(make, "10.0.0.0/30", values)
+    assert len(packets) == len(dests) * len(values)
+    for packet, (dest, value) in zip(packets, itertools.product(dests, values)):
+        assert packet == make(dest, value).build()
+
+
+def test_pseudo_header_from_ip_layer():
+    #a TCP layer without addresses takes its pseudo-header from the IP layer carrying it
+    packet = _ip("10.0.0.0/30", 6) / TCP(src_port=1000, dst_port=[22, 80], flags=2)
+    for packet_bytes, (dest, port) in zip(Expansion(packet), itertools.product(range(4), [22, 80])):
+        dest = "10.0.0.%d" % dest
+        built = _ip(dest, 6) / TCP(src_port=1000, dst_port=port, flags=2, ip_src=SOURCE, ip_dst=dest)
+        assert packet_bytes == built.build()
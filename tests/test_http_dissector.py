@@ -0,0 +1,160 @@
+"""
+test_http_dissector.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Feeds HTTP conversations as synthetic TCP segments to HTTPDissector and checks the
+             transactions it pairs up: pipelining, Content-Length and chunked bodies (with
+             trailers), responses without a body, and recovery from data lost from the capture.
+"""
+
+import struct
+from http_dissector import HTTPDissector
+from tcp_stream import ACK, FIN, SYN
+
+
+CLIENT = (bytes((10, 0, 0, 2)), 51000)
+SERVER = (bytes((10, 0, 0, 1)), 80)
+
+
+class Conversation:
+    def __init__(self, **dissector_args):
+        """
+        Description: A dissector and one connection on it, opened with a handshake. Each
+                     direction's sequence number advances with the data sent.
+        """
+        self.bodies = []
+        self.dissector = HTTPDissector(on_body=lambda message, data: self.bodies.append(bytes(data)),
+                                       **dissector_args)
+        self.next_seq = {True: 1000, False: 5000}
+        self._send(True, SYN)
+        self._send(False, SYN | ACK)
+
+    def _send(self, from_client, flags, data=b'', ts=0.0):
+        src, dst = (CLIENT, SERVER) if from_client else (SERVER, CLIENT)
+        seq = self.next_seq[from_client]
+        segment = struct.pack("!HHLLBBHHH", src[1], dst[1], seq, 0, 5 << 4, flags, 65535, 0, 0) + data
+        self.dissector.reassembler.feed_segment(ts, src[0], dst[0], segment)
+        self.next_seq[from_client] = seq + len(data) + (1 if flags & (SYN | FIN) else 0)
+
+    def client(self, data, ts=0.0):
+        self._send(True, ACK, data, ts)
+
+    def server(self, data, ts=0.0):
+        self._send(False, ACK, data, ts)
+
+    def lose(self, from_client, size):
+        #size bytes of the direction that the capture missed
+        self.next_seq[from_client] += size
+
+    def close(self):
+        self.dissector.flush()
+        return list(self.dissector.transactions)
+
+
+def _response(body=b'', status="200 OK", headers=b''):
+    return b"HTTP/1.1 " + status.encode() + b"\r\nContent-Length: " + str(len(body)).encode() + \
+        b"\r\n" + headers + b"\r\n" + body
+
+
+def test_single_transaction_timing():
+    conv = Conversation()
+    conv.client(b"GET /index.html HTTP/1.1\r\nHost: example.com\r\n\r\n", ts=1.0)
+    conv.server(_response(b"x" * 10)[:30], ts=1.5)
+    conv.server(_response(b"x" * 10)[30:], ts=2.0)
+    transaction, = conv.dissector.transactions
+    assert transaction.complete
+    assert (transaction.request.method, transaction.request.target) == ("GET", "/index.html")
+    assert transaction.request.header("HOST") == "example.com"
+    assert (transaction.response.status, transaction.response.body_bytes) == (200, 10)
+    assert transaction.time_to_first_byte == 0.5
+    assert transaction.total_time == 1.0
+
+
+def test_pipelined_requests_pair_in_order():
+    conv = Conversation()
+    conv.client(b"GET /a HTTP/1.1\r\n\r\nGET /b HTTP/1.1\r\n\r\nPOST /c HTTP/1.1\r\nContent-Length: 4\r\n\r\nbody")
+    conv.server(_response(b"A") + _response(b"BB") + _response(b"CCC", "201 Created"))
+    transactions = conv.close()
+    assert [t.request.target for t in transactions] == ["/a", "/b", "/c"]
+    assert [t.response.body_bytes for t in transactions] == [1, 2, 3]
+    assert transactions[2].request.body_bytes == 4
+    assert transactions[2].response.status == 201
+    assert all(t.complete for t in transactions)
+
+
+def test_chunked_body_with_trailers():
+    conv = Conversation()
+    conv.client(b"GET /stream HTTP/1.1\r\n\r\n")
+    head = b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\nTrailer: X-Checksum\r\n\r\n"
+    body = b"5;ext=1\r\nhello\r\n6\r\n world\r\n0\r\nX-Checksum: abc\r\n\r\n"
+    #split inside the chunk size, the chunk data and the trailer
+    conv.server(head + body[:2])
+    conv.server(body[2:12])
+    conv.server(body[12:40])
+    conv.server(body[40:])
+    transaction, = conv.close()
+    response = transaction.response
+    assert response.complete and response.chunked
+    assert response.body_bytes == 11
+    assert b"".join(conv.bodies) == b"hello world"
+    assert response.header("x-checksum") == "abc"
+
+
+def test_responses_without_body():
+    conv = Conversation()
+    conv.client(b"HEAD /big HTTP/1.1\r\n\r\nGET /none HTTP/1.1\r\n\r\nGET /cached HTTP/1.1\r\n\r\nGET /last HTTP/1.1\r\n\r\n")
+    #HEAD, 204 and 304 announce a length but carry no body: the next response follows at once
+    conv.server(b"HTTP/1.1 200 OK\r\nContent-Length: 5000\r\n\r\n")
+    conv.server(b"HTTP/1.1 204 No Content\r\n\r\n")
+    conv.server(b"HTTP/1.1 304 Not Modified\r\nContent-Length: 120\r\n\r\n")
+    conv.server(_response(b"end"))
+    transactions = conv.close()
+    assert [t.response.status for t in transactions] == [200, 204, 304, 200]
+    assert [t.response.body_bytes for t in transactions] == [0, 0, 0, 3]
+    assert all(t.complete for t in transactions)
+
+
+def test_interim_and_close_delimited_responses():
+    conv = Conversation()
+    conv.client(b"POST /upload HTTP/1.1\r\nContent-Length: 0\r\n\r\n")
+    conv.server(b"HTTP/1.1 100 Continue\r\n\r\nHTTP/1.0 200 OK\r\n\r\nrest of ")
+    conv.server(b"the body")
+    conv._send(False, ACK | FIN)
+    transaction, = conv.close()
+    assert transaction.interim == 1
+    assert transaction.response.status == 200
+    assert transaction.response.body_bytes == 16
+    assert transaction.complete
+
+
+def test_loss_inside_body_keeps_sync():
+    conv = Conversation()
+    conv.client(b"GET /a HTTP/1.1\r\n\r\nGET /b HTTP/1.1\r\n\r\n")
+    first = _response(b"y" * 100)
+    conv.server(first[:50])
+    conv.lose(False, 20)
+    conv.server(first[70:] + _response(b"z"))
+    conv.dissector.reassembler.flush()
+    transactions = list(conv.dissector.transactions)
+    assert [t.response.body_bytes for t in transactions] == [100, 1]
+    assert transactions[0].response.missing_bytes == 20
+    assert all(t.complete for t in transactions)
+
+
+def test_resync_after_loss_in_headers():
+    #holes are given up on as soon as 16 bytes wait behind them
+    conv = Conversation(max_out_of_order=16)
+    request = b"GET /lost HTTP/1.1\r\nHost: example.com\r\nAccept: */*\r\n\r\n"
+    conv.client(request[:20])
+    conv.lose(True, 15)
+    #the rest of the damaged request is skipped; parsing resumes at the next segment that
+    #starts a message
+    conv.client(request[35:])
+    conv.client(b"GET /next HTTP/1.1\r\n\r\n")
+    #the response to the lost request was not captured either
+    conv.lose(False, len(_response(b"1")))
+    conv.server(_response(b"22"))
+    transaction, = conv.close()
+    assert transaction.request.target == "/next"
+    assert transaction.response.body_bytes == 2
+    assert transaction.complete
@@ -0,0 +1,98 @@
+"""
+test_ping_sweep.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Runs PingSweeper over an in-memory link against a responder that answers echo
+             requests for some addresses, and checks the hosts found up and the mapping of
+             ICMP ID/seq back to probe indexes.
+"""
+
+import struct
+import threading
+import transports
+from Ether import Ether
+from ICMP import ICMP
+from IP import IP
+from ping_sweep import PingSweeper, expand_targets
+
+
+SOURCE = "10.9.0.100"
+UP = {"10.9.0.1", "10.9.0.3", "10.9.0.6"}
+
+
+def _responder(link, up, seen, stop):
+    """
+    Description: Answers echo requests to the addresses in up and records, for every request
+                 seen, (destination, ID, seq).
+    """
+    while not stop.is_set():
+        frame = link.recv_frame(0.05)
+        if frame is None:
+            continue
+        request = Ether(raw=frame)
+        ip = request.payload
+        if not isinstance(ip, IP) or not isinstance(ip.payload, ICMP) or ip.payload.icmp_type != 8:
+            continue
+        icmp = ip.payload
+        seen.append((ip.dest_IP, icmp.ID, icmp.seq))
+        if ip.dest_IP not in up:
+            continue
+        reply = Ether(dest_mac=request.src_mac, src_mac=request.dest_mac) / \
+            IP(src_IP=ip.dest_IP, dest_IP=ip.src_IP, protocol=1) / \
+            ICMP(icmp_type=0, ID=icmp.ID, seq=icmp.seq, payload=bytes(icmp.payload))
+        link.send_frame(reply.build())
+
+
+def _sweep(targets, count, up=UP):
+    left, right = transports.memory_pair()
+    seen = []
+    stop = threading.Event()
+    responder = threading.Thread(target=_responder, args=(right, up, seen, stop), daemon=True)
+    responder.start()
+    try:
+        sweeper = PingSweeper(targets, count=count, rate=0, timeout=0.3, payload=b'sweep',
+                              ID=0x1234, transport=left, source=SOURCE)
+        results = sweeper.run()
+    finally:
+        stop.set()
+        responder.join()
+    return sweeper, results, seen
+
+
+def test_hosts_up():
+    sweeper, results, _ = _sweep("10.9.0.0/29", count=2)
+    assert set(results) == set(expand_targets("10.9.0.0/29"))
+    assert {host for host, result in results.items() if result.alive} == UP
+    for host, result in results.items():
+        assert result.sent == 2
+        assert result.received == (2 if host in UP else 0)
+        assert all(rtt >= 0 for rtt in result.rtts)
+
+
+def test_probe_index_mapping():
+    sweeper, _, seen = _sweep("10.9.0.0/29", count=3)
+    hosts = sweeper.hosts
+    assert len(seen) == sweeper.total
+    indexes = set()
+    for dest, ident, seq in seen:
+        index = ((ident - sweeper.base_id) & 0xFFFF) << 16 | seq
+        #every probe index is used once, and for the host it was sent to
+        assert hosts[index % len(hosts)] == dest
+        indexes.add(index)
+    assert indexes == set(range(sweeper.total))
+
+
+def test_match_beyond_16_bits():
+    #past 65536 probes the index spills from seq into ID
+    sweeper = PingSweeper("10.0.0.0/16", count=2, ID=0xFFFF)
+    for index in (0, 65535, 65536, 70000, sweeper.total - 1):
+        echo = bytes(sweeper._probe(index))
+        host = sweeper.hosts[index % len(sweeper.hosts)]
+        header = struct.pack("!BBHHHBBH4s4s", 0x45, 0, 20 + len(echo), 0, 0, 64, 1, 0,
+                             bytes(map(int, host.split("."))), bytes(4))
+        reply = header + b'\x00' + echo[1:]
+        assert sweeper._match(reply) == index
+        #the same reply from another address, or an echo request, is not ours
+        wrong = header[:12] + bytes((10, 255, 255, 254)) + header[16:] + b'\x00' + echo[1:]
+        assert sweeper._match(wrong) is None
+        assert sweeper._match(header + echo) is None
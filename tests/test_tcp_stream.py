@@ -0,0 +1,141 @@
+"""
+test_tcp_stream.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Feeds synthetic TCP segments to TCPReassembler and checks what its consumer sees:
+             in-order delivery of out-of-order and overlapping data, gaps for data that never
+             arrives, sequence wraparound and the end of each direction.
+"""
+
+import struct
+from tcp_stream import TCPReassembler, ACK, FIN, RST, SYN
+
+
+CLIENT = (bytes((10, 0, 0, 2)), 51000)
+SERVER = (bytes((10, 0, 0, 1)), 80)
+
+
+class Recorder:
+    def __init__(self, stream):
+        self.stream = stream
+        self.events = []
+
+    def data(self, from_client, ts, data):
+        self.events.append(("data", from_client, bytes(data)))
+
+    def gap(self, from_client, ts, size):
+        self.events.append(("gap", from_client, size))
+
+    def end(self, from_client, ts):
+        self.events.append(("end", from_client))
+
+    def close(self, ts):
+        self.events.append(("close",))
+
+    def received(self, from_client):
+        return b"".join(event[2] for event in self.events if event[0] == "data" and event[1] == from_client)
+
+
+def _segment(sport, dport, seq, flags, data=b''):
+    return struct.pack("!HHLLBBHHH", sport, dport, seq, 0, 5 << 4, flags, 65535, 0, 0) + data
+
+
+class Connection:
+    def __init__(self, client_isn=1000, server_isn=5000, **reassembler_args):
+        """
+        Description: A reassembler and one connection on it, opened with a handshake.
+        """
+        self.consumers = []
+        self.reassembler = TCPReassembler(self._consumer, **reassembler_args)
+        self.isn = {True: client_isn, False: server_isn}
+        self.send(True, client_isn, SYN)
+        self.send(False, server_isn, SYN | ACK)
+
+    def _consumer(self, stream):
+        consumer = Recorder(stream)
+        self.consumers.append(consumer)
+        return consumer
+
+    @property
+    def consumer(self):
+        return self.consumers[0]
+
+    def send(self, from_client, seq, flags=ACK, data=b'', ts=0.0):
+        src, dst = (CLIENT, SERVER) if from_client else (SERVER, CLIENT)
+        self.reassembler.feed_segment(ts, src[0], dst[0], _segment(src[1], dst[1], seq & 0xFFFFFFFF, flags, data))
+
+    def data(self, from_client, offset, data, flags=ACK):
+        #offset counts from the first data byte of the direction
+        self.send(from_client, self.isn[from_client] + 1 + offset, flags, data)
+
+
+def test_handshake_sets_roles():
+    conn = Connection()
+    stream = conn.consumer.stream
+    assert stream.client == ("10.0.0.2", 51000)
+    assert stream.server == ("10.0.0.1", 80)
+
+
+def test_out_of_order_and_overlapping_data():
+    conn = Connection()
+    conn.data(True, 6, b"world")
+    assert conn.consumer.events == []
+    conn.data(True, 0, b"hello ")
+    #a retransmission overlapping both delivers nothing new; one running past them the rest
+    conn.data(True, 3, b"lo wo")
+    conn.data(True, 8, b"rld!")
+    assert conn.consumer.received(True) == b"hello world!"
+    #out-of-order segments that overlap each other are not delivered twice
+    conn.data(False, 4, b"efgh")
+    conn.data(False, 2, b"cdef")
+    conn.data(False, 0, b"ab")
+    assert conn.consumer.received(False) == b"abcdefgh"
+
+
+def test_hole_reported_as_gap():
+    conn = Connection(max_out_of_order=8)
+    conn.data(True, 0, b"abc")
+    conn.data(True, 8, b"ijkl")
+    assert conn.consumer.received(True) == b"abc"
+    #more out-of-order data than max_out_of_order: the hole in front of it is given up on
+    conn.data(True, 12, b"mnopq")
+    assert ("gap", True, 5) in conn.consumer.events
+    assert conn.consumer.received(True) == b"abcijklmnopq"
+
+
+def test_flush_reports_remaining_holes():
+    conn = Connection()
+    conn.data(False, 0, b"head")
+    conn.data(False, 10, b"tail")
+    conn.reassembler.flush()
+    assert conn.consumer.events[-3:] == [("gap", False, 6), ("data", False, b"tail"), ("close",)]
+    assert conn.reassembler.streams == {}
+
+
+def test_sequence_wraparound():
+    conn = Connection(client_isn=0xFFFFFFFC)
+    conn.data(True, 5, b"fgh")
+    conn.data(True, 0, b"abcde")
+    assert conn.consumer.received(True) == b"abcdefgh"
+
+
+def test_fin_ends_each_direction():
+    conn = Connection()
+    conn.data(True, 0, b"request", ACK | FIN)
+    assert conn.consumer.events[-1] == ("end", True)
+    #data after the FIN is not delivered
+    conn.data(True, 7, b"late")
+    assert conn.consumer.received(True) == b"request"
+    conn.data(False, 0, b"response", ACK | FIN)
+    assert conn.consumer.events[-2:] == [("end", False), ("close",)]
+
+
+def test_rst_closes_and_stray_segments_are_ignored():
+    conn = Connection()
+    conn.data(True, 0, b"x")
+    conn.data(False, 0, b"", RST)
+    assert conn.consumer.events[-1] == ("close",)
+    #a stray ACK after the close does not open a new connection
+    conn.data(True, 1, b"", ACK)
+    assert len(conn.consumers) == 1
+    assert conn.reassembler.streams == {}
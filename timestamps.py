@@ -0,0 +1,123 @@
+"""
+timestamps.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Kernel packet timestamps (Linux). A receive timestamp taken by the kernel when the
+             packet arrived (SO_TIMESTAMPNS) and a transmit timestamp taken when the packet
+             was handed to the device (SO_TIMESTAMPING, read back from the socket's error
+             queue) leave out everything the Python code does around the system calls:
+             socket setup, building, the wait for the receive loop to wake up and dissection.
+
+             Timestamps are floats in seconds since the epoch (CLOCK_REALTIME, the kernel's
+             clock for both), so a receive timestamp minus a transmit timestamp is an RTT
+             even when one of them had to fall back to time.time().
+"""
+
+import select
+import socket
+import struct
+import time
+
+
+#socket options and control message types (asm-generic/socket.h; the same on x86 and arm)
+SO_TIMESTAMPNS = getattr(socket, "SO_TIMESTAMPNS", 35)
+SCM_TIMESTAMPNS = SO_TIMESTAMPNS
+SO_TIMESTAMPING = getattr(socket, "SO_TIMESTAMPING", 37)
+SCM_TIMESTAMPING = SO_TIMESTAMPING
+#SO_TIMESTAMPING flags (linux/net_tstamp.h)
+SOF_TIMESTAMPING_TX_SOFTWARE = 1 << 1
+SOF_TIMESTAMPING_RX_SOFTWARE = 1 << 3
+SOF_TIMESTAMPING_SOFTWARE = 1 << 4
+SOF_TIMESTAMPING_OPT_TSONLY = 1 << 11
+MSG_ERRQUEUE = getattr(socket, "MSG_ERRQUEUE", 0x2000)
+
+#struct timespec, and the three of them an SCM_TIMESTAMPING message carries (software first)
+_TIMESPEC = struct.Struct("@qq")
+#room for one timestamp control message
+ANCILLARY_SIZE = socket.CMSG_SPACE(3 * _TIMESPEC.size)
+
+
+def enable_rx(sock):
+    """
+    Description: Asks the kernel to timestamp every packet received on sock.
+
+    @param sock: Socket (raw, packet or UDP).
+    @returns: (bool) False when the kernel refused (timestamps then fall back to time.time()).
+    """
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+    except OSError:
+        return False
+    return True
+
+
+def enable_tx(sock):
+    """
+    Description: Asks the kernel for a software transmit timestamp of every packet sent on
+                 sock, queued on the socket's error queue (see tx_timestamp()).
+
+    @param sock: Socket (raw or packet).
+    @returns: (bool) False when the kernel refused.
+    """
+    flags = SOF_TIMESTAMPING_TX_SOFTWARE | SOF_TIMESTAMPING_SOFTWARE | SOF_TIMESTAMPING_OPT_TSONLY
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPING, flags)
+    except OSError:
+        return False
+    return True
+
+
+def from_ancillary(ancdata):
+    """
+    Description: Timestamp carried by recvmsg() ancillary data, or None.
+    """
+    for level, kind, data in ancdata:
+        if level != socket.SOL_SOCKET or len(data) < _TIMESPEC.size:
+            continue
+        if kind == SCM_TIMESTAMPNS or kind == SCM_TIMESTAMPING:
+            seconds, nanoseconds = _TIMESPEC.unpack_from(data)
+            if seconds or nanoseconds:
+                return seconds + nanoseconds * 1e-9
+    return None
+
+
+def recv(sock, bufsize=65535, flags=0):
+    """
+    Description: recvfrom() that also returns when the packet arrived: the kernel's timestamp
+                 when enable_rx() was called on sock, else the time it was read.
+
+    @param sock: Socket to read.
+    @param bufsize: Largest packet read.
+    @param flags: recvmsg flags.
+    @returns: (tuple) (data, timestamp, address). Raises like sock.recv when nothing is queued.
+    """
+    data, ancdata, _, address = sock.recvmsg(bufsize, ANCILLARY_SIZE, flags)
+    stamp = from_ancillary(ancdata) if ancdata else None
+    return data, stamp if stamp is not None else time.time(), address
+
+
+def tx_timestamp(sock, wait=0.01):
+    """
+    Description: Transmit timestamp of the oldest packet sent on sock since enable_tx() whose
+                 timestamp has not been read yet.
+
+    @param sock: Socket enable_tx() was called on.
+    @param wait: Seconds to wait for the kernel to queue it.
+    @returns: (float or None) The timestamp, or None when none arrived.
+    """
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            _, ancdata, _, _ = sock.recvmsg(0, ANCILLARY_SIZE, MSG_ERRQUEUE | socket.MSG_DONTWAIT)
+        except (BlockingIOError, InterruptedError):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            #the error queue makes the socket readable with POLLERR
+            select.select([], [], [sock], remaining)
+            continue
+        except OSError:
+            return None
+        stamp = from_ancillary(ancdata)
+        if stamp is not None:
+            return stamp
@@ -0,0 +1,340 @@
+"""
+traceroute.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Concurrent traceroute engine built on the IP, ICMP, UDP and TCP layers.
+             Every TTL probe for every destination is sent up front through one raw socket;
+             ICMP time-exceeded / unreachable errors are attributed to their probe through the
+             probe_key() of the quoted inner IP header, and direct answers from the destination
+             (echo reply, SYN-ACK or RST) close the path. Results are per-destination hop lists.
+"""
+
+import os
+import select
+import socket
+import struct
+import threading
+import time
+from IP import IP
+from ICMP import ICMP, probe_key, error_key
+from UDP import UDP
+from TCP import TCP
+import timestamps
+
+
+ICMP_ECHO_REPLY = 0
+ICMP_DEST_UNREACHABLE = 3
+ICMP_TIME_EXCEEDED = 11
+
+#base destination port used by UDP probes (classic traceroute range)
+UDP_BASE_PORT = 33434
+
+_source_cache = {}
+
+
+def source_address(dest_IP):
+    """
+    Description: Finds the local address the kernel would use to reach dest_IP by connecting
+                 an unbound UDP socket (no packet is sent). Results are cached per destination.
+
+    @param dest_IP: Destination IPv4 address string.
+    @returns: (str) Local source IPv4 address.
+    """
+    src = _source_cache.get(dest_IP)
+    if src is None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.connect((dest_IP, 9))
+            src = sock.getsockname()[0]
+        finally:
+            sock.close()
+        _source_cache[dest_IP] = src
+    return src
+
+
+class Hop:
+    def __init__(self, ttl, responder, rtt, icmp_type, code):
+        """
+        Description: One answered probe on the path to a destination.
+
+        @param ttl: TTL the probe was sent with.
+        @param responder: IPv4 address string of the router or host that answered.
+        @param rtt: Round-trip time in seconds.
+        @param icmp_type: ICMP type of the answer (None for a TCP answer from the destination).
+        @param code: ICMP code of the answer (None for a TCP answer).
+        @returns: None
+        """
+        self.ttl = ttl
+        self.responder = responder
+        self.rtt = rtt
+        self.icmp_type = icmp_type
+        self.code = code
+
+    def __repr__(self):
+        return f"<Hop {self.ttl} {self.responder} {self.rtt * 1000:.3f}ms>"
+
+
+class TraceResult:
+    def __init__(self, dest_IP):
+        """
+        Description: Collects every answer received for one destination.
+
+        @param dest_IP: Destination IPv4 address string.
+        @returns: None
+        """
+        self.dest_IP = dest_IP
+        self.answers = {}
+        self.reached_ttl = None
+
+    def add(self, hop, reached):
+        self.answers.setdefault(hop.ttl, []).append(hop)
+        if reached and (self.reached_ttl is None or hop.ttl < self.reached_ttl):
+            self.reached_ttl = hop.ttl
+
+    @property
+    def reached(self):
+        return self.reached_ttl is not None
+
+    def hops(self):
+        """
+        Description: Assembles the hop list. Probes are sent for every TTL at once, so answers
+                     past the first TTL that reached the destination are dropped.
+
+        @returns: (list) One entry per TTL: a list of Hop answers, empty when nothing answered.
+        """
+        if not self.answers:
+            return []
+        last = self.reached_ttl if self.reached else max(self.answers)
+        return [self.answers.get(ttl, []) for ttl in range(1, last + 1)]
+
+    def __repr__(self):
+        return f"<TraceResult {self.dest_IP} hops={len(self.hops())} reached={self.reached}>"
+
+
+class Traceroute:
+    def __init__(self, targets, method="icmp", max_ttl=30, queries=1, dst_port=80,
+                 rate=10000, timeout=2.0, ID=None):
+        """
+        Description: Prepares a parallel trace of every target. Each probe carries a tag
+                     (query << 8 | ttl) in a field that routers quote back (the ICMP seq,
+                     UDP_BASE_PORT + tag as UDP destination port, or the TCP sequence number)
+                     so that every probe has a distinct probe_key().
+
+        @param targets: Iterable of destination IPv4 address strings (or a single string).
+        @param method: Probe type: "icmp", "udp" or "tcp" (TCP SYN).
+        @param max_ttl: Highest TTL probed (at most 255).
+        @param queries: Probes per TTL.
+        @param dst_port: Destination port for TCP SYN probes.
+        @param rate: Maximum probes per second (None or 0 disables rate limiting).
+        @param timeout: Seconds to wait for answers after the last probe is sent.
+        @param ID: Identifier shared by all probes (ICMP ID / UDP and TCP source port).
+        @returns: None
+        """
+        if method not in ("icmp", "udp", "tcp"):
+            raise ValueError(f"Unknown traceroute method: {method}")
+        if isinstance(targets, str):
+            targets = [targets]
+        self.targets = list(dict.fromkeys(targets))
+        self.method = method
+        self.max_ttl = min(int(max_ttl), 255)
+        self.queries = int(queries)
+        self.dst_port = dst_port
+        self.rate = rate
+        self.timeout = timeout
+        ident = os.getpid() if ID is None else ID
+        self.ID = ident & 0xFFFF
+        # keep the source port out of the privileged range
+        self.src_port = 32768 + (ident & 0x7FFF)
+        self.results = {dest: TraceResult(dest) for dest in self.targets}
+        # probe_key() of each probe in flight -> (destination, ttl, send time)
+        self._outstanding = {}
+
+    def _probe(self, dest_IP, ttl, tag):
+        """
+        Description: Builds one probe datagram (IP header included) with the library's layers.
+
+        @param dest_IP: Destination IPv4 address string.
+        @param ttl: TTL for the IP header.
+        @param tag: Probe tag encoded into the transport header.
+        @returns: (bytes) The complete IP datagram.
+        """
+        src_IP = source_address(dest_IP)
+        if self.method == "icmp":
+            l4 = ICMP(icmp_type=8, code=0, ID=self.ID, seq=tag)
+            protocol = socket.IPPROTO_ICMP
+        elif self.method == "udp":
+            l4 = UDP(src_port=self.src_port, dst_port=UDP_BASE_PORT + tag, src_ip=src_IP, dst_ip=dest_IP)
+            protocol = socket.IPPROTO_UDP
+        else:
+            l4 = TCP(src_port=self.src_port, dst_port=self.dst_port, seq=tag, flags=0x02,
+                     ip_src=src_IP, ip_dst=dest_IP)
+            protocol = socket.IPPROTO_TCP
+        return IP(src_IP=src_IP, dest_IP=dest_IP, ttl=ttl, protocol=protocol, payload=l4).build()
+
+    def _handle_icmp(self, raw, now):
+        """
+        Description: Attributes an ICMP message (error or echo reply) to the probe it answers.
+
+        @param raw: Bytes from the raw ICMP socket (outer IP header + ICMP message).
+        @param now: Receive time.
+        @returns: None
+        """
+        ihl = (raw[0] & 0x0F) * 4
+        if len(raw) < ihl + 8:
+            return
+        icmp_type, code = raw[ihl], raw[ihl + 1]
+        if icmp_type in (ICMP_TIME_EXCEEDED, ICMP_DEST_UNREACHABLE):
+            key = error_key(raw)
+            # an unreachable from the destination itself (e.g. port unreachable) ends the path
+            reached = icmp_type == ICMP_DEST_UNREACHABLE and key is not None and raw[12:16] == key[0]
+        elif icmp_type == ICMP_ECHO_REPLY and self.method == "icmp":
+            # an echo reply carries our ID/seq, so it maps onto the request's key
+            key = (raw[12:16], socket.IPPROTO_ICMP) + struct.unpack_from('!HH', raw, ihl + 4)
+            reached = True
+        else:
+            return
+        self._record(key, socket.inet_ntoa(raw[12:16]), now, icmp_type, code, reached)
+
+    def _handle_tcp(self, raw, now):
+        """
+        Description: Attributes a SYN-ACK or RST from a destination to the SYN that caused it.
+
+        @param raw: Bytes from the raw TCP socket (IP header + TCP segment).
+        @param now: Receive time.
+        @returns: None
+        """
+        ihl = (raw[0] & 0x0F) * 4
+        if len(raw) < ihl + 20:
+            return
+        sport, dport, _, ack, flags = struct.unpack_from('!HHLLH', raw, ihl)
+        if dport != self.src_port or sport != self.dst_port or not flags & 0x14:
+            return
+        key = (raw[12:16], socket.IPPROTO_TCP, dport, sport, (ack - 1) & 0xFFFFFFFF)
+        self._record(key, socket.inet_ntoa(raw[12:16]), now, None, None, True)
+
+    def _record(self, key, responder, now, icmp_type, code, reached):
+        if key is None:
+            return
+        probe = self._outstanding.pop(key, None)
+        if probe is None:
+            return
+        dest, ttl, sent_at = probe
+        self.results[dest].add(Hop(ttl, responder, now - sent_at, icmp_type, code), reached)
+
+    def _send_loop(self, sock, done):
+        """
+        Description: Sends every (destination, TTL, query) probe, TTL-major so that the
+                     near hops of all destinations are probed first, at the configured rate.
+
+        @param sock: Raw IPPROTO_RAW socket (IP header included).
+        @param done: (threading.Event) Set once every probe has been sent.
+        @returns: None
+        """
+        start = time.perf_counter()
+        sent = 0
+        try:
+            for query in range(self.queries):
+                for ttl in range(1, self.max_ttl + 1):
+                    tag = query << 8 | ttl
+                    for dest in self.targets:
+                        if self.rate:
+                            ahead = sent / self.rate - (time.perf_counter() - start)
+                            if ahead > 0.001:
+                                time.sleep(ahead)
+                        packet = self._probe(dest, ttl, tag)
+                        key = probe_key(packet)
+                        #wall clock, the kernel's receive timestamps use it too
+                        self._outstanding[key] = (dest, ttl, time.time())
+                        try:
+                            sock.sendto(packet, (dest, 0))
+                        except OSError:
+                            self._outstanding.pop(key, None)
+                        sent += 1
+        finally:
+            done.set()
+
+    def run(self):
+        """
+        Description: Runs the trace and returns the per-destination results.
+
+        @returns: (dict) Mapping of destination address string to TraceResult.
+        """
+        send_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_RAW)
+        recv_socks = {socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP): self._handle_icmp}
+        if self.method == "tcp":
+            recv_socks[socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)] = self._handle_tcp
+        try:
+            for sock in recv_socks:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 22)
+                sock.setblocking(False)
+                timestamps.enable_rx(sock)
+            done = threading.Event()
+            sender = threading.Thread(target=self._send_loop, args=(send_sock, done), daemon=True)
+            sender.start()
+            self._recv_loop(recv_socks, done)
+            sender.join()
+        finally:
+            send_sock.close()
+            for sock in recv_socks:
+                sock.close()
+        return self.results
+
+    def _recv_loop(self, recv_socks, done):
+        """
+        Description: Dispatches received datagrams until the sender is done and the timeout
+                     has passed, or until no probes remain outstanding.
+
+        @param recv_socks: (dict) Mapping of socket to its handler.
+        @param done: (threading.Event) Set by the sender when it has sent everything.
+        @returns: None
+        """
+        deadline = None
+        while True:
+            if deadline is None and done.is_set():
+                deadline = time.perf_counter() + self.timeout
+            if deadline is not None and not self._outstanding:
+                break
+            wait = 0.05 if deadline is None else deadline - time.perf_counter()
+            if wait <= 0:
+                break
+            readable, _, _ = select.select(list(recv_socks), [], [], wait)
+            for sock in readable:
+                handler = recv_socks[sock]
+                while True:
+                    try:
+                        raw, now, _ = timestamps.recv(sock)
+                    except BlockingIOError:
+                        break
+                    handler(raw, now)
+
+
+def traceroute(targets, method="icmp", max_ttl=30, queries=1, dst_port=80, rate=10000, timeout=2.0):
+    """
+    Description: Convenience wrapper that traces every target in parallel.
+
+    @param targets: Destination IPv4 address string or iterable of them.
+    @param method: "icmp", "udp" or "tcp".
+    @param max_ttl: Highest TTL probed.
+    @param queries: Probes per TTL.
+    @param dst_port: Destination port for TCP probes.
+    @param rate: Maximum probes per second.
+    @param timeout: Seconds to wait for answers after the last probe.
+    @returns: (dict) Mapping of destination address string to TraceResult.
+    """
+    return Traceroute(targets, method=method, max_ttl=max_ttl, queries=queries,
+                      dst_port=dst_port, rate=rate, timeout=timeout).run()
+
+
+if __name__ == "__main__":
+    import sys
+
+    method = sys.argv[1] if len(sys.argv) > 1 else "icmp"
+    targets = sys.argv[2:] or ["127.0.0.1"]
+    for dest, result in traceroute(targets, method=method).items():
+        print(f"[*] traceroute to {dest} ({method})")
+        for ttl, answers in enumerate(result.hops(), start=1):
+            if not answers:
+                print(f" {ttl:2d}  *")
+            else:
+                rtts = " ".join(f"{hop.rtt * 1000:.3f}ms" for hop in answers)
+                print(f" {ttl:2d}  {answers[0].responder}  {rtts}")
@@ -0,0 +1,732 @@
+"""
+transports.py      COSC 60      Oct 19th, 2026
+
+Author: Ahmed Al Sunbati
+Description: Transports carry the frames that send/sendp/sr/sniff/capture in network_utils
+             produce and consume, so the same code runs over different links:
+               RawTransport    - raw IP and AF_PACKET sockets on the host's interfaces (what
+                                 network_utils uses when no transport is given).
+               TunTransport    - a TUN (IP datagrams) or TAP (Ethernet frames) device; the
+                                 kernel on the other side of the device is the peer.
+               MemoryTransport - one end of an in-memory link made by memory_pair(); frames
+                                 sent on one end are received on the other, without root,
+                                 interfaces or system calls.
+             A transport can also be made the default with set_default(), so code that calls
+             network_utils without naming one (e.g. ICMP_ping, traceroute) runs over it.
+
+             Every transport has the same interface: send_frame / send_frames for frames in
+             its link framing (link_type, a pcap LINKTYPE_*), send_datagram for IP datagrams,
+             recv_frame / recv_frames to receive, recv_into to receive into a given buffer
+             (see buffer_pool.py), decode() to dissect a received frame, and close().
+             send_datagram_stamped and recv_stamped / recv_stamped_frames also return when a
+             packet left or arrived (see timestamps.py).
+"""
+
+import collections
+import fcntl
+import os
+import select
+import socket
+import struct
+import threading
+import time
+import instrumentation
+import timestamps
+from Ether import Ether
+from IP import IP
+from IPv6 import IPv6
+from pcap import LINKTYPE_ETHERNET, LINKTYPE_RAW
+
+
+ETH_P_ALL = 0x0003
+#TUN/TAP ioctl and flags (linux/if_tun.h)
+TUNSETIFF = 0x400454CA
+IFF_TUN = 0x0001
+IFF_TAP = 0x0002
+IFF_NO_PI = 0x1000
+#largest frame read from a device or socket
+MAX_FRAME = 65535
+#how long to wait for the kernel's transmit timestamp of a probe
+TX_STAMP_WAIT = 0.005
+#getsockopt(SOL_PACKET, PACKET_STATISTICS) -> struct tpacket_stats (linux/if_packet.h)
+SOL_PACKET = 263
+PACKET_STATISTICS = 6
+_TPACKET_STATS = struct.Struct("II")
+#sll_pkttype of a frame this host sent (linux/if_packet.h)
+PACKET_OUTGOING = 4
+#locally administered addresses used by Ethernet transports with no real hardware address
+MEMORY_MAC = "02:00:00:00:00:01"
+MEMORY_PEER_MAC = "02:00:00:00:00:02"
+
+_default = None
+
+
+def _deadline(timeout):
+    return None if timeout is None else time.monotonic() + timeout
+
+
+def _remaining(deadline):
+    """
+    Description: Timeout left until deadline for the next wait (None: no deadline).
+    """
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def set_default(transport):
+    """
+    Description: Makes a transport the one network_utils uses when a call names none
+                 (None restores the raw sockets).
+
+    @param transport: Transport or None.
+    @returns: The previous default.
+    """
+    global _default
+    previous, _default = _default, transport
+    return previous
+
+
+def get_default():
+    """
+    Description: The default transport, or None when raw sockets are used.
+    """
+    return _default
+
+
+class Transport:
+    #framing of the frames sent and received (pcap LINKTYPE_*)
+    link_type = LINKTYPE_ETHERNET
+    #Ethernet addresses filled in when an Ether packet leaves with them missing, and used
+    #to frame datagrams given to send_datagram
+    mac = None
+    peer_mac = None
+
+    def send_frame(self, frame):
+        """
+        Description: Sends one frame in the transport's link framing.
+
+        @param frame: Frame bytes.
+        @returns: None
+        """
+        raise NotImplementedError
+
+    def send_frames(self, frames):
+        """
+        Description: Sends many frames.
+
+        @param frames: Iterable of frame bytes.
+        @returns: (int) Number of frames sent.
+        """
+        count = 0
+        for frame in frames:
+            self.send_frame(frame)
+            count += 1
+        return count
+
+    def send_datagram(self, datagram, dest_IP=None):
+        """
+        Description: Sends one IP datagram, framed for the link (an Ethernet header from mac to
+                     peer_mac on Ethernet transports).
+
+        @param datagram: IPv4 or IPv6 datagram bytes.
+        @param dest_IP: Destination address (needed by raw sockets only).
+        @returns: None
+        """
+        if self.link_type == LINKTYPE_RAW:
+            self.send_frame(datagram)
+        else:
+            self.send_frame(self._ether_header(datagram[0] >> 4) + datagram)
+
+    def send_datagram_stamped(self, datagram, dest_IP=None):
+        """
+        Description: send_datagram() that also returns when the datagram left: the kernel's
+                     transmit timestamp where the transport can get one, else the time just
+                     before the send.
+
+        @returns: (float) Send time in seconds since the epoch.
+        """
+        stamp = time.time()
+        self.send_datagram(datagram, dest_IP)
+        return stamp
+
+    def _ether_header(self, version):
+        headers = self.__dict__.setdefault("_headers", {})
+        header = headers.get(version)
+        if header is None:
+            header = headers[version] = Ether(dest_mac=self.peer_mac or "ff:ff:ff:ff:ff:ff",
+                                              src_mac=self.mac or "00:00:00:00:00:00",
+                                              ethr_type=0x86DD if version == 6 else 0x0800,
+                                              payload=b'').build()
+        return header
+
+    def frame(self, packet):
+        """
+        Description: Frame bytes for an Ether packet on this transport: missing addresses are
+                     filled from mac and peer_mac (in place, as sendp does with ARP), and TUN
+                     devices get the IP layer alone.
+
+        @param packet: Ether packet.
+        @returns: (bytes) The frame.
+        """
+        if self.link_type == LINKTYPE_RAW:
+            return packet.payload.build()
+        if packet.src_mac is None:
+            packet.src_mac = self.mac
+        if packet.dest_mac is None:
+            if self.peer_mac is None:
+                raise ValueError("No destination MAC and no peer address on this transport")
+            packet.dest_mac = self.peer_mac
+        return packet.build()
+
+    def recv_frame(self, timeout=None):
+        """
+        Description: Receives one frame.
+
+        @param timeout: Seconds to wait (None waits forever, 0 does not wait).
+        @returns: (bytes or None) The frame, or None on timeout.
+        """
+        raise NotImplementedError
+
+    def recv_frames(self, max_count=64, timeout=None):
+        """
+        Description: Waits for one frame like recv_frame, then also takes up to max_count - 1
+                     frames that are already queued, without waiting.
+
+        @param max_count: Most frames returned.
+        @param timeout: Seconds to wait for the first frame.
+        @returns: (list) Frames (empty on timeout).
+        """
+        frame = self.recv_frame(timeout)
+        if frame is None:
+            return []
+        frames = [frame]
+        while len(frames) < max_count:
+            frame = self.recv_frame(0)
+            if frame is None:
+                break
+            frames.append(frame)
+        return frames
+
+    def recv_stamped(self, timeout=None):
+        """
+        Description: recv_frame() that also returns when the frame arrived (the kernel's receive
+                     timestamp where the transport has one, else the time it was read).
+
+        @param timeout: Seconds to wait.
+        @returns: (tuple or None) (timestamp, frame), or None on timeout.
+        """
+        frame = self.recv_frame(timeout)
+        return None if frame is None else (time.time(), frame)
+
+    def recv_stamped_frames(self, max_count=64, timeout=None, snaplen=None):
+        """
+        Description: recv_frames() with each frame's timestamp and length on the wire.
+
+        @param max_count: Most frames returned.
+        @param timeout: Seconds to wait for the first frame.
+        @param snaplen: Keep only the first snaplen bytes of each frame (None keeps all).
+        @returns: (list) (timestamp, frame, original length) tuples (empty on timeout).
+        """
+        frames = []
+        item = self.recv_stamped(timeout)
+        while item is not None:
+            stamp, frame = item
+            original = len(frame)
+            if snaplen is not None and original > snaplen:
+                frame = frame[:snaplen]
+            frames.append((stamp, frame, original))
+            if len(frames) >= max_count:
+                break
+            item = self.recv_stamped(0)
+        return frames
+
+    def recv_into(self, buffer, timeout=None):
+        """
+        Description: Receives one frame into a caller's buffer (e.g. a BufferPool slot) instead
+                     of a new bytes object. A frame longer than the buffer is truncated to it.
+                     Transports that cannot read into a buffer copy a received frame into it.
+
+        @param buffer: (bytearray) Writable buffer.
+        @param timeout: Seconds to wait (None waits forever, 0 does not wait).
+        @returns: (tuple or None) (bytes stored, length of the frame, timestamp), or None on
+                  timeout.
+        """
+        received = self.recv_stamped(timeout)
+        if received is None:
+            return None
+        stamp, frame = received
+        length = min(len(frame), len(buffer))
+        buffer[:length] = frame[:length]
+        return length, len(frame), stamp
+
+    def recv_into_many(self, buffers, timeout=None):
+        """
+        Description: recv_into() for a batch: waits for one frame, then also reads the frames
+                     that are already queued, without waiting, one per buffer.
+
+        @param buffers: Writable buffers, filled in order.
+        @param timeout: Seconds to wait for the first frame.
+        @returns: (list) (bytes stored, length of the frame, timestamp) for each buffer
+                  filled (empty on timeout).
+        """
+        received = []
+        for buffer in buffers:
+            item = self.recv_into(buffer, 0 if received else timeout)
+            if item is None:
+                break
+            received.append(item)
+        return received
+
+    def link_stats(self):
+        """
+        Description: Frames the link received for us and frames it dropped before we read
+                     them (e.g. because the receive queue was full), since it was opened.
+
+        @returns: (dict or None) {"received", "dropped"}, or None when the link cannot tell.
+        """
+        return None
+
+    def decode(self, frame):
+        """
+        Description: Dissects a received frame: Ether on Ethernet transports, IP or IPv6 on TUN.
+        """
+        if self.link_type == LINKTYPE_RAW:
+            return IPv6(raw=frame) if frame[0] >> 4 == 6 else IP(raw=frame)
+        return Ether(raw=frame)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RawTransport(Transport):
+    def __init__(self, interface=None, rcvbuf=None, protocol=ETH_P_ALL):
+        """
+        Description: Raw sockets on the host: IP datagrams go out through an IPPROTO_RAW socket
+                     (the kernel routes them and adds the Ethernet header), frames through an
+                     AF_PACKET socket on interface, and frames are received on an AF_PACKET
+                     socket (on interface, or on every interface). Sockets are opened on first
+                     use, so a receive socket only sees traffic from after the first receive.
+                     Frames this host sent are not received (the socket sees them as
+                     PACKET_OUTGOING copies), so a probe is never taken for its own reply.
+                     Received frames carry the kernel's receive timestamp, and datagrams sent
+                     with send_datagram_stamped() its transmit timestamp. Needs CAP_NET_RAW.
+
+        @param interface: Interface to send frames on and to receive from.
+        @param rcvbuf: Receive buffer size in bytes (default: the system's).
+        @param protocol: EtherType the receive socket takes frames of (default: all).
+        @returns: None
+        """
+        self.interface = interface
+        self.rcvbuf = rcvbuf
+        self.protocol = protocol
+        self._ip_sock = None
+        self._packet_socks = {}
+        self._recv_sock = None
+        self._stamped_sock = None
+        #buffer the kernel copies header-only frames into, reused while snaplen stays the same
+        self._snap_buf = None
+        self._tx_stamps = False
+        self._tx_missed = False
+        #PACKET_STATISTICS resets on every read, so the totals are kept here
+        self._kernel_packets = 0
+        self._kernel_drops = 0
+
+    def send_datagram(self, datagram, dest_IP=None):
+        if self._ip_sock is None:
+            self._ip_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_RAW)
+            if instrumentation.ENABLED:
+                instrumentation.syscall("socket")
+        if dest_IP is None:
+            dest_IP = socket.inet_ntoa(datagram[16:20])
+        self._ip_sock.sendto(datagram, (dest_IP, 0))
+        if instrumentation.ENABLED:
+            instrumentation.syscall("sendto", len(datagram))
+
+    def send_datagram_stamped(self, datagram, dest_IP=None):
+        #the reply is read next, so the receive socket has to exist before the probe leaves
+        self.receiver()
+        sock = self._stamped_sock
+        if sock is None:
+            sock = self._stamped_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_RAW)
+            self._tx_stamps = timestamps.enable_tx(sock)
+            if instrumentation.ENABLED:
+                instrumentation.syscall("socket")
+        if self._tx_missed:
+            #a late timestamp of an earlier probe must not be taken for this one's
+            while timestamps.tx_timestamp(sock, 0) is not None:
+                pass
+            self._tx_missed = False
+        if dest_IP is None:
+            dest_IP = socket.inet_ntoa(datagram[16:20])
+        stamp = time.time()
+        sock.sendto(datagram, (dest_IP, 0))
+        if instrumentation.ENABLED:
+            instrumentation.syscall("sendto", len(datagram))
+        if self._tx_stamps:
+            kernel = timestamps.tx_timestamp(sock, TX_STAMP_WAIT)
+            if kernel is not None:
+                return kernel
+            self._tx_missed = True
+        return stamp
+
+    def send_frame(self, frame):
+        self.send_frame_on(frame, self.interface)
+
+    def send_frame_on(self, frame, interface):
+        """
+        Description: Sends a frame on a given interface (one AF_PACKET socket is kept per
+                     interface used).
+        """
+        sock = self._packet_socks.get(interface)
+        if sock is None:
+            if interface is None:
+                raise ValueError("Sending frames needs an interface")
+            sock = self._packet_socks[interface] = socket.socket(socket.AF_PACKET, socket.SOCK_RAW)
+            sock.bind((interface, 0))
+            if instrumentation.ENABLED:
+                instrumentation.syscall("socket")
+                instrumentation.syscall("bind")
+        sock.send(frame)
+        if instrumentation.ENABLED:
+            instrumentation.syscall("send", len(frame))
+
+    def frame(self, packet):
+        #missing addresses are resolved with ARP by network_utils before this is reached
+        return packet.build()
+
+    def receiver(self):
+        """
+        Description: The receiving AF_PACKET socket, opened on first use.
+        """
+        if self._recv_sock is None:
+            self._recv_sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(self.protocol))
+            if self.interface:
+                self._recv_sock.bind((self.interface, 0))
+            if self.rcvbuf:
+                self._recv_sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf)
+            timestamps.enable_rx(self._recv_sock)
+            if instrumentation.ENABLED:
+                instrumentation.syscall("socket")
+        return self._recv_sock
+
+    def fileno(self):
+        return self.receiver().fileno()
+
+    def recv_frame(self, timeout=None):
+        sock = self.receiver()
+        deadline = _deadline(timeout)
+        while True:
+            sock.settimeout(timeout)
+            try:
+                frame, address = sock.recvfrom(MAX_FRAME)
+            except (socket.timeout, BlockingIOError):
+                return None
+            if instrumentation.ENABLED:
+                instrumentation.syscall("recvfrom", len(frame))
+            if address[2] != PACKET_OUTGOING:
+                return frame
+            timeout = _remaining(deadline)
+
+    def recv_stamped(self, timeout=None):
+        sock = self.receiver()
+        deadline = _deadline(timeout)
+        while True:
+            sock.settimeout(timeout)
+            try:
+                frame, stamp, address = timestamps.recv(sock, MAX_FRAME)
+            except (socket.timeout, BlockingIOError):
+                return None
+            if instrumentation.ENABLED:
+                instrumentation.syscall("recvmsg", len(frame))
+            if address[2] != PACKET_OUTGOING:
+                return stamp, frame
+            timeout = _remaining(deadline)
+
+    def recv_stamped_frames(self, max_count=64, timeout=None, snaplen=None):
+        if snaplen is None:
+            return Transport.recv_stamped_frames(self, max_count, timeout)
+        #the kernel copies only snaplen bytes and, with MSG_TRUNC, still reports the full length
+        sock = self.receiver()
+        buf = self._snap_buf
+        if buf is None or len(buf) != snaplen:
+            buf = self._snap_buf = memoryview(bytearray(snaplen))
+        frames = []
+        deadline = _deadline(timeout)
+        sock.settimeout(timeout)
+        while len(frames) < max_count:
+            try:
+                length, ancdata, _, address = sock.recvmsg_into([buf], timestamps.ANCILLARY_SIZE,
+                                                                socket.MSG_TRUNC)
+            except (socket.timeout, BlockingIOError):
+                break
+            if instrumentation.ENABLED:
+                instrumentation.syscall("recvmsg", min(length, snaplen))
+            if address[2] == PACKET_OUTGOING:
+                #only waits for the first frame; the rest of the batch is what is queued
+                sock.settimeout(_remaining(deadline) if not frames else 0)
+                continue
+            stamp = timestamps.from_ancillary(ancdata)
+            frames.append((stamp if stamp is not None else time.time(), bytes(buf[:length]), length))
+            sock.settimeout(0)
+        return frames
+
+    def recv_into(self, buffer, timeout=None):
+        sock = self.receiver()
+        deadline = _deadline(timeout)
+        while True:
+            sock.settimeout(timeout)
+            try:
+                #with MSG_TRUNC the length returned is the frame's, even when the buffer was shorter
+                length, ancdata, _, address = sock.recvmsg_into([buffer], timestamps.ANCILLARY_SIZE,
+                                                                socket.MSG_TRUNC)
+            except (socket.timeout, BlockingIOError):
+                return None
+            stored = min(length, len(buffer))
+            if instrumentation.ENABLED:
+                instrumentation.syscall("recvmsg", stored)
+            if address[2] != PACKET_OUTGOING:
+                break
+            timeout = _remaining(deadline)
+        stamp = timestamps.from_ancillary(ancdata) if ancdata else None
+        return stored, length, stamp if stamp is not None else time.time()
+
+    def recv_into_many(self, buffers, timeout=None):
+        #one loop over the socket, like recv_stamped_frames; only the first frame is waited for
+        sock = self.receiver()
+        recvmsg_into, from_ancillary = sock.recvmsg_into, timestamps.from_ancillary
+        received = []
+        deadline = _deadline(timeout)
+        sock.settimeout(timeout)
+        index, count = 0, len(buffers)
+        while index < count:
+            buffer = buffers[index]
+            try:
+                length, ancdata, _, address = recvmsg_into([buffer], timestamps.ANCILLARY_SIZE,
+                                                           socket.MSG_TRUNC)
+            except (socket.timeout, BlockingIOError):
+                break
+            stored = min(length, len(buffer))
+            if instrumentation.ENABLED:
+                instrumentation.syscall("recvmsg", stored)
+            if address[2] == PACKET_OUTGOING:
+                #the buffer is used again for the next frame
+                sock.settimeout(_remaining(deadline) if not received else 0)
+                continue
+            stamp = from_ancillary(ancdata) if ancdata else None
+            received.append((stored, length, stamp if stamp is not None else time.time()))
+            if index == 0:
+                sock.settimeout(0)
+            index += 1
+        return received
+
+    def link_stats(self):
+        if self._recv_sock is None:
+            return {"received": 0, "dropped": 0}
+        packets, drops = _TPACKET_STATS.unpack(self._recv_sock.getsockopt(SOL_PACKET, PACKET_STATISTICS,
+                                                                          _TPACKET_STATS.size))
+        self._kernel_packets += packets
+        self._kernel_drops += drops
+        #tp_packets counts the dropped frames too
+        return {"received": self._kernel_packets - self._kernel_drops, "dropped": self._kernel_drops}
+
+    def close(self):
+        for sock in (self._ip_sock, self._recv_sock, self._stamped_sock, *self._packet_socks.values()):
+            if sock is not None:
+                sock.close()
+        self._ip_sock = self._recv_sock = self._stamped_sock = None
+        self._packet_socks = {}
+
+
+class TunTransport(Transport):
+    def __init__(self, name="tun0", tap=False, mac=MEMORY_MAC, peer_mac=None):
+        """
+        Description: A TUN or TAP device. The kernel routes packets for the device's networks
+                     to it, so what the host sends there is received here, and what is sent
+                     here enters the host's stack as if it came from a wire. The device is
+                     created when it does not exist (needs CAP_NET_ADMIN; a persistent device
+                     made with `ip tuntap add ... user <name>` can be opened without it); it
+                     still has to be given an address and set up, e.g.
+                     `ip addr add 10.9.0.1/24 dev tun0 && ip link set tun0 up`.
+
+                     Each read or write on a TUN/TAP descriptor moves exactly one packet, so
+                     batches are drained with non-blocking reads after one poll; frames whose
+                     header and payload are separate buffers are written with one writev.
+
+        @param name: Device name.
+        @param tap: Open a TAP (Ethernet frames) instead of a TUN (IP datagrams) device.
+        @param mac: Our address on a TAP link.
+        @param peer_mac: The kernel side's address on a TAP link (defaults to the device's).
+        @returns: None
+        """
+        self.name = name
+        self.link_type = LINKTYPE_ETHERNET if tap else LINKTYPE_RAW
+        self._fd = os.open("/dev/net/tun", os.O_RDWR | os.O_NONBLOCK)
+        try:
+            flags = (IFF_TAP if tap else IFF_TUN) | IFF_NO_PI
+            fcntl.ioctl(self._fd, TUNSETIFF, struct.pack("16sH", name.encode(), flags))
+        except OSError:
+            os.close(self._fd)
+            raise
+        if tap:
+            self.mac = mac
+            if peer_mac is None:
+                with open(f"/sys/class/net/{name}/address") as f:
+                    peer_mac = f.read().strip()
+            self.peer_mac = peer_mac
+        self._poller = select.poll()
+        self._poller.register(self._fd, select.POLLIN)
+
+    def fileno(self):
+        return self._fd
+
+    def send_frame(self, frame):
+        os.write(self._fd, frame)
+        if instrumentation.ENABLED:
+            instrumentation.syscall("write", len(frame))
+
+    def send_datagram(self, datagram, dest_IP=None):
+        if self.link_type == LINKTYPE_RAW:
+            self.send_frame(datagram)
+            return
+        #header and datagram gathered by the kernel instead of concatenated here
+        os.writev(self._fd, (self._ether_header(datagram[0] >> 4), datagram))
+        if instrumentation.ENABLED:
+            instrumentation.syscall("writev", len(datagram) + 14)
+
+    def recv_frame(self, timeout=None):
+        try:
+            frame = os.read(self._fd, MAX_FRAME)
+        except BlockingIOError:
+            if timeout == 0 or not self._poller.poll(None if timeout is None else timeout * 1000):
+                return None
+            try:
+                frame = os.read(self._fd, MAX_FRAME)
+            except BlockingIOError:
+                return None
+        if instrumentation.ENABLED:
+            instrumentation.syscall("read", len(frame))
+        return frame
+
+    def recv_into(self, buffer, timeout=None):
+        #the device hands over one packet per read, cut to the buffer without saying so
+        try:
+            length = os.readv(self._fd, (buffer,))
+        except BlockingIOError:
+            if timeout == 0 or not self._poller.poll(None if timeout is None else timeout * 1000):
+                return None
+            try:
+                length = os.readv(self._fd, (buffer,))
+            except BlockingIOError:
+                return None
+        if instrumentation.ENABLED:
+            instrumentation.syscall("readv", length)
+        return length, length, time.time()
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class MemoryTransport(Transport):
+    def __init__(self, mac=MEMORY_MAC, peer_mac=MEMORY_PEER_MAC, link_type=LINKTYPE_ETHERNET,
+                 capacity=None):
+        """
+        Description: One end of an in-memory link; use memory_pair() to make both ends. Frames
+                     are handed over by reference through a deque, so nothing is copied and
+                     no system call is made. Safe to use from two threads (one per end).
+
+        @param mac: This end's Ethernet address.
+        @param peer_mac: The other end's Ethernet address.
+        @param link_type: LINKTYPE_ETHERNET, or LINKTYPE_RAW for a link carrying IP datagrams.
+        @param capacity: Frames the receive queue holds before new ones are dropped (default:
+                         no limit).
+        @returns: None
+        """
+        self.mac = mac
+        self.peer_mac = peer_mac
+        self.link_type = link_type
+        self.capacity = capacity
+        self.peer = None
+        self.inbox = collections.deque()
+        self.received = 0
+        self.dropped = 0
+        self.sent = 0
+        self._cond = threading.Condition()
+        self._waiting = 0
+
+    def _deliver(self, frame):
+        if self.capacity is not None and len(self.inbox) >= self.capacity:
+            self.dropped += 1
+            return
+        self.received += 1
+        self.inbox.append(frame)
+        #a receiver that saw the queue empty registers before waiting, so it cannot miss this
+        if self._waiting:
+            with self._cond:
+                self._cond.notify()
+
+    def send_frame(self, frame):
+        self.peer._deliver(bytes(frame))
+        self.sent += 1
+
+    def send_frames(self, frames):
+        peer = self.peer
+        count = 0
+        for frame in frames:
+            peer._deliver(bytes(frame))
+            count += 1
+        self.sent += count
+        return count
+
+    def recv_frame(self, timeout=None):
+        try:
+            return self.inbox.popleft()
+        except IndexError:
+            if timeout == 0:
+                return None
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._waiting += 1
+            try:
+                while not self.inbox:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+        return self.inbox.popleft()
+
+    def recv_frames(self, max_count=64, timeout=None):
+        frame = self.recv_frame(timeout)
+        if frame is None:
+            return []
+        frames = [frame]
+        inbox = self.inbox
+        while inbox and len(frames) < max_count:
+            frames.append(inbox.popleft())
+        return frames
+
+    def link_stats(self):
+        return {"received": self.received, "dropped": self.dropped}
+
+
+def memory_pair(link_type=LINKTYPE_ETHERNET, capacity=None):
+    """
+    Description: Both ends of an in-memory link. Each end's mac is the other's peer_mac, so
+                 frames sendp() completes on one end are addressed to the other.
+
+    @param link_type: LINKTYPE_ETHERNET or LINKTYPE_RAW.
+    @param capacity: Receive queue limit of each end (default: no limit).
+    @returns: (tuple) (MemoryTransport, MemoryTransport).
+    """
+    left = MemoryTransport(MEMORY_MAC, MEMORY_PEER_MAC, link_type, capacity)
+    right = MemoryTransport(MEMORY_PEER_MAC, MEMORY_MAC, link_type, capacity)
+    left.peer, right.peer = right, left
+    return left, right